@@ -1,38 +1,55 @@
 """
 LLM Client for AI decision making
 """
+import time
 from typing import Optional
 from loguru import logger
 from config.config import config
+from utils.llm_usage import LLMUsageTracker
 
 
 class LLMClient:
     """Client for interacting with LLM providers"""
     
-    def __init__(self):
-        self.provider = config.llm.provider
-        self.model = config.llm.model
+    def __init__(
+        self,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        bot_name: str = "default"
+    ):
+        """
+        Args:
+            provider: openai, deepseek, qwen or anthropic (if None, uses config)
+            model: Model name (if None, uses config)
+            api_key: Provider API key (if None, uses the provider's key from config)
+            bot_name: Bot the calls are accounted to in LLMUsageTracker
+        """
+        self.provider = provider or config.llm.provider
+        self.model = model or config.llm.model
+        self.bot_name = bot_name
+        self.usage = LLMUsageTracker()
         
         if self.provider == "openai":
             from openai import AsyncOpenAI
-            self.client = AsyncOpenAI(api_key=config.llm.openai_api_key)
+            self.client = AsyncOpenAI(api_key=api_key or config.llm.openai_api_key)
         elif self.provider == "deepseek":
             from openai import AsyncOpenAI
             # DeepSeek uses OpenAI-compatible API
             self.client = AsyncOpenAI(
-                api_key=config.llm.deepseek_api_key,
+                api_key=api_key or config.llm.deepseek_api_key,
                 base_url="https://api.deepseek.com"
             )
         elif self.provider == "qwen":
             from openai import AsyncOpenAI
             # Qwen uses OpenAI-compatible API (DashScope International)
             self.client = AsyncOpenAI(
-                api_key=config.llm.qwen_api_key,
+                api_key=api_key or config.llm.qwen_api_key,
                 base_url="https://dashscope-intl.aliyuncs.com/compatible-mode/v1"
             )
         elif self.provider == "anthropic":
             from anthropic import AsyncAnthropic
-            self.client = AsyncAnthropic(api_key=config.llm.anthropic_api_key)
+            self.client = AsyncAnthropic(api_key=api_key or config.llm.anthropic_api_key)
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
         
@@ -41,7 +58,8 @@ class LLMClient:
     async def get_completion(
         self, 
         prompt: str, 
-        system_message: Optional[str] = None
+        system_message: Optional[str] = None,
+        cache_prefix: Optional[str] = None
     ) -> str:
         """
         Get completion from LLM
@@ -49,24 +67,30 @@ class LLMClient:
         Args:
             prompt: User prompt
             system_message: Optional system message
+            cache_prefix: Static start of the prompt that is identical on every call.
+                Anthropic gets it as a separate block marked for prompt caching;
+                OpenAI-compatible providers cache identical prefixes automatically.
             
         Returns:
             LLM response text
         """
+        started = time.perf_counter()
         try:
             if self.provider in ["openai", "deepseek", "qwen"]:
                 # DeepSeek and Qwen use OpenAI-compatible API
-                return await self._get_openai_completion(prompt, system_message)
+                return await self._get_openai_completion(prompt, system_message, started)
             elif self.provider == "anthropic":
-                return await self._get_anthropic_completion(prompt, system_message)
+                return await self._get_anthropic_completion(prompt, system_message, cache_prefix, started)
         except Exception as e:
+            self.usage.record(self.bot_name, self.provider, self.model, time.perf_counter() - started, error=True)
             logger.error(f"Error getting LLM completion: {e}")
             raise
     
     async def _get_openai_completion(
         self, 
         prompt: str, 
-        system_message: Optional[str]
+        system_message: Optional[str],
+        started: float
     ) -> str:
         """Get completion from OpenAI"""
         messages = []
@@ -83,23 +107,60 @@ class LLMClient:
             max_tokens=config.llm.max_tokens
         )
         
+        usage = response.usage
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            # OpenAI and Qwen report cache hits in prompt_tokens_details, DeepSeek at the top level
+            cached = (getattr(details, "cached_tokens", None) if details is not None else None) \
+                or getattr(usage, "prompt_cache_hit_tokens", None) or 0
+            self._record(started, usage.prompt_tokens or 0, cached, 0, usage.completion_tokens or 0)
+        
         return response.choices[0].message.content
     
     async def _get_anthropic_completion(
         self, 
         prompt: str, 
-        system_message: Optional[str]
+        system_message: Optional[str],
+        cache_prefix: Optional[str],
+        started: float
     ) -> str:
         """Get completion from Anthropic"""
+        content = prompt
+        if cache_prefix and len(cache_prefix) < len(prompt) and prompt.startswith(cache_prefix):
+            # Cache breakpoint after the static instructions (covers the system message too)
+            content = [
+                {"type": "text", "text": cache_prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": prompt[len(cache_prefix):]}
+            ]
         response = await self.client.messages.create(
             model=self.model,
             max_tokens=config.llm.max_tokens,
             temperature=config.llm.temperature,
             system=system_message or "",
             messages=[
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": content}
             ]
         )
         
+        usage = response.usage
+        if usage is not None:
+            # input_tokens excludes the tokens read from or written to the cache
+            cached = getattr(usage, "cache_read_input_tokens", None) or 0
+            written = getattr(usage, "cache_creation_input_tokens", None) or 0
+            self._record(started, usage.input_tokens + cached + written, cached, written, usage.output_tokens)
+        
         return response.content[0].text
+    
+    def _record(self, started: float, input_tokens: int, cached: int, written: int, output_tokens: int):
+        """Account one successful call to this client's bot and model"""
+        latency = time.perf_counter() - started
+        self.usage.record(
+            self.bot_name, self.provider, self.model, latency,
+            input_tokens=input_tokens, cached_tokens=cached,
+            cache_write_tokens=written, output_tokens=output_tokens
+        )
+        logger.debug(
+            f"🧠 [{self.bot_name}] {self.model}: {input_tokens:,} in ({cached:,} cached, {written:,} written) "
+            f"/ {output_tokens:,} out in {latency:.2f}s"
+        )
 
@@ -45,7 +45,7 @@ class MoonPhaseTrader:
         self.positions = {}
         
         # Persistent decision storage
-        self.decision_store = DecisionStore(filepath=f"logs/moon_decisions_{symbol}.json")
+        self.decision_store = DecisionStore(filepath=f"logs/moon_decisions_{symbol}.jsonl")
         
         self.trade_history = []
         self.decision_log = []
@@ -2,19 +2,34 @@
 AI Vibe Trader - Main trading agent with LLM integration
 """
 import asyncio
+import time
+from collections import deque
+from functools import partial
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Awaitable
 from loguru import logger
 import json
-import winsound
+
+try:
+    import winsound
+except ImportError:  # Sound alerts are Windows-only
+    winsound = None
 
 from config.config import config
 from agent.llm_client import LLMClient
+from agent.prompt_template import PromptTemplate, SYSTEM_MESSAGE, TRADING_BODY, TRADING_PREFIX
 from utils.logger import setup_logger
 from utils.decision_store import DecisionStore
 from utils.trade_tracker import TradeTracker
-from strategies.indicators import MarketAnalyzer
+from strategies.candles import CandleFrame
 from utils.shared_account_cache import SharedAccountCache
+from utils.shared_kline_store import SharedKlineStore
+from utils.shared_market_analysis import SharedMarketAnalysis
+from utils.exchange_filters import ExchangeFilterCache
+from utils.order_book import OrderBookManager
+from utils.trade_tape import TradeTapeManager
+from utils.mark_price_cache import MarkPriceCache
+from strategies.indicators import MarketAnalyzer
 
 
 class VibeTrader:
@@ -22,13 +37,28 @@ class VibeTrader:
     Autonomous AI trading agent that uses LLM for decision making
     """
     
+    # Timeframes gathered every cycle
+    # Reduced to 3 timeframes to prevent API bans (was 5)
+    TIMEFRAMES = {
+        "1m": {"limit": 360, "label": "Last 6h (1m)"},      # 6 hours - primary for entries
+        "5m": {"limit": 288, "label": "Last 24h (5m)"},     # 24 hours - trend confirmation
+        "15m": {"limit": 96, "label": "Last 24h (15m)"}     # 24 hours - structure
+    }
+    
     def __init__(
         self, 
         aster_client, 
         llm_client: Optional[LLMClient] = None,
         bot_name: str = "VIBE",
         symbol: str = None,
-        decision_log_path: str = None
+        decision_log_path: str = None,
+        account_cache=None,
+        kline_store=None,
+        mark_prices=None,
+        decision_store: Optional[DecisionStore] = None,
+        trade_tracker: Optional[TradeTracker] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+        sound_alerts: bool = True
     ):
         """
         Initialize the Vibe Trader
@@ -39,13 +69,25 @@ class VibeTrader:
             bot_name: Name for this bot instance (for logging)
             symbol: Trading symbol (if None, uses config default)
             decision_log_path: Custom path for decision log (if None, uses default)
+            account_cache: Account data source (if None, uses the SharedAccountCache singleton)
+            kline_store: Candle source (if None, uses the SharedKlineStore singleton)
+            mark_prices: Mark price and funding source (if None, uses the MarkPriceCache singleton)
+            decision_store: Decision storage (if None, creates a file-backed store)
+            trade_tracker: Trade outcome tracker (if None, creates a file-backed tracker)
+            clock: Callable returning the current time (if None, uses datetime.now; backtests inject a simulated clock)
+            sound_alerts: Beep on new positions (Windows only)
         """
         self.aster = aster_client
-        self.llm = llm_client or LLMClient()
+        self.llm = llm_client or LLMClient(bot_name=bot_name)
         self.running = False
         self.positions = {}
         self.bot_name = bot_name
         self.symbol = symbol or config.trading.symbol
+        self._now = clock or datetime.now
+        self.sound_alerts = sound_alerts
+        
+        # Prompt instructions compiled once; only the market data section is rendered per cycle
+        self._prompt = PromptTemplate(TRADING_PREFIX, TRADING_BODY, {"symbol": self.symbol})
         
         # Track when we last opened a position (prevent overtrading)
         self.last_trade_time = None
@@ -56,17 +98,41 @@ class VibeTrader:
         self.pnl_lock_percent = getattr(config.trading, "pnl_lock_percent", 0.01)
         
         # Persistent decision storage (separate file per bot)
-        log_path = decision_log_path or f"logs/decisions_{bot_name}.json"
-        self.decision_store = DecisionStore(filepath=log_path)
+        log_path = decision_log_path or f"logs/decisions_{bot_name}.jsonl"
+        self.decision_store = decision_store or DecisionStore(filepath=log_path)
         
         # Trade outcome tracking for ML (separate file per bot)
-        self.trade_tracker = TradeTracker(filepath=f"logs/trade_outcomes_{bot_name}.json")
-        
-        # Market analysis engine
-        self.market_analyzer = MarketAnalyzer()
+        self.trade_tracker = trade_tracker or TradeTracker(filepath=f"logs/trade_outcomes_{bot_name}.jsonl")
         
         # Shared account cache (singleton across all bots)
-        self.account_cache = SharedAccountCache()
+        self.account_cache = account_cache or SharedAccountCache()
+        
+        # Shared kline store (singleton across all bots) - serves candles from memory once streaming
+        self.kline_store = kline_store or SharedKlineStore()
+        for interval, tf_config in self.TIMEFRAMES.items():
+            self.kline_store.subscribe(self.symbol, interval, tf_config["limit"])
+        
+        # Mark price and funding from the stream (singleton across all bots) - no premiumIndex polling
+        self.mark_prices = mark_prices or MarkPriceCache()
+        self.mark_prices.subscribe(self.symbol)
+        
+        # Shared analysis scheduler (singleton across all bots) - batches indicator work across symbols
+        self.market_analysis = SharedMarketAnalysis()
+        
+        # Symbol trading rules from exchangeInfo (singleton across all bots)
+        self.exchange_filters = ExchangeFilterCache()
+        
+        # Local L2 books from the depth stream (singleton across all bots)
+        self.order_books = OrderBookManager()
+        self.order_books.subscribe(self.symbol)
+        
+        # Aggregated-trade tape with rolling order-flow features (singleton across all bots)
+        self.trade_tape = TradeTapeManager()
+        self.trade_tape.subscribe(self.symbol)
+        
+        # Cycle I/O runs concurrently, bounded per bot, each request with its own deadline
+        self._io_limit = asyncio.Semaphore(config.trading.cycle_max_concurrency)
+        self.cycle_latency = deque(maxlen=200)  # (I/O seconds, total seconds) per cycle
         
         # Trade history is fetched from Aster now, but keep in-memory for compatibility
         self.trade_history = []
@@ -98,7 +164,7 @@ class VibeTrader:
         account_balance = portfolio_state.get("balance", {}).get("total", 100)
         # If AI is selective, use MORE capital when it DOES trade
         # Increased to 1.0/0.6 for better capital utilization with $2k account
-        base_size = min(config.trading.max_position_size * 1.0, account_balance * 0.6)  # 100% of max OR 60% of balance
+        base_size = min(config.trading.max_position_size * 1.0, account_balance * config.trading.position_balance_fraction)  # 100% of max OR 60% of balance
         
         # Confidence multiplier (60-100% confidence -> 0.7x to 2.5x)
         # Higher confidence = larger position
@@ -142,12 +208,12 @@ class VibeTrader:
                 kelly_multiplier)
         
         # Enforce hard limits
-        min_size = config.trading.max_position_size * 0.25  # At least 25% of max ($300 with $1200 max)
+        min_size = config.trading.max_position_size * config.trading.min_position_fraction  # At least 25% of max ($300 with $1200 max)
         max_size = config.trading.max_position_size  # Never exceed max
         
         # Check available margin
         available = portfolio_state.get("available_margin", max_size)
-        size = min(size, available * 0.8)  # Use max 80% of available margin
+        size = min(size, available * config.trading.max_margin_usage)  # Use max 80% of available margin
         
         final_size = max(min_size, min(max_size, size))
         
@@ -177,10 +243,15 @@ class VibeTrader:
         self.running = True
         logger.info("Starting Vibe Trader...")
         
-        # Set leverage for the symbol before trading
+        # Set leverage for the symbol before trading (capped at the exchange's bracket)
+        leverage = config.trading.leverage
+        max_leverage = self.exchange_filters.get(self.symbol).max_leverage(config.trading.max_position_size)
+        if max_leverage and leverage > max_leverage:
+            logger.warning(f"[{self.bot_name}] {leverage}x exceeds the {max_leverage}x bracket for {self.symbol}, using {max_leverage}x")
+            leverage = max_leverage
         try:
-            await self.aster.set_leverage(self.symbol, config.trading.leverage)
-            logger.success(f"✅ [{self.bot_name}] Set leverage to {config.trading.leverage}x for {self.symbol}")
+            await self.aster.set_leverage(self.symbol, leverage)
+            logger.success(f"✅ [{self.bot_name}] Set leverage to {leverage}x for {self.symbol}")
         except Exception as e:
             logger.warning(f"[{self.bot_name}] Could not set leverage: {e}. Using account default.")
         
@@ -193,21 +264,81 @@ class VibeTrader:
             raise
     
     def stop(self):
-        """Stop the trading agent"""
+        """Stop the trading agent and flush its decision and trade journals"""
         self.running = False
+        self.decision_store.close()
+        self.trade_tracker.close()
         logger.info("Stopping Vibe Trader...")
     
+    async def _fetch(self, request: Callable[[], Awaitable], timeout: Optional[float] = None):
+        """
+        Await one exchange request under the bot's concurrency limit and deadline
+        
+        Args:
+            request: Callable returning the request's coroutine (called once a slot is free,
+                so a cancelled wait leaves no coroutine behind)
+            timeout: Seconds before giving up (default: config.trading.cycle_request_timeout)
+        
+        Raises:
+            TimeoutError: If the request misses its deadline
+        """
+        async with self._io_limit:
+            async with asyncio.timeout(timeout or config.trading.cycle_request_timeout):
+                return await request()
+    
+    async def _gather(self, *aws: Awaitable, return_exceptions: bool = False) -> List[Any]:
+        """Run awaitables concurrently (asyncio.gather); the backtester overrides this to await in order"""
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+    
+    async def _fetch_all(self, *requests: Callable[[], Awaitable]) -> List[Any]:
+        """
+        Run requests concurrently through _fetch
+        
+        Args:
+            requests: Callables returning request coroutines (e.g. functools.partial)
+        
+        Returns:
+            Results in request order, with the exception in place of any request that failed
+        """
+        return await self._gather(*(self._fetch(request) for request in requests), return_exceptions=True)
+    
+    def get_cycle_latency(self) -> Dict[str, float]:
+        """
+        Recent trading cycle latency
+        
+        Returns:
+            Last and average I/O phase and total cycle time in milliseconds
+        """
+        if not self.cycle_latency:
+            return {"cycles": 0, "io_ms": 0.0, "avg_io_ms": 0.0, "total_ms": 0.0, "avg_total_ms": 0.0}
+        io_times = [io for io, _ in self.cycle_latency]
+        totals = [total for _, total in self.cycle_latency]
+        return {
+            "cycles": len(self.cycle_latency),
+            "io_ms": io_times[-1] * 1000,
+            "avg_io_ms": sum(io_times) / len(io_times) * 1000,
+            "total_ms": totals[-1] * 1000,
+            "avg_total_ms": sum(totals) / len(totals) * 1000
+        }
+    
     async def _trading_cycle(self):
         """Execute one trading cycle"""
+        started = time.perf_counter()
         try:
-            # 1. Gather market data
-            market_data = await self._gather_market_data()
-            
-            # 2. Analyze current positions
-            portfolio_state = await self._analyze_portfolio()
+            # 1-2. Gather market data and analyze current positions (independent I/O, run together).
+            # Both finish before either error is raised, so neither is left running orphaned
+            market_data, portfolio_state = await self._gather(
+                self._gather_market_data(),
+                self._analyze_portfolio(),
+                return_exceptions=True
+            )
+            for result in (portfolio_state, market_data):
+                if isinstance(result, BaseException):
+                    raise result
             
             # 🛡️ 2.5. Check for missing protective orders and fix them
             await self._ensure_protective_orders(portfolio_state, market_data)
+            io_seconds = time.perf_counter() - started
             
             # 3. Get AI decision
             decision = await self._get_ai_decision(market_data, portfolio_state)
@@ -219,6 +350,10 @@ class VibeTrader:
             # 5. Log decision
             self._log_decision(decision, market_data, portfolio_state)
             
+            total_seconds = time.perf_counter() - started
+            self.cycle_latency.append((io_seconds, total_seconds))
+            logger.debug(f"⏱️ [{self.bot_name}] Cycle I/O {io_seconds * 1000:.0f}ms, total {total_seconds * 1000:.0f}ms")
+            
         except ValueError as e:
             # Balance unavailable - skip this cycle safely
             if "balance" in str(e).lower() or "usdt" in str(e).lower():
@@ -238,63 +373,82 @@ class VibeTrader:
         try:
             symbol = self.symbol
             
-            # Get ticker for current price
-            ticker = await self.aster.get_ticker(symbol)
-            
-            # Gather multiple timeframes for comprehensive analysis
-            # Reduced to 3 timeframes to prevent API bans (was 5)
-            timeframes = {
-                "1m": {"limit": 360, "label": "Last 6h (1m)"},      # 6 hours - primary for entries
-                "5m": {"limit": 288, "label": "Last 24h (5m)"},     # 24 hours - trend confirmation
-                "15m": {"limit": 96, "label": "Last 24h (15m)"}     # 24 hours - structure
-            }
-            
             multi_timeframe_data = {}
+            needs_analysis = []
             
-            # Fetch all timeframes
-            for interval, config_data in timeframes.items():
-                try:
-                    klines = await self.aster.get_klines(
-                        symbol, 
-                        interval=interval, 
-                        limit=config_data["limit"]
-                    )
-                    
-                    candles = []
-                    for k in klines:
-                        candles.append({
-                            "time": datetime.fromtimestamp(int(k[0])/1000).strftime('%Y-%m-%d %H:%M'),
-                            "open": float(k[1]),
-                            "high": float(k[2]),
-                            "low": float(k[3]),
-                            "close": float(k[4]),
-                            "volume": float(k[5])
-                        })
-                    
-                    # Perform technical analysis on this timeframe
-                    analysis = self.market_analyzer.analyze_full_market(candles)
-                    
+            # Serve timeframes from the shared stream-fed store when live; the rest fall back to REST
+            rest_intervals = []
+            for interval, config_data in self.TIMEFRAMES.items():
+                if self.kline_store.is_ready(symbol, interval):
+                    candles = self.kline_store.get_candles(symbol, interval, config_data["limit"])
+                    # Indicators are kept current incrementally as candles stream in
+                    analysis = self.kline_store.get_analysis(symbol, interval, config_data["limit"])
+                    if analysis is None:
+                        needs_analysis.append(interval)
                     multi_timeframe_data[interval] = {
                         "candles": candles,
                         "analysis": analysis,
                         "label": config_data["label"]
                     }
-                    
-                except Exception as e:
-                    logger.warning(f"Could not fetch {interval} data: {e}")
+                else:
+                    rest_intervals.append(interval)
+            
+            # Ticker and REST timeframes in flight together - a failed timeframe is just dropped
+            ticker, *klines_results = await self._fetch_all(
+                partial(self.aster.get_ticker, symbol),
+                *(partial(self.aster.get_klines, symbol, interval=interval, limit=self.TIMEFRAMES[interval]["limit"])
+                  for interval in rest_intervals)
+            )
+            for interval, klines in zip(rest_intervals, klines_results):
+                if isinstance(klines, BaseException):
+                    logger.warning(f"Could not fetch {interval} data: {klines!r}")
+                    continue
+                needs_analysis.append(interval)
+                multi_timeframe_data[interval] = {
+                    "candles": CandleFrame.from_klines(klines),
+                    "analysis": None,
+                    "label": self.TIMEFRAMES[interval]["label"]
+                }
+            multi_timeframe_data = {i: multi_timeframe_data[i] for i in self.TIMEFRAMES if i in multi_timeframe_data}
+            
+            # Perform technical analysis on the remaining timeframes, batched with the other bots
+            results = await asyncio.gather(
+                *(self.market_analysis.analyze(symbol, interval, multi_timeframe_data[interval]["candles"])
+                  for interval in needs_analysis),
+                return_exceptions=True
+            )
+            for interval, result in zip(needs_analysis, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Could not analyze {interval} data: {result}")
+                    del multi_timeframe_data[interval]
+                else:
+                    multi_timeframe_data[interval]["analysis"] = result
             
             # Primary timeframe for main analysis (1m for aggressive trading)
             primary_tf = "1m"
-            primary_candles = multi_timeframe_data.get(primary_tf, {}).get("candles", [])
+            primary_candles = multi_timeframe_data.get(primary_tf, {}).get("candles", CandleFrame.empty())
             primary_analysis = multi_timeframe_data.get(primary_tf, {}).get("analysis", {})
             
+            # Order flow from the trade tape alongside the candle indicators
+            order_flow = self.trade_tape.features(symbol)
+            if order_flow and primary_analysis:
+                primary_analysis = MarketAnalyzer.with_order_flow(primary_analysis, order_flow)
+            
+            if isinstance(ticker, BaseException):
+                if not len(primary_candles):
+                    raise ticker
+                # Keep trading on the latest 1m close rather than skipping the cycle
+                logger.warning(f"[{self.bot_name}] Ticker unavailable ({ticker!r}), using last 1m close")
+                ticker = {"symbol": symbol, "lastPrice": str(float(primary_candles.close[-1]))}
+            
             return {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self._now().isoformat(),
                 "ticker": ticker,
                 "candles": primary_candles,  # Keep for backward compatibility
                 "analysis": primary_analysis,  # Primary timeframe analysis
                 "multi_timeframe": multi_timeframe_data,  # All timeframes
-                "current_price": float(ticker.get('lastPrice', 0))
+                "current_price": self.mark_prices.mark_price(symbol) or float(ticker.get('lastPrice', 0)),
+                "funding": self.mark_prices.funding(symbol)
             }
         except Exception as e:
             logger.error(f"Error gathering market data: {e}")
@@ -361,6 +515,9 @@ class VibeTrader:
                     for order in open_orders
                 )
                 
+                # Exits to place: {"stop_loss"/"take_profit": (trigger price, side)}
+                missing = {}
+                
                 # Get ATR for calculations
                 analysis = market_data.get('analysis', {})
                 current_price = market_data.get('current_price', entry_price)
@@ -377,16 +534,7 @@ class VibeTrader:
                         stop_price = entry_price + (atr * 2.0)
                         close_side = "BUY"
                     
-                    try:
-                        await self.aster.set_stop_loss(
-                            self.symbol, 
-                            stop_price, 
-                            quantity,
-                            side=close_side
-                        )
-                        logger.success(f"✅ [{self.bot_name}] Emergency stop loss set at ${stop_price:.4f}")
-                    except Exception as e:
-                        logger.error(f"Could not set emergency stop loss: {e}")
+                    missing["stop_loss"] = (stop_price, close_side)
                 
                 # 🎯 Missing Take Profit - SET IT INTELLIGENTLY!
                 if not has_take_profit:
@@ -433,16 +581,10 @@ class VibeTrader:
                         
                         close_side = "BUY"
                     
-                    try:
-                        await self.aster.set_take_profit(
-                            self.symbol,
-                            tp_price,
-                            quantity,
-                            side=close_side
-                        )
-                        logger.success(f"✅ [{self.bot_name}] Auto-set take profit at ${tp_price:.4f}")
-                    except Exception as e:
-                        logger.error(f"Could not set take profit: {e}")
+                    missing["take_profit"] = (tp_price, close_side)
+                
+                if missing:
+                    await self._place_missing_exits(missing, quantity)
                 
                 # Log protective orders status
                 if has_stop_loss and has_take_profit:
@@ -451,6 +593,38 @@ class VibeTrader:
         except Exception as e:
             logger.error(f"Error checking protective orders: {e}")
     
+    async def _place_missing_exits(self, missing: Dict[str, tuple], quantity: float):
+        """
+        Place the stop loss and/or take profit an open position is missing
+        
+        Both together go out as one batch request (config.trading.bracket_orders);
+        a single exit, or one the batch rejected, is placed on its own.
+        
+        Args:
+            missing: {"stop_loss"/"take_profit": (trigger price, close side)}
+            quantity: Position size
+        """
+        placed = {}
+        if config.trading.bracket_orders and len(missing) == 2:
+            (sl_price, side), (tp_price, _) = missing["stop_loss"], missing["take_profit"]
+            try:
+                placed = await self.aster.set_protective_orders(self.symbol, sl_price, tp_price, quantity, side=side)
+            except Exception as e:
+                logger.error(f"Could not batch protective orders, placing separately: {e}")
+        
+        labels = {"stop_loss": ("Emergency stop loss", self.aster.set_stop_loss),
+                  "take_profit": ("Auto-set take profit", self.aster.set_take_profit)}
+        for leg, (price, side) in missing.items():
+            label, place = labels[leg]
+            if "orderId" in placed.get(leg, {}):
+                logger.success(f"✅ [{self.bot_name}] {label} at ${price:.4f}")
+                continue
+            try:
+                await place(self.symbol, price, quantity, side=side)
+                logger.success(f"✅ [{self.bot_name}] {label} at ${price:.4f}")
+            except Exception as e:
+                logger.error(f"Could not set {leg.replace('_', ' ')}: {e}")
+    
     async def _analyze_portfolio(self) -> Dict[str, Any]:
         """
         Analyze current portfolio state with risk metrics
@@ -464,9 +638,18 @@ class VibeTrader:
             total_pnl = 0.0
             total_exposure = 0.0
             
+            # Account and open orders (shared cache / user data stream) are independent - fetch them together.
+            # Our own client backs the cache when no shared client is set (single-bot mode)
+            account_result, orders_result = await self._fetch_all(
+                partial(self.account_cache.get_account_data, client=self.aster),
+                partial(self.account_cache.get_open_orders, self.symbol, client=self.aster)
+            )
+            
             try:
-                # Use shared account cache to get positions (already fetched for balance)
-                account = await self.account_cache.get_account_data()
+                # Use shared account cache to get positions (same fetch as the balance below)
+                if isinstance(account_result, BaseException):
+                    raise account_result
+                account = account_result
                 if account:
                     positions = account.get("positions", [])
                 
@@ -482,7 +665,9 @@ class VibeTrader:
             # Get open orders (including stop loss and take profit)
             open_orders = []
             try:
-                open_orders = await self.aster.get_open_orders(self.symbol)
+                if isinstance(orders_result, BaseException):
+                    raise orders_result
+                open_orders = orders_result
                 logger.debug(f"[{self.bot_name}] Found {len(open_orders)} open orders for {self.symbol}")
             except Exception as e:
                 logger.warning(f"Could not fetch open orders: {e}")
@@ -498,7 +683,9 @@ class VibeTrader:
             # Get actual balance using shared cache - CRITICAL for safe position sizing
             try:
                 # Use shared account cache to reduce API calls (all bots share one fetch)
-                account = await self.account_cache.get_account_data()
+                if isinstance(account_result, BaseException):
+                    raise account_result
+                account = account_result
                 if not account:
                     raise ValueError("Shared account cache returned no data")
                 
@@ -587,13 +774,14 @@ class VibeTrader:
         try:
             response = await self.llm.get_completion(
                 prompt=prompt,
-                system_message=self._get_system_message()
+                system_message=self._get_system_message(),
+                cache_prefix=self._prompt.prefix
             )
             
             # Parse LLM response into structured decision
             decision = self._parse_llm_response(response)
             decision["raw_response"] = response
-            decision["timestamp"] = datetime.now().isoformat()
+            decision["timestamp"] = self._now().isoformat()
             
             return decision
             
@@ -606,329 +794,183 @@ class VibeTrader:
         market_data: Dict[str, Any], 
         portfolio_state: Dict[str, Any]
     ) -> str:
-        """Build sophisticated trading prompt with multi-timeframe analysis"""
+        """Build sophisticated trading prompt with multi-timeframe analysis (cached prefix + rendered data)"""
+        return self._prompt.render(self._prompt_features(market_data, portfolio_state))
+    
+    def _prompt_features(
+        self, 
+        market_data: Dict[str, Any], 
+        portfolio_state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Flatten market data and portfolio state into the prompt body's fields
         
-        # Get current price and 24h data
+        Every nested lookup happens once here; the template only formats the values.
+        
+        Returns:
+            Dictionary with one entry per TRADING_BODY field
+        """
         ticker = market_data.get('ticker', {})
-        current_price = float(ticker.get('lastPrice', 0))
-        change_24h = ticker.get('priceChangePercent', 'N/A')
+        # Same price the orders are sized and placed from (mark price, else last trade)
+        current_price = market_data.get('current_price') or float(ticker.get('lastPrice', 0))
         
         # Primary timeframe analysis (1m for aggressive trading)
         analysis = market_data.get('analysis', {})
-        
-        # Build technical indicators summary
-        indicators_summary = f"""
-TECHNICAL INDICATORS (1m timeframe):
-═══════════════════════════════════════════════════════════
-RSI (14): {analysis.get('rsi', 50):.1f} {'🔥 OVERSOLD' if analysis.get('rsi', 50) < 30 else '❄️ OVERBOUGHT' if analysis.get('rsi', 50) > 70 else '⚖️ NEUTRAL'}
-MACD: Line={analysis.get('macd', {}).get('macd', 0):.2f}, Signal={analysis.get('macd', {}).get('signal', 0):.2f}, 
-      Histogram={analysis.get('macd', {}).get('histogram', 0):.2f} {'📈 BULLISH' if analysis.get('macd', {}).get('histogram', 0) > 0 else '📉 BEARISH'}
-      
-Bollinger Bands:
-  Upper: ${analysis.get('bollinger_bands', {}).get('upper', 0):.2f}
-  Middle: ${analysis.get('bollinger_bands', {}).get('middle', 0):.2f}
-  Lower: ${analysis.get('bollinger_bands', {}).get('lower', 0):.2f}
-  Position: {analysis.get('bollinger_bands', {}).get('position', 0.5)*100:.0f}% {'⚠️ Near upper band' if analysis.get('bollinger_bands', {}).get('position', 0.5) > 0.8 else '⚠️ Near lower band' if analysis.get('bollinger_bands', {}).get('position', 0.5) < 0.2 else ''}
-  Width: {analysis.get('bollinger_bands', {}).get('width', 0)*100:.2f}% {'🌊 HIGH VOLATILITY' if analysis.get('bollinger_bands', {}).get('width', 0) > 0.05 else '😴 LOW VOLATILITY'}
-
-ATR (14): ${analysis.get('atr', 0):.2f} ({analysis.get('atr_percent', 0):.2f}% of price)
-
-Momentum (10): {analysis.get('momentum', 0):+.2f}%
-
-Volume:
-  Avg Volume: {analysis.get('volume_profile', {}).get('avg_volume', 0):.0f}
-  Current vs Avg: {analysis.get('volume_profile', {}).get('volume_ratio', 1):.2f}x {'🚀 SURGE' if analysis.get('volume_profile', {}).get('volume_ratio', 1) > 1.5 else '💤 LOW' if analysis.get('volume_profile', {}).get('volume_ratio', 1) < 0.5 else ''}
-  Trend: {analysis.get('volume_profile', {}).get('volume_trend', 0)*100:+.1f}%
-
-Volatility:
-  Std Dev: {analysis.get('volatility', {}).get('std_dev', 0):.2f}%
-  Percentile: {analysis.get('volatility', {}).get('volatility_percentile', 50):.0f}th percentile
-
-Trend Analysis:
-  Trend: {analysis.get('trend', {}).get('trend', 'neutral').upper()} 
-  Strength: {analysis.get('trend', {}).get('strength', 0)*100:.2f}%
-  
-Market Structure:
-  Structure: {analysis.get('market_structure', {}).get('structure', 'ranging').upper()}
-  Support: ${analysis.get('market_structure', {}).get('support', 0):.2f}
-  Resistance: ${analysis.get('market_structure', {}).get('resistance', 0):.2f}
-  Breakout Probability: {analysis.get('market_structure', {}).get('breakout_probability', 0)*100:.0f}%
-
-⭐ TRADE QUALITY SCORE: {analysis.get('trade_quality_score', 50):.0f}/100
-"""
+        rsi = analysis.get('rsi', 50)
+        macd = analysis.get('macd', {})
+        histogram = macd.get('histogram', 0)
+        bands = analysis.get('bollinger_bands', {})
+        bb_position = bands.get('position', 0.5)
+        bb_width = bands.get('width', 0)
+        volume = analysis.get('volume_profile', {})
+        volume_ratio = volume.get('volume_ratio', 1)
+        volatility = analysis.get('volatility', {})
+        trend = analysis.get('trend', {})
+        structure = analysis.get('market_structure', {})
         
         # Multi-timeframe alignment
         mtf_data = market_data.get('multi_timeframe', {})
-        mtf_summary = "\nMULTI-TIMEFRAME ANALYSIS:\n═══════════════════════════════════════════════════════════\n"
-        
+        mtf_lines = []
         for tf in ['5m', '15m', '1h', '4h']:
             if tf in mtf_data:
                 tf_analysis = mtf_data[tf].get('analysis', {})
                 tf_trend = tf_analysis.get('trend', {}).get('trend', 'neutral')
                 tf_rsi = tf_analysis.get('rsi', 50)
                 tf_macd_hist = tf_analysis.get('macd', {}).get('histogram', 0)
-                
-                mtf_summary += f"{tf.upper():>4}: {tf_trend.upper():>8} | RSI={tf_rsi:.0f} | MACD={'🟢' if tf_macd_hist > 0 else '🔴'}\n"
+                mtf_lines.append(f"{tf.upper():>4}: {tf_trend.upper():>8} | RSI={tf_rsi:.0f} | MACD={'🟢' if tf_macd_hist > 0 else '🔴'}")
         
         # Account balance and capital info
         balance_info = portfolio_state.get('balance', {})
         total_balance = balance_info.get('total', 0)
-        available_balance = balance_info.get('available', 0)
         total_exposure = portfolio_state.get('total_exposure', 0)
         
-        account_summary = f"""
-ACCOUNT STATUS:
-═══════════════════════════════════════════════════════════
-Total Balance: ${total_balance:.2f}
-Available Margin: ${available_balance:.2f}
-Current Exposure: ${total_exposure:.2f} ({total_exposure/total_balance*100 if total_balance > 0 else 0:.1f}% of capital)
-Max Position Size: ${config.trading.max_position_size:.2f}
-Recommended Size Range: ${total_balance * 0.2:.2f} - ${total_balance * 0.5:.2f} (20-50% of balance)
-"""
-        
         # Performance feedback (learning loop)
         performance = portfolio_state.get('performance', {})
-        perf_summary = f"""
-YOUR RECENT PERFORMANCE:
-═══════════════════════════════════════════════════════════
-Total Trades: {performance.get('total_trades', 0)}
-Win Rate: {performance.get('win_rate', 0)*100:.1f}%
-Avg Win: {performance.get('avg_win', 0):+.2f}%
-Avg Loss: {performance.get('avg_loss', 0):+.2f}%
-Recent P&L: ${performance.get('recent_pnl', 0):+.2f}
-"""
         daily_perf = performance.get('daily', {})
         daily_pnl = daily_perf.get('pnl_usd', 0.0)
-        daily_trades = daily_perf.get('trades', 0)
-        daily_win_rate = daily_perf.get('win_rate', 0.0)
-        daily_hours = daily_perf.get('hours', 24)
         daily_target_pct = config.trading.daily_target_percent * 100
         equity_pct = (daily_pnl / total_balance * 100) if total_balance else 0.0
-        daily_target_value = total_balance * config.trading.daily_target_percent
-        daily_summary = f"""
-DAILY PERFORMANCE (Last {daily_hours}h):
-═══════════════════════════════════════════════════════════
-Realized P&L: ${daily_pnl:+.2f} ({equity_pct:+.2f}% of equity)
-Trades Closed: {daily_trades} | Win Rate: {daily_win_rate:.1f}%
-Daily Target: +{daily_target_pct:.2f}% (≈ ${daily_target_value:.2f})
-Progress Toward Target: {equity_pct / daily_target_pct * 100 if daily_target_pct else 0:.1f}%"""
-        
-        # Position and orders info
-        positions = portfolio_state.get('positions', [])
-        open_orders = portfolio_state.get('open_orders', [])
         
+        return {
+            "symbol": self.symbol,
+            "price": current_price,
+            "change_24h": ticker.get('priceChangePercent', 'N/A'),
+            "rsi": rsi,
+            "rsi_label": '🔥 OVERSOLD' if rsi < 30 else '❄️ OVERBOUGHT' if rsi > 70 else '⚖️ NEUTRAL',
+            "macd": macd.get('macd', 0),
+            "macd_signal": macd.get('signal', 0),
+            "macd_histogram": histogram,
+            "macd_label": '📈 BULLISH' if histogram > 0 else '📉 BEARISH',
+            "bb_upper": bands.get('upper', 0),
+            "bb_middle": bands.get('middle', 0),
+            "bb_lower": bands.get('lower', 0),
+            "bb_position_pct": bb_position * 100,
+            "bb_position_label": '⚠️ Near upper band' if bb_position > 0.8 else '⚠️ Near lower band' if bb_position < 0.2 else '',
+            "bb_width_pct": bb_width * 100,
+            "bb_width_label": '🌊 HIGH VOLATILITY' if bb_width > 0.05 else '😴 LOW VOLATILITY',
+            "atr": analysis.get('atr', 0),
+            "atr_percent": analysis.get('atr_percent', 0),
+            "momentum": analysis.get('momentum', 0),
+            "avg_volume": volume.get('avg_volume', 0),
+            "volume_ratio": volume_ratio,
+            "volume_label": '🚀 SURGE' if volume_ratio > 1.5 else '💤 LOW' if volume_ratio < 0.5 else '',
+            "volume_trend_pct": volume.get('volume_trend', 0) * 100,
+            "std_dev": volatility.get('std_dev', 0),
+            "volatility_percentile": volatility.get('volatility_percentile', 50),
+            "trend": trend.get('trend', 'neutral').upper(),
+            "trend_strength_pct": trend.get('strength', 0) * 100,
+            "structure": structure.get('structure', 'ranging').upper(),
+            "support": structure.get('support', 0),
+            "resistance": structure.get('resistance', 0),
+            "breakout_pct": structure.get('breakout_probability', 0) * 100,
+            "quality_score": analysis.get('trade_quality_score', 50),
+            "order_flow_section": self._format_order_flow(analysis['order_flow'], analysis.get('order_flow_bias', 'balanced')) if analysis.get('order_flow') else "",
+            "funding_section": self._format_funding(market_data['funding']) if market_data.get('funding') else "",
+            "mtf_lines": "\n".join(mtf_lines),
+            "total_balance": total_balance,
+            "available_balance": balance_info.get('available', 0),
+            "total_exposure": total_exposure,
+            "exposure_pct": total_exposure / total_balance * 100 if total_balance > 0 else 0,
+            "max_position_size": config.trading.max_position_size,
+            "size_low": total_balance * 0.2,
+            "size_high": total_balance * 0.5,
+            "total_trades": performance.get('total_trades', 0),
+            "win_rate_pct": performance.get('win_rate', 0) * 100,
+            "avg_win": performance.get('avg_win', 0),
+            "avg_loss": performance.get('avg_loss', 0),
+            "recent_pnl": performance.get('recent_pnl', 0),
+            "daily_hours": daily_perf.get('hours', 24),
+            "daily_pnl": daily_pnl,
+            "equity_pct": equity_pct,
+            "daily_trades": daily_perf.get('trades', 0),
+            "daily_win_rate": daily_perf.get('win_rate', 0.0),
+            "daily_target_pct": daily_target_pct,
+            "daily_target_value": total_balance * config.trading.daily_target_percent,
+            "target_progress_pct": equity_pct / daily_target_pct * 100 if daily_target_pct else 0,
+            "position_status": self._format_position_status(
+                portfolio_state.get('positions', []), portfolio_state.get('open_orders', []), current_price
+            ),
+        }
+    
+    def _format_position_status(self, positions: List[Dict[str, Any]], open_orders: List[Dict[str, Any]], current_price: float) -> str:
+        """Prompt section for the open position and its protective orders"""
         # Check if we have an ACTUAL position (non-zero amount for our symbol)
         has_position = any(
             pos.get('symbol') == self.symbol and float(pos.get('positionAmt', 0)) != 0 
             for pos in positions
         )
+        if not has_position:
+            return "✅ NO OPEN POSITION - Looking for HIGH QUALITY setups"
         
         # Format position info with protective orders
-        if has_position:
-            position_info = f"⚠️ OPEN POSITION:\n"
-            for pos in positions:
-                if float(pos.get('positionAmt', 0)) != 0:
-                    side = "LONG" if float(pos.get('positionAmt', 0)) > 0 else "SHORT"
-                    entry = float(pos.get('entryPrice', 0))
-                    pnl = float(pos.get('unrealizedProfit', 0))
-                    pnl_pct = (pnl / abs(float(pos.get('notional', 1)))) * 100 if pos.get('notional') else 0
-                    
-                    position_info += f"  {side} {abs(float(pos.get('positionAmt', 0)))} @ ${entry:.4f}\n"
-                    position_info += f"  Entry Price: ${entry:.4f}\n"
-                    position_info += f"  Current Price: ${current_price:.4f}\n"
-                    position_info += f"  Unrealized P&L: ${pnl:+.2f} ({pnl_pct:+.2f}%)\n"
-            
-            # Show protective orders (SL/TP)
-            has_sl = False
-            has_tp = False
-            
-            if open_orders:
-                position_info += f"\n📋 PROTECTIVE ORDERS ({len(open_orders)}):\n"
-                for order in open_orders:
-                    order_type = order.get('type', 'UNKNOWN')
-                    side = order.get('side', '')
-                    price = float(order.get('stopPrice', order.get('price', 0)))
-                    qty = float(order.get('origQty', 0))
-                    
-                    if 'STOP' in order_type and 'TAKE_PROFIT' not in order_type:
-                        position_info += f"  🛡️ STOP LOSS: {side} {qty} @ ${price:.4f}\n"
-                        has_sl = True
-                    elif 'TAKE_PROFIT' in order_type:
-                        position_info += f"  🎯 TAKE PROFIT: {side} {qty} @ ${price:.4f}\n"
-                        has_tp = True
-                    elif 'LIMIT' in order_type:
-                        position_info += f"  🎯 TAKE PROFIT: {side} {qty} @ ${price:.4f}\n"
-                        has_tp = True
-                    else:
-                        position_info += f"  📌 {order_type}: {side} {qty} @ ${price:.4f}\n"
-            
-            # Warn if missing protection
-            if not has_sl:
-                position_info += f"\n  ⚠️ WARNING: NO STOP LOSS SET! Position is UNPROTECTED!\n"
-            if not has_tp:
-                position_info += f"  ⚠️ WARNING: NO TAKE PROFIT SET! No exit target!\n"
-            
-            position_status = position_info.strip()
-        else:
-            position_status = "✅ NO OPEN POSITION - Looking for HIGH QUALITY setups"
+        position_info = f"⚠️ OPEN POSITION:\n"
+        for pos in positions:
+            if float(pos.get('positionAmt', 0)) != 0:
+                side = "LONG" if float(pos.get('positionAmt', 0)) > 0 else "SHORT"
+                entry = float(pos.get('entryPrice', 0))
+                pnl = float(pos.get('unrealizedProfit', 0))
+                pnl_pct = (pnl / abs(float(pos.get('notional', 1)))) * 100 if pos.get('notional') else 0
+                
+                position_info += f"  {side} {abs(float(pos.get('positionAmt', 0)))} @ ${entry:.4f}\n"
+                position_info += f"  Entry Price: ${entry:.4f}\n"
+                position_info += f"  Current Price: ${current_price:.4f}\n"
+                position_info += f"  Unrealized P&L: ${pnl:+.2f} ({pnl_pct:+.2f}%)\n"
         
-        # Build the aggressive prompt
-        prompt = f"""
-🎯 AGGRESSIVE ALPHA-SEEKING CRYPTO TRADER
-
-You are an elite futures trader on Aster DEX. Your mission: GENERATE ALPHA.
-Find edges, time entries perfectly, size positions optimally.
-
-MARKET: {self.symbol}
-Current Price: ${current_price:.2f}
-24h Change: {change_24h}%
-
-{indicators_summary}
-
-{mtf_summary}
-
-{account_summary}
-
-{perf_summary}
-
-{daily_summary}
-
-POSITION STATUS: {position_status}
-
-═══════════════════════════════════════════════════════════
-🎲 DECISION FRAMEWORK:
-═══════════════════════════════════════════════════════════
-
-1. IDENTIFY THE EDGE:
-   - What patterns do you see? (trend, reversal, breakout, range)
-   - Do multiple timeframes align?
-   - Is volume confirming the move?
-   - What's the trade quality score telling you?
-
-2. POSITION SIZING STRATEGY:
-   - Your account: ${total_balance:.2f} total
-   - Recommended range: ${total_balance * 0.2:.2f} - ${total_balance * 0.5:.2f} (20-50% of YOUR balance)
-   - Since you're PATIENT and SELECTIVE, use BIGGER positions when you do trade
-   - Scale UP if: High confidence (>75), strong setup, aligned timeframes
-   - Scale DOWN if: High volatility, conflicting signals, low quality score
-   - Consider your available margin (${available_balance:.2f}) when sizing
-   - DO NOT specify exact size_usd - the system will calculate dynamically based on your confidence and trade quality
-
-3. RISK MANAGEMENT:
-   - ATR-based stops: Set stop_loss using current ATR (${analysis.get('atr', 0):.2f})
-   - Risk/Reward: Minimum 2:1 RR ratio
-   - Stop distance: Use 1.5-2x ATR for breathing room
-   - Take profit: 3-4x ATR or at key resistance/support
-
-4. TIMING:
-   - Enter on confirmation (volume surge, breakout, reversal signal)
-   - Avoid chop (low volume, tight BB, ranging)
-   - Best setups: Trend + RSI extreme + MACD cross + Volume
-
-5. CONFIDENCE CALIBRATION:
-   - FOR OPENING: 95-100: Perfect setup, all signals aligned → BIG size
-   - FOR OPENING: 85-94: Strong setup, most signals aligned → LARGE size
-   - FOR OPENING: 75-84: Good setup, mixed signals but edge present → MEDIUM size
-   - FOR OPENING: 60-74: Marginal setup, small edge → SMALL size
-   - FOR OPENING: <60: No trade (HOLD)
-   
-   - FOR CLOSING: Need 75%+ confidence (strong reversal signal required)
-   - FOR CLOSING: <75%: Keep holding, trust your stop loss
-
-═══════════════════════════════════════════════════════════
-🚀 YOUR MISSION:
-═══════════════════════════════════════════════════════════
-
-Analyze EVERYTHING above. Think like a pro:
-- What's the dominant force? (Bulls or bears)
-- Where's the smart money? (volume, structure)
-- What's the highest probability move?
-- Is this a trade worth taking?
-
-🚨 CRITICAL POSITION RULES:
-═══════════════════════════════════════════════════════════
-If NO position: You can go LONG, SHORT, or HOLD (trade at >60 confidence)
-  - "long" = Open bullish position
-  - "short" = Open bearish position  
-  - "hold" = Wait for better setup (only if confidence <60%)
-
-If HAVE position: You can ONLY use "hold" or "close"
-  - "hold" = Keep current position open (DEFAULT - be patient!)
-  - "close" = Exit current position NOW (only if strong reversal signal)
-  - ❌ NEVER use "long" or "short" when you have a position!
-  - ❌ If you want to reverse (long→short), say "close" first
-  
-🛡️ ANTI-OVERTRADING RULES:
-  - DON'T close positions just because price moved 0.5%
-  - DON'T panic exit on small indicator changes
-  - DO let positions breathe (minimum 5 minutes)
-  - DO close only on STRONG reversal signals (RSI flip, MACD cross, volume divergence)
-  - Your stop loss will protect you - trust it!
-  - Better to HOLD and let the trade develop than flip-flop
-
-⚠️ PROTECTIVE ORDERS (CRITICAL):
-  - YOU determine optimal stop_loss and take_profit based on YOUR analysis
-  - Use support/resistance levels, volatility (ATR), and market structure
-  - stop_loss: Position where market would invalidate your thesis
-  - take_profit: Target based on Fibonacci, resistance levels, or risk/reward
-  - AIM for at least 2:1 risk/reward ratio (reward > 2x risk)
-  - Be SMART: tighter stops in volatile conditions, wider in stable trends
-  - If market structure is unclear, use ATR-based: SL at -2x ATR, TP at +3-4x ATR
-
-Respond with JSON ONLY (no markdown, no explanation outside JSON):
-{{
-    "action": "long" | "short" | "close" | "hold",
-    "symbol": "{self.symbol}",
-    "stop_loss": <exact_price_level_you_decide>,
-    "take_profit": <exact_price_level_you_decide>,
-    "reasoning": "Technical analysis with specific indicators cited",
-    "confidence": <0-100>,
-    "edge_identified": "Brief description of your edge",
-    "timeframe_alignment": "bullish" | "bearish" | "mixed" | "neutral",
-    "expected_rr": <expected_risk_reward_ratio>
-}}
-
-NOTE: Do NOT include "size_usd" field - sizing is handled automatically based on your confidence and market conditions.
-
-🎯 TRADE SMART. TRADE AGGRESSIVE. FIND ALPHA.
-"""
+        # Show protective orders (SL/TP)
+        has_sl = False
+        has_tp = False
         
-        return prompt
+        if open_orders:
+            position_info += f"\n📋 PROTECTIVE ORDERS ({len(open_orders)}):\n"
+            for order in open_orders:
+                order_type = order.get('type', 'UNKNOWN')
+                side = order.get('side', '')
+                price = float(order.get('stopPrice', order.get('price', 0)))
+                qty = float(order.get('origQty', 0))
+                
+                if 'STOP' in order_type and 'TAKE_PROFIT' not in order_type:
+                    position_info += f"  🛡️ STOP LOSS: {side} {qty} @ ${price:.4f}\n"
+                    has_sl = True
+                elif 'TAKE_PROFIT' in order_type:
+                    position_info += f"  🎯 TAKE PROFIT: {side} {qty} @ ${price:.4f}\n"
+                    has_tp = True
+                elif 'LIMIT' in order_type:
+                    position_info += f"  🎯 TAKE PROFIT: {side} {qty} @ ${price:.4f}\n"
+                    has_tp = True
+                else:
+                    position_info += f"  📌 {order_type}: {side} {qty} @ ${price:.4f}\n"
+        
+        # Warn if missing protection
+        if not has_sl:
+            position_info += f"\n  ⚠️ WARNING: NO STOP LOSS SET! Position is UNPROTECTED!\n"
+        if not has_tp:
+            position_info += f"  ⚠️ WARNING: NO TAKE PROFIT SET! No exit target!\n"
+        
+        return position_info.strip()
     
     def _get_system_message(self) -> str:
         """Get system message for LLM"""
-        return """You are an ELITE cryptocurrency futures trader and market maker with 10+ years experience.
-
-🧠 YOUR EXPERTISE:
-- Advanced technical analysis (price action, market structure, order flow)
-- Multi-timeframe correlation and trend identification
-- Volatility trading and options market insights
-- Statistical arbitrage and mean reversion strategies
-- Momentum and breakout trading with precision entries
-- Risk management: Kelly Criterion, position sizing, portfolio heat
-- Trading psychology: discipline, patience, objective decision-making
-
-🎯 YOUR EDGE:
-You identify asymmetric risk/reward opportunities where probability and payoff align.
-You recognize when markets offer genuine alpha vs random noise.
-You understand that NOT trading is often the best trade.
-
-⚡ YOUR MINDSET:
-- AGGRESSIVE when edge is clear (high quality setups)
-- PATIENT when edge is unclear (wait for A+ setups)
-- DISCIPLINED with stops (cut losses fast, let winners run)
-- ADAPTIVE to changing market regimes (trend vs range vs breakout)
-
-📊 YOUR PROCESS:
-1. Analyze ALL provided indicators and timeframes
-2. Synthesize information into a coherent market view
-3. Identify specific technical triggers for entry/exit
-4. Assess trade quality and confidence honestly
-5. Express conviction through confidence score (not position size)
-
-🚀 YOUR MISSION: Generate consistent positive returns through skilled pattern recognition,
-disciplined risk management, and high-quality trade selection. Every decision must be
-backed by technical evidence. Trade like your career depends on it - because it does."""
+        return SYSTEM_MESSAGE
     
     def _parse_llm_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response into structured decision"""
@@ -972,8 +1014,9 @@ backed by technical evidence. Trade like your career depends on it - because it
         confidence = decision.get("confidence", 0)
         
         # Only trade if confidence is high enough
-        if confidence < 60:
-            logger.info(f"⏸️ [{self.bot_name}] Skipping trade - confidence too low: {confidence}% (need ≥60%)")
+        if confidence < config.trading.confidence_threshold:
+            logger.info(f"⏸️ [{self.bot_name}] Skipping trade - confidence too low: {confidence}% "
+                        f"(need ≥{config.trading.confidence_threshold}%)")
             return
         
         # Get portfolio state for dynamic sizing
@@ -1004,7 +1047,7 @@ backed by technical evidence. Trade like your career depends on it - because it
         
         time_in_position = None
         if self.last_trade_time:
-            time_in_position = (datetime.now() - self.last_trade_time).total_seconds()
+            time_in_position = (self._now() - self.last_trade_time).total_seconds()
         
         if has_position:
             # If we have a position, only allow HOLD or CLOSE actions
@@ -1038,7 +1081,9 @@ backed by technical evidence. Trade like your career depends on it - because it
             if action in ["long", "short"]:
                 # Get current market analysis
                 analysis = market_data.get('analysis', {})
-                current_price = float(market_data.get('ticker', {}).get('lastPrice', 0))
+                # Mark price read from memory at execution time; last trade price as fallback
+                current_price = (self.mark_prices.mark_price(symbol)
+                                 or float(market_data.get('ticker', {}).get('lastPrice', 0)))
                 atr = analysis.get('atr', current_price * 0.02)  # Fallback to 2% of price
                 atr_percent = analysis.get('atr_percent', 2.0)
                 trade_quality = analysis.get('trade_quality_score', 50)
@@ -1055,16 +1100,20 @@ backed by technical evidence. Trade like your career depends on it - because it
                     portfolio_state=portfolio_state
                 )
                 
+                # 📚 LIQUIDITY CHECK: size against the local book (no REST calls)
+                book = self.order_books.get(symbol)
+                if book is not None:
+                    size_usd = self._fit_to_book(book, action, size_usd)
+                    if size_usd is None:
+                        return
+                
                 # Calculate asset quantity from dynamically calculated USD notional
                 quantity = size_usd / current_price
                 
-                # For ASTERUSDT, round to whole number. For BTCUSDT, use 3 decimals
-                if "ASTER" in symbol:
-                    quantity = round(quantity, 0)  # Whole numbers for ASTER
-                    min_qty = 1
-                else:
-                    quantity = round(quantity, 3)  # 3 decimals for BTC
-                    min_qty = 0.001
+                # Snap to the symbol's lot step; the minimum also covers MIN_NOTIONAL
+                filters = self.exchange_filters.get(symbol)
+                quantity = filters.round_quantity(quantity, market=True)
+                min_qty = filters.min_quantity(current_price)
                 
                 if quantity < min_qty:
                     logger.warning(f"Position size too small: {quantity}, increasing to minimum {min_qty}")
@@ -1072,8 +1121,8 @@ backed by technical evidence. Trade like your career depends on it - because it
                 
                 # 🎯 ATR-BASED DYNAMIC STOPS
                 # Calculate stop loss if not provided or improve it with ATR
-                atr_multiplier_stop = 2.0  # 2x ATR for stop loss
-                atr_multiplier_tp = 4.0    # 4x ATR for take profit (2:1 RR)
+                atr_multiplier_stop = config.trading.atr_stop_multiplier       # 2x ATR for stop loss
+                atr_multiplier_tp = config.trading.atr_take_profit_multiplier  # 4x ATR for take profit (2:1 RR)
                 
                 if action == "long":
                     # For longs: stop below, target above
@@ -1131,18 +1180,13 @@ backed by technical evidence. Trade like your career depends on it - because it
                 logger.info(f"[{self.bot_name}]   Risk/Reward: {rr_ratio:.2f}:1")
                 logger.info(f"[{self.bot_name}]   Confidence: {confidence}% | Quality: {trade_quality:.0f}/100")
                 
-                # Open new position
+                # Open new position together with its stop loss and take profit
                 side = "buy" if action == "long" else "sell"
-                order = await self.aster.place_order(
-                    symbol=symbol,
-                    side=side,
-                    size=quantity,
-                    order_type="market"
-                )
+                order = await self._open_position(symbol, side, quantity, stop_loss, take_profit)
                 logger.success(f"[{self.bot_name}] {action.upper()} position opened: {order}")
                 
                 # Track when we opened this position (for anti-overtrading)
-                self.last_trade_time = datetime.now()
+                self.last_trade_time = self._now()
                 
                 # Track trade for ML dataset
                 try:
@@ -1158,46 +1202,21 @@ backed by technical evidence. Trade like your career depends on it - because it
                     logger.warning(f"Could not start trade tracking: {e}")
                 
                 # Play sound notification
-                try:
-                    logger.info(f"Playing {action.upper()} sound alert...")
-                    if action == "long":
-                        # Higher pitch for BUY/LONG
-                        winsound.Beep(1000, 500)
-                    else:
-                        # Lower pitch for SELL/SHORT
-                        winsound.Beep(500, 500)
-                    logger.info(f"Sound alert played successfully")
-                except Exception as e:
-                    logger.warning(f"Could not play sound: {e}")
-                
-                # Determine the closing side: SELL for longs, BUY for shorts
-                close_side = "SELL" if action == "long" else "BUY"
-                
-                # Set stop loss and take profit
-                try:
-                    sl_order = await self.aster.set_stop_loss(
-                        symbol, 
-                        stop_loss, 
-                        quantity,
-                        side=close_side
-                    )
-                    logger.success(f"[{self.bot_name}] Stop loss set at ${stop_loss:.2f}")
-                except Exception as e:
-                    logger.warning(f"Could not set stop loss: {e}")
-                    
-                try:
-                    tp_order = await self.aster.set_take_profit(
-                        symbol, 
-                        take_profit, 
-                        quantity,
-                        side=close_side
-                    )
-                    logger.success(f"[{self.bot_name}] Take profit set at ${take_profit:.2f}")
-                except Exception as e:
-                    logger.warning(f"Could not set take profit: {e}")
+                if self.sound_alerts and winsound is not None:
+                    try:
+                        logger.info(f"Playing {action.upper()} sound alert...")
+                        if action == "long":
+                            # Higher pitch for BUY/LONG
+                            winsound.Beep(1000, 500)
+                        else:
+                            # Lower pitch for SELL/SHORT
+                            winsound.Beep(500, 500)
+                        logger.info(f"Sound alert played successfully")
+                    except Exception as e:
+                        logger.warning(f"Could not play sound: {e}")
                 
                 self.trade_history.append({
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": self._now().isoformat(),
                     "action": action,
                     "order": order,
                     "decision": decision
@@ -1207,9 +1226,11 @@ backed by technical evidence. Trade like your career depends on it - because it
                 # Close existing position
                 position = await self.aster.get_position(symbol)
                 if position:
-                    # Get current price for tracking
-                    ticker = await self.aster.get_ticker(symbol)
-                    exit_price = float(ticker.get('lastPrice', 0))
+                    # Get current price for tracking (mark price from memory when streaming)
+                    exit_price = self.mark_prices.mark_price(symbol)
+                    if not exit_price:
+                        ticker = await self.aster.get_ticker(symbol)
+                        exit_price = float(ticker.get('lastPrice', 0))
                     
                     close_order = await self.aster.close_position(symbol)
                     logger.info(f"Closed position: {close_order}")
@@ -1236,7 +1257,7 @@ backed by technical evidence. Trade like your career depends on it - because it
                         logger.warning(f"Could not cancel orders: {e}")
                     
                     self.trade_history.append({
-                        "timestamp": datetime.now().isoformat(),
+                        "timestamp": self._now().isoformat(),
                         "action": "close",
                         "order": close_order,
                         "decision": decision
@@ -1245,6 +1266,120 @@ backed by technical evidence. Trade like your career depends on it - because it
         except Exception as e:
             logger.error(f"Error executing decision: {e}")
     
+    @staticmethod
+    def _format_order_flow(order_flow: Dict[str, Any], bias: str) -> str:
+        """Prompt section for the streamed order-flow features"""
+        lines = [f"\nORDER FLOW (live trades): {bias.upper()} {'🟢' if bias == 'buying' else '🔴' if bias == 'selling' else '⚖️'}"]
+        for window, stats in order_flow.items():
+            if not isinstance(stats, dict) or "delta_ratio" not in stats:
+                continue
+            vwap = f"${stats['vwap']:.4f}" if stats['vwap'] is not None else "n/a"
+            lines.append(f"  {window:>5}: VWAP={vwap} | Delta={stats['delta_ratio']*100:+.0f}% of volume | "
+                         f"{stats['trade_rate']:.1f} trades/s | Large prints: {stats['large_prints']}")
+        burst = order_flow.get('burst', 0)
+        lines.append(f"  Trade rate burst: {burst:.2f}x {'🚀 ACTIVITY SPIKE' if burst > 2 else ''}")
+        large = order_flow.get('last_large_print')
+        if large:
+            lines.append(f"  Last large print: {large['side'].upper()} ${large['notional']:,.0f} @ ${large['price']:.4f}")
+        return "\n".join(lines) + "\n"
+    
+    @staticmethod
+    def _format_funding(funding: Dict[str, Any]) -> str:
+        """Prompt section for the streamed funding rate and its settled history"""
+        rate = funding['rate']
+        payer = "longs pay shorts" if rate > 0 else "shorts pay longs" if rate < 0 else "no payments"
+        lines = [
+            "\nFUNDING:",
+            f"  Current: {rate*100:+.4f}% per {funding['interval_hours']:g}h ({payer}) | "
+            f"Annualized: {funding['annualized_rate']*100:+.1f}% {'⚠️ CROWDED' if abs(funding['annualized_rate']) > 0.5 else ''}",
+            f"  Next settlement in {funding['minutes_to_funding']:.0f} min"
+        ]
+        averages = [(label, funding.get(key)) for label, key in (("Last", "last_settled_rate"), ("24h avg", "avg_rate_24h"), ("7d avg", "avg_rate_7d"))]
+        if any(value is not None for _, value in averages):
+            lines.append("  Settled: " + " | ".join(f"{label} {value*100:+.4f}%" for label, value in averages if value is not None))
+        return "\n".join(lines) + "\n"
+    
+    def _fit_to_book(self, book, action: str, size_usd: float) -> Optional[float]:
+        """
+        Fit a market entry to the liquidity resting in the order book
+        
+        Args:
+            book: Synced OrderBook for the symbol
+            action: "long" or "short"
+            size_usd: Intended position notional
+            
+        Returns:
+            Notional that fills within config.trading.max_entry_slippage_bps of mid,
+            or None if the spread is too wide to enter at all
+        """
+        side = "BUY" if action == "long" else "SELL"
+        spread_bps = book.spread_bps()
+        if spread_bps is None or spread_bps > config.trading.max_entry_spread_bps:
+            logger.warning(f"⚠️ [{self.bot_name}] Spread too wide to enter "
+                           f"({spread_bps if spread_bps is not None else float('nan'):.1f} bps > "
+                           f"{config.trading.max_entry_spread_bps:.1f} bps) - skipping {action.upper()}")
+            return None
+        
+        available = book.depth(side, config.trading.max_entry_slippage_bps)
+        if available <= 0:
+            logger.warning(f"⚠️ [{self.bot_name}] No liquidity within "
+                           f"{config.trading.max_entry_slippage_bps:.0f} bps of mid - skipping {action.upper()}")
+            return None
+        if size_usd > available:
+            logger.warning(f"⚠️ [{self.bot_name}] Book holds ${available:.2f} within "
+                           f"{config.trading.max_entry_slippage_bps:.0f} bps - reducing size from ${size_usd:.2f}")
+            size_usd = available
+        
+        fill = book.estimate_fill(side, size_usd)
+        if fill is not None:
+            logger.info(f"[{self.bot_name}] 📚 Book: spread {spread_bps:.1f} bps, est. slippage "
+                        f"{fill['slippage_bps']:.1f} bps, imbalance {book.imbalance() or 0:+.2f}")
+        return size_usd
+    
+    async def _open_position(
+        self,
+        symbol: str,
+        side: str,
+        quantity: float,
+        stop_loss: float,
+        take_profit: float
+    ) -> Dict[str, Any]:
+        """
+        Market entry plus stop loss and take profit
+        
+        With config.trading.bracket_orders all three go out in one batch request, so
+        the position is never left unprotected between round trips; any exit the batch
+        couldn't place is retried on its own.
+        
+        Returns:
+            The entry order
+        """
+        close_side = "SELL" if side.upper() == "BUY" else "BUY"
+        exits = (("stop_loss", "Stop loss", stop_loss, self.aster.set_stop_loss),
+                 ("take_profit", "Take profit", take_profit, self.aster.set_take_profit))
+        
+        if config.trading.bracket_orders:
+            bracket = await self.aster.place_bracket_order(symbol, side, quantity, stop_loss, take_profit)
+            order, placed = bracket["entry"], bracket
+        else:
+            order = await self.aster.place_order(symbol=symbol, side=side, size=quantity, order_type="market")
+            placed = {}
+        
+        for leg, label, price, place in exits:
+            result = placed.get(leg)
+            if result is not None and "orderId" in result:
+                logger.success(f"[{self.bot_name}] {label} set at ${price:.2f}")
+                continue
+            if result is not None:
+                logger.warning(f"[{self.bot_name}] {label} rejected in batch ({result.get('msg', result)}) - retrying")
+            try:
+                await place(symbol, price, quantity, side=close_side)
+                logger.success(f"[{self.bot_name}] {label} set at ${price:.2f}")
+            except Exception as e:
+                logger.warning(f"Could not set {label.lower()}: {e}")
+        
+        return order
+    
     def _log_decision(
         self, 
         decision: Dict[str, Any], 
@@ -1257,7 +1392,7 @@ backed by technical evidence. Trade like your career depends on it - because it
         
         # Also keep in memory for backward compatibility
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now().isoformat(),
             "decision": decision,
             "market_snapshot": market_data,
             "portfolio_snapshot": portfolio_state
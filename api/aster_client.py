@@ -2,19 +2,44 @@
 Aster API Client - Wallet-based Authentication
 Based on official Aster API V3 specification
 """
-import aiohttp
+import asyncio
 import json
 import math
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
+import aiohttp
 from loguru import logger
 
-from eth_abi import encode
-from eth_account import Account
-from eth_account.messages import encode_defunct
+from eth_keys import keys
+from eth_utils import keccak
 from web3 import Web3
 
+from api.http_pool import HttpPool, HttpResponse
+from api.resilience import RequestResilience, is_idempotent
 from config.config import config
+from utils.exchange_filters import ExchangeFilterCache
+from utils.rate_limiter import Priority, RateLimiter, default_priority, order_count, request_weight
+
+
+# EIP-191 prefix for a 32-byte message (what encode_defunct(hexstr=msg_hash) signs)
+EIP191_PREFIX = b"\x19Ethereum Signed Message:\n32"
+
+# Shared by every client when config.aster.sign_in_thread is on
+_sign_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _client_order_id() -> str:
+    """Unique newClientOrderId (the API allows ^[.A-Z:/a-z0-9_-]{1,36}$)"""
+    return f"avt-{uuid.uuid4().hex[:28]}"
+
+
+def _get_sign_executor() -> ThreadPoolExecutor:
+    global _sign_executor
+    if _sign_executor is None:
+        _sign_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="aster-sign")
+    return _sign_executor
 
 
 class AsterClient:
@@ -23,11 +48,25 @@ class AsterClient:
     Uses Ethereum wallet-based authentication
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        user_address: Optional[str] = None,
+        signer_address: Optional[str] = None,
+        private_key: Optional[str] = None,
+        priority: Optional[Priority] = None
+    ):
+        """
+        Args:
+            user_address: Main wallet address (default: config.aster.user_address)
+            signer_address: API signer address (default: config.aster.signer_address)
+            private_key: Signer private key (default: config.aster.private_key)
+            priority: Rate limiter class for every request from this client
+                (e.g. Priority.DASHBOARD); default picks one per endpoint
+        """
         # Ensure addresses are in proper checksum format for eth-abi
         # Strip any trailing whitespace and validate length
-        user_addr = config.aster.user_address.strip()
-        signer_addr = config.aster.signer_address.strip()
+        user_addr = (user_address or config.aster.user_address).strip()
+        signer_addr = (signer_address or config.aster.signer_address).strip()
         
         # Validate address length (should be 42 chars: 0x + 40 hex digits)
         if len(user_addr) != 42:
@@ -37,20 +76,35 @@ class AsterClient:
         
         self.user_address = Web3.to_checksum_address(user_addr)
         self.signer_address = Web3.to_checksum_address(signer_addr)
-        self.private_key = config.aster.private_key.strip()
+        self.private_key = (private_key or config.aster.private_key).strip()
         self.base_url = config.aster.api_url
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Connections come from the process-wide pool shared with every other client
+        self._pool = HttpPool()
+        
+        # ABI head of (string, address, address, uint256): string offset and the two
+        # constant addresses, so each request only packs the nonce and the JSON
+        self._abi_prefix = (
+            (4 * 32).to_bytes(32, "big")
+            + bytes.fromhex(self.user_address[2:]).rjust(32, b"\0")
+            + bytes.fromhex(self.signer_address[2:]).rjust(32, b"\0")
+        )
+        self._signing_key: Optional[tuple] = None  # (private_key, parsed key), parsed on first use
+        
+        # Exchange limits are per IP, so every client in the process shares one limiter
+        self._limiter = RateLimiter()
+        self._filters = ExchangeFilterCache()
+        self._resilience = RequestResilience()
+        self.priority = priority
         
         logger.info("Aster API Client initialized (wallet-based auth)")
     
     async def __aenter__(self):
-        timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        self._pool.open()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The pool closes once the last client using it has exited
+        await self._pool.close()
     
     def _sign_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -70,25 +124,18 @@ class AsterClient:
         params['recvWindow'] = 50000
         params['timestamp'] = int(round(time.time() * 1000))
         
-        # Create message to sign
+        # Create message to sign and sign it
         msg_hash = self._create_message_hash(params, nonce)
         
-        # Sign the message
-        signable_msg = encode_defunct(hexstr=msg_hash)
-        signed_message = Account.sign_message(
-            signable_message=signable_msg, 
-            private_key=self.private_key
-        )
-        
         # Add signature fields
         params['nonce'] = nonce
         params['user'] = self.user_address
         params['signer'] = self.signer_address
-        params['signature'] = '0x' + signed_message.signature.hex()
+        params['signature'] = self._sign_hash(msg_hash)
         
         return params
     
-    def _create_message_hash(self, params: Dict[str, Any], nonce: int) -> str:
+    def _create_message_hash(self, params: Dict[str, Any], nonce: int) -> bytes:
         """
         Create message hash for signing
         
@@ -97,7 +144,7 @@ class AsterClient:
             nonce: Unique nonce value
             
         Returns:
-            Keccak hash of encoded message
+            Keccak hash of the ABI-encoded (json, user, signer, nonce) message
         """
         # Trim and convert all values to strings
         trimmed_params = self._trim_dict(params.copy())
@@ -105,14 +152,39 @@ class AsterClient:
         # Create JSON string (sorted keys, no spaces)
         json_str = json.dumps(trimmed_params, sort_keys=True).replace(' ', '').replace("'", '"')
         
-        # Encode message
-        encoded = encode(
-            ['string', 'address', 'address', 'uint256'],
-            [json_str, self.user_address, self.signer_address, nonce]
-        )
+        # Same bytes as eth_abi.encode(['string', 'address', 'address', 'uint256'], ...)
+        data = json_str.encode("utf-8")
+        encoded = b"".join((
+            self._abi_prefix,
+            nonce.to_bytes(32, "big"),
+            len(data).to_bytes(32, "big"),
+            data,
+            b"\0" * (-len(data) % 32)
+        ))
+        
+        return keccak(encoded)
+    
+    def _get_signing_key(self) -> keys.PrivateKey:
+        """Parsed signer key, cached until private_key changes"""
+        if self._signing_key is None or self._signing_key[0] != self.private_key:
+            raw = self.private_key[2:] if self.private_key.startswith("0x") else self.private_key
+            self._signing_key = (self.private_key, keys.PrivateKey(bytes.fromhex(raw)))
+        return self._signing_key[1]
+    
+    def _sign_hash(self, msg_hash: bytes) -> str:
+        """
+        Sign a message hash as an EIP-191 personal message
         
-        # Return keccak hash
-        return Web3.keccak(encoded).hex()
+        Args:
+            msg_hash: 32-byte message hash
+            
+        Returns:
+            0x-prefixed r || s || v signature (v = 27/28), as Account.sign_message produces
+        """
+        signature = self._get_signing_key().sign_msg_hash(keccak(EIP191_PREFIX + msg_hash))
+        return '0x' + (
+            signature.r.to_bytes(32, "big") + signature.s.to_bytes(32, "big") + bytes([signature.v + 27])
+        ).hex()
     
     def _trim_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -146,87 +218,139 @@ class AsterClient:
         self, 
         method: str, 
         endpoint: str, 
-        params: Optional[Dict] = None
+        params: Optional[Dict] = None,
+        signed: bool = True,
+        priority: Optional[Priority] = None
     ) -> Dict[str, Any]:
-        """Make authenticated API request"""
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        """
+        Make API request
         
+        Args:
+            method: HTTP method
+            endpoint: API path
+            params: Request parameters
+            signed: Add the wallet signature (False for public market data)
+            priority: Rate limiter class (default: the client's priority, else by endpoint)
+        """
         url = f"{self.base_url}{endpoint}"
         params = params or {}
-        
-        # Sign the request
-        signed_params = self._sign_request(params)
+        if priority is None:
+            priority = self.priority if self.priority is not None else default_priority(method, endpoint, signed)
         
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded',
             'User-Agent': 'AsterVibeTrader/1.0'
         }
         
-        try:
+        async def send() -> Any:
+            # Wait for our share of the exchange-wide weight budget (before signing, so the
+            # timestamp isn't aged by the wait)
+            await self._limiter.acquire(
+                request_weight(method, endpoint, params), priority, order_count(method, endpoint, params)
+            )
+            
+            # Sign the request (optionally off the event loop so concurrent bots don't stall it)
+            if not signed:
+                signed_params = {key: value for key, value in params.items() if value is not None}
+            elif config.aster.sign_in_thread:
+                signed_params = await asyncio.get_running_loop().run_in_executor(
+                    _get_sign_executor(), self._sign_request, params
+                )
+            else:
+                signed_params = self._sign_request(params)
+            
             if method == "GET":
-                async with self.session.get(url, params=signed_params, headers=headers) as response:
-                    if response.status >= 400:
-                        error_text = await response.text()
-                        logger.error(f"API Error {response.status}: {error_text}")
-                    response.raise_for_status()
-                    return await response.json()
-            elif method == "POST":
-                # POST requests - always send params as form data in body (even if empty)
-                async with self.session.post(url, data=signed_params, headers=headers) as response:
-                    if response.status >= 400:
-                        error_text = await response.text()
-                        logger.error(f"API Error {response.status}: {error_text}")
-                    response.raise_for_status()
-                    return await response.json()
-            elif method == "PUT":
-                # PUT requests - send params as form data in body
-                async with self.session.put(url, data=signed_params, headers=headers) as response:
-                    if response.status >= 400:
-                        error_text = await response.text()
-                        logger.error(f"API Error {response.status}: {error_text}")
-                    response.raise_for_status()
-                    return await response.json()
-            elif method == "DELETE":
-                # DELETE requests - send params as form data in body
-                async with self.session.delete(url, data=signed_params, headers=headers) as response:
-                    if response.status >= 400:
-                        error_text = await response.text()
-                        logger.error(f"API Error {response.status}: {error_text}")
-                    response.raise_for_status()
-                    return await response.json()
+                response = await self._pool.request("GET", url, params=signed_params, headers=headers)
+            else:
+                # POST/PUT/DELETE - always send params as form data in body (even if empty)
+                response = await self._pool.request(method, url, data=signed_params, headers=headers)
+            return self._read_response(response)
+        
+        # A new order carries its client id, so an unknown outcome is settled by looking it up
+        reconcile = None
+        if method == "POST" and endpoint.endswith("/order") and params.get("newClientOrderId"):
+            reconcile = lambda: self._find_order(params["symbol"], params["newClientOrderId"])
+        
+        try:
+            return await self._resilience.call(
+                method, endpoint, send,
+                idempotent=is_idempotent(method, endpoint),
+                reconcile=reconcile,
+                hedge=method == "GET" and not self._limiter.is_constrained(priority)
+            )
         except Exception as e:
             logger.error(f"API request failed: {e}")
             raise
     
+    def _read_response(self, response: HttpResponse) -> Any:
+        """Feed rate limit headers to the limiter, then decode the body (raising on errors)"""
+        self._limiter.update_from_headers(response.headers)
+        if response.status >= 400:
+            error_text = response.text()
+            logger.error(f"API Error {response.status}: {error_text}")
+            if response.status in (418, 429):
+                retry_after = response.headers.get("Retry-After")
+                self._limiter.back_off(response.status, float(retry_after) if retry_after else None)
+        response.raise_for_status()
+        return response.json()
+    
     # ========== Market Data Methods ==========
     
     async def get_markets(self) -> List[Dict[str, Any]]:
         """Get list of available markets"""
-        return await self._request("GET", "/fapi/v3/exchangeInfo", {})
+        exchange_info = await self._request("GET", "/fapi/v1/exchangeInfo", {}, signed=False)
+        self._limiter.configure_from_exchange_info(exchange_info)
+        return exchange_info
     
     async def get_orderbook(self, symbol: str = "BTCUSDT", limit: int = 20) -> Dict[str, Any]:
         """Get orderbook for a symbol"""
-        return await self._request("GET", "/fapi/v3/depth", {"symbol": symbol, "limit": limit})
+        return await self._request("GET", "/fapi/v1/depth", {"symbol": symbol, "limit": limit}, signed=False)
     
     async def get_recent_trades(self, symbol: str = "BTCUSDT", limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent trades for a symbol"""
-        return await self._request("GET", "/fapi/v3/trades", {"symbol": symbol, "limit": limit})
+        return await self._request("GET", "/fapi/v1/trades", {"symbol": symbol, "limit": limit}, signed=False)
     
     async def get_funding_rates(self, symbol: str = "BTCUSDT") -> Dict[str, Any]:
-        """Get current funding rate"""
-        return await self._request("GET", "/fapi/v3/premiumIndex", {"symbol": symbol})
+        """Get current funding rate (bots read it from MarkPriceCache instead)"""
+        return await self._request("GET", "/fapi/v1/premiumIndex", {"symbol": symbol}, signed=False)
+    
+    async def get_funding_history(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Get settled funding rates, oldest first
+        
+        Args:
+            symbol: Trading symbol
+            start_time: Earliest funding time in ms (inclusive)
+            end_time: Latest funding time in ms (inclusive)
+            limit: Number of settlements (max 1000)
+            
+        Returns:
+            List of {"symbol", "fundingRate", "fundingTime"}
+        """
+        params = {"symbol": symbol, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return await self._request("GET", "/fapi/v1/fundingRate", params, signed=False)
     
     async def get_ticker(self, symbol: str = "BTCUSDT") -> Dict[str, Any]:
         """Get 24hr ticker"""
-        return await self._request("GET", "/fapi/v3/ticker/24hr", {"symbol": symbol})
+        return await self._request("GET", "/fapi/v1/ticker/24hr", {"symbol": symbol}, signed=False)
     
     async def get_klines(
         self, 
         symbol: str = "BTCUSDT", 
         interval: str = "1h", 
-        limit: int = 24
+        limit: int = 24,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
     ) -> List[List]:
         """
         Get historical candlestick data
@@ -234,17 +358,24 @@ class AsterClient:
         Args:
             symbol: Trading pair (e.g., "BTCUSDT")
             interval: Candlestick interval (1m, 5m, 15m, 1h, 4h, 1d, etc.)
-            limit: Number of candles to fetch (default 24 for 24 hours of 1h data)
+            limit: Number of candles to fetch (default 24 for 24 hours of 1h data, max 1500)
+            start_time: Earliest open time in ms (optional, for paging through history)
+            end_time: Latest open time in ms (optional)
         
         Returns:
             List of candlesticks, each containing:
             [timestamp, open, high, low, close, volume, ...]
         """
-        return await self._request("GET", "/fapi/v1/klines", {
+        params = {
             "symbol": symbol,
             "interval": interval,
             "limit": limit
-        })
+        }
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return await self._request("GET", "/fapi/v1/klines", params, signed=False)
     
     # ========== Account Methods ==========
     
@@ -276,6 +407,21 @@ class AsterClient:
             params["symbol"] = symbol
         return await self._request("GET", "/fapi/v3/openOrders", params)
     
+    async def _find_order(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look an order up by client order id (settles requests whose outcome is unknown)
+        
+        Returns:
+            The order, or None if the exchange has no order with that id
+        """
+        params = {"symbol": symbol, "origClientOrderId": client_order_id}
+        try:
+            return await self._request("GET", "/fapi/v3/order", params, priority=Priority.ORDER)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 400:  # -2013 Order does not exist
+                return None
+            raise
+    
     async def get_all_orders(
         self, 
         symbol: str = "BTCUSDT", 
@@ -362,71 +508,93 @@ class AsterClient:
     
     # ========== Trading Methods ==========
     
-    def _format_quantity(self, symbol: str, quantity: float) -> str:
+    def _format_quantity(self, symbol: str, quantity: float, market: bool = False) -> str:
         """
-        Format quantity to match symbol's precision requirements
+        Format quantity to the symbol's lot step (LOT_SIZE / MARKET_LOT_SIZE)
         
         Args:
             symbol: Trading symbol (e.g., "BTCUSDT", "ASTERUSDT")
             quantity: Raw quantity value
+            market: Use the MARKET_LOT_SIZE filter
             
         Returns:
-            Formatted quantity string with correct precision
-        """
-        symbol_upper = symbol.upper()
-        # Precision map derived from Aster lot size filters
-        precision_map = {
-            "ASTERUSDT": 0,   # whole numbers only
-            "BTCUSDT": 3,
-            "ETHUSDT": 3,
-            "SOLUSDT": 2,     # step size 0.01 on Aster
-            "BNBUSDT": 2      # step size 0.01 on Aster (API error if 3 decimals)
-        }
-        precision = precision_map.get(symbol_upper, 3)
-        
-        # Round to specified precision
-        quantity_rounded = round(quantity, precision)
-        
-        # Handle floating point precision issues by converting to string with exact precision
-        if precision == 0:
-            # For whole numbers, ensure we return an integer string
-            return str(int(quantity_rounded))
-        else:
-            # For decimals, format with exact precision and remove trailing zeros
-            # Use format to ensure exact precision, then strip trailing zeros
-            formatted = f"{quantity_rounded:.{precision}f}"
-            return formatted.rstrip('0').rstrip('.') if '.' in formatted else formatted
+            Quantity string on the nearest step
+        """
+        return self._filters.get(symbol).format_quantity(quantity, market)
     
     def _format_price(self, symbol: str, price: float) -> str:
         """
-        Format price to match symbol's precision requirements
+        Format price to the symbol's tick size (PRICE_FILTER)
         
         Args:
             symbol: Trading symbol
             price: Raw price value
             
         Returns:
-            Formatted price string with correct precision
-        """
-        # Round based on price level (more precise for lower prices)
-        if price >= 1000:
-            precision = 1  # BTC (~$100k)
-        elif price >= 100:
-            precision = 2  # SOL, BNB (~$200-$1k)
-        elif price >= 10:
-            precision = 3  # ETH (~$4k)
-        else:
-            precision = 4  # ASTER and low-priced assets (~$1)
+            Price string on the nearest tick
+        """
+        return self._filters.get(symbol).format_price(price)
+    
+    def _order_params(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        order_type: str = "MARKET",
+        price: Optional[float] = None,
+        position_side: str = "BOTH",
+        reduce_only: bool = False
+    ) -> Dict[str, Any]:
+        """Parameters of a MARKET/LIMIT order (shared by place_order and batches)"""
+        params = {
+            "symbol": symbol,
+            "side": side.upper(),
+            "type": order_type.upper(),
+            "positionSide": position_side,
+            "quantity": self._format_quantity(symbol, size, market=order_type.upper() == "MARKET"),
+            "reduceOnly": "true" if reduce_only else "false",  # API expects string "true"/"false"
+            "newClientOrderId": _client_order_id()  # Lets a retry find the order instead of duplicating it
+        }
+        
+        if order_type.upper() == "LIMIT":
+            if not price:
+                raise ValueError("Price is required for LIMIT orders")
+            params["price"] = self._format_price(symbol, price)
+            params["timeInForce"] = "GTC"
         
-        price_rounded = round(price, precision)
+        return params
+    
+    def _protective_params(
+        self,
+        symbol: str,
+        order_type: str,
+        stop_price: float,
+        size: float,
+        side: str,
+        close_position: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Parameters of a STOP_MARKET / TAKE_PROFIT_MARKET exit order
         
-        # Handle floating point precision issues by converting to string with exact precision
-        if precision == 0 or price_rounded == int(price_rounded):
-            return str(int(price_rounded))
+        Args:
+            close_position: Close-all order instead of reduce-only `size`; it can be
+                accepted before the position exists (needed inside a batch, which
+                the exchange may process in any order)
+        """
+        params = {
+            "symbol": symbol,
+            "side": side.upper(),
+            "type": order_type,
+            "stopPrice": self._format_price(symbol, stop_price),
+            "positionSide": "BOTH",
+            "newClientOrderId": _client_order_id()
+        }
+        if close_position:
+            params["closePosition"] = "true"
         else:
-            # Format with exact precision and remove trailing zeros
-            formatted = f"{price_rounded:.{precision}f}"
-            return formatted.rstrip('0').rstrip('.') if '.' in formatted else formatted
+            params["quantity"] = self._format_quantity(symbol, size, market=True)
+            params["reduceOnly"] = "true"
+        return params
     
     async def place_order(
         self,
@@ -453,22 +621,87 @@ class AsterClient:
         Returns:
             Order response
         """
-        params = {
-            "symbol": symbol,
-            "side": side.upper(),
-            "type": order_type.upper(),
-            "positionSide": position_side,
-            "quantity": self._format_quantity(symbol, size),
-            "reduceOnly": "true" if reduce_only else "false"  # API expects string "true"/"false"
-        }
+        params = self._order_params(symbol, side, size, order_type, price, position_side, reduce_only)
+        return await self._request("POST", "/fapi/v3/order", params)
+    
+    async def place_batch_orders(
+        self,
+        orders: List[Dict[str, Any]],
+        priority: Optional[Priority] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Place up to 5 orders in one signed request (POST batchOrders)
         
-        if order_type.upper() == "LIMIT":
-            if not price:
-                raise ValueError("Price is required for LIMIT orders")
-            params["price"] = self._format_price(symbol, price)
-            params["timeInForce"] = "GTC"
+        Args:
+            orders: Order parameter dicts (as built by _order_params/_protective_params)
+            priority: Rate limiter class (default: ORDER)
+            
+        Returns:
+            One entry per order, in the same order: the order, or {"code", "msg"} if
+            that order was rejected
+        """
+        if not 1 <= len(orders) <= 5:
+            raise ValueError(f"batchOrders takes 1-5 orders, got {len(orders)}")
+        # Sent (and signed) as a compact JSON array of string-valued order objects
+        batch = json.dumps(
+            [{key: str(value) for key, value in order.items()} for order in orders],
+            separators=(",", ":")
+        )
+        results = await self._request("POST", "/fapi/v3/batchOrders", {"batchOrders": batch}, priority=priority)
+        if not isinstance(results, list) or len(results) != len(orders):
+            raise ValueError(f"Unexpected batchOrders response: {results}")
+        return results
+    
+    async def place_bracket_order(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        stop_loss: float,
+        take_profit: float,
+        order_type: str = "MARKET",
+        price: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Open a position with its stop loss and take profit in a single request
         
-        return await self._request("POST", "/fapi/v3/order", params)
+        The exits are close-all STOP_MARKET / TAKE_PROFIT_MARKET orders, so they are
+        valid whichever order the exchange processes the batch in. If the entry is
+        rejected, any exits that were accepted are cancelled.
+        
+        Args:
+            symbol: Trading symbol
+            side: Entry side, "BUY" (long) or "SELL" (short)
+            size: Entry quantity
+            stop_loss: Stop loss trigger price
+            take_profit: Take profit trigger price
+            order_type: Entry type, "MARKET" or "LIMIT"
+            price: Limit price (LIMIT entries)
+            
+        Returns:
+            {"entry": ..., "stop_loss": ..., "take_profit": ...}; an exit that was
+            rejected holds {"code", "msg"} and has to be placed separately
+            
+        Raises:
+            ValueError: The entry order was rejected
+        """
+        close_side = "SELL" if side.upper() == "BUY" else "BUY"
+        entry, sl, tp = await self.place_batch_orders([
+            self._order_params(symbol, side, size, order_type, price),
+            self._protective_params(symbol, "STOP_MARKET", stop_loss, size, close_side, close_position=True),
+            self._protective_params(symbol, "TAKE_PROFIT_MARKET", take_profit, size, close_side, close_position=True)
+        ], priority=Priority.ORDER)
+        
+        if "orderId" not in entry:
+            for leg in (sl, tp):
+                if "orderId" in leg:
+                    try:
+                        await self.cancel_order(symbol, leg["orderId"])
+                    except Exception as e:
+                        logger.error(f"Could not cancel exit {leg['orderId']} after rejected entry: {e}")
+            raise ValueError(f"Entry order rejected: {entry.get('msg', entry)}")
+        
+        return {"entry": entry, "stop_loss": sl, "take_profit": tp}
     
     async def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
         """Cancel an order"""
@@ -515,21 +748,8 @@ class AsterClient:
             size: Position size
             side: "SELL" for LONG positions, "BUY" for SHORT positions
         """
-        # Format price and quantity with proper precision
-        stop_price_rounded = self._format_price(symbol, stop_price)
-        quantity_formatted = self._format_quantity(symbol, size)
-        
-        params = {
-            "symbol": symbol,
-            "side": side.upper(),
-            "type": "STOP_MARKET",
-            "stopPrice": stop_price_rounded,
-            "quantity": quantity_formatted,
-            "positionSide": "BOTH",
-            "reduceOnly": "true"
-        }
-        
-        return await self._request("POST", "/fapi/v3/order", params)
+        params = self._protective_params(symbol, "STOP_MARKET", stop_price, size, side)
+        return await self._request("POST", "/fapi/v3/order", params, priority=Priority.PROTECTIVE)
     
     async def set_take_profit(self, symbol: str, target_price: float, size: float, side: str = "SELL") -> Dict[str, Any]:
         """
@@ -541,21 +761,35 @@ class AsterClient:
             size: Position size
             side: "SELL" for LONG positions, "BUY" for SHORT positions
         """
-        # Format price and quantity with proper precision
-        target_price_rounded = self._format_price(symbol, target_price)
-        quantity_formatted = self._format_quantity(symbol, size)
-        
-        params = {
-            "symbol": symbol,
-            "side": side.upper(),
-            "type": "TAKE_PROFIT_MARKET",
-            "stopPrice": target_price_rounded,
-            "quantity": quantity_formatted,
-            "positionSide": "BOTH",
-            "reduceOnly": "true"
-        }
+        params = self._protective_params(symbol, "TAKE_PROFIT_MARKET", target_price, size, side)
+        return await self._request("POST", "/fapi/v3/order", params, priority=Priority.PROTECTIVE)
+    
+    async def set_protective_orders(
+        self,
+        symbol: str,
+        stop_price: float,
+        target_price: float,
+        size: float,
+        side: str = "SELL"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Set stop loss and take profit for an open position in one request
         
-        return await self._request("POST", "/fapi/v3/order", params)
+        Args:
+            symbol: Trading symbol
+            stop_price: Stop loss trigger price
+            target_price: Take profit trigger price
+            size: Position size
+            side: "SELL" for LONG positions, "BUY" for SHORT positions
+            
+        Returns:
+            {"stop_loss": ..., "take_profit": ...}; a rejected order holds {"code", "msg"}
+        """
+        sl, tp = await self.place_batch_orders([
+            self._protective_params(symbol, "STOP_MARKET", stop_price, size, side),
+            self._protective_params(symbol, "TAKE_PROFIT_MARKET", target_price, size, side)
+        ], priority=Priority.PROTECTIVE)
+        return {"stop_loss": sl, "take_profit": tp}
     
     async def set_leverage(self, symbol: str, leverage: int) -> Dict[str, Any]:
         """Set leverage for a symbol"""
@@ -565,6 +799,20 @@ class AsterClient:
         }
         return await self._request("POST", "/fapi/v3/leverage", params)
     
+    async def get_leverage_brackets(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get notional and leverage brackets
+        
+        Args:
+            symbol: Single symbol (all symbols if None)
+            
+        Returns:
+            List of {"symbol", "brackets": [{"initialLeverage", "notionalFloor", ...}]}
+        """
+        params = {"symbol": symbol} if symbol else {}
+        result = await self._request("GET", "/fapi/v3/leverageBracket", params)
+        return [result] if isinstance(result, dict) else result
+    
     # ========== User Data Stream Methods ==========
     
     async def start_user_data_stream(self) -> str:
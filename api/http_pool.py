@@ -0,0 +1,225 @@
+"""
+Shared HTTP Transport
+One aiohttp connection pool for every AsterClient in the process (all bots and the
+dashboard), so requests ride a few warm keep-alive TLS connections instead of each
+client opening its own
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Optional
+
+import aiohttp
+from loguru import logger
+
+from config.config import config
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is used without it
+    orjson = None
+
+
+def loads(body: bytes) -> Any:
+    """Decode a JSON response body (orjson when installed)"""
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+class HttpResponse:
+    """Fully read response, safe to hand across event loops"""
+    __slots__ = ("status", "headers", "body", "reason", "request_info", "history")
+
+    def __init__(self, response: aiohttp.ClientResponse, body: bytes):
+        self.status = response.status
+        self.headers = response.headers
+        self.body = body
+        self.reason = response.reason
+        self.request_info = response.request_info
+        self.history = response.history
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return loads(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                self.request_info, self.history, status=self.status, message=self.reason or "", headers=self.headers
+            )
+
+
+class HttpPool:
+    """
+    Singleton aiohttp session + TCPConnector shared by all AsterClients
+
+    The session lives on the event loop that first used it (the bots' loop). Calls
+    from another loop - the dashboard API runs uvicorn in its own thread - are
+    forwarded to that loop, so they reuse the same connections. aiohttp speaks
+    HTTP/1.1 without pipelining; throughput comes from keep-alive reuse and
+    several connections per host.
+
+    Clients register with open() / close(); the session is closed when the last
+    one leaves (one-shot scripts) and stays up for long-running bots.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._users = 0
+
+        # Transport metrics (connections opened == TLS handshakes for https)
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.forwarded = 0
+        self._initialized = True
+        logger.info("✅ HttpPool initialized")
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.connections_opened += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.connections_reused += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    def _create_session(self, loop: asyncio.AbstractEventLoop) -> aiohttp.ClientSession:
+        aster = config.aster
+        connector = aiohttp.TCPConnector(
+            limit=aster.http_pool_size,
+            limit_per_host=aster.http_pool_per_host,
+            keepalive_timeout=aster.http_keepalive,
+            use_dns_cache=True,
+            ttl_dns_cache=aster.http_dns_ttl,
+        )
+        self._loop = loop
+        logger.info(f"🔌 HTTP pool ready ({aster.http_pool_per_host} connections per host, "
+                    f"keep-alive {aster.http_keepalive:.0f}s)")
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=aster.http_timeout),
+            trace_configs=[self._trace_config()],
+        )
+
+    def _home_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Loop that owns the session, if it can still run requests"""
+        if self._session is None or self._session.closed or self._loop is None or self._loop.is_closed():
+            return None
+        return self._loop
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Session for the running loop
+
+        Creates the pool on first use; a loop other than the owner only gets its own
+        session when the owner has gone away (e.g. consecutive asyncio.run calls).
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._home_loop() is not loop:
+                self._retire(self._session, self._loop)
+                self._session = self._create_session(loop)
+            return self._session
+
+    @staticmethod
+    def _retire(session: Optional[aiohttp.ClientSession], loop: Optional[asyncio.AbstractEventLoop]):
+        """Close a session on its own loop without waiting (the caller runs on another loop)"""
+        if session is None or session.closed or loop is None or loop.is_closed():
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # Stopped but not closed: nothing else drives it, so run the close to completion
+            threading.Thread(
+                target=loop.run_until_complete, args=(session.close(),), name="http-pool-close", daemon=True
+            ).start()
+
+    def open(self):
+        """Register a client (AsterClient.__aenter__)"""
+        with self._lock:
+            self._users += 1
+
+    async def close(self, force: bool = False):
+        """
+        Unregister a client; closes the session when nobody uses it any more
+
+        Args:
+            force: Close regardless of registered clients (process shutdown)
+        """
+        with self._lock:
+            self._users = 0 if force else max(0, self._users - 1)
+            if self._users or self._home_loop() is None:
+                return
+            session, loop = self._session, self._loop
+            self._session = None
+        if loop is asyncio.get_running_loop():
+            await session.close()
+        elif loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+        else:
+            self._retire(session, loop)
+        logger.info("🔌 HTTP pool closed")
+
+    async def _send(self, method: str, url: str, **kwargs) -> HttpResponse:
+        async with self.get_session().request(method, url, **kwargs) as response:
+            return HttpResponse(response, await response.read())
+
+    async def request(self, method: str, url: str, **kwargs) -> HttpResponse:
+        """
+        Send a request over the shared pool and read the whole body
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed to aiohttp (params, data, headers, ...)
+
+        Returns:
+            HttpResponse (status, headers, body; json() decodes with orjson)
+        """
+        home = self._home_loop()
+        if home is not None and home is not asyncio.get_running_loop() and home.is_running():
+            self.forwarded += 1
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self._send(method, url, **kwargs), home)
+            )
+        return await self._send(method, url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection pool metrics for logging and the dashboard"""
+        connector = self._session.connector if self._home_loop() else None
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values()) if connector else 0
+        in_use = len(getattr(connector, "_acquired", ())) if connector else 0
+        reused_of = self.connections_opened + self.connections_reused
+        return {
+            "requests": self.requests,
+            "open_connections": idle + in_use,
+            "idle_connections": idle,
+            "in_use_connections": in_use,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.connections_opened if config.aster.api_url.startswith("https") else 0,
+            "reuse_ratio": round(self.connections_reused / reused_of, 3) if reused_of else 0.0,
+            "forwarded_requests": self.forwarded,
+            "json_decoder": "orjson" if orjson is not None else "json",
+        }
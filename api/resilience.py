@@ -0,0 +1,365 @@
+"""
+Request Resilience
+Retries with decorrelated jitter, Retry-After handling, hedged GETs and per-endpoint
+circuit breakers around AsterClient requests, so a transient 502 or timeout costs
+a fraction of a second instead of a whole trading cycle
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+from config.config import config
+from utils.rate_limiter import route_of
+
+
+# Non-GET routes that are safe to repeat (the second call leaves the same state)
+IDEMPOTENT_ROUTES = {"leverage", "listenKey", "allOpenOrders", "marginType", "positionSide/dual"}
+
+# Outcomes reported to metrics hooks
+OK = "ok"
+THROTTLED = "throttled"    # 429/418 - rejected before execution, retry after Retry-After
+REJECTED = "rejected"      # Never reached the exchange (connect/TLS failure)
+UNKNOWN = "unknown"        # Timeout, disconnect or 5xx - the request may have executed
+FATAL = "fatal"            # Client error (4xx) or bug - retrying would not help
+RECONCILED = "reconciled"  # Outcome unknown, but the order was found on the exchange
+CIRCUIT_OPEN = "circuit_open"
+
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without sending when an endpoint's circuit breaker is open"""
+
+
+def is_idempotent(method: str, endpoint: str) -> bool:
+    """True if repeating the request can't change the outcome (GET, cancel-all, leverage, ...)"""
+    return method in ("GET", "PUT") or route_of(endpoint) in IDEMPOTENT_ROUTES
+
+
+def classify(error: BaseException) -> str:
+    """
+    Map a failed attempt to an outcome
+
+    Returns:
+        THROTTLED, REJECTED, UNKNOWN or FATAL
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        if error.status in (418, 429):
+            return THROTTLED
+        return UNKNOWN if error.status in RETRYABLE_STATUSES else FATAL
+    if isinstance(error, aiohttp.ClientConnectorError):
+        return REJECTED
+    if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return UNKNOWN
+    return FATAL
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header, if the error carries one"""
+    headers = getattr(error, "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float) -> float:
+    """Next backoff delay: uniform(base, 3 * previous), capped (AWS "decorrelated jitter")"""
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker: opens after consecutive server/transport failures, lets
+    one probe through after the reset timeout and closes again when it succeeds
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self, now: float) -> bool:
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return self.state != self.OPEN
+
+    def on_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def on_failure(self, now: float) -> bool:
+        """Count a failure; True if this opened the circuit"""
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            opened = self.state != self.OPEN
+            self.state = self.OPEN
+            self.opened_at = now
+            return opened
+        return False
+
+    def retry_in(self, now: float) -> float:
+        return max(0.0, self.reset_timeout - (now - self.opened_at)) if self.state == self.OPEN else 0.0
+
+
+class EndpointStats:
+    """Latency window (for the hedge threshold) and attempt counters of one endpoint"""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self._p95: Optional[float] = None
+        self._since_sort = 0
+        self.counts: Dict[str, int] = {}
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, latency: float):
+        self.latencies.append(latency)
+        self._since_sort += 1
+
+    def p95(self, min_samples: int) -> Optional[float]:
+        """95th percentile of recent successful latencies (re-sorted every 10 samples)"""
+        if len(self.latencies) < min_samples:
+            return None
+        if self._p95 is None or self._since_sort >= 10:
+            ordered = sorted(self.latencies)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self._since_sort = 0
+        return self._p95
+
+
+class RequestResilience:
+    """
+    Singleton retry/hedge/breaker layer shared by every AsterClient
+
+    Retry rules:
+        - THROTTLED / REJECTED attempts never executed, so any request is retried
+          (after Retry-After for 429/418, unless that exceeds retry_max_wait)
+        - UNKNOWN attempts are retried only when the request is idempotent; for
+          orders the caller's reconcile() looks the order up by its client order
+          id first and returns it instead of sending a duplicate
+        - FATAL errors are raised at once
+
+    Every attempt (including hedges) is passed to the registered metrics hooks as
+    a dict: method, endpoint, attempt, hedged, outcome, status, latency, error.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()  # The dashboard calls in from its own thread
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._stats: Dict[Tuple[str, str], EndpointStats] = {}
+        self._hooks: List[Callable[[Dict[str, Any]], None]] = []
+        self._initialized = True
+        logger.info("✅ RequestResilience initialized")
+
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        """Register a callback that receives every attempt record"""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _endpoint(self, key: Tuple[str, str]) -> Tuple[CircuitBreaker, EndpointStats]:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                aster = config.aster
+                breaker = self._breakers[key] = CircuitBreaker(aster.breaker_failure_threshold, aster.breaker_reset_timeout)
+                self._stats[key] = EndpointStats(aster.hedge_window)
+            return breaker, self._stats[key]
+
+    def _report(self, key: Tuple[str, str], attempt: int, outcome: str, latency: float,
+                error: Optional[BaseException] = None, hedged: bool = False):
+        stats = self._stats[key]
+        stats.counts[outcome] = stats.counts.get(outcome, 0) + 1
+        record = {
+            "method": key[0],
+            "endpoint": key[1],
+            "attempt": attempt,
+            "hedged": hedged,
+            "outcome": outcome,
+            "status": getattr(error, "status", None) if error else 200,
+            "latency": latency,
+            "error": str(error) if error else None,
+        }
+        for hook in list(self._hooks):
+            try:
+                hook(record)
+            except Exception as e:
+                logger.debug(f"Resilience metrics hook failed: {e}")
+
+    async def call(
+        self,
+        method: str,
+        endpoint: str,
+        send: Callable[[], Awaitable[Any]],
+        idempotent: bool,
+        reconcile: Optional[Callable[[], Awaitable[Any]]] = None,
+        hedge: bool = False
+    ) -> Any:
+        """
+        Run a request with retries, optional hedging and the endpoint's breaker
+
+        Args:
+            method: HTTP method
+            endpoint: API path (breakers and stats are per method + route)
+            send: One full attempt (rate limit, sign, send, decode); called again per retry
+            idempotent: Safe to repeat when the outcome is unknown
+            reconcile: For non-idempotent requests: returns the already-executed
+                result (e.g. the order looked up by client id) or None if it didn't execute
+            hedge: Send a duplicate after the endpoint's p95 latency (GETs only)
+
+        Returns:
+            The result of the first successful attempt (or of reconcile())
+        """
+        aster = config.aster
+        key = (method, route_of(endpoint))
+        breaker, stats = self._endpoint(key)
+        delay = aster.retry_base_delay
+
+        for attempt in range(1, max(aster.retry_max_attempts, 1) + 1):
+            now = time.monotonic()
+            with self._lock:
+                allowed = breaker.allow(now)
+            if not allowed:
+                self._report(key, attempt, CIRCUIT_OPEN, 0.0)
+                raise CircuitOpenError(
+                    f"Circuit open for {method} {key[1]} (retry in {breaker.retry_in(now):.0f}s)"
+                )
+
+            started = time.monotonic()
+            try:
+                if hedge and method == "GET" and aster.hedge_requests:
+                    result = await self._hedged(key, stats, attempt, send)
+                else:
+                    result = await send()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                outcome = classify(e)
+                latency = time.monotonic() - started
+                with self._lock:
+                    if outcome == UNKNOWN or outcome == REJECTED:
+                        if breaker.on_failure(time.monotonic()):
+                            logger.warning(f"⚡ Circuit opened for {method} {key[1]} after {breaker.failures} failures")
+                    else:
+                        breaker.on_success()  # The endpoint answered (4xx / throttled)
+                self._report(key, attempt, outcome, latency, e)
+
+                if outcome == FATAL or attempt >= aster.retry_max_attempts:
+                    raise
+                if outcome == UNKNOWN and not idempotent:
+                    if reconcile is None:
+                        raise
+                    try:
+                        found = await reconcile()
+                    except Exception as lookup_error:
+                        logger.error(f"❌ Could not settle {method} {key[1]} after {outcome} failure: {lookup_error}")
+                        raise e from lookup_error
+                    if found is not None:
+                        self._report(key, attempt, RECONCILED, time.monotonic() - started)
+                        logger.info(f"🔎 {method} {key[1]} had executed despite the error - using the exchange's record")
+                        return found
+
+                delay = decorrelated_jitter(delay, aster.retry_base_delay, aster.retry_max_delay)
+                if outcome == THROTTLED:
+                    wait = retry_after(e)
+                    if wait is not None and wait > aster.retry_max_wait:
+                        raise
+                    delay = max(delay, wait or 0.0)
+                stats.retries += 1
+                logger.warning(f"🔁 {method} {key[1]} failed ({outcome}: {e}) - retry {attempt}/"
+                               f"{aster.retry_max_attempts - 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            latency = time.monotonic() - started
+            with self._lock:
+                breaker.on_success()
+            stats.observe(latency)
+            self._report(key, attempt, OK, latency)
+            return result
+
+    async def _hedged(self, key: Tuple[str, str], stats: EndpointStats, attempt: int,
+                      send: Callable[[], Awaitable[Any]]) -> Any:
+        """Send once; if no answer within the p95 latency, send a duplicate and take the first success"""
+        threshold = stats.p95(config.aster.hedge_min_samples)
+        if threshold is None:
+            return await send()
+
+        tasks = [asyncio.ensure_future(send())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(threshold, config.aster.hedge_min_delay))
+            if done:
+                return tasks[0].result()
+
+            stats.hedges += 1
+            started = time.monotonic()
+            tasks.append(asyncio.ensure_future(send()))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            stats.hedge_wins += 1
+                            self._report(key, attempt, OK, time.monotonic() - started, hedged=True)
+                        return task.result()
+                    error = task.exception()
+                    if task is tasks[1]:
+                        self._report(key, attempt, classify(error), time.monotonic() - started, error, hedged=True)
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-endpoint attempt outcomes, retries, hedges and breaker state"""
+        now = time.monotonic()
+        with self._lock:
+            endpoints = {}
+            for key, stats in self._stats.items():
+                breaker = self._breakers[key]
+                p95 = stats.p95(1)
+                endpoints[f"{key[0]} {key[1]}"] = {
+                    "outcomes": dict(stats.counts),
+                    "retries": stats.retries,
+                    "hedges": stats.hedges,
+                    "hedge_wins": stats.hedge_wins,
+                    "p95_latency": round(p95, 4) if p95 is not None else None,
+                    "breaker": breaker.state,
+                    "breaker_retry_in": round(breaker.retry_in(now), 1),
+                }
+        return {"hedging": config.aster.hedge_requests, "endpoints": endpoints}
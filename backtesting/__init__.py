@@ -0,0 +1,40 @@
+"""
+Backtesting Module
+Replays historical klines through the live trading path against a simulated exchange
+"""
+from .data import MarketReplay, load_klines
+from .decision_sources import (
+    DecisionSource,
+    LLMDecisionSource,
+    RecordedDecisionSource,
+    StrategyDecisionSource,
+    StubLLMClient,
+    source_factory
+)
+from .engine import BacktestEngine, BacktestTrader
+from .exchange import SimulatedAsterClient
+from .replay import ReplayKlineStore, ReplayAccountCache, ReplayMarkPriceCache, SimulatedClock
+from .sweep import ParameterSweep, SharedCandles, grid, random_configs, rank
+
+__all__ = [
+    "MarketReplay",
+    "load_klines",
+    "DecisionSource",
+    "LLMDecisionSource",
+    "RecordedDecisionSource",
+    "StrategyDecisionSource",
+    "StubLLMClient",
+    "source_factory",
+    "BacktestEngine",
+    "BacktestTrader",
+    "SimulatedAsterClient",
+    "ReplayKlineStore",
+    "ReplayAccountCache",
+    "ReplayMarkPriceCache",
+    "SimulatedClock",
+    "ParameterSweep",
+    "SharedCandles",
+    "grid",
+    "random_configs",
+    "rank"
+]
@@ -0,0 +1,202 @@
+"""
+Historical Market Data for Backtests
+Loads 1m klines from local files and serves any higher interval, as of a replay cursor,
+without looking ahead
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from data.kline_archive import KlineArchive
+from strategies.candles import CandleFrame
+from utils.shared_kline_store import INTERVAL_MS
+
+
+def load_klines(path: str) -> CandleFrame:
+    """
+    Load 1m klines from a local file
+
+    Args:
+        path: .json file holding the raw /fapi/v1/klines payload (list of rows), or
+              .csv file with rows of open_time,open,high,low,close,volume[,...]
+              (a header row is skipped)
+
+    Returns:
+        CandleFrame sorted by open time
+    """
+    file_path = Path(path)
+    if file_path.suffix.lower() == ".json":
+        with open(file_path, "r") as f:
+            rows = json.load(f)
+    else:
+        with open(file_path, "r", newline="") as f:
+            reader = csv.reader(f)
+            rows = [row for row in reader if row and row[0].strip().lstrip("-").isdigit()]
+
+    frame = CandleFrame.from_klines(rows)
+    order = np.argsort(frame.open_time, kind="stable")
+    if np.any(order != np.arange(len(order))):
+        frame = CandleFrame(frame.open_time[order], frame.block[:, order])
+    return frame
+
+
+class _Aggregation:
+    """Candles of one interval built from 1m candles, plus the 1m index -> bucket mapping"""
+
+    def __init__(self, base: CandleFrame, interval_ms: int):
+        keys = base.open_time // interval_ms
+        starts = np.flatnonzero(np.diff(keys)) + 1
+        self.starts = np.concatenate(([0], starts)).astype(np.int64)
+        self.ends = np.concatenate((starts, [len(base)])).astype(np.int64)  # exclusive
+        self.bucket_of = np.repeat(np.arange(len(self.starts)), self.ends - self.starts)
+
+        self.open_time = keys[self.starts] * interval_ms
+        block = np.empty((5, len(self.starts)), dtype=np.float64)
+        block[0] = base.open[self.starts]
+        block[1] = np.maximum.reduceat(base.high, self.starts)
+        block[2] = np.minimum.reduceat(base.low, self.starts)
+        block[3] = base.close[self.ends - 1]
+        block[4] = np.add.reduceat(base.volume, self.starts)
+        self.block = block
+
+
+class MarketReplay:
+    """
+    Historical 1m candles for several symbols with a per-symbol replay cursor
+
+    The cursor is the index of the last 1m candle that has closed. Every read
+    (candles, prices, aggregated intervals) only sees data up to the cursor; the
+    higher-interval candle containing the cursor is returned as in progress.
+    """
+
+    def __init__(self, candles: Dict[str, CandleFrame]):
+        """
+        Args:
+            candles: 1m CandleFrame per symbol
+        """
+        self.candles = {symbol.upper(): frame for symbol, frame in candles.items()}
+        self.cursor: Dict[str, int] = {symbol: -1 for symbol in self.candles}
+        self._aggregations: Dict[tuple, _Aggregation] = {}
+
+    @classmethod
+    def from_files(cls, files: Dict[str, str]) -> "MarketReplay":
+        """
+        Args:
+            files: Kline file path per symbol (see load_klines)
+        """
+        return cls({symbol: load_klines(path) for symbol, path in files.items()})
+
+    @classmethod
+    def from_archive(
+        cls,
+        symbols: List[str],
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        archive: Optional[KlineArchive] = None
+    ) -> "MarketReplay":
+        """
+        Replay 1m candles straight from the local kline archive (memory-mapped, no copy)
+
+        Args:
+            symbols: Symbols to load
+            start_time: Earliest open time in ms (default: everything archived)
+            end_time: Latest open time in ms
+            archive: Archive to read (default: config.data.archive_dir)
+        """
+        archive = archive or KlineArchive()
+        candles = {}
+        for symbol in symbols:
+            frame = archive.read(symbol, "1m", start_time=start_time, end_time=end_time)
+            if not len(frame):
+                raise ValueError(f"No archived 1m klines for {symbol} in the requested range")
+            candles[symbol] = frame
+        return cls(candles)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.candles)
+
+    def timeline(self) -> np.ndarray:
+        """Sorted union of every symbol's 1m open times"""
+        return np.unique(np.concatenate([frame.open_time for frame in self.candles.values()]))
+
+    def index_at(self, symbol: str, open_time: int) -> int:
+        """Index of the candle with this open time, or -1"""
+        times = self.candles[symbol].open_time
+        i = int(np.searchsorted(times, open_time))
+        return i if i < len(times) and times[i] == open_time else -1
+
+    def aggregation(self, symbol: str, interval: str) -> _Aggregation:
+        key = (symbol, interval)
+        aggregation = self._aggregations.get(key)
+        if aggregation is None:
+            if interval not in INTERVAL_MS:
+                raise ValueError(f"Unsupported interval: {interval}")
+            aggregation = _Aggregation(self.candles[symbol], INTERVAL_MS[interval])
+            self._aggregations[key] = aggregation
+        return aggregation
+
+    def last_price(self, symbol: str) -> float:
+        i = self.cursor[symbol]
+        return float(self.candles[symbol].close[i]) if i >= 0 else 0.0
+
+    def bucket_candle(self, symbol: str, interval: str, bucket: int) -> List[float]:
+        """
+        One aggregated candle as [open_time, open, high, low, close, volume] as of the cursor
+        (partial if the cursor is inside the bucket)
+        """
+        aggregation = self.aggregation(symbol, interval)
+        i = self.cursor[symbol]
+        start, end = int(aggregation.starts[bucket]), int(aggregation.ends[bucket])
+        if i + 1 >= end:
+            column = aggregation.block[:, bucket]
+            return [int(aggregation.open_time[bucket]), *column.tolist()]
+
+        base = self.candles[symbol]
+        return [
+            int(aggregation.open_time[bucket]),
+            float(base.open[start]),
+            float(base.high[start:i + 1].max()),
+            float(base.low[start:i + 1].min()),
+            float(base.close[i]),
+            float(base.volume[start:i + 1].sum())
+        ]
+
+    def current_bucket(self, symbol: str, interval: str) -> int:
+        i = self.cursor[symbol]
+        return int(self.aggregation(symbol, interval).bucket_of[i]) if i >= 0 else -1
+
+    def get_candles(self, symbol: str, interval: str, limit: Optional[int] = None) -> CandleFrame:
+        """
+        Most recent candles as of the cursor (the last one may be in progress)
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval (aggregated from 1m)
+            limit: Number of candles (default: all available)
+        """
+        symbol = symbol.upper()
+        bucket = self.current_bucket(symbol, interval)
+        if bucket < 0:
+            return CandleFrame.empty()
+
+        aggregation = self.aggregation(symbol, interval)
+        first = 0 if limit is None else max(0, bucket - limit + 1)
+        block = aggregation.block[:, first:bucket + 1]
+        if self.cursor[symbol] + 1 < aggregation.ends[bucket]:
+            # Bucket still in progress: copy so the partial candle does not leak into the aggregate
+            block = block.copy()
+            block[:, -1] = self.bucket_candle(symbol, interval, bucket)[1:]
+        return CandleFrame(aggregation.open_time[first:bucket + 1], block)
+
+    def get_klines(self, symbol: str, interval: str, limit: int) -> List[List]:
+        """Same candles as get_candles, in the raw /fapi/v1/klines row layout"""
+        frame = self.get_candles(symbol, interval, limit)
+        interval_ms = INTERVAL_MS[interval]
+        return [
+            [int(t), str(o), str(h), str(l), str(c), str(v), int(t) + interval_ms - 1]
+            for t, o, h, l, c, v in zip(frame.open_time, *frame.block)
+        ]
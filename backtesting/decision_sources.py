@@ -0,0 +1,180 @@
+"""
+Backtest Decision Sources
+Pluggable replacements for the LLM call inside a trading cycle. Each source gets
+the trader, market data and portfolio state the live bot would send to the LLM
+and returns a decision dictionary in the same format.
+"""
+import json
+from datetime import datetime
+from itertools import cycle
+from typing import Dict, Any, List, Optional
+
+from loguru import logger
+
+from strategies.momentum_strategy import MomentumStrategy
+from utils.decision_store import DecisionStore
+
+
+HOLD = {"action": "hold", "reasoning": "No signal", "confidence": 0}
+
+
+class DecisionSource:
+    """Base class: produces one decision per trading cycle"""
+
+    async def decide(self, trader, market_data: Dict[str, Any], portfolio_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Args:
+            trader: The VibeTrader running the cycle (for its symbol, clock and prompt helpers)
+            market_data: Output of the trader's _gather_market_data
+            portfolio_state: Output of the trader's _analyze_portfolio
+
+        Returns:
+            Decision dictionary (action, reasoning, confidence, optional stop_loss/take_profit)
+        """
+        raise NotImplementedError
+
+
+class LLMDecisionSource(DecisionSource):
+    """Full live path: builds the trader's prompt, calls an LLM client and parses the reply"""
+
+    def __init__(self, llm_client):
+        """
+        Args:
+            llm_client: Anything with an async get_completion(prompt, system_message, cache_prefix) (LLMClient or StubLLMClient)
+        """
+        self.llm = llm_client
+
+    async def decide(self, trader, market_data: Dict[str, Any], portfolio_state: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = trader._build_trading_prompt(market_data, portfolio_state)
+        response = await self.llm.get_completion(
+            prompt=prompt, system_message=trader._get_system_message(), cache_prefix=trader._prompt.prefix
+        )
+        decision = trader._parse_llm_response(response)
+        decision["raw_response"] = response
+        return decision
+
+
+class StubLLMClient:
+    """
+    Deterministic LLM client: returns canned JSON replies in rotation
+
+    Exercises prompt building and response parsing without network calls.
+    """
+
+    def __init__(self, responses: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            responses: Decisions to return in order, cycling (default: always hold)
+        """
+        self._responses = cycle([json.dumps(response) for response in (responses or [HOLD])])
+        self.calls = 0
+
+    async def get_completion(self, prompt: str, system_message: Optional[str] = None, cache_prefix: Optional[str] = None) -> str:
+        self.calls += 1
+        return f"```json\n{next(self._responses)}\n```"
+
+
+class RecordedDecisionSource(DecisionSource):
+    """
+    Replays decisions recorded by a live bot's DecisionStore
+
+    At each cycle the latest recorded decision at or before the simulated time is
+    returned once; cycles with no new recorded decision hold.
+    """
+
+    def __init__(self, decisions: List[Dict[str, Any]]):
+        """
+        Args:
+            decisions: DecisionStore entries (timestamp + decision)
+        """
+        entries = [
+            (datetime.fromisoformat(entry["timestamp"]), entry["decision"])
+            for entry in decisions if entry.get("timestamp") and entry.get("decision")
+        ]
+        self._entries = sorted(entries, key=lambda entry: entry[0])
+        self._next = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "RecordedDecisionSource":
+        """Load a DecisionStore journal (e.g. logs/decisions_BTC.jsonl) or a legacy JSON file"""
+        decisions = DecisionStore.read_file(path)
+        logger.info(f"Loaded {len(decisions)} recorded decisions from {path}")
+        return cls(decisions)
+
+    async def decide(self, trader, market_data: Dict[str, Any], portfolio_state: Dict[str, Any]) -> Dict[str, Any]:
+        now = trader._now()
+        latest = None
+        while self._next < len(self._entries) and self._entries[self._next][0] <= now:
+            latest = self._entries[self._next][1]
+            self._next += 1
+
+        if latest is None:
+            return dict(HOLD, reasoning="No recorded decision for this cycle")
+        decision = {key: value for key, value in latest.items() if key != "raw_response"}
+        decision.pop("symbol", None)  # Recorded for the live symbol; the trader fills in its own
+        return decision
+
+
+class StrategyDecisionSource(DecisionSource):
+    """
+    Rule-based decisions from MomentumStrategy
+
+    The trader's last price is fed to the strategy every cycle, so the lookback is
+    measured in trading cycles. Bullish/bearish signals map to long/short with a
+    confidence of 60-100% scaled by signal strength.
+    """
+
+    def __init__(self, strategy: Optional[MomentumStrategy] = None):
+        """
+        Args:
+            strategy: Momentum strategy instance (default: MomentumStrategy())
+        """
+        self.strategy = strategy or MomentumStrategy()
+
+    async def decide(self, trader, market_data: Dict[str, Any], portfolio_state: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = trader.symbol
+        price = market_data.get("current_price", 0)
+        if not price:
+            return dict(HOLD, reasoning="No price")
+
+        self.strategy.update_price(symbol, price, trader._now())
+        signal = self.strategy.get_signal(symbol)
+        if signal["signal"] == "neutral":
+            return dict(HOLD, reasoning=f"Momentum {signal['momentum'] * 100:.2f}% below threshold")
+
+        return {
+            "action": "long" if signal["signal"] == "bullish" else "short",
+            "reasoning": f"Momentum {signal['momentum'] * 100:+.2f}% ({signal['signal']})",
+            "confidence": round(60 + 40 * signal["strength"], 1)
+        }
+
+
+def source_factory(spec: Dict[str, Any]):
+    """
+    Build a per-symbol decision source factory from a plain (picklable) spec
+
+    Args:
+        spec: {"type": "momentum", "lookback": 20, "threshold": 0.02}
+              {"type": "recorded", "files": {"BTCUSDT": "logs/decisions_BTC.jsonl"}}
+              {"type": "stub-llm", "responses": [...]}
+              {"type": "llm"} (calls the configured provider every cycle)
+
+    Returns:
+        Callable mapping a symbol to a new DecisionSource
+    """
+    source_type = spec.get("type", "momentum")
+    if source_type == "momentum":
+        lookback = int(spec.get("lookback", 20))
+        threshold = float(spec.get("threshold", 0.02))
+        return lambda symbol: StrategyDecisionSource(MomentumStrategy(lookback_period=lookback, threshold=threshold))
+    if source_type == "recorded":
+        files = {symbol.upper(): path for symbol, path in spec["files"].items()}
+        return lambda symbol: RecordedDecisionSource.from_file(files[symbol])
+    if source_type == "stub-llm":
+        responses = spec.get("responses")
+        return lambda symbol: LLMDecisionSource(StubLLMClient(responses))
+    if source_type == "llm":
+        from agent.llm_client import LLMClient
+        llm = LLMClient()
+        return lambda symbol: LLMDecisionSource(llm)
+    raise ValueError(f"Unknown decision source: {source_type}")
@@ -0,0 +1,235 @@
+"""
+Event-driven Backtesting Engine
+Replays 1m candles through unmodified VibeTrader trading cycles (market data,
+portfolio analysis, protective orders, decision, execution) against a simulated
+exchange, with the LLM call swapped for a pluggable decision source
+"""
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from config.config import config
+from agent.trader import VibeTrader
+from utils.decision_store import DecisionStore
+from utils.metrics import PerformanceMetrics
+from utils.trade_tracker import TradeTracker
+from backtesting.data import MarketReplay
+from backtesting.decision_sources import DecisionSource, StubLLMClient
+from backtesting.exchange import SimulatedAsterClient
+from backtesting.replay import ReplayKlineStore, ReplayAccountCache, ReplayMarkPriceCache, SimulatedClock
+
+
+class BacktestTrader(VibeTrader):
+    """VibeTrader whose decision step is delegated to a DecisionSource"""
+
+    def __init__(self, *args, decision_source: DecisionSource, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decision_source = decision_source
+
+    async def _get_ai_decision(
+        self,
+        market_data: Dict[str, Any],
+        portfolio_state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        try:
+            decision = await self.decision_source.decide(self, market_data, portfolio_state)
+        except Exception as e:
+            logger.error(f"Error getting backtest decision: {e}")
+            return {"action": "hold", "reason": f"Error: {e}"}
+
+        decision.setdefault("symbol", self.symbol)
+        decision["timestamp"] = self._now().isoformat()
+        return decision
+
+    # The simulated exchange answers without suspending: deadlines never fire and
+    # overlapping requests gains nothing, while every gather task costs an event loop pass
+
+    async def _fetch(self, request: Callable[[], Awaitable], timeout: Optional[float] = None):
+        """Await the request directly (no concurrency slot or deadline)"""
+        return await request()
+
+    async def _gather(self, *aws: Awaitable, return_exceptions: bool = False) -> List[Any]:
+        """Await in order instead of concurrently"""
+        results = []
+        for i, aw in enumerate(aws):
+            try:
+                results.append(await aw)
+            except Exception as e:
+                if not return_exceptions:
+                    for pending in aws[i + 1:]:
+                        pending.close()
+                    raise
+                results.append(e)
+        return results
+
+
+class BacktestEngine:
+    """
+    Runs one bot per symbol over historical 1m data
+
+    Each step moves the replay cursor to the next 1m candle, lets the simulated
+    exchange trigger resting orders and funding, then runs every bot whose
+    update_interval has elapsed on the simulated clock. All bots share one
+    simulated account, as the live multi-bot runner shares one Aster account.
+    """
+
+    def __init__(
+        self,
+        replay: MarketReplay,
+        source_factory: Callable[[str], DecisionSource],
+        symbols: Optional[List[str]] = None,
+        initial_balance: float = 10000.0,
+        taker_fee: float = 0.00035,
+        maker_fee: float = 0.0001,
+        slippage_bps: float = 1.0,
+        funding_rate: Union[float, Dict[str, float]] = 0.0001,
+        funding_history: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+        update_interval: Optional[int] = None,
+        warmup: int = 1440,
+        stagger_seconds: int = 60,
+        quiet: bool = True
+    ):
+        """
+        Args:
+            replay: Historical 1m data for every symbol
+            source_factory: Builds the decision source for a symbol
+            symbols: Symbols to trade (default: every symbol in the replay)
+            initial_balance: Starting USDT balance of the shared account
+            taker_fee: Fee rate for market and triggered orders
+            maker_fee: Fee rate for resting LIMIT orders
+            slippage_bps: Adverse slippage on market fills, in basis points
+            funding_rate: Funding rate per 8h, constant or per symbol
+            funding_history: Settled funding (times in ms, rates) per symbol, e.g. from
+                             FundingArchive.read; replaces funding_rate for those symbols
+            update_interval: Seconds between trading cycles (default: config.trading.update_interval)
+            warmup: 1m candles replayed before the first cycle so every timeframe has full history
+            stagger_seconds: Offset between bots' first cycles (as main_multi_bot staggers startup)
+            quiet: Silence trader/utils logging during the run
+        """
+        self.replay = replay
+        self.symbols = [symbol.upper() for symbol in (symbols or replay.symbols)]
+        self.update_interval = update_interval or config.trading.update_interval
+        self.warmup = warmup
+        self.stagger_seconds = stagger_seconds
+        self.quiet = quiet
+
+        self.clock = SimulatedClock()
+        self.exchange = SimulatedAsterClient(
+            replay,
+            initial_balance=initial_balance,
+            taker_fee=taker_fee,
+            maker_fee=maker_fee,
+            slippage_bps=slippage_bps,
+            funding_rate=funding_rate,
+            funding_history=funding_history
+        )
+        self.kline_store = ReplayKlineStore(replay)
+        self.account_cache = ReplayAccountCache(self.exchange)
+        self.mark_prices = ReplayMarkPriceCache(self.exchange, self.clock)
+
+        self.traders: List[BacktestTrader] = []
+        for symbol in self.symbols:
+            source = source_factory(symbol)
+            self.traders.append(BacktestTrader(
+                self.exchange,
+                llm_client=getattr(source, "llm", None) or StubLLMClient(),
+                bot_name=symbol.replace("USDT", ""),
+                symbol=symbol,
+                account_cache=self.account_cache,
+                kline_store=self.kline_store,
+                mark_prices=self.mark_prices,
+                decision_store=DecisionStore(filepath=None, clock=self.clock),
+                trade_tracker=TradeTracker(filepath=None, clock=self.clock),
+                clock=self.clock,
+                sound_alerts=False,
+                decision_source=source
+            ))
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Replay the whole timeline
+
+        Returns:
+            Dictionary with the performance report, closed trades, equity curve
+            (one point per 1m step) and run statistics
+        """
+        timeline = self.replay.timeline()
+        if len(timeline) <= self.warmup:
+            raise ValueError(f"Need more than {self.warmup} candles of history, got {len(timeline)}")
+
+        # Per symbol: cursor after each step, and whether the step has a candle of its own
+        cursors = {}
+        present = {}
+        for symbol in self.replay.symbols:
+            open_time = self.replay.candles[symbol].open_time
+            cursor = np.searchsorted(open_time, timeline, side="right") - 1
+            present[symbol] = ((cursor >= 0) & (open_time[cursor.clip(0)] == timeline)).tolist()
+            cursors[symbol] = cursor.tolist()
+
+        start = self.warmup
+        for symbol in self.replay.symbols:
+            self.replay.cursor[symbol] = cursors[symbol][start - 1]
+
+        first_cycle = int(timeline[start]) + 60_000
+        next_cycle = [first_cycle + k * self.stagger_seconds * 1000 for k in range(len(self.traders))]
+        interval_ms = self.update_interval * 1000
+
+        steps = len(timeline) - start
+        times = timeline.tolist()
+        equity = np.empty(steps, dtype=np.float64)
+        cycles = 0
+
+        logger.info(f"🧪 Backtesting {len(self.traders)} bots over {steps:,} 1m candles "
+                    f"({steps / 1440:.1f} days, cycle every {self.update_interval}s)")
+        if self.quiet:
+            logger.disable("agent")
+            logger.disable("utils")
+        started = time.perf_counter()
+
+        try:
+            for step in range(steps):
+                t = start + step
+                for symbol in self.replay.symbols:
+                    self.replay.cursor[symbol] = cursors[symbol][t]
+                    if present[symbol][t]:
+                        self.exchange.on_candle(symbol)
+
+                now_ms = times[t] + 60_000
+                self.clock.set(now_ms)
+                for k, trader in enumerate(self.traders):
+                    if now_ms >= next_cycle[k]:
+                        await trader._trading_cycle()
+                        cycles += 1
+                        while next_cycle[k] <= now_ms:
+                            next_cycle[k] += interval_ms
+
+                equity[step] = self.exchange.equity()
+        finally:
+            if self.quiet:
+                logger.enable("agent")
+                logger.enable("utils")
+
+        elapsed = time.perf_counter() - started
+        trades = self.exchange.trades
+        report = PerformanceMetrics.generate_report(trades, equity.tolist())
+        final_equity = float(equity[-1])
+
+        logger.success(f"✅ Backtest finished in {elapsed:.1f}s: {cycles:,} cycles, {len(trades)} trades, "
+                       f"equity ${final_equity:,.2f}")
+
+        return {
+            "report": report,
+            "trades": trades,
+            "equity_curve": equity,
+            "timestamps": timeline[start:] + 60_000,
+            "initial_balance": self.exchange.initial_balance,
+            "final_equity": final_equity,
+            "total_return": (final_equity - self.exchange.initial_balance) / self.exchange.initial_balance,
+            "total_fees": self.exchange.total_fees,
+            "total_funding": self.exchange.total_funding,
+            "open_positions": {symbol: dict(position) for symbol, position in self.exchange.positions.items()},
+            "cycles": cycles,
+            "elapsed_seconds": elapsed
+        }
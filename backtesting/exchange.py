@@ -0,0 +1,578 @@
+"""
+Simulated Aster Exchange
+Drop-in AsterClient replacement for backtests: market fills with slippage and fees,
+STOP_MARKET / TAKE_PROFIT_MARKET / LIMIT orders triggered from 1m candle highs and
+lows, margin checks and periodic funding
+"""
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config.config import config
+from backtesting.data import MarketReplay
+
+
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+DAY_MINUTES = 1440
+
+# Resting order types checked on every candle; stops are checked first so a candle
+# that spans both the stop loss and the take profit is assumed to hit the stop
+TRIGGER_PRIORITY = {"STOP_MARKET": 0, "TAKE_PROFIT_MARKET": 1, "LIMIT": 2}
+
+
+class SimulatedAsterClient:
+    """
+    Simulated USDT-margined futures account over a MarketReplay
+
+    Implements the AsterClient methods the trader calls, with the same argument
+    names and response shapes (numeric fields as strings). Market orders fill at
+    the last close adjusted by slippage; resting orders are evaluated against each
+    new 1m candle by on_candle, filling at their trigger price or at the open if
+    the candle gapped through it. One-way (BOTH) position mode only.
+    """
+
+    def __init__(
+        self,
+        replay: MarketReplay,
+        initial_balance: float = 10000.0,
+        taker_fee: float = 0.00035,
+        maker_fee: float = 0.0001,
+        slippage_bps: float = 1.0,
+        funding_rate: Union[float, Dict[str, float]] = 0.0001,
+        funding_history: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+        leverage: Optional[int] = None
+    ):
+        """
+        Args:
+            replay: Historical data with the replay cursor
+            initial_balance: Starting USDT wallet balance
+            taker_fee: Fee rate for market and triggered orders
+            maker_fee: Fee rate for resting LIMIT orders
+            slippage_bps: Adverse price move applied to market fills, in basis points
+            funding_rate: Funding rate per 8h, constant or per symbol (longs pay when positive)
+            funding_history: Settled funding (times in ms, rates) per symbol, e.g. from
+                             FundingArchive.read; those symbols are charged at the recorded
+                             times and rates instead of funding_rate
+            leverage: Default leverage per symbol (default: config.trading.leverage)
+        """
+        self.replay = replay
+        self.initial_balance = initial_balance
+        self.wallet_balance = initial_balance
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.slippage = slippage_bps / 10000
+        self.funding_rate = funding_rate
+        self.funding_history = {
+            symbol.upper(): (np.asarray(times, dtype=np.int64), np.asarray(rates, dtype=np.float64))
+            for symbol, (times, rates) in (funding_history or {}).items()
+        }
+        self.default_leverage = leverage or config.trading.leverage
+
+        self.leverage: Dict[str, int] = {}
+        # Open position per symbol: amt (signed), entry, opened_at, fees, funding, realized
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.open_orders: List[Dict[str, Any]] = []
+        self.trades: List[Dict[str, Any]] = []  # Closed round trips (PerformanceMetrics format)
+        self.fills: List[Dict[str, Any]] = []
+
+        self.total_fees = 0.0
+        self.total_funding = 0.0
+        self.realized_pnl = 0.0
+        self._next_order_id = 1
+
+    # ========== Simulation Hooks ==========
+
+    def on_candle(self, symbol: str):
+        """
+        Process a newly closed 1m candle (call after the replay cursor has moved onto it)
+
+        Charges funding if the candle opens a funding interval, then triggers
+        resting orders whose price the candle traded through.
+        """
+        i = self.replay.cursor[symbol]
+        frame = self.replay.candles[symbol]
+        open_time = int(frame.open_time[i])
+
+        history = self.funding_history.get(symbol)
+        if history is not None:
+            # Recorded settlements falling inside this minute
+            times, rates = history
+            k = int(np.searchsorted(times, open_time))
+            while k < len(times) and times[k] < open_time + 60_000:
+                self._charge_funding(symbol, float(frame.open[i]), int(times[k]), float(rates[k]))
+                k += 1
+        elif open_time % FUNDING_INTERVAL_MS == 0:
+            self._charge_funding(symbol, float(frame.open[i]), open_time)
+
+        orders = [order for order in self.open_orders if order["symbol"] == symbol]
+        if not orders:
+            return
+        open_price, high, low = float(frame.open[i]), float(frame.high[i]), float(frame.low[i])
+
+        triggered = []
+        for order in orders:
+            fill_price = self._trigger_price(order, open_price, high, low)
+            if fill_price is not None:
+                triggered.append((TRIGGER_PRIORITY[order["type"]], order["orderId"], order, fill_price))
+
+        for _, _, order, fill_price in sorted(triggered, key=lambda t: t[:2]):
+            if order not in self.open_orders:
+                continue
+            self.open_orders.remove(order)
+            if order["reduceOnly"] and symbol not in self.positions:
+                order["status"] = "EXPIRED"
+                continue
+
+            is_limit = order["type"] == "LIMIT"
+            if not is_limit:
+                fill_price = self._slipped(fill_price, order["side"])
+            self._fill(
+                symbol, order["side"], order["quantity"], fill_price,
+                self.maker_fee if is_limit else self.taker_fee,
+                order["reduceOnly"], open_time + 60_000,
+                reason="stop_loss" if order["type"] == "STOP_MARKET" else
+                       "take_profit" if order["type"] == "TAKE_PROFIT_MARKET" else "limit"
+            )
+            order["status"] = "FILLED"
+
+    def equity(self) -> float:
+        """Wallet balance plus unrealized PnL at the last close"""
+        return self.wallet_balance + sum(self._unrealized(symbol) for symbol in self.positions)
+
+    # ========== Market Data Methods ==========
+
+    async def get_ticker(self, symbol: str = "BTCUSDT") -> Dict[str, Any]:
+        """24hr ticker as of the replay cursor (rolling 1440 1m candles)"""
+        symbol = symbol.upper()
+        i = self.replay.cursor[symbol]
+        if i < 0:
+            raise ValueError(f"No market data for {symbol} yet")
+
+        frame = self.replay.candles[symbol]
+        start = max(0, i - DAY_MINUTES + 1)
+        open_price = float(frame.open[start])
+        last = float(frame.close[i])
+        return {
+            "symbol": symbol,
+            "lastPrice": str(last),
+            "openPrice": str(open_price),
+            "highPrice": str(float(frame.high[start:i + 1].max())),
+            "lowPrice": str(float(frame.low[start:i + 1].min())),
+            "volume": str(float(frame.volume[start:i + 1].sum())),
+            "priceChange": str(last - open_price),
+            "priceChangePercent": f"{(last - open_price) / open_price * 100:.3f}" if open_price else "0",
+            "openTime": int(frame.open_time[start]),
+            "closeTime": int(frame.open_time[i]) + 59_999
+        }
+
+    async def get_klines(self, symbol: str = "BTCUSDT", interval: str = "1h", limit: int = 24) -> List[List]:
+        """Historical candlesticks as of the replay cursor"""
+        return self.replay.get_klines(symbol.upper(), interval, limit)
+
+    # ========== Account Methods ==========
+
+    async def get_account(self) -> Dict[str, Any]:
+        """Account snapshot in the /fapi/v3/account layout"""
+        unrealized = sum(self._unrealized(symbol) for symbol in self.positions)
+        margin_balance = self.wallet_balance + unrealized
+        available = margin_balance - self._initial_margin()
+        positions = []
+        for symbol in self.replay.symbols:
+            position = self.positions.get(symbol)
+            amt = position["amt"] if position else 0.0
+            mark = self.replay.last_price(symbol)
+            positions.append({
+                "symbol": symbol,
+                "positionAmt": str(amt),
+                "entryPrice": str(position["entry"] if position else 0.0),
+                "markPrice": str(mark),
+                "unrealizedProfit": str(self._unrealized(symbol) if position else 0.0),
+                "notional": str(amt * mark),
+                "leverage": str(self._leverage(symbol)),
+                "positionSide": "BOTH"
+            })
+
+        return {
+            "totalWalletBalance": str(self.wallet_balance),
+            "totalUnrealizedProfit": str(unrealized),
+            "totalMarginBalance": str(margin_balance),
+            "availableBalance": str(available),
+            "assets": [{
+                "asset": "USDT",
+                "walletBalance": str(self.wallet_balance),
+                "unrealizedProfit": str(unrealized),
+                "marginBalance": str(margin_balance),
+                "availableBalance": str(available)
+            }],
+            "positions": positions
+        }
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        """Get all positions"""
+        account = await self.get_account()
+        return account.get("positions", [])
+
+    async def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get specific position"""
+        for pos in await self.get_positions():
+            if pos.get("symbol") == symbol and float(pos.get("positionAmt", 0)) != 0:
+                return pos
+        return None
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get open orders"""
+        return [
+            self._order_response(order) for order in self.open_orders
+            if symbol is None or order["symbol"] == symbol
+        ]
+
+    # ========== Trading Methods ==========
+
+    async def place_order(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        order_type: str = "MARKET",
+        price: Optional[float] = None,
+        position_side: str = "BOTH",
+        reduce_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Place an order (MARKET fills immediately at the last close; LIMIT rests)
+
+        Raises:
+            ValueError: Same conditions the exchange rejects (insufficient margin,
+                        reduce-only with no position, missing limit price)
+        """
+        symbol, side, order_type = symbol.upper(), side.upper(), order_type.upper()
+        quantity = float(size)
+        if quantity <= 0:
+            raise ValueError(f"Invalid quantity: {size}")
+
+        if order_type == "LIMIT":
+            if not price:
+                raise ValueError("Price is required for LIMIT orders")
+            return self._rest_order(symbol, side, "LIMIT", quantity, reduce_only, price=float(price))
+        if order_type != "MARKET":
+            raise ValueError(f"Unsupported order type: {order_type}")
+
+        last = self.replay.last_price(symbol)
+        if last <= 0:
+            raise ValueError(f"No market data for {symbol} yet")
+        if reduce_only and symbol not in self.positions:
+            raise ValueError("ReduceOnly Order is rejected")
+
+        fill_price = self._slipped(last, side)
+        self._check_margin(symbol, side, quantity, fill_price, reduce_only)
+        filled = self._fill(symbol, side, quantity, fill_price, self.taker_fee, reduce_only,
+                            self._time_ms(symbol), reason="market")
+
+        order_id = self._new_order_id()
+        return {
+            "orderId": order_id,
+            "symbol": symbol,
+            "status": "FILLED",
+            "side": side,
+            "type": "MARKET",
+            "origQty": str(quantity),
+            "executedQty": str(filled),
+            "avgPrice": str(fill_price),
+            "reduceOnly": reduce_only,
+            "positionSide": position_side,
+            "updateTime": self._time_ms(symbol)
+        }
+
+    async def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        """Cancel an order"""
+        for order in self.open_orders:
+            if order["symbol"] == symbol and order["orderId"] == int(order_id):
+                self.open_orders.remove(order)
+                order["status"] = "CANCELED"
+                return self._order_response(order)
+        raise ValueError(f"Unknown order sent: {order_id}")
+
+    async def cancel_all_orders(self, symbol: str) -> Dict[str, Any]:
+        """Cancel all open orders for a symbol"""
+        self.open_orders = [order for order in self.open_orders if order["symbol"] != symbol]
+        return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    async def close_position(self, symbol: str) -> Dict[str, Any]:
+        """Close a position"""
+        position = await self.get_position(symbol)
+        if not position:
+            raise ValueError(f"No open position for {symbol}")
+
+        position_amt = float(position.get("positionAmt", 0))
+        side = "SELL" if position_amt > 0 else "BUY"
+        return await self.place_order(
+            symbol=symbol,
+            side=side,
+            size=abs(position_amt),
+            order_type="MARKET",
+            reduce_only=True
+        )
+
+    async def set_stop_loss(self, symbol: str, stop_price: float, size: float, side: str = "SELL") -> Dict[str, Any]:
+        """Place a reduce-only STOP_MARKET order"""
+        return self._rest_order(symbol.upper(), side.upper(), "STOP_MARKET", float(size), True, stop_price=float(stop_price))
+
+    async def set_take_profit(self, symbol: str, target_price: float, size: float, side: str = "SELL") -> Dict[str, Any]:
+        """Place a reduce-only TAKE_PROFIT_MARKET order"""
+        return self._rest_order(symbol.upper(), side.upper(), "TAKE_PROFIT_MARKET", float(size), True, stop_price=float(target_price))
+
+    async def place_bracket_order(
+        self,
+        symbol: str,
+        side: str,
+        size: float,
+        stop_loss: float,
+        take_profit: float,
+        order_type: str = "MARKET",
+        price: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Entry plus reduce-only STOP_MARKET and TAKE_PROFIT_MARKET (AsterClient.place_bracket_order shape)"""
+        entry = await self.place_order(symbol, side, size, order_type=order_type, price=price)
+        close_side = "SELL" if side.upper() == "BUY" else "BUY"
+        exits = await self.set_protective_orders(symbol, stop_loss, take_profit, size, side=close_side)
+        return {"entry": entry, **exits}
+
+    async def set_protective_orders(
+        self,
+        symbol: str,
+        stop_price: float,
+        target_price: float,
+        size: float,
+        side: str = "SELL"
+    ) -> Dict[str, Dict[str, Any]]:
+        """Stop loss and take profit together; rejections come back as {"code", "msg"} like a batch"""
+        results = {}
+        for leg, place, trigger in (("stop_loss", self.set_stop_loss, stop_price),
+                                    ("take_profit", self.set_take_profit, target_price)):
+            try:
+                results[leg] = await place(symbol, trigger, size, side=side)
+            except ValueError as e:
+                results[leg] = {"code": -1, "msg": str(e)}
+        return results
+
+    async def set_leverage(self, symbol: str, leverage: int) -> Dict[str, Any]:
+        """Set leverage for a symbol"""
+        self.leverage[symbol.upper()] = int(leverage)
+        return {"symbol": symbol.upper(), "leverage": int(leverage)}
+
+    # ========== Internals ==========
+
+    def _new_order_id(self) -> int:
+        order_id = self._next_order_id
+        self._next_order_id += 1
+        return order_id
+
+    def _time_ms(self, symbol: str) -> int:
+        """Close time of the symbol's last closed candle"""
+        i = self.replay.cursor.get(symbol, -1)
+        return int(self.replay.candles[symbol].open_time[i]) + 60_000 if i >= 0 else 0
+
+    def _leverage(self, symbol: str) -> int:
+        return self.leverage.get(symbol, self.default_leverage)
+
+    def _slipped(self, price: float, side: str) -> float:
+        return price * (1 + self.slippage) if side == "BUY" else price * (1 - self.slippage)
+
+    def _unrealized(self, symbol: str) -> float:
+        position = self.positions.get(symbol)
+        if not position:
+            return 0.0
+        return position["amt"] * (self.replay.last_price(symbol) - position["entry"])
+
+    def _initial_margin(self) -> float:
+        return sum(
+            abs(position["amt"]) * self.replay.last_price(symbol) / self._leverage(symbol)
+            for symbol, position in self.positions.items()
+        )
+
+    def _check_margin(self, symbol: str, side: str, quantity: float, price: float, reduce_only: bool):
+        """Reject orders that increase exposure beyond the available margin"""
+        if reduce_only:
+            return
+        position = self.positions.get(symbol)
+        amt = position["amt"] if position else 0.0
+        signed = quantity if side == "BUY" else -quantity
+        added = max(0.0, abs(amt + signed) - abs(amt))
+        if added == 0:
+            return
+        required = added * price / self._leverage(symbol) + quantity * price * self.taker_fee
+        available = self.equity() - self._initial_margin()
+        if required > available:
+            raise ValueError(f"Margin is insufficient (required ${required:.2f}, available ${available:.2f})")
+
+    def _rest_order(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        quantity: float,
+        reduce_only: bool,
+        price: float = 0.0,
+        stop_price: float = 0.0
+    ) -> Dict[str, Any]:
+        order = {
+            "orderId": self._new_order_id(),
+            "symbol": symbol,
+            "side": side,
+            "type": order_type,
+            "quantity": quantity,
+            "price": price,
+            "stopPrice": stop_price,
+            "reduceOnly": reduce_only,
+            "status": "NEW",
+            "time": self._time_ms(symbol)
+        }
+        self.open_orders.append(order)
+        return self._order_response(order)
+
+    @staticmethod
+    def _order_response(order: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "orderId": order["orderId"],
+            "symbol": order["symbol"],
+            "status": order["status"],
+            "side": order["side"],
+            "type": order["type"],
+            "origType": order["type"],
+            "origQty": str(order["quantity"]),
+            "executedQty": "0",
+            "price": str(order["price"]),
+            "stopPrice": str(order["stopPrice"]),
+            "reduceOnly": order["reduceOnly"],
+            "positionSide": "BOTH",
+            "time": order["time"],
+            "updateTime": order["time"]
+        }
+
+    @staticmethod
+    def _trigger_price(order: Dict[str, Any], open_price: float, high: float, low: float) -> Optional[float]:
+        """Fill price if the candle reaches the order, else None (gaps fill at the open)"""
+        order_type, side = order["type"], order["side"]
+        if order_type == "LIMIT":
+            price = order["price"]
+            if side == "BUY":
+                return min(open_price, price) if low <= price else None
+            return max(open_price, price) if high >= price else None
+
+        stop = order["stopPrice"]
+        # Stops trigger against the move, take profits with it
+        triggers_on_rise = (side == "BUY") == (order_type == "STOP_MARKET")
+        if triggers_on_rise:
+            return max(open_price, stop) if high >= stop else None
+        return min(open_price, stop) if low <= stop else None
+
+    def _fill(
+        self,
+        symbol: str,
+        side: str,
+        quantity: float,
+        price: float,
+        fee_rate: float,
+        reduce_only: bool,
+        time_ms: int,
+        reason: str
+    ) -> float:
+        """
+        Apply a fill to the position and wallet
+
+        Returns:
+            Executed quantity (reduce-only fills are capped at the position size)
+        """
+        position = self.positions.get(symbol)
+        amt = position["amt"] if position else 0.0
+        signed = quantity if side == "BUY" else -quantity
+
+        closing = 0.0
+        if amt and (amt > 0) != (signed > 0):
+            closing = min(abs(signed), abs(amt))
+        if reduce_only:
+            quantity = closing
+            signed = quantity if side == "BUY" else -quantity
+            if quantity == 0:
+                return 0.0
+
+        fee = quantity * price * fee_rate
+        self.wallet_balance -= fee
+        self.total_fees += fee
+        self.fills.append({
+            "symbol": symbol, "side": side, "quantity": quantity, "price": price,
+            "fee": fee, "time": time_ms, "reason": reason
+        })
+
+        if closing:
+            pnl = closing * (price - position["entry"]) * (1 if amt > 0 else -1)
+            self.wallet_balance += pnl
+            self.realized_pnl += pnl
+            position["realized"] += pnl
+            # Fees are attributed to the round trip pro rata to the closed quantity
+            close_fee = fee * closing / quantity
+            position["fees"] += close_fee
+
+            remaining = amt - closing if amt > 0 else amt + closing
+            if abs(remaining) > 1e-12:
+                position["amt"] = remaining
+                return quantity
+            self._record_trade(symbol, position, price, time_ms, reason)
+            del self.positions[symbol]
+
+            # Whatever exceeds the old position opens one on the other side
+            leftover = quantity - closing
+            if leftover < 1e-12:
+                return quantity
+            signed = leftover if side == "BUY" else -leftover
+            fee -= close_fee
+            position = None
+
+        # Open or add to a position
+        if position is None:
+            self.positions[symbol] = {
+                "amt": signed, "entry": price, "opened_at": time_ms, "side": "long" if signed > 0 else "short",
+                "fees": fee, "funding": 0.0, "realized": 0.0, "quantity": abs(signed)
+            }
+        else:
+            new_amt = position["amt"] + signed
+            position["entry"] = (position["entry"] * abs(position["amt"]) + price * abs(signed)) / abs(new_amt)
+            position["amt"] = new_amt
+            position["fees"] += fee
+            position["quantity"] += abs(signed)
+        return quantity
+
+    def _record_trade(self, symbol: str, position: Dict[str, Any], exit_price: float, time_ms: int, reason: str):
+        """Record a closed round trip; pnl is net of fees and funding"""
+        pnl = position["realized"] - position["fees"] - position["funding"]
+        self.trades.append({
+            "symbol": symbol,
+            "side": position["side"],
+            "quantity": position["quantity"],
+            "entry_price": position["entry"],
+            "exit_price": exit_price,
+            "entry_time": datetime.fromtimestamp(position["opened_at"] / 1000).isoformat(),
+            "exit_time": datetime.fromtimestamp(time_ms / 1000).isoformat(),
+            "exit_reason": reason,
+            "gross_pnl": position["realized"],
+            "fees": position["fees"],
+            "funding": position["funding"],
+            "pnl": pnl
+        })
+
+    def funding_rate_for(self, symbol: str) -> float:
+        """Configured constant funding rate per 8h for a symbol"""
+        return self.funding_rate.get(symbol, 0.0) if isinstance(self.funding_rate, dict) else self.funding_rate
+
+    def _charge_funding(self, symbol: str, mark_price: float, time_ms: int, rate: Optional[float] = None):
+        """Settle funding on an open position (positive rate: longs pay shorts)"""
+        position = self.positions.get(symbol)
+        if not position:
+            return
+        if rate is None:
+            rate = self.funding_rate_for(symbol)
+        payment = position["amt"] * mark_price * rate
+        self.wallet_balance -= payment
+        self.total_funding += payment
+        position["funding"] += payment
@@ -0,0 +1,215 @@
+"""
+Replay Stand-ins for the Shared Live Services
+Drop-in replacements for SharedKlineStore, SharedAccountCache, MarkPriceCache and
+datetime.now that a VibeTrader is injected with during a backtest
+"""
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from strategies.candles import CandleFrame
+from strategies.incremental_indicators import IncrementalIndicators
+from backtesting.data import MarketReplay
+
+
+class ReplayKlineStore:
+    """
+    Serves candles and incremental indicator analysis from a MarketReplay
+
+    Mirrors the SharedKlineStore interface used by the trader. Indicator engines are
+    fed lazily: when a pair is read, every bucket closed since the last read is applied
+    once, then the in-progress bucket, so a replay costs one engine update per
+    interval per trading cycle rather than one per 1m candle.
+    """
+
+    def __init__(self, replay: MarketReplay):
+        """
+        Args:
+            replay: Historical data with the replay cursor
+        """
+        self.replay = replay
+        self._limits: Dict[Tuple[str, str], int] = {}
+        self._engines: Dict[Tuple[str, str], IncrementalIndicators] = {}
+        self._applied: Dict[Tuple[str, str], int] = {}  # Last bucket fed to each engine
+
+    def subscribe(self, symbol: str, interval: str, limit: int):
+        """Register a (symbol, interval) pair and the window its analysis covers"""
+        key = (symbol.upper(), interval)
+        if self._limits.get(key, 0) < limit:
+            self._limits[key] = limit
+            self._engines.pop(key, None)
+            self._applied.pop(key, None)
+
+    def is_ready(self, symbol: str, interval: str) -> bool:
+        """True once the replay has at least one closed candle for the symbol"""
+        symbol = symbol.upper()
+        return symbol in self.replay.cursor and self.replay.cursor[symbol] >= 0
+
+    def get_candles(self, symbol: str, interval: str, limit: Optional[int] = None) -> CandleFrame:
+        """Most recent candles as of the replay cursor (the last one may be in progress)"""
+        return self.replay.get_candles(symbol, interval, limit)
+
+    def get_analysis(self, symbol: str, interval: str, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Incremental indicator analysis as of the replay cursor
+
+        Returns:
+            Same dictionary as MarketAnalyzer.analyze_full_market over the last `limit`
+            candles, or None if no engine covers exactly that window
+        """
+        key = (symbol.upper(), interval)
+        window = self._limits.get(key)
+        if window is None or (limit is not None and limit != window):
+            return None
+
+        bucket = self.replay.current_bucket(key[0], interval)
+        if bucket < 0:
+            return None
+
+        engine = self._catch_up(key, window, bucket)
+        return engine.analysis() if engine is not None and len(engine) else None
+
+    def _catch_up(self, key: Tuple[str, str], window: int, bucket: int) -> Optional[IncrementalIndicators]:
+        """Feed the engine every bucket up to the current (partial) one"""
+        symbol, interval = key
+        engine = self._engines.get(key)
+        applied = self._applied.get(key, -1)
+
+        if engine is None or bucket < applied or bucket - applied > window:
+            try:
+                engine = IncrementalIndicators(window=window)
+            except ValueError:
+                return None
+            self._engines[key] = engine
+            applied = max(0, bucket - window + 1)
+        # The last applied bucket may have been partial; re-applying it replaces it in place
+
+        aggregation = self.replay.aggregation(symbol, interval)
+        for b in range(applied, bucket):
+            engine.update(int(aggregation.open_time[b]), *aggregation.block[:, b].tolist())
+        engine.update(*self.replay.bucket_candle(symbol, interval, bucket))
+
+        self._applied[key] = bucket
+        return engine
+
+
+class ReplayAccountCache:
+    """SharedAccountCache stand-in that reads the simulated account on every call (no staleness)"""
+
+    def __init__(self, client=None):
+        """
+        Args:
+            client: SimulatedAsterClient to read from
+        """
+        self._aster_client = client
+
+    def set_client(self, client):
+        """Set the simulated client to read from"""
+        self._aster_client = client
+
+    async def get_account_data(self, force_refresh: bool = False, client=None) -> Optional[Dict[str, Any]]:
+        client = self._aster_client or client
+        if not client:
+            return None
+        return await client.get_account()
+
+    async def get_open_orders(self, symbol: Optional[str] = None, client=None) -> List[Dict[str, Any]]:
+        client = self._aster_client or client
+        if not client:
+            return []
+        return await client.get_open_orders(symbol)
+
+    def clear_cache(self):
+        """Nothing is cached"""
+
+    def get_cache_age(self) -> float:
+        return 0.0
+
+
+class ReplayMarkPriceCache:
+    """
+    MarkPriceCache stand-in over the simulated exchange
+
+    The mark is the last 1m close (what the simulated exchange marks positions at).
+    Funding comes from the exchange's recorded history when it has one, otherwise from
+    its constant rate on the 8h schedule. The current-period estimate is the last
+    settled rate, so the prompt never sees a settlement before it happens.
+    """
+
+    def __init__(self, client, clock: "SimulatedClock"):
+        """
+        Args:
+            client: SimulatedAsterClient to read from
+            clock: Replay clock (funding timing is relative to it)
+        """
+        self._aster_client = client
+        self._clock = clock
+
+    def subscribe(self, symbol: str):
+        """Every replayed symbol is available"""
+
+    def mark_price(self, symbol: str) -> Optional[float]:
+        price = self._aster_client.replay.last_price(symbol.upper())
+        return price or None
+
+    def funding(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Same dictionary as MarkPriceCache.funding, as of the replay clock"""
+        from backtesting.exchange import FUNDING_INTERVAL_MS
+        from utils.mark_price_cache import DAY_MS
+        symbol = symbol.upper()
+        now = self._clock.time_ms
+        history = self._aster_client.funding_history.get(symbol)
+
+        if history is None:
+            rate = self._aster_client.funding_rate_for(symbol)
+            interval_ms = FUNDING_INTERVAL_MS
+            next_time = (now // interval_ms + 1) * interval_ms
+            last_rate = avg_24h = avg_7d = rate
+        else:
+            times, rates = history
+            settled = int(np.searchsorted(times, now, side="right"))
+            if settled == 0:
+                return None
+            interval_ms = int(times[settled - 1] - times[settled - 2]) if settled > 1 else FUNDING_INTERVAL_MS
+            next_time = int(times[settled]) if settled < len(times) else int(times[settled - 1]) + interval_ms
+            rate = last_rate = float(rates[settled - 1])
+            past_times, past_rates = times[:settled], rates[:settled]
+            day = past_rates[past_times > now - DAY_MS]
+            week = past_rates[past_times > now - 7 * DAY_MS]
+            avg_24h = float(day.mean()) if len(day) else None
+            avg_7d = float(week.mean()) if len(week) else None
+
+        return {
+            "rate": rate,
+            "next_funding_time": next_time,
+            "minutes_to_funding": max(0.0, (next_time - now) / 60_000),
+            "interval_hours": interval_ms / 3_600_000,
+            "annualized_rate": rate * DAY_MS / interval_ms * 365,
+            "last_settled_rate": last_rate,
+            "avg_rate_24h": avg_24h,
+            "avg_rate_7d": avg_7d,
+        }
+
+
+class SimulatedClock:
+    """
+    Replacement for datetime.now driven by the replay
+
+    Returns naive local datetimes like datetime.now, so timestamps in the decision
+    store and trade tracker line up with the candle times shown to the LLM.
+    """
+
+    def __init__(self, time_ms: int = 0):
+        """
+        Args:
+            time_ms: Initial time in epoch milliseconds
+        """
+        self.time_ms = time_ms
+
+    def set(self, time_ms: int):
+        """Move the clock to an epoch time in milliseconds"""
+        self.time_ms = int(time_ms)
+
+    def __call__(self) -> datetime:
+        return datetime.fromtimestamp(self.time_ms / 1000)
@@ -0,0 +1,269 @@
+"""
+Parallel Parameter Sweeps
+Fans TradingConfig variations out over a process pool. The historical candle arrays
+are copied into shared memory once; every worker maps them zero-copy and reuses
+one MarketReplay for all the configurations it runs.
+"""
+import asyncio
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from config.config import config
+from strategies.candles import CandleFrame
+from backtesting.data import MarketReplay
+from backtesting.decision_sources import source_factory
+from backtesting.engine import BacktestEngine
+
+
+# Overrides with this prefix go to the decision source spec instead of TradingConfig
+SOURCE_PREFIX = "source."
+
+
+class SharedCandles:
+    """
+    1m candles of every symbol held in named shared memory segments
+
+    The owning process creates the segments with from_frames and must unlink them;
+    workers attach with the picklable spec and get read-only CandleFrames over the
+    same pages.
+    """
+
+    def __init__(self, spec: Dict[str, Dict[str, Any]], segments: List[shared_memory.SharedMemory], frames: Dict[str, CandleFrame]):
+        self.spec = spec
+        self.frames = frames
+        self._segments = segments
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, CandleFrame]) -> "SharedCandles":
+        """Copy frames into new shared memory segments (call unlink when done)"""
+        spec, segments, shared = {}, [], {}
+        for symbol, frame in frames.items():
+            n = len(frame)
+            times = shared_memory.SharedMemory(create=True, size=max(1, n * 8))
+            block = shared_memory.SharedMemory(create=True, size=max(1, n * 5 * 8))
+            segments += [times, block]
+
+            open_time = np.ndarray((n,), dtype=np.int64, buffer=times.buf)
+            values = np.ndarray((5, n), dtype=np.float64, buffer=block.buf)
+            open_time[:] = frame.open_time
+            values[:] = frame.block
+            spec[symbol] = {"length": n, "open_time": times.name, "block": block.name}
+            shared[symbol] = CandleFrame(open_time, values)
+        return cls(spec, segments, shared)
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Dict[str, Any]]) -> "SharedCandles":
+        """Map segments created by the parent process (pool workers share its resource tracker)"""
+        segments, frames = [], {}
+        for symbol, entry in spec.items():
+            n = entry["length"]
+            times = shared_memory.SharedMemory(name=entry["open_time"])
+            block = shared_memory.SharedMemory(name=entry["block"])
+            segments += [times, block]
+
+            open_time = np.ndarray((n,), dtype=np.int64, buffer=times.buf)
+            values = np.ndarray((5, n), dtype=np.float64, buffer=block.buf)
+            open_time.flags.writeable = False
+            values.flags.writeable = False
+            frames[symbol] = CandleFrame(open_time, values)
+        return cls(spec, segments, frames)
+
+    def close(self):
+        """Drop this process's mapping"""
+        self.frames = {}
+        for segment in self._segments:
+            segment.close()
+
+    def unlink(self):
+        """Close and destroy the segments (creator only)"""
+        segments = self._segments
+        self.close()
+        for segment in segments:
+            segment.unlink()
+
+
+def grid(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Every combination of the given values
+
+    Args:
+        space: Parameter name -> candidate values
+
+    Returns:
+        List of override dictionaries
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_configs(
+    space: Dict[str, Union[Sequence[Any], Tuple[float, float]]],
+    count: int,
+    seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Random samples from the given space
+
+    Args:
+        space: Parameter name -> list of choices, or a (low, high) tuple sampled
+               uniformly (integers if both bounds are ints)
+        count: Number of configurations
+        seed: RNG seed for reproducible sweeps
+
+    Returns:
+        List of override dictionaries
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        overrides = {}
+        for name, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                low, high = values
+                overrides[name] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+            else:
+                overrides[name] = rng.choice(list(values))
+        configs.append(overrides)
+    return configs
+
+
+# ========== Worker process state ==========
+
+_worker_candles: Optional[SharedCandles] = None
+_worker_replay: Optional[MarketReplay] = None
+_worker_base_trading = None
+
+
+def _init_worker(spec: Dict[str, Dict[str, Any]]):
+    """Attach the shared candles once per worker"""
+    global _worker_candles, _worker_replay, _worker_base_trading
+    _worker_candles = SharedCandles.attach(spec)
+    _worker_replay = MarketReplay(_worker_candles.frames)
+    _worker_base_trading = config.trading.model_copy()
+
+
+def _run_config(
+    index: int,
+    overrides: Dict[str, Any],
+    source: Dict[str, Any],
+    engine_kwargs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run one configuration in a worker and return its summary row"""
+    trading_overrides = {k: v for k, v in overrides.items() if not k.startswith(SOURCE_PREFIX)}
+    source_spec = dict(source, **{k[len(SOURCE_PREFIX):]: v for k, v in overrides.items() if k.startswith(SOURCE_PREFIX)})
+
+    # The trader reads config.trading at call time, so swapping it applies the overrides
+    config.trading = _worker_base_trading.model_copy(update=trading_overrides)
+    for name in ("agent", "utils", "backtesting"):
+        logger.disable(name)
+
+    try:
+        engine = BacktestEngine(_worker_replay, source_factory(source_spec), quiet=True, **engine_kwargs)
+        result = asyncio.run(engine.run())
+        return {
+            "index": index,
+            "params": overrides,
+            "report": result["report"],
+            "final_equity": result["final_equity"],
+            "total_return": result["total_return"],
+            "total_fees": result["total_fees"],
+            "cycles": result["cycles"],
+            "elapsed_seconds": result["elapsed_seconds"]
+        }
+    except Exception as e:
+        return {"index": index, "params": overrides, "error": str(e)}
+    finally:
+        config.trading = _worker_base_trading
+
+
+class ParameterSweep:
+    """
+    Runs many backtest configurations across all cores
+
+    Each configuration is a dict of overrides: TradingConfig field names
+    (confidence_threshold, atr_stop_multiplier, close_confidence_decay_minutes, ...)
+    or "source."-prefixed decision source parameters (source.threshold, ...).
+    """
+
+    def __init__(
+        self,
+        frames: Dict[str, CandleFrame],
+        source: Dict[str, Any],
+        workers: Optional[int] = None,
+        **engine_kwargs
+    ):
+        """
+        Args:
+            frames: 1m CandleFrame per symbol
+            source: Decision source spec (see decision_sources.source_factory)
+            workers: Worker processes (default: all cores)
+            **engine_kwargs: Passed to every BacktestEngine (initial_balance, fees, warmup, ...)
+        """
+        self.frames = frames
+        self.source = source
+        self.workers = workers or os.cpu_count() or 1
+        self.engine_kwargs = engine_kwargs
+
+    @staticmethod
+    def validate(configs: List[Dict[str, Any]]):
+        """Reject override names that are not TradingConfig fields"""
+        fields = set(type(config.trading).model_fields)
+        for overrides in configs:
+            unknown = [k for k in overrides if not k.startswith(SOURCE_PREFIX) and k not in fields]
+            if unknown:
+                raise ValueError(f"Unknown TradingConfig fields: {', '.join(unknown)}")
+
+    def run(self, configs: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Run every configuration, yielding summary rows as they finish
+
+        Args:
+            configs: Override dictionaries (see grid / random_configs)
+
+        Yields:
+            Row with index, params, the PerformanceMetrics report and headline numbers
+            (or an "error" key if the run failed)
+        """
+        self.validate(configs)
+        shared = SharedCandles.from_frames(self.frames)
+        logger.info(f"🧪 Sweeping {len(configs)} configurations on {self.workers} workers "
+                    f"({sum(len(f) for f in self.frames.values()):,} candles in shared memory)")
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(shared.spec,)
+            ) as pool:
+                futures = [
+                    pool.submit(_run_config, i, overrides, self.source, self.engine_kwargs)
+                    for i, overrides in enumerate(configs)
+                ]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            shared.unlink()
+
+
+def rank(rows: List[Dict[str, Any]], metric: str = "sharpe_ratio") -> List[Dict[str, Any]]:
+    """
+    Sort summary rows best first
+
+    Args:
+        rows: Rows yielded by ParameterSweep.run
+        metric: Report key (sharpe_ratio, total_pnl, profit_factor, expectancy, ...)
+                or total_return; max_drawdown ranks lowest first
+    """
+    def score(row: Dict[str, Any]) -> float:
+        if "error" in row:
+            return float("-inf")
+        value = row["total_return"] if metric == "total_return" else row["report"].get(metric, 0.0)
+        return -value if metric == "max_drawdown" else value
+
+    return sorted(rows, key=score, reverse=True)
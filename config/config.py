@@ -2,7 +2,7 @@
 Configuration management for Aster Vibe Trader
 """
 import os
-from typing import Literal
+from typing import Literal, Tuple
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
@@ -16,6 +16,55 @@ class AsterConfig(BaseModel):
     private_key: str = Field(default_factory=lambda: os.getenv("ASTER_PRIVATE_KEY", ""))
     api_url: str = Field(default_factory=lambda: os.getenv("ASTER_API_URL", "https://fapi.asterdex.com"))
     ws_url: str = Field(default_factory=lambda: os.getenv("ASTER_WS_URL", "wss://fapi.asterdex.com"))
+    stream_url: str = Field(default_factory=lambda: os.getenv("ASTER_STREAM_URL", "wss://fstream.asterdex.com"))  # Market data streams
+    sign_in_thread: bool = Field(
+        default_factory=lambda: os.getenv("ASTER_SIGN_IN_THREAD", "false").lower() == "true"  # Sign requests off the event loop
+    )
+    rate_limit_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ASTER_RATE_LIMIT_ENABLED", "true").lower() == "true"  # Shared weight limiter
+    )
+    rate_limit_budget: float = Field(
+        default_factory=lambda: float(os.getenv("ASTER_RATE_LIMIT_BUDGET", "0.8"))  # Fraction of the exchange limits to use
+    )
+    rate_limit_reserve: float = 0.1  # Weight each class below ACCOUNT leaves for orders (fraction of budget)
+    weight_limit_per_minute: int = 2400  # REQUEST_WEIGHT limit (updated from exchangeInfo)
+    order_limit_per_minute: int = 1200  # ORDERS limit (updated from exchangeInfo)
+    http_pool_size: int = 32  # Max connections in the shared HTTP pool
+    http_pool_per_host: int = 8  # Max connections to one host (all bots + dashboard share them)
+    http_keepalive: float = 60.0  # Seconds an idle connection is kept warm
+    http_dns_ttl: int = 300  # Seconds resolved addresses are cached
+    http_timeout: float = 30.0  # Total seconds per request
+    retry_max_attempts: int = Field(
+        default_factory=lambda: int(os.getenv("ASTER_RETRY_ATTEMPTS", "3"))  # Attempts per request (1 = no retries)
+    )
+    retry_base_delay: float = 0.2  # Seconds; first backoff and jitter floor
+    retry_max_delay: float = 5.0  # Seconds; backoff cap
+    retry_max_wait: float = 30.0  # Longest Retry-After honoured before giving up
+    hedge_requests: bool = Field(
+        default_factory=lambda: os.getenv("ASTER_HEDGE_REQUESTS", "false").lower() == "true"  # Duplicate slow GETs
+    )
+    hedge_window: int = 100  # Latency samples per endpoint for the p95 hedge threshold
+    hedge_min_samples: int = 20  # Samples needed before hedging an endpoint
+    hedge_min_delay: float = 0.05  # Never hedge sooner than this (seconds)
+    breaker_failure_threshold: int = 5  # Consecutive server/transport failures that open a circuit
+    breaker_reset_timeout: float = 30.0  # Seconds an open circuit waits before a probe
+    user_stream_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ASTER_USER_STREAM_ENABLED", "true").lower() == "true"  # Account state from the user data stream
+    )
+    user_stream_keepalive: float = 1800.0  # Seconds between listenKey keepalives (key expires after 60 min)
+    user_stream_resync: float = 1800.0  # Seconds between safety REST resyncs of the account book
+    user_stream_start_timeout: float = 10.0  # Seconds start() waits for the first snapshot
+    stream_queue_size: int = 1000  # Events buffered per market stream subscriber (oldest dropped when full)
+    order_book_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ASTER_ORDER_BOOK_ENABLED", "true").lower() == "true"  # Local L2 books from depth streams
+    )
+    order_book_snapshot_limit: int = 1000  # Levels per depth snapshot (weight 20; only fetched on start and resync)
+    trade_tape_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ASTER_TRADE_TAPE_ENABLED", "true").lower() == "true"  # Order-flow features from aggTrade
+    )
+    trade_tape_capacity: int = 50_000  # Trades kept per symbol (ring buffer)
+    trade_tape_windows: Tuple[float, ...] = (10.0, 60.0, 300.0)  # Rolling feature windows (seconds)
+    large_print_sigma: float = 3.0  # Trades this many std devs above the mean notional are large prints
 
 
 class LLMConfig(BaseModel):
@@ -54,13 +103,27 @@ class TradingConfig(BaseModel):
     leverage: int = Field(
         default_factory=lambda: int(os.getenv("LEVERAGE", "5"))  # 5x leverage (aggressive but manageable)
     )
-    update_interval: int = 300  # 5 minutes (300 seconds) - reduced to prevent API bans
+    update_interval: int = Field(
+        default_factory=lambda: int(os.getenv("UPDATE_INTERVAL", "300"))  # Seconds between cycles (request weight is budgeted by utils.rate_limiter)
+    )
+    cycle_max_concurrency: int = 6  # Requests one bot keeps in flight at once (a cold cycle needs 6)
+    cycle_request_timeout: float = 10.0  # Seconds before a single cycle request is abandoned
+    max_entry_slippage_bps: float = 10.0  # Cap entries at the book depth within this distance of mid
+    max_entry_spread_bps: float = 25.0  # Skip entries while the spread is wider than this
+    bracket_orders: bool = True  # Send entry + SL + TP (and paired SL/TP repairs) as one batchOrders request
     
     # Advanced risk parameters
     max_portfolio_heat: float = 0.15  # Max 15% total portfolio at risk
     trailing_stop_activation: float = 0.015  # Activate trailing stop after 1.5% profit
     trailing_stop_distance: float = 0.01  # Trail at 1% distance
     confidence_threshold: int = 60  # Minimum confidence to trade (lowered for more opportunities)
+    atr_stop_multiplier: float = 2.0  # Stop loss distance in ATRs on entry
+    atr_take_profit_multiplier: float = 4.0  # Take profit distance in ATRs on entry (2:1 RR)
+    
+    # Dynamic position sizing
+    position_balance_fraction: float = 0.6  # Base size capped at 60% of balance
+    min_position_fraction: float = 0.25  # Floor at 25% of max_position_size
+    max_margin_usage: float = 0.8  # Use at most 80% of available margin
     daily_target_percent: float = Field(
         default_factory=lambda: float(os.getenv("DAILY_TARGET_PERCENT", "0.01"))  # 1% daily equity goal reference
     )
@@ -87,12 +150,30 @@ class DashboardConfig(BaseModel):
     api_port: int = Field(default_factory=lambda: int(os.getenv("API_PORT", "8000")))
 
 
+class DataConfig(BaseModel):
+    """Local market data archive configuration"""
+    archive_enabled: bool = Field(
+        default_factory=lambda: os.getenv("KLINE_ARCHIVE_ENABLED", "true").lower() == "true"
+    )
+    archive_dir: str = Field(default_factory=lambda: os.getenv("KLINE_ARCHIVE_DIR", "data/klines"))
+    backfill_page_size: int = 1000  # Klines per REST page (1000 is the cheapest weight per candle)
+    backfill_pause: float = 0.25  # Seconds between backfill pages
+    exchange_info_path: str = Field(
+        default_factory=lambda: os.getenv("EXCHANGE_INFO_PATH", "data/exchange_info.json")  # Cached symbol filters
+    )
+    exchange_info_refresh: int = 3600  # Seconds between exchangeInfo refreshes
+    funding_history_days: int = 30  # Settled funding backfilled on start (0 = no backfill)
+    persistence_flush_interval: float = 1.0  # Seconds a queued journal write may wait before it is flushed
+    persistence_flush_size: int = 100  # Queued records that trigger an immediate flush
+
+
 class Config(BaseModel):
     """Master configuration"""
     aster: AsterConfig = Field(default_factory=AsterConfig)
     llm: LLMConfig = Field(default_factory=LLMConfig)
     trading: TradingConfig = Field(default_factory=TradingConfig)
     dashboard: DashboardConfig = Field(default_factory=DashboardConfig)
+    data: DataConfig = Field(default_factory=DataConfig)
 
 
 # Global config instance
@@ -3,17 +3,28 @@ FastAPI server for dashboard backend
 """
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import json
 import asyncio
 from datetime import datetime, timedelta
 from loguru import logger
 import websockets
-import aiohttp
 from collections import defaultdict
 
 from config.config import config
 from api.aster_client import AsterClient
+from api.http_pool import HttpPool
+from api.resilience import RequestResilience
+from data import KlineArchive, KlineBackfiller
+from utils.llm_usage import LLMUsageTracker
+from utils.mark_price_cache import MarkPriceCache
+from utils.market_stream import CONNECTED, MarketStreamHub, StreamClosed
+from utils.order_book import OrderBookManager
+from utils.persistence import PersistenceWorker
+from utils.rate_limiter import Priority, RateLimiter
+from utils.shared_kline_store import INTERVAL_MS
+from utils.trade_tape import TradeTapeManager
+from utils.user_data_stream import UserDataStream
 
 app = FastAPI(title="Aster Vibe Trader Dashboard API")
 
@@ -26,12 +37,39 @@ async def get_aster_client():
     global _shared_client
     async with _client_lock:
         if _shared_client is None:
-            _shared_client = AsterClient()
-            timeout = aiohttp.ClientTimeout(total=30)
-            _shared_client.session = aiohttp.ClientSession(timeout=timeout)
-            logger.info("✅ Created shared Aster client with reusable session")
+            # Lowest rate limiter class: browser traffic never delays a bot's orders or data
+            _shared_client = AsterClient(priority=Priority.DASHBOARD)
+            await _shared_client.__aenter__()
+            logger.info("✅ Created dashboard Aster client on the shared HTTP pool")
         return _shared_client
 
+async def get_account_state(client) -> Dict[str, Any]:
+    """Account from the bots' user data stream when it is live, otherwise over REST"""
+    stream = UserDataStream()
+    if stream.is_live():
+        account = stream.get_account()
+        if account is not None:
+            return account
+    return await client.get_account()
+
+# Local kline archive: chart history is read from disk, only missing candles come over REST
+_kline_archive = None
+_kline_backfiller = None
+
+def get_kline_archive() -> KlineArchive:
+    """Get or create the dashboard's archive reader (keeps files mapped between requests)"""
+    global _kline_archive
+    if _kline_archive is None:
+        _kline_archive = KlineArchive()
+    return _kline_archive
+
+def get_kline_backfiller(client) -> KlineBackfiller:
+    """Get or create the archive-backed kline source for the dashboard"""
+    global _kline_backfiller
+    if _kline_backfiller is None:
+        _kline_backfiller = KlineBackfiller(client, get_kline_archive())
+    return _kline_backfiller
+
 # Rate limiting and caching to prevent API bans - BALANCED SETTINGS (proven stable for 1 hour!)
 _klines_cache: Dict[str, Tuple[Any, datetime]] = {}  # {cache_key: (data, timestamp)}
 _general_cache: Dict[str, Tuple[Any, datetime]] = {}  # Cache for all endpoints
@@ -57,6 +95,11 @@ def check_rate_limit(endpoint: str) -> bool:
         logger.warning(f"⚠️ Rate limit exceeded for {endpoint}")
         return False
     
+    # Serve from cache instead of queueing behind the bots when the shared budget is tight
+    if RateLimiter().is_constrained(Priority.DASHBOARD):
+        logger.warning(f"⚠️ Exchange weight budget busy - deferring {endpoint}")
+        return False
+    
     _request_timestamps[endpoint].append(now)
     return True
 
@@ -101,11 +144,12 @@ def get_cached_or_fetch(cache_key: str, fetch_func, cache_duration: int = _gener
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Cleanup on shutdown - close shared client session"""
+    """Cleanup on shutdown - release the dashboard's hold on the shared HTTP pool"""
     global _shared_client
-    if _shared_client and _shared_client.session:
-        await _shared_client.session.close()
-        logger.info("✅ Closed shared Aster client session")
+    if _shared_client:
+        await _shared_client.__aexit__(None, None, None)
+        _shared_client = None
+        logger.info("✅ Released dashboard Aster client")
 
 # CORS middleware
 app.add_middleware(
@@ -206,43 +250,112 @@ async def get_status(bot_name: str = None):
     }
 
 
+@app.get("/api/user-stream")
+async def get_user_stream():
+    """Health of the shared user data stream (connection, last event and resync ages)"""
+    return UserDataStream().get_status()
+
+
+@app.get("/api/market-stream")
+async def get_market_stream():
+    """Shared market stream connection: streams, subscribers, frames and dropped events"""
+    return MarketStreamHub().get_status()
+
+
+@app.get("/api/order-book")
+async def get_order_book_status():
+    """Sync state of the local order books (levels, spread, age)"""
+    return OrderBookManager().get_status()
+
+
+@app.get("/api/order-book/{symbol}")
+async def get_order_book(symbol: str, levels: int = 10):
+    """Top of a local order book (served from memory, no REST call)"""
+    book = OrderBookManager().get(symbol)
+    if book is None:
+        return {"error": f"No live order book for {symbol.upper()}"}
+    return book.snapshot(levels)
+
+
+@app.get("/api/order-flow/{symbol}")
+async def get_order_flow(symbol: str):
+    """Rolling order-flow features from the trade tape (served from memory)"""
+    features = TradeTapeManager().features(symbol)
+    if features is None:
+        return {"error": f"No live trade tape for {symbol.upper()}", **TradeTapeManager().get_status()}
+    return features
+
+
+@app.get("/api/mark-prices")
+async def get_mark_prices():
+    """Streamed mark prices and funding rates per symbol"""
+    return MarkPriceCache().get_status()
+
+
+@app.get("/api/funding/{symbol}")
+async def get_funding(symbol: str):
+    """Funding features for a symbol (current rate, next settlement, settled averages)"""
+    funding = MarkPriceCache().funding(symbol)
+    if funding is None:
+        return {"error": f"No live mark price stream for {symbol.upper()}"}
+    return funding
+
+
+@app.get("/api/rate-limit")
+async def get_rate_limit():
+    """Shared exchange weight/order budget (local buckets plus what the exchange last reported)"""
+    return RateLimiter().get_status()
+
+
+@app.get("/api/llm-usage")
+async def get_llm_usage():
+    """LLM tokens (input/cached/output), prompt cache savings and latency per bot and model"""
+    return LLMUsageTracker().get_status()
+
+
+@app.get("/api/persistence")
+async def get_persistence():
+    """Write-behind journal queue depth and flush latency"""
+    return PersistenceWorker().get_status()
+
+
+@app.get("/api/http-pool")
+async def get_http_pool():
+    """Shared HTTP connection pool metrics (connections, reuse ratio, TLS handshakes)"""
+    return HttpPool().get_stats()
+
+
+@app.get("/api/resilience")
+async def get_resilience():
+    """Retry/hedge outcomes and circuit breaker state per exchange endpoint"""
+    return RequestResilience().get_stats()
+
+
 @app.get("/api/decisions")
 async def get_decisions(limit: int = 50, symbol: str = None, bot_name: str = None):
     """Get recent trading decisions, optionally filtered by symbol or bot"""
-    all_decisions = []
-    
-    # Get decisions from all bots or specific bot
     if bot_name:
         trader = get_trader_instance(bot_name)
-        if trader:
-            all_decisions = trader.get_decision_log()
+        traders = [trader] if trader else []
     else:
-        # Get decisions from all bots
-        for trader in trader_instances.values():
-            all_decisions.extend(trader.get_decision_log())
-        
-        # Sort by timestamp (most recent first)
-        all_decisions.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+        traders = list(trader_instances.values())
     
-    # Filter by symbol if provided
-    if symbol:
-        filtered = [d for d in all_decisions if d.get('decision', {}).get('symbol') == symbol]
-        return filtered[:limit]
+    # Each store answers from its symbol index; merge the newest across bots
+    all_decisions = []
+    for trader in traders:
+        all_decisions.extend(trader.decision_store.get_decisions(limit=limit, symbol=symbol))
     
+    # Sort by timestamp (most recent first)
+    all_decisions.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
     return all_decisions[:limit]
 
 
-# Track last known decision counts per bot to detect new decisions
-last_decision_counts = {}
-
 @app.websocket("/ws/decisions")
 async def decisions_websocket(websocket: WebSocket):
     """
     WebSocket endpoint for real-time AI decisions
-    Polls bot decision logs and pushes new decisions to frontend
+    Polls each bot's decision store with a cursor and pushes new decisions to frontend
     """
-    global last_decision_counts
-    
     try:
         await websocket.accept()
         logger.info("Frontend WebSocket connected to /ws/decisions")
@@ -250,21 +363,22 @@ async def decisions_websocket(websocket: WebSocket):
         logger.error(f"Error accepting WebSocket connection: {e}")
         return
     
+    # Last decision id sent per bot (0 sends what each store holds on connect)
+    cursors: Dict[str, int] = {}
+    
     try:
         while True:
             try:
                 # Check all bots for new decisions
                 all_decisions = []
-                for bot_name, trader in trader_instances.items():
+                for bot_name, trader in list(trader_instances.items()):
                     try:
-                        decisions = trader.get_decision_log()
-                        current_count = len(decisions)
-                        
-                        # Check if there are new decisions
-                        last_count = last_decision_counts.get(bot_name, 0)
-                        if current_count > last_count:
-                            # New decisions detected
-                            new_decisions = decisions[last_count:current_count]
+                        store = trader.decision_store
+                        cursor = cursors.get(bot_name, 0)
+                        if store.last_id < cursor:
+                            cursor = 0  # Store was reset - start over
+                        new_decisions = store.get_decisions(limit=None, since=cursor)
+                        if new_decisions:
                             logger.info(f"📊 New decisions detected for {bot_name}: {len(new_decisions)}")
                             
                             # Add bot symbol to each decision
@@ -275,11 +389,7 @@ async def decisions_websocket(websocket: WebSocket):
                                     'asset': trader.symbol.replace('USDT', '')
                                 }
                                 all_decisions.append(decision_with_meta)
-                            
-                            last_decision_counts[bot_name] = current_count
-                        elif current_count == 0 and last_count > 0:
-                            # Decision log was cleared - reset counter
-                            last_decision_counts[bot_name] = 0
+                        cursors[bot_name] = new_decisions[-1]["id"] if new_decisions else cursor
                         
                     except Exception as e:
                         logger.error(f"Error reading decisions from {bot_name}: {e}")
@@ -473,7 +583,7 @@ async def get_performance(symbol: str = None):
     
     async def fetch_performance():
         client = await get_aster_client()
-        account = await client.get_account()
+        account = await get_account_state(client)
         
         # Determine which symbols to fetch
         symbols_to_fetch = [symbol] if symbol else ["ASTERUSDT", "BTCUSDT"]
@@ -577,7 +687,7 @@ async def get_positions():
     async def fetch_positions():
         # Use dedicated client for dashboard
         client = await get_aster_client()
-        account = await client.get_account()
+        account = await get_account_state(client)
         positions = account.get('positions', [])
         
         # Filter only open positions
@@ -643,7 +753,13 @@ async def get_balance():
 
 
 @app.get("/api/klines")
-async def get_klines(symbol: str = "ASTERUSDT", interval: str = "5m", limit: int = 288):
+async def get_klines(
+    symbol: str = "ASTERUSDT",
+    interval: str = "5m",
+    limit: int = 288,
+    start: Optional[int] = None,
+    end: Optional[int] = None
+):
     """
     Get candlestick data for charting (CACHED + RATE LIMITED to prevent API bans)
     
@@ -651,7 +767,17 @@ async def get_klines(symbol: str = "ASTERUSDT", interval: str = "5m", limit: int
         symbol: Trading symbol (default: ASTERUSDT)
         interval: Candle interval (1m, 3m, 5m, 15m, 30m, 1h, 4h, 1d) (default: 5m)
         limit: Number of candles to fetch (default: 288 = 24 hours of 5m candles)
+        start: Earliest open time in ms - historical ranges are served from the local archive only
+        end: Latest open time in ms (with start)
     """
+    use_archive = config.data.archive_enabled and interval in INTERVAL_MS
+    if use_archive and (start is not None or end is not None):
+        frame = get_kline_archive().read(symbol, interval, start_time=start, end_time=end, limit=limit)
+        return [
+            {"time": int(t), "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for t, o, h, l, c, v in zip(frame.open_time, *frame.block.tolist())
+        ]
+
     cache_key = f"{symbol}_{interval}_{limit}"
     
     # Check cache first
@@ -673,7 +799,10 @@ async def get_klines(symbol: str = "ASTERUSDT", interval: str = "5m", limit: int
     
     try:
         client = await get_aster_client()
-        klines = await client.get_klines(symbol, interval=interval, limit=limit)
+        if use_archive:
+            klines = await get_kline_backfiller(client).recent(symbol, interval, limit)
+        else:
+            klines = await client.get_klines(symbol, interval=interval, limit=limit)
         
         # Format for candlestick chart
         formatted_candles = []
@@ -723,7 +852,8 @@ async def get_ticker(symbol: str):
 async def ticker_websocket(websocket: WebSocket):
     """
     WebSocket endpoint for real-time ticker prices from Aster
-    Connects to Aster's WebSocket and proxies ticker data to frontend
+    Relays <symbol>@miniTicker events from the shared MarketStreamHub, so any number
+    of open tabs costs one upstream connection
     """
     try:
         await websocket.accept()
@@ -732,106 +862,62 @@ async def ticker_websocket(websocket: WebSocket):
         logger.error(f"Error accepting WebSocket connection: {e}")
         return
     
-    aster_ws = None
-    
+    # Only our 5 symbols (the frontend merges partial updates per symbol)
+    our_symbols = ['asterusdt', 'btcusdt', 'ethusdt', 'solusdt', 'bnbusdt']
+    subscription = MarketStreamHub().subscribe(f"{symbol}@miniTicker" for symbol in our_symbols)
+    # Completes when the browser disconnects (or sends something, which is ignored)
+    receiver = asyncio.create_task(websocket.receive_text())
+    getter = None
     try:
-        # Connect to Aster's WebSocket stream for all market mini tickers
-        # Stream: !miniTicker@arr - updates every 1 second with all symbols
-        aster_ws_url = "wss://fstream.asterdex.com/stream?streams=!miniTicker@arr"
-        
-        logger.info("Connecting to Aster WebSocket for ticker data...")
-        try:
-            # ping_interval=300 (5 min), ping_timeout=60 (1 min) - Aster sends ping every 5 min
-            # Use context manager to ensure proper cleanup
-            async with websockets.connect(aster_ws_url, ping_interval=300, ping_timeout=60) as aster_ws:
-                logger.info("✅ Connected to Aster WebSocket")
-                
-                # When using /stream?streams=... URL format, streams are already active
-                # No need to send SUBSCRIBE message - it's already subscribed via URL
-                logger.info("Listening for ticker updates...")
-                
-                # Listen for messages from Aster and forward to frontend
-                async for message in aster_ws:
-                    try:
-                        data = json.loads(message)
-                    
-                        # Handle subscription confirmation
-                        if data.get('result') is not None:
-                            logger.info("Subscribed to ticker stream")
-                            continue
-                        
-                        # Forward ticker updates to frontend
-                        # Combined stream format: {"stream": "<streamName>", "data": <rawPayload>}
-                        if 'stream' in data and 'data' in data:
-                            # Extract ticker data array
-                            tickers = data.get('data', [])
-                            
-                            # Filter to only our 5 symbols
-                            our_symbols = ['asterusdt', 'btcusdt', 'ethusdt', 'solusdt', 'bnbusdt']
-                            filtered_tickers = [
-                                t for t in tickers 
-                                if isinstance(t, dict) and t.get('s', '').lower() in our_symbols
-                            ]
-                            
-                            # Format for frontend
-                            formatted_tickers = []
-                            for ticker in filtered_tickers:
-                                symbol = ticker.get('s', '').upper()
-                                last_price = float(ticker.get('c', 0))
-                                price_change = float(ticker.get('p', 0))
-                                price_change_percent = float(ticker.get('P', 0))
-                                
-                                formatted_tickers.append({
-                                    "symbol": symbol,
-                                    "lastPrice": str(last_price),
-                                    "priceChange": str(price_change),
-                                    "priceChangePercent": str(price_change_percent),
-                                    "highPrice": str(ticker.get('h', 0)),
-                                    "lowPrice": str(ticker.get('l', 0)),
-                                    "openPrice": str(ticker.get('o', 0)),
-                                    "volume": str(ticker.get('v', 0))
-                                })
-                            
-                            # Send to frontend
-                            if formatted_tickers:
-                                try:
-                                    await websocket.send_json({
-                                        "type": "tickers",
-                                        "data": formatted_tickers
-                                    })
-                                except Exception as e:
-                                    logger.error(f"Error sending to frontend: {e}")
-                                    break  # Frontend disconnected
-                        else:
-                            # Log unexpected message format for debugging
-                            logger.debug(f"Received unexpected message format: {list(data.keys())}")
-                    
-                    except json.JSONDecodeError:
-                        continue
-                    except Exception as e:
-                        logger.error(f"Error processing WebSocket message: {e}")
-                        continue
-        
-        except websockets.exceptions.ConnectionClosed:
-            logger.info("Aster WebSocket connection closed")
-        except Exception as e:
-            logger.error(f"❌ Failed to connect to Aster WebSocket: {e}", exc_info=True)
-            try:
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.exception() is not None:
+                    break
+                receiver = asyncio.create_task(websocket.receive_text())
+            if getter not in done:
+                getter.cancel()
+                continue
+            
+            # Batch everything queued since the last send, newest ticker per symbol
+            latest = {}
+            for stream, ticker in [getter.result()] + subscription.drain():
+                if stream != CONNECTED and isinstance(ticker, dict):
+                    latest[ticker.get('s', '').upper()] = ticker
+            
+            # Format for frontend
+            formatted_tickers = []
+            for symbol, ticker in latest.items():
+                formatted_tickers.append({
+                    "symbol": symbol,
+                    "lastPrice": str(float(ticker.get('c', 0))),
+                    "priceChange": str(float(ticker.get('p', 0))),
+                    "priceChangePercent": str(float(ticker.get('P', 0))),
+                    "highPrice": str(ticker.get('h', 0)),
+                    "lowPrice": str(ticker.get('l', 0)),
+                    "openPrice": str(ticker.get('o', 0)),
+                    "volume": str(ticker.get('v', 0))
+                })
+            
+            if formatted_tickers:
                 await websocket.send_json({
-                    "type": "error",
-                    "message": f"Failed to connect to Aster: {str(e)}"
+                    "type": "tickers",
+                    "data": formatted_tickers
                 })
-            except:
-                pass
-            return
-    
+    except StreamClosed:
+        logger.info("Market stream closed")
     except Exception as e:
-        logger.error(f"Unexpected WebSocket error: {e}", exc_info=True)
+        logger.debug(f"Ticker relay ended: {e}")
     finally:
+        subscription.close()
+        for task in (getter, receiver):
+            if task and not task.done():
+                task.cancel()
         try:
             await websocket.close()
             logger.info("Frontend WebSocket closed")
-        except:
+        except Exception:
             pass
 
 
@@ -848,6 +934,13 @@ async def account_websocket(websocket: WebSocket):
         logger.error(f"Error accepting WebSocket connection: {e}")
         return
     
+    # Inside the bot process, share its user data stream: Aster hands out one listenKey
+    # per account, so a tab opening (and later deleting) its own would cut the bots off
+    stream = UserDataStream()
+    if stream.running:
+        await relay_user_data_stream(stream, websocket)
+        return
+    
     aster_ws = None
     listen_key = None
     keepalive_task = None
@@ -954,6 +1047,44 @@ async def account_websocket(websocket: WebSocket):
             pass
 
 
+async def relay_user_data_stream(stream: UserDataStream, websocket: WebSocket):
+    """Forward the in-process user data stream to one browser tab"""
+    queue = stream.subscribe()
+    logger.info("Frontend /ws/account attached to the shared user data stream")
+    # Completes when the browser disconnects (or sends something, which is ignored)
+    receiver = asyncio.create_task(websocket.receive_text())
+    getter = None
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.exception() is not None:
+                    break
+                receiver = asyncio.create_task(websocket.receive_text())
+            if getter not in done:
+                getter.cancel()
+                continue
+            data = getter.result()
+            event_type = data.get('e')
+            if event_type == 'ACCOUNT_UPDATE':
+                await handle_account_update(data, websocket)
+            elif event_type == 'ORDER_TRADE_UPDATE':
+                await handle_order_trade_update(data, websocket)
+    except Exception as e:
+        logger.debug(f"User data relay ended: {e}")
+    finally:
+        stream.unsubscribe(queue)
+        for task in (getter, receiver):
+            if task and not task.done():
+                task.cancel()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+        logger.info("Frontend WebSocket closed")
+
+
 async def handle_account_update(data: dict, websocket: WebSocket):
     """
     Parse ACCOUNT_UPDATE event and send formatted data to frontend
@@ -0,0 +1,9 @@
+"""
+Market Data Module
+Local kline and funding archives and the REST backfill that keeps them filled
+"""
+from .kline_archive import KlineArchive
+from .funding_archive import FundingArchive
+from .backfill import KlineBackfiller, FundingBackfiller
+
+__all__ = ["KlineArchive", "FundingArchive", "KlineBackfiller", "FundingBackfiller"]
@@ -0,0 +1,213 @@
+"""
+Kline and Funding Backfill
+Pages through /fapi/v1/klines and /fapi/v1/fundingRate with startTime/endTime to fill
+the local archives, resuming from whatever is already on disk
+"""
+import asyncio
+import time
+from typing import List, Optional
+
+from loguru import logger
+
+from config.config import config
+from data.funding_archive import FundingArchive
+from data.kline_archive import KlineArchive
+from utils.shared_kline_store import INTERVAL_MS
+
+
+# A candle counts as closed this long after its nominal close (covers clock skew)
+CLOSE_GRACE_MS = 5_000
+
+FUNDING_PAGE_SIZE = 1000  # Settlements per /fapi/v1/fundingRate page (the maximum)
+
+
+def _row(k) -> List:
+    return [int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])]
+
+
+class KlineBackfiller:
+    """
+    Fills a KlineArchive from the exchange
+
+    Only closed candles are archived; the in-progress candle is returned to callers
+    but never written, so the archive never holds a candle that can still change.
+    """
+
+    def __init__(
+        self,
+        client,
+        archive: Optional[KlineArchive] = None,
+        page_size: Optional[int] = None,
+        pause: Optional[float] = None
+    ):
+        """
+        Args:
+            client: AsterClient (anything with get_klines(symbol, interval, limit, start_time, end_time))
+            archive: Target archive (default: KlineArchive at config.data.archive_dir)
+            page_size: Klines per request (default: config.data.backfill_page_size)
+            pause: Seconds between pages (default: config.data.backfill_pause)
+        """
+        self.client = client
+        self.archive = archive or KlineArchive()
+        self.page_size = page_size or config.data.backfill_page_size
+        self.pause = config.data.backfill_pause if pause is None else pause
+
+    @staticmethod
+    def _is_closed(open_time: int, interval: str, now_ms: int) -> bool:
+        return open_time + INTERVAL_MS[interval] + CLOSE_GRACE_MS <= now_ms
+
+    async def _fetch_range(self, symbol: str, interval: str, start_time: int, end_time: Optional[int] = None) -> List[List]:
+        """
+        Every candle with open time in [start_time, end_time], paging forward
+
+        Returns:
+            Rows [open_time, open, high, low, close, volume], oldest first; with no
+            end_time the last row is usually the in-progress candle
+        """
+        interval_ms = INTERVAL_MS[interval]
+        rows: List[List] = []
+        cursor = start_time
+        while end_time is None or cursor <= end_time:
+            page = await self.client.get_klines(
+                symbol, interval=interval, limit=self.page_size, start_time=cursor, end_time=end_time
+            )
+            if not page:
+                break
+            rows.extend(_row(k) for k in page)
+            cursor = rows[-1][0] + interval_ms
+            if len(page) < self.page_size:
+                break
+            if self.pause:
+                await asyncio.sleep(self.pause)
+        return rows
+
+    async def backfill(self, symbol: str, interval: str, start_time: int, end_time: Optional[int] = None) -> int:
+        """
+        Archive every closed candle in a time range (resumable)
+
+        Continues after the last archived candle when the archive already reaches
+        past start_time, and fills history older than the archive with a merge.
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval
+            start_time: Earliest open time in ms
+            end_time: Latest open time in ms (default: now)
+
+        Returns:
+            Number of candles added
+        """
+        symbol = symbol.upper()
+        interval_ms = INTERVAL_MS[interval]
+        end_time = end_time if end_time is not None else int(time.time() * 1000)
+        first = self.archive.first_time(symbol, interval)
+        last = self.archive.last_time(symbol, interval)
+        added = 0
+
+        if first is not None and start_time < first:
+            # Older history than we have: fetch the missing head in one go and merge it in
+            rows = await self._fetch_range(symbol, interval, start_time, min(end_time, first - interval_ms))
+            added += self.archive.append(symbol, interval, rows)
+            logger.info(f"📥 {symbol} {interval}: merged {added} older candles")
+
+        cursor = start_time if last is None else max(start_time, last + interval_ms)
+        while cursor <= end_time:
+            page = await self.client.get_klines(
+                symbol, interval=interval, limit=self.page_size, start_time=cursor, end_time=end_time
+            )
+            now_ms = int(time.time() * 1000)
+            rows = [_row(k) for k in page or []]
+            closed = [r for r in rows if self._is_closed(r[0], interval, now_ms)]
+            added += self.archive.append(symbol, interval, closed)
+            if len(rows) < self.page_size or len(closed) < len(rows):
+                break
+            cursor = rows[-1][0] + interval_ms
+            logger.debug(f"📥 {symbol} {interval}: archived up to {cursor} ({added} new)")
+            if self.pause:
+                await asyncio.sleep(self.pause)
+
+        logger.info(f"📥 {symbol} {interval}: backfill added {added} candles "
+                    f"({self.archive.count(symbol, interval)} archived)")
+        return added
+
+    async def recent(self, symbol: str, interval: str, limit: int) -> List[List]:
+        """
+        Latest candles, reading the archive first and fetching only what it lacks
+
+        Brings the archive up to the last closed candle (at most `limit` candles
+        back), then returns the archived tail plus the in-progress candle.
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval
+            limit: Number of candles wanted
+
+        Returns:
+            Rows [open_time, open, high, low, close, volume], oldest first
+        """
+        symbol = symbol.upper()
+        interval_ms = INTERVAL_MS[interval]
+        now_ms = int(time.time() * 1000)
+        oldest_wanted = (now_ms // interval_ms - limit) * interval_ms
+        last = self.archive.last_time(symbol, interval)
+        start_time = oldest_wanted if last is None or last < oldest_wanted else last + interval_ms
+
+        fetched = await self._fetch_range(symbol, interval, start_time)
+        closed = [r for r in fetched if self._is_closed(r[0], interval, now_ms)]
+        live = [r for r in fetched if not self._is_closed(r[0], interval, now_ms)]
+        self.archive.append(symbol, interval, closed)
+
+        rows = self.archive.read_klines(symbol, interval, start_time=oldest_wanted) + live
+        return rows[-limit:]
+
+
+class FundingBackfiller:
+    """
+    Fills a FundingArchive from /fapi/v1/fundingRate
+
+    Settlements only ever append, so every run resumes after the last archived one.
+    """
+
+    def __init__(self, client, archive: Optional[FundingArchive] = None, pause: Optional[float] = None):
+        """
+        Args:
+            client: AsterClient (anything with get_funding_history(symbol, start_time, end_time, limit))
+            archive: Target archive (default: FundingArchive at config.data.archive_dir)
+            pause: Seconds between pages (default: config.data.backfill_pause)
+        """
+        self.client = client
+        self.archive = archive or FundingArchive()
+        self.pause = config.data.backfill_pause if pause is None else pause
+
+    async def backfill(self, symbol: str, start_time: int, end_time: Optional[int] = None) -> int:
+        """
+        Archive every settlement in a time range (resumable)
+
+        Args:
+            symbol: Trading symbol
+            start_time: Earliest funding time in ms
+            end_time: Latest funding time in ms (default: now)
+
+        Returns:
+            Number of settlements added
+        """
+        symbol = symbol.upper()
+        last = self.archive.last_time(symbol)
+        cursor = start_time if last is None else max(start_time, last + 1)
+        added = 0
+        while True:
+            page = await self.client.get_funding_history(
+                symbol, start_time=cursor, end_time=end_time, limit=FUNDING_PAGE_SIZE
+            )
+            if not page:
+                break
+            added += self.archive.append(symbol, [(p["fundingTime"], p["fundingRate"]) for p in page])
+            cursor = int(page[-1]["fundingTime"]) + 1
+            if len(page) < FUNDING_PAGE_SIZE:
+                break
+            if self.pause:
+                await asyncio.sleep(self.pause)
+
+        logger.info(f"📥 {symbol} funding: backfill added {added} settlements "
+                    f"({self.archive.count(symbol)} archived)")
+        return added
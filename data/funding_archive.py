@@ -0,0 +1,126 @@
+"""
+Funding Archive
+Settled funding rates per symbol, stored locally so the prompt and the backtester
+can use funding history without REST calls
+"""
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence, Any, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config.config import config
+
+
+# One fixed-width little-endian record per settlement, sorted by funding time
+RECORD = np.dtype([
+    ("funding_time", "<i8"),
+    ("rate", "<f8"),
+])
+
+
+class FundingArchive:
+    """
+    Settled funding rates on disk, one file per symbol
+
+    Files live at <root>/<SYMBOL>/funding.bin next to the kline archive. A symbol
+    settles a few times a day, so files stay small and are read whole.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Archive directory (default: config.data.archive_dir)
+        """
+        self.root = Path(root or config.data.archive_dir)
+
+    def path(self, symbol: str) -> Path:
+        return self.root / symbol.upper() / "funding.bin"
+
+    def _records(self, symbol: str) -> np.ndarray:
+        file_path = self.path(symbol)
+        if not file_path.exists():
+            return np.empty(0, dtype=RECORD)
+        data = file_path.read_bytes()
+        count = len(data) // RECORD.itemsize  # Ignore a torn trailing record
+        return np.frombuffer(data, dtype=RECORD, count=count)
+
+    def count(self, symbol: str) -> int:
+        return len(self._records(symbol))
+
+    def last_time(self, symbol: str) -> Optional[int]:
+        records = self._records(symbol)
+        return int(records["funding_time"][-1]) if len(records) else None
+
+    def read(
+        self,
+        symbol: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Settled funding by time
+
+        Args:
+            symbol: Trading symbol
+            start_time: Earliest funding time in ms, inclusive
+            end_time: Latest funding time in ms, inclusive
+
+        Returns:
+            (funding times in ms, rates), oldest first
+        """
+        records = self._records(symbol)
+        times = records["funding_time"]
+        lo = 0 if start_time is None else int(np.searchsorted(times, start_time, side="left"))
+        hi = len(records) if end_time is None else int(np.searchsorted(times, end_time, side="right"))
+        return times[lo:hi].copy(), records["rate"][lo:hi].copy()
+
+    def append(self, symbol: str, rows: Sequence[Sequence[Any]]) -> int:
+        """
+        Store settled funding
+
+        Args:
+            symbol: Trading symbol
+            rows: (funding_time, rate) pairs; numeric strings accepted
+
+        Returns:
+            Number of settlements added (ones already archived are skipped)
+        """
+        if not len(rows):
+            return 0
+        records = np.empty(len(rows), dtype=RECORD)
+        records["funding_time"] = [int(row[0]) for row in rows]
+        records["rate"] = [float(row[1]) for row in rows]
+
+        existing = self._records(symbol)
+        records = records[~np.isin(records["funding_time"], existing["funding_time"])]
+        records = records[np.argsort(records["funding_time"], kind="stable")]
+        records = records[np.concatenate(([True], np.diff(records["funding_time"]) > 0))] if len(records) else records
+        if not len(records):
+            return 0
+
+        file_path = self.path(symbol)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if not len(existing) or records["funding_time"][0] > existing["funding_time"][-1]:
+            with open(file_path, "ab") as f:
+                # Drop a torn record left by an interrupted write before appending
+                size = f.tell()
+                if size % RECORD.itemsize:
+                    f.truncate(size - size % RECORD.itemsize)
+                    f.seek(0, os.SEEK_END)
+                f.write(records.tobytes())
+        else:
+            merged = np.concatenate((existing, records))
+            merged = merged[np.argsort(merged["funding_time"], kind="stable")]
+            temp_path = file_path.with_suffix(".tmp")
+            temp_path.write_bytes(merged.tobytes())
+            os.replace(temp_path, file_path)
+            logger.debug(f"💾 Rewrote {file_path} with {len(merged)} settlements")
+        return len(records)
+
+    def symbols(self) -> List[str]:
+        """Symbols with archived funding"""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "funding.bin").exists())
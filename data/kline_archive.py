@@ -0,0 +1,218 @@
+"""
+Kline Archive
+Append-only store of closed candles per symbol/interval with memory-mapped,
+zero-copy reads by time range
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Any, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config.config import config
+from strategies.candles import CandleFrame
+from utils.shared_kline_store import INTERVAL_MS
+
+
+# One fixed-width little-endian record per candle, sorted by open time
+RECORD = np.dtype([
+    ("open_time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+class KlineArchive:
+    """
+    Closed candles on disk, one file per symbol/interval
+
+    Files live at <root>/<SYMBOL>/<interval>.bin and only ever grow at the end, so
+    readers can map them while a backfill or the live stream appends. Reads return
+    CandleFrames whose columns are strided views straight into the page cache.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Archive directory (default: config.data.archive_dir)
+        """
+        self.root = Path(root or config.data.archive_dir)
+        # Mapped files keyed by path, remapped when the file grows or is replaced
+        self._maps: Dict[Path, Tuple[Tuple[int, int], np.memmap]] = {}
+
+    def path(self, symbol: str, interval: str) -> Path:
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        return self.root / symbol.upper() / f"{interval}.bin"
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one archived interval"""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and any(p.glob("*.bin")))
+
+    def intervals(self, symbol: str) -> List[str]:
+        """Archived intervals for a symbol"""
+        directory = self.root / symbol.upper()
+        return sorted(p.stem for p in directory.glob("*.bin")) if directory.exists() else []
+
+    # ========== Reads ==========
+
+    def _records(self, symbol: str, interval: str) -> np.ndarray:
+        """Read-only structured view over every complete record in the file"""
+        file_path = self.path(symbol, interval)
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            self._maps.pop(file_path, None)
+            return np.empty(0, dtype=RECORD)
+
+        count = stat.st_size // RECORD.itemsize  # Ignore a torn trailing record
+        if count == 0:
+            return np.empty(0, dtype=RECORD)
+
+        key = (stat.st_ino, count)
+        cached = self._maps.get(file_path)
+        if cached is None or cached[0] != key:
+            records = np.memmap(file_path, dtype=RECORD, mode="r", shape=(count,))
+            self._maps[file_path] = (key, records)
+            return records
+        return cached[1]
+
+    def count(self, symbol: str, interval: str) -> int:
+        return len(self._records(symbol, interval))
+
+    def first_time(self, symbol: str, interval: str) -> Optional[int]:
+        records = self._records(symbol, interval)
+        return int(records["open_time"][0]) if len(records) else None
+
+    def last_time(self, symbol: str, interval: str) -> Optional[int]:
+        records = self._records(symbol, interval)
+        return int(records["open_time"][-1]) if len(records) else None
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> CandleFrame:
+        """
+        Archived candles by open time (no copy)
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval
+            start_time: Earliest open time in ms, inclusive (default: first archived)
+            end_time: Latest open time in ms, inclusive (default: last archived)
+            limit: Keep only the most recent N candles of the range
+
+        Returns:
+            CandleFrame over the mapped file, oldest first (read-only; copy before mutating)
+        """
+        records = self._records(symbol, interval)
+        if not len(records):
+            return CandleFrame.empty()
+
+        open_time = np.ndarray((len(records),), dtype=np.int64, buffer=records, strides=(RECORD.itemsize,))
+        lo = 0 if start_time is None else int(np.searchsorted(open_time, start_time, side="left"))
+        hi = len(records) if end_time is None else int(np.searchsorted(open_time, end_time, side="right"))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        if hi <= lo:
+            return CandleFrame.empty()
+
+        block = np.ndarray(
+            (5, hi - lo),
+            dtype=np.float64,
+            buffer=records,
+            offset=lo * RECORD.itemsize + RECORD.fields["open"][1],
+            strides=(8, RECORD.itemsize)
+        )
+        return CandleFrame(open_time[lo:hi], block)
+
+    def read_klines(self, symbol: str, interval: str, **kwargs) -> List[List]:
+        """Same as read, as [open_time, open, high, low, close, volume] rows"""
+        frame = self.read(symbol, interval, **kwargs)
+        return [[int(t), o, h, l, c, v] for t, o, h, l, c, v in zip(frame.open_time, *frame.block.tolist())]
+
+    # ========== Writes ==========
+
+    @staticmethod
+    def _to_records(rows: Sequence[Sequence[Any]]) -> np.ndarray:
+        """Raw kline rows (numeric strings accepted) -> sorted, de-duplicated records"""
+        records = np.empty(len(rows), dtype=RECORD)
+        if not len(rows):
+            return records
+        values = np.array([r[:6] for r in rows], dtype=np.float64)
+        records["open_time"] = np.array([int(r[0]) for r in rows], dtype=np.int64)
+        for column, name in enumerate(RECORD.names[1:], start=1):
+            records[name] = values[:, column]
+        records = records[np.argsort(records["open_time"], kind="stable")]
+        keep = np.concatenate(([True], np.diff(records["open_time"]) > 0))
+        return records[keep]
+
+    def append(self, symbol: str, interval: str, rows: Sequence[Sequence[Any]]) -> int:
+        """
+        Store closed candles
+
+        Candles newer than the archive are appended in place; older ones not yet
+        archived are merged by rewriting the file. Candles already archived are kept
+        as they are (closed candles never change).
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval
+            rows: Closed kline rows [open_time, open, high, low, close, volume, ...]
+
+        Returns:
+            Number of candles added
+        """
+        records = self._to_records(rows)
+        if not len(records):
+            return 0
+
+        file_path = self.path(symbol, interval)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        existing = self._records(symbol, interval)
+        last = int(existing["open_time"][-1]) if len(existing) else None
+
+        if last is not None and records["open_time"][0] <= last:
+            older = records[records["open_time"] <= last]
+            older = older[~np.isin(older["open_time"], existing["open_time"])]
+            newer = records[records["open_time"] > last]
+            if len(older):
+                self._rewrite(file_path, np.concatenate((existing, older, newer)))
+                return len(older) + len(newer)
+            records = newer
+            if not len(records):
+                return 0
+
+        with open(file_path, "ab") as f:
+            # Drop a torn record left by an interrupted write before appending
+            size = f.tell()
+            if size % RECORD.itemsize:
+                f.truncate(size - size % RECORD.itemsize)
+                f.seek(0, os.SEEK_END)
+            f.write(records.tobytes())
+        return len(records)
+
+    def _rewrite(self, file_path: Path, records: np.ndarray):
+        """Atomically replace a file with the merged, sorted records"""
+        records = records[np.argsort(records["open_time"], kind="stable")]
+        temp_path = file_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(records.tobytes())
+        # Release our own mapping first (Windows cannot replace a mapped file)
+        self._maps.pop(file_path, None)
+        os.replace(temp_path, file_path)
+        logger.debug(f"💾 Rewrote {file_path} with {len(records)} candles")
+
+    def close(self):
+        """Drop all mappings"""
+        self._maps.clear()
@@ -8,7 +8,15 @@ from loguru import logger
 from config.config import config
 from api.aster_client import AsterClient
 from agent.trader import VibeTrader
+from utils.exchange_filters import ExchangeFilterCache
 from utils.logger import setup_logger
+from utils.mark_price_cache import MarkPriceCache
+from utils.market_stream import MarketStreamHub
+from utils.order_book import OrderBookManager
+from utils.persistence import PersistenceWorker
+from utils.shared_kline_store import SharedKlineStore
+from utils.trade_tape import TradeTapeManager
+from utils.user_data_stream import UserDataStream
 
 
 def run_dashboard_api(trader):
@@ -37,16 +45,59 @@ async def main():
     try:
         # Initialize Aster API client
         async with AsterClient() as aster_client:
-            # Initialize trading agent
-            trader = VibeTrader(aster_client)
-            
-            # Start dashboard API in background thread
-            api_thread = threading.Thread(target=run_dashboard_api, args=(trader,), daemon=True)
-            api_thread.start()
-            logger.info("Dashboard API started in background")
-            
-            # Start trading (this will run indefinitely)
-            await trader.start()
+            trader = None
+            try:
+                # Initialize trading agent
+                trader = VibeTrader(aster_client)
+                
+                # Account and open orders over REST whenever the user data stream isn't live
+                trader.account_cache.set_client(aster_client)
+                
+                # One market stream connection for klines, mark prices and dashboard tickers
+                await MarketStreamHub().start()
+                trader.mark_prices.set_client(aster_client)
+                await trader.mark_prices.start()
+                
+                # Serve candles from the kline stream instead of polling REST every cycle
+                trader.kline_store.set_client(aster_client)
+                await trader.kline_store.start()
+                
+                # Local order books from the depth stream (snapshot only on start and gaps)
+                trader.order_books.set_client(aster_client)
+                await trader.order_books.start()
+                
+                # Order-flow features from the aggregated trade stream
+                await trader.trade_tape.start()
+                
+                # Lot/tick/notional rules for order formatting, refreshed in the background
+                trader.exchange_filters.set_client(aster_client)
+                await trader.exchange_filters.start()
+                
+                # Balances, positions and open orders from the user data stream
+                if config.aster.user_stream_enabled:
+                    user_stream = UserDataStream()
+                    user_stream.set_client(aster_client)
+                    await user_stream.start()
+                
+                # Start dashboard API in background thread
+                api_thread = threading.Thread(target=run_dashboard_api, args=(trader,), daemon=True)
+                api_thread.start()
+                logger.info("Dashboard API started in background")
+                
+                # Start trading (this will run indefinitely)
+                await trader.start()
+            finally:
+                # Stop while the client's connection pool is still open (the user data
+                # stream closes its listenKey over REST)
+                if trader is not None:
+                    trader.stop()
+                await SharedKlineStore().stop()
+                await ExchangeFilterCache().stop()
+                await UserDataStream().stop()
+                await OrderBookManager().stop()
+                await TradeTapeManager().stop()
+                await MarkPriceCache().stop()
+                await MarketStreamHub().stop()
             
     except KeyboardInterrupt:
         logger.info("Received shutdown signal")
@@ -55,7 +106,7 @@ async def main():
         raise
     finally:
         logger.info("Shutting down Vibe Trader")
-
+        PersistenceWorker().stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
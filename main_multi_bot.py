@@ -15,6 +15,7 @@ from dotenv import load_dotenv
 from api.aster_client import AsterClient
 from agent.trader import VibeTrader
 from agent.llm_client import LLMClient
+from utils.llm_usage import LLMUsageTracker
 from utils.logger import setup_logger
 from config.config import config
 
@@ -49,33 +50,12 @@ class BotConfig:
 
 def create_llm_client(bot_config: BotConfig) -> LLMClient:
     """Create a custom LLM client for a bot"""
-    from openai import AsyncOpenAI
-    from config.config import Config, LLMConfig
-    
-    # Create custom config for this bot
-    if bot_config.llm_provider == "openai":
-        client = AsyncOpenAI(api_key=bot_config.llm_api_key)
-    elif bot_config.llm_provider == "deepseek":
-        client = AsyncOpenAI(
-            api_key=bot_config.llm_api_key,
-            base_url="https://api.deepseek.com"
-        )
-    elif bot_config.llm_provider == "qwen":
-        client = AsyncOpenAI(
-            api_key=bot_config.llm_api_key,
-            base_url="https://dashscope-intl.aliyuncs.com/compatible-mode/v1"
-        )
-    elif bot_config.llm_provider == "anthropic":
-        from anthropic import AsyncAnthropic
-        client = AsyncAnthropic(api_key=bot_config.llm_api_key)
-    else:
-        raise ValueError(f"Unsupported provider: {bot_config.llm_provider}")
-    
-    # Create LLM client wrapper
-    llm = LLMClient.__new__(LLMClient)
-    llm.provider = bot_config.llm_provider
-    llm.model = bot_config.llm_model
-    llm.client = client
+    llm = LLMClient(
+        provider=bot_config.llm_provider,
+        model=bot_config.llm_model,
+        api_key=bot_config.llm_api_key,
+        bot_name=bot_config.name
+    )
     
     logger.info(f"[{bot_config.name}] LLM initialized: {bot_config.llm_provider} - {bot_config.llm_model}")
     return llm
@@ -83,15 +63,11 @@ def create_llm_client(bot_config: BotConfig) -> LLMClient:
 
 def create_aster_client(bot_config: BotConfig) -> AsterClient:
     """Create Aster client with custom credentials"""
-    # Create client with custom credentials
-    client = AsterClient.__new__(AsterClient)
-    client.user_address = bot_config.user_address
-    client.signer_address = bot_config.signer_address
-    client.private_key = bot_config.private_key
-    client.api_url = config.aster.api_url
-    client.base_url = config.aster.api_url  # Fix: add base_url attribute
-    client.ws_url = config.aster.ws_url
-    client.session = None
+    client = AsterClient(
+        user_address=bot_config.user_address,
+        signer_address=bot_config.signer_address,
+        private_key=bot_config.private_key
+    )
     
     logger.info(f"[{bot_config.name}] Aster client created for {bot_config.user_address[:10]}...")
     return client
@@ -156,6 +132,38 @@ async def main():
     shared_cache = SharedAccountCache()
     logger.info("✅ Shared account cache initialized - all bots will share account data")
     
+    # Initialize shared kline store - bots read candles from memory instead of REST
+    from utils.shared_kline_store import SharedKlineStore
+    kline_store = SharedKlineStore()
+    
+    # Initialize exchange filter cache - symbol lot/tick/notional rules from exchangeInfo
+    from utils.exchange_filters import ExchangeFilterCache
+    exchange_filters = ExchangeFilterCache()
+    
+    # Initialize market stream hub - one upstream connection for klines, mark prices and dashboard tickers
+    from utils.market_stream import MarketStreamHub
+    market_stream = MarketStreamHub()
+    
+    # Initialize mark price cache - mark price and funding from the stream, funding history archived
+    from utils.mark_price_cache import MarkPriceCache
+    mark_prices = MarkPriceCache()
+    
+    # Initialize order books - local L2 depth per symbol for entry sizing
+    from utils.order_book import OrderBookManager
+    order_books = OrderBookManager()
+    
+    # Initialize trade tapes - rolling order-flow features from aggregated trades
+    from utils.trade_tape import TradeTapeManager
+    trade_tapes = TradeTapeManager()
+    
+    # Initialize user data stream - account state pushed by the exchange instead of polled
+    from utils.user_data_stream import UserDataStream
+    user_stream = UserDataStream()
+    
+    # Initialize persistence worker - decision and trade journals are written behind on its thread
+    from utils.persistence import PersistenceWorker
+    persistence = PersistenceWorker()
+    
     # ═══════════════════════════════════════════════════════════════
     # BOT CONFIGURATIONS - 5 ASSETS WITH QWEN-FLASH
     # All bots use same wallet, same LLM model, different assets
@@ -254,10 +262,10 @@ async def main():
         logger.info(f"  • {bot.name}: {bot.symbol} via {bot.llm_provider} ({bot.strategy_name})")
     logger.info("=" * 70)
     
+    # Create traders list for dashboard
+    traders = []
+    
     try:
-        # Create traders list for dashboard
-        traders = []
-        
         # Start dashboard API in background
         api_thread = threading.Thread(
             target=run_dashboard_api,
@@ -283,9 +291,34 @@ async def main():
         if traders:
             shared_cache.set_client(traders[0].aster)
             logger.info("✅ Shared cache configured with Aster client")
+            
+            # One upstream market stream connection; mark prices and funding come from it
+            await market_stream.start()
+            mark_prices.set_client(traders[0].aster)
+            await mark_prices.start()
+            
+            # Bootstrap candles once over REST, then keep them current from the kline stream
+            kline_store.set_client(traders[0].aster)
+            await kline_store.start()
+            
+            # Keep a local book per symbol from the depth stream
+            order_books.set_client(traders[0].aster)
+            await order_books.start()
+            
+            # Stream aggregated trades for order-flow features
+            await trade_tapes.start()
+            
+            # Load symbol trading rules before the first order is formatted
+            exchange_filters.set_client(traders[0].aster)
+            await exchange_filters.start()
+            
+            # One user data stream keeps balances, positions and open orders current for every bot
+            if config.aster.user_stream_enabled:
+                user_stream.set_client(traders[0].aster)
+                await user_stream.start()
         
         # Now start trading for all bots - STAGGERED to spread API load
-        logger.success(f"🚀 Starting {len(traders)} trading bots (staggered 1 min apart)...")
+        logger.success(f"🚀 Starting {len(traders)} trading bots (staggered over one update interval)...")
         
         async def start_bot_with_delay(trader, delay_seconds):
             """Start a bot after a delay to stagger API calls"""
@@ -295,9 +328,11 @@ async def main():
             logger.info(f"🚀 Starting {trader.bot_name}")
             await trader.start()
         
-        # Stagger bot starts by 60 seconds each
+        # Spread bot starts evenly over one cycle so their cycles don't line up
+        # (60s apart for 5 bots at the default 300s interval)
+        stagger = config.trading.update_interval / max(len(traders), 1)
         staggered_tasks = [
-            start_bot_with_delay(trader, index * 60) 
+            start_bot_with_delay(trader, round(index * stagger)) 
             for index, trader in enumerate(traders)
         ]
         
@@ -309,7 +344,23 @@ async def main():
         logger.error(f"Fatal error: {e}")
         raise
     finally:
+        for trader in traders:
+            trader.stop()
+        await kline_store.stop()
+        await exchange_filters.stop()
+        await user_stream.stop()
+        await order_books.stop()
+        await trade_tapes.stop()
+        await mark_prices.stop()
+        await market_stream.stop()
+        usage = LLMUsageTracker().get_status()["totals"]
+        logger.info(
+            f"🧠 LLM usage: {usage['calls']} calls, {usage['input_tokens']:,} input tokens "
+            f"({usage['cache_hit_ratio']:.0%} cached, ~{usage['input_tokens_saved']:,} saved), "
+            f"{usage['output_tokens']:,} output tokens"
+        )
         logger.info("Shutting down all trading bots")
+        persistence.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+"""
+Backfill the local kline archive from Aster
+Safe to interrupt and re-run: every run resumes after the last archived candle
+
+Usage:
+    python scripts/backfill_klines.py BTCUSDT ETHUSDT --start 2025-01-01
+    python scripts/backfill_klines.py ASTERUSDT --intervals 1m 5m 1h --start 2025-06-01 --end 2025-07-01
+    python scripts/backfill_klines.py BTCUSDT --start 2025-01-01 --funding
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+sys.path.append('.')
+
+from loguru import logger
+
+from api.aster_client import AsterClient
+from data import FundingArchive, FundingBackfiller, KlineArchive, KlineBackfiller
+
+
+def parse_date(value):
+    """YYYY-MM-DD (UTC) -> epoch milliseconds"""
+    if value is None:
+        return None
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+async def main():
+    """Backfill klines"""
+    parser = argparse.ArgumentParser(description="Bulk download klines into the local archive")
+    parser.add_argument("symbols", nargs="+", help="Symbols to backfill")
+    parser.add_argument("--intervals", nargs="+", default=["1m"], help="Kline intervals (default: 1m)")
+    parser.add_argument("--start", required=True, help="First day to fetch (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", default=None, help="Stop at this day (YYYY-MM-DD, UTC; default: now)")
+    parser.add_argument("--archive-dir", default=None, help="Archive directory (default: config)")
+    parser.add_argument("--funding", action="store_true", help="Also backfill settled funding rates")
+    args = parser.parse_args()
+
+    archive = KlineArchive(args.archive_dir)
+    funding_archive = FundingArchive(args.archive_dir)
+    async with AsterClient() as client:
+        backfiller = KlineBackfiller(client, archive)
+        for symbol in args.symbols:
+            for interval in args.intervals:
+                await backfiller.backfill(symbol, interval, parse_date(args.start), parse_date(args.end))
+        if args.funding:
+            funding_backfiller = FundingBackfiller(client, funding_archive)
+            for symbol in args.symbols:
+                await funding_backfiller.backfill(symbol, parse_date(args.start), parse_date(args.end))
+
+    for symbol in args.symbols:
+        for interval in args.intervals:
+            logger.info(f"✓ {symbol.upper()} {interval}: {archive.count(symbol, interval):,} candles "
+                        f"in {archive.path(symbol, interval)}")
+        if args.funding:
+            logger.info(f"✓ {symbol.upper()} funding: {funding_archive.count(symbol):,} settlements "
+                        f"in {funding_archive.path(symbol)}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Backfill interrupted - re-run to resume")
@@ -1,77 +1,139 @@
 """
 Backtesting script for Vibe Trader strategies
+Replays local 1m kline files through the trader against a simulated exchange
+
+Usage:
+    python scripts/backtest.py BTCUSDT=data/btc_1m.csv ETHUSDT=data/eth_1m.json
+    python scripts/backtest.py BTCUSDT=data/btc_1m.csv --source recorded --decisions BTCUSDT=logs/decisions_BTC.jsonl
+    python scripts/backtest.py BTCUSDT=data/btc_1m.csv --source stub-llm --balance 2000
+    python scripts/backtest.py BTCUSDT ETHUSDT --archive --start 2025-01-01 --end 2025-02-01
+    python scripts/backtest.py BTCUSDT ETHUSDT --archive --funding-archive --start 2025-01-01
+
+Kline files hold the raw /fapi/v1/klines rows (.json) or open_time,open,high,low,close,volume rows (.csv).
+With --archive, symbols are read from the local kline archive (fill it with scripts/backfill_klines.py).
+With --funding-archive, archived funding settlements replace --funding-rate (backfill_klines.py --funding).
 """
+import argparse
 import asyncio
 import sys
+from datetime import datetime, timezone
 sys.path.append('.')
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
 from loguru import logger
 
-# This is a placeholder for backtesting functionality
-# Will be expanded once we have historical data access
+from backtesting import BacktestEngine, MarketReplay, source_factory
+from data import FundingArchive
 
 
-class Backtester:
-    """Backtest trading strategies"""
-    
-    def __init__(self, initial_balance: float = 10000):
-        self.initial_balance = initial_balance
-        self.balance = initial_balance
-        self.trades: List[Dict[str, Any]] = []
-        self.positions: Dict[str, Dict] = {}
-    
-    async def run(self, start_date: datetime, end_date: datetime):
-        """
-        Run backtest for a date range
-        
-        Args:
-            start_date: Start date for backtest
-            end_date: End date for backtest
-        """
-        logger.info(f"Starting backtest from {start_date} to {end_date}")
-        
-        # TODO: Implement backtesting logic
-        # 1. Fetch historical data
-        # 2. Simulate trading decisions
-        # 3. Track performance
-        # 4. Generate report
-        
-        logger.info("Backtest complete")
-        self._generate_report()
-    
-    def _generate_report(self):
-        """Generate backtest performance report"""
-        total_trades = len(self.trades)
-        winning_trades = sum(1 for t in self.trades if t.get('pnl', 0) > 0)
-        win_rate = winning_trades / total_trades if total_trades > 0 else 0
-        
-        final_balance = self.balance
-        total_return = (final_balance - self.initial_balance) / self.initial_balance
-        
-        logger.info("=" * 50)
-        logger.info("BACKTEST RESULTS")
-        logger.info("=" * 50)
-        logger.info(f"Initial Balance: ${self.initial_balance:.2f}")
-        logger.info(f"Final Balance: ${final_balance:.2f}")
-        logger.info(f"Total Return: {total_return * 100:.2f}%")
-        logger.info(f"Total Trades: {total_trades}")
-        logger.info(f"Winning Trades: {winning_trades}")
-        logger.info(f"Win Rate: {win_rate * 100:.2f}%")
-        logger.info("=" * 50)
+def parse_pairs(values):
+    """Parse SYMBOL=path arguments into a dict"""
+    pairs = {}
+    for value in values or []:
+        symbol, _, path = value.partition("=")
+        if not path:
+            raise argparse.ArgumentTypeError(f"Expected SYMBOL=path, got {value}")
+        pairs[symbol.upper()] = path
+    return pairs
+
+
+def parse_date(value):
+    """YYYY-MM-DD (UTC) or epoch milliseconds -> epoch milliseconds"""
+    if value is None or value.isdigit():
+        return int(value) if value else None
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def source_spec(args):
+    """Decision source spec for the chosen --source"""
+    if args.source == "momentum":
+        return {"type": "momentum", "lookback": args.lookback, "threshold": args.threshold}
+    if args.source == "recorded":
+        return {"type": "recorded", "files": parse_pairs(args.decisions)}
+    return {"type": args.source}
+
+
+def print_results(result):
+    report = result["report"]
+    print("=" * 50)
+    print("BACKTEST RESULTS")
+    print("=" * 50)
+    print(f"Initial Balance: ${result['initial_balance']:.2f}")
+    print(f"Final Equity: ${result['final_equity']:.2f}")
+    print(f"Total Return: {result['total_return'] * 100:.2f}%")
+    print(f"Total Trades: {report['total_trades']}")
+    print(f"Win Rate: {report['win_rate'] * 100:.2f}%")
+    print(f"Profit Factor: {report['profit_factor']:.2f}")
+    print(f"Max Drawdown: {report['max_drawdown'] * 100:.2f}%")
+    print(f"Expectancy: ${report['expectancy']:.2f}")
+    print(f"Fees Paid: ${result['total_fees']:.2f}")
+    print(f"Funding Paid: ${result['total_funding']:.2f}")
+    print(f"Open Positions: {len(result['open_positions'])}")
+    print(f"Cycles: {result['cycles']:,} in {result['elapsed_seconds']:.1f}s")
+    print("=" * 50)
 
 
 async def main():
     """Run backtest"""
-    backtester = Backtester(initial_balance=10000)
-    
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=30)
+    parser = argparse.ArgumentParser(description="Replay historical klines through the Vibe Trader")
+    parser.add_argument("klines", nargs="+", help="SYMBOL=path to a 1m kline file (.json or .csv), or SYMBOL with --archive")
+    parser.add_argument("--archive", action="store_true", help="Read 1m klines from the local kline archive")
+    parser.add_argument("--start", default=None, help="First day (YYYY-MM-DD, UTC) to replay from the archive")
+    parser.add_argument("--end", default=None, help="Last open time (YYYY-MM-DD, UTC) to replay from the archive")
+    parser.add_argument("--source", choices=["momentum", "recorded", "stub-llm", "llm"], default="momentum",
+                        help="Decision source (llm calls the configured provider every cycle)")
+    parser.add_argument("--decisions", nargs="*", help="SYMBOL=path to a recorded decision log (for --source recorded)")
+    parser.add_argument("--balance", type=float, default=10000.0, help="Initial USDT balance")
+    parser.add_argument("--taker-fee", type=float, default=0.00035)
+    parser.add_argument("--maker-fee", type=float, default=0.0001)
+    parser.add_argument("--slippage-bps", type=float, default=1.0)
+    parser.add_argument("--funding-rate", type=float, default=0.0001, help="Funding rate per 8h")
+    parser.add_argument("--funding-archive", action="store_true",
+                        help="Charge archived funding settlements instead of --funding-rate")
+    parser.add_argument("--interval", type=int, default=None, help="Seconds between cycles (default: config)")
+    parser.add_argument("--warmup", type=int, default=1440, help="1m candles before the first cycle")
+    parser.add_argument("--lookback", type=int, default=20, help="Momentum lookback in cycles")
+    parser.add_argument("--threshold", type=float, default=0.02, help="Momentum threshold")
+    args = parser.parse_args()
+
+    if args.source == "recorded" and not args.decisions:
+        parser.error("--source recorded needs --decisions SYMBOL=path")
+
+    if args.archive:
+        replay = MarketReplay.from_archive(
+            [symbol.upper() for symbol in args.klines],
+            start_time=parse_date(args.start),
+            end_time=parse_date(args.end)
+        )
+    else:
+        replay = MarketReplay.from_files(parse_pairs(args.klines))
     
-    await backtester.run(start_date, end_date)
+    funding_history = None
+    if args.funding_archive:
+        funding_archive = FundingArchive()
+        funding_history = {symbol: funding_archive.read(symbol) for symbol in replay.symbols
+                           if funding_archive.count(symbol)}
+        missing = [symbol for symbol in replay.symbols if symbol not in funding_history]
+        if missing:
+            logger.warning(f"No archived funding for {', '.join(missing)} - using --funding-rate")
+    engine = BacktestEngine(
+        replay,
+        source_factory(source_spec(args)),
+        initial_balance=args.balance,
+        taker_fee=args.taker_fee,
+        maker_fee=args.maker_fee,
+        slippage_bps=args.slippage_bps,
+        funding_rate=args.funding_rate,
+        funding_history=funding_history,
+        update_interval=args.interval,
+        warmup=args.warmup
+    )
 
+    result = await engine.run()
+    print_results(result)
 
-if __name__ == "__main__":
-    asyncio.run(main())
 
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Backtest interrupted")
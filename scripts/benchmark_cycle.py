@@ -0,0 +1,115 @@
+"""
+Trading cycle latency benchmark
+Runs VibeTrader cycles against a simulated exchange that adds a fixed round trip
+to every request, once with cycle I/O serialized (cycle_max_concurrency=1, the
+old one-request-at-a-time behaviour) and once with the default concurrency
+
+Usage:
+    python scripts/benchmark_cycle.py
+    python scripts/benchmark_cycle.py --rtt 0.15 --cycles 10
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+sys.path.append('.')
+
+import numpy as np
+from loguru import logger
+
+from agent.trader import VibeTrader
+from backtesting import MarketReplay, ReplayAccountCache, ReplayKlineStore, SimulatedAsterClient, StubLLMClient
+from config.config import config
+from strategies.candles import CandleFrame
+from utils.decision_store import DecisionStore
+from utils.trade_tracker import TradeTracker
+
+
+SYMBOL = "BTCUSDT"
+
+
+class LatencyClient:
+    """Wraps the simulated exchange and sleeps one round trip before every request"""
+
+    def __init__(self, inner: SimulatedAsterClient, rtt: float):
+        self.inner = inner
+        self.rtt = rtt
+        self.requests = 0
+
+    def __getattr__(self, name):
+        target = getattr(self.inner, name)
+        if not asyncio.iscoroutinefunction(target):
+            return target
+
+        async def call(*args, **kwargs):
+            self.requests += 1
+            await asyncio.sleep(self.rtt)
+            return await target(*args, **kwargs)
+        return call
+
+
+class ColdKlineStore:
+    """Kline store that never goes live, so every timeframe falls back to REST"""
+
+    def subscribe(self, symbol, interval, limit):
+        pass
+
+    def is_ready(self, symbol, interval):
+        return False
+
+
+def synthetic_replay(minutes: int = 3000) -> MarketReplay:
+    rng = np.random.default_rng(7)
+    close = 50_000 * np.exp(np.cumsum(rng.normal(0, 0.001, minutes)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, minutes)) * close
+    block = np.vstack([open_, np.maximum(open_, close) + spread, np.minimum(open_, close) - spread,
+                       close, rng.uniform(1, 10, minutes)])
+    open_time = (np.arange(minutes, dtype=np.int64) + 28_000_000) * 60_000
+    replay = MarketReplay({SYMBOL: CandleFrame(open_time, block)})
+    replay.cursor[SYMBOL] = minutes - 1
+    return replay
+
+
+async def run_cycles(concurrency: int, rtt: float, cycles: int, cold_store: bool) -> dict:
+    config.trading.cycle_max_concurrency = concurrency
+    replay = synthetic_replay()
+    client = LatencyClient(SimulatedAsterClient(replay), rtt)
+    trader = VibeTrader(
+        client,
+        llm_client=StubLLMClient(),
+        bot_name="BENCH",
+        symbol=SYMBOL,
+        account_cache=ReplayAccountCache(client),
+        kline_store=ColdKlineStore() if cold_store else ReplayKlineStore(replay),
+        decision_store=DecisionStore(filepath=None),
+        trade_tracker=TradeTracker(filepath=None),
+        sound_alerts=False
+    )
+    for _ in range(cycles):
+        await trader._trading_cycle()
+    io_times = [io * 1000 for io, _ in trader.cycle_latency]
+    return {"median_io_ms": statistics.median(io_times), "requests": client.requests / cycles}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Serial vs concurrent trading cycle I/O latency")
+    parser.add_argument("--rtt", type=float, default=0.1, help="Simulated round trip per request in seconds")
+    parser.add_argument("--cycles", type=int, default=5, help="Cycles per measurement")
+    args = parser.parse_args()
+
+    for name in ("agent", "utils", "backtesting"):
+        logger.disable(name)
+    default_concurrency = config.trading.cycle_max_concurrency
+    print(f"Round trip per request: {args.rtt * 1000:.0f}ms, {args.cycles} cycles each")
+    print(f"{'scenario':<28}{'requests':>10}{'serial':>12}{'concurrent':>12}{'speedup':>10}")
+    for label, cold_store in (("kline store cold (REST)", True), ("kline store streaming", False)):
+        serial = await run_cycles(1, args.rtt, args.cycles, cold_store)
+        concurrent = await run_cycles(default_concurrency, args.rtt, args.cycles, cold_store)
+        print(f"{label:<28}{serial['requests']:>10.0f}{serial['median_io_ms']:>10.0f}ms"
+              f"{concurrent['median_io_ms']:>10.0f}ms{serial['median_io_ms'] / concurrent['median_io_ms']:>9.1f}x")
+    config.trading.cycle_max_concurrency = default_concurrency
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
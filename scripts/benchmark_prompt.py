@@ -0,0 +1,92 @@
+"""
+Prompt rendering benchmark
+Runs one VibeTrader cycle against a simulated exchange to capture real market data,
+then times prompt rendering and reports how much of each call is the static,
+provider-cacheable prefix
+
+Usage:
+    python scripts/benchmark_prompt.py
+    python scripts/benchmark_prompt.py --renders 5000
+"""
+import argparse
+import asyncio
+import sys
+import time
+sys.path.append('.')
+
+from loguru import logger
+
+from agent.trader import VibeTrader
+from backtesting import ReplayAccountCache, ReplayKlineStore, SimulatedAsterClient, StubLLMClient
+from utils.decision_store import DecisionStore
+from utils.trade_tracker import TradeTracker
+from benchmark_cycle import SYMBOL, synthetic_replay
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:  # Fall back to the usual ~4 characters per token
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    return len(_encoding.encode(text)) if _encoding is not None else len(text) // 4
+
+
+async def capture_inputs():
+    """Market data and portfolio state exactly as one trading cycle builds them"""
+    replay = synthetic_replay()
+    client = SimulatedAsterClient(replay)
+    trader = VibeTrader(
+        client,
+        llm_client=StubLLMClient(),
+        bot_name="BENCH",
+        symbol=SYMBOL,
+        account_cache=ReplayAccountCache(client),
+        kline_store=ReplayKlineStore(replay),
+        decision_store=DecisionStore(filepath=None),
+        trade_tracker=TradeTracker(filepath=None),
+        sound_alerts=False
+    )
+    captured = {}
+    build = trader._build_trading_prompt
+
+    def capture(market_data, portfolio_state):
+        captured["inputs"] = (market_data, portfolio_state)
+        return build(market_data, portfolio_state)
+
+    trader._build_trading_prompt = capture
+    await trader._trading_cycle()
+    trader._build_trading_prompt = build
+    return trader, captured["inputs"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Prompt render time and cacheable prefix size")
+    parser.add_argument("--renders", type=int, default=2000, help="Renders to time")
+    args = parser.parse_args()
+
+    for name in ("agent", "utils", "backtesting"):
+        logger.disable(name)
+    trader, (market_data, portfolio_state) = await capture_inputs()
+
+    started = time.perf_counter()
+    for _ in range(args.renders):
+        prompt = trader._build_trading_prompt(market_data, portfolio_state)
+    render_us = (time.perf_counter() - started) / args.renders * 1e6
+
+    system_tokens = count_tokens(trader._get_system_message())
+    prefix_tokens = count_tokens(trader._prompt.prefix)
+    body_tokens = count_tokens(prompt[len(trader._prompt.prefix):])
+    total = system_tokens + prefix_tokens + body_tokens
+    unit = "tokens" if _encoding is not None else "tokens (~4 chars each)"
+    print(f"Render time: {render_us:.1f}us per prompt ({args.renders} renders)")
+    print(f"Input per call: {total} {unit}")
+    print(f"  system message  {system_tokens:>6}  static")
+    print(f"  prompt prefix   {prefix_tokens:>6}  static")
+    print(f"  market data     {body_tokens:>6}  per cycle")
+    print(f"Cacheable prefix: {(system_tokens + prefix_tokens) / total * 100:.0f}% of input")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
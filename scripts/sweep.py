@@ -0,0 +1,128 @@
+"""
+Parameter sweep for Vibe Trader backtests
+Runs many TradingConfig variations in parallel over the same historical klines
+
+Usage:
+    python scripts/sweep.py BTCUSDT=data/btc_1m.csv ETHUSDT=data/eth_1m.csv \\
+        -p confidence_threshold=60,70,80 -p atr_stop_multiplier=1.5,2,3
+    python scripts/sweep.py BTCUSDT=data/btc_1m.csv --random 50 --seed 7 \\
+        -p atr_take_profit_multiplier=2:6 -p close_confidence_decay_minutes=10:60 -p source.threshold=0.01:0.05
+
+Values are comma separated lists (grid) or low:high ranges (sampled with --random).
+"source."-prefixed names tune the decision source (e.g. source.lookback, source.threshold).
+"""
+import argparse
+import sys
+sys.path.append('.')
+
+from loguru import logger
+
+from backtesting import ParameterSweep, grid, load_klines, random_configs, rank
+
+
+def parse_value(text):
+    """int, float, bool or str from the command line"""
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    return text
+
+
+def parse_space(values, sampled):
+    """Parse name=v1,v2 / name=low:high arguments into a parameter space"""
+    space = {}
+    for value in values or []:
+        name, _, spec = value.partition("=")
+        if not spec:
+            raise argparse.ArgumentTypeError(f"Expected name=values, got {value}")
+        if ":" in spec:
+            low, _, high = spec.partition(":")
+            if not sampled:
+                raise argparse.ArgumentTypeError(f"Ranges need --random: {value}")
+            space[name] = (parse_value(low), parse_value(high))
+        else:
+            space[name] = [parse_value(v) for v in spec.split(",")]
+    return space
+
+
+def format_params(params):
+    return " ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in params.items())
+
+
+def format_row(row):
+    if "error" in row:
+        return f"#{row['index']:<4} {format_params(row['params'])}  ERROR: {row['error']}"
+    report = row["report"]
+    return (f"#{row['index']:<4} return {row['total_return'] * 100:7.2f}%  "
+            f"sharpe {report['sharpe_ratio']:6.2f}  trades {report['total_trades']:5d}  "
+            f"win {report['win_rate'] * 100:5.1f}%  dd {report['max_drawdown'] * 100:5.1f}%  "
+            f"{format_params(row['params'])}")
+
+
+def main():
+    """Run parameter sweep"""
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over historical klines")
+    parser.add_argument("klines", nargs="+", help="SYMBOL=path to a 1m kline file (.json or .csv)")
+    parser.add_argument("-p", "--param", action="append", help="name=v1,v2,... or name=low:high")
+    parser.add_argument("--random", type=int, default=None, help="Sample N configurations instead of the full grid")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for --random")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--rank-by", default="sharpe_ratio",
+                        help="Report metric to rank by (sharpe_ratio, total_pnl, profit_factor, total_return, ...)")
+    parser.add_argument("--top", type=int, default=10, help="Rows in the final ranking")
+    parser.add_argument("--lookback", type=int, default=20, help="Momentum lookback in cycles")
+    parser.add_argument("--threshold", type=float, default=0.02, help="Momentum threshold")
+    parser.add_argument("--balance", type=float, default=10000.0, help="Initial USDT balance")
+    parser.add_argument("--interval", type=int, default=None, help="Seconds between cycles (default: config)")
+    parser.add_argument("--warmup", type=int, default=1440, help="1m candles before the first cycle")
+    args = parser.parse_args()
+
+    try:
+        space = parse_space(args.param, sampled=args.random is not None)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if not space:
+        parser.error("Give at least one -p name=values")
+    configs = random_configs(space, args.random, args.seed) if args.random else grid(space)
+    try:
+        ParameterSweep.validate(configs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    frames = {}
+    for value in args.klines:
+        symbol, _, path = value.partition("=")
+        if not path:
+            parser.error(f"Expected SYMBOL=path, got {value}")
+        frames[symbol.upper()] = load_klines(path)
+
+    sweep = ParameterSweep(
+        frames,
+        {"type": "momentum", "lookback": args.lookback, "threshold": args.threshold},
+        workers=args.workers,
+        initial_balance=args.balance,
+        update_interval=args.interval,
+        warmup=args.warmup
+    )
+
+    rows = []
+    for row in sweep.run(configs):
+        rows.append(row)
+        print(f"[{len(rows)}/{len(configs)}] {format_row(row)}", flush=True)
+
+    print("=" * 50)
+    print(f"TOP {min(args.top, len(rows))} BY {args.rank_by.upper()}")
+    print("=" * 50)
+    for row in rank(rows, args.rank_by)[:args.top]:
+        print(format_row(row))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("Sweep interrupted")
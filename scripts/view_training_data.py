@@ -103,7 +103,7 @@ def main():
                 console.print(f"    → {lesson}")
     
     console.print("\n[bold cyan]💡 This data is being saved for future model training![/bold cyan]")
-    console.print(f"[dim]Data stored in: logs/trade_outcomes.json[/dim]\n")
+    console.print(f"[dim]Data stored in: logs/trade_outcomes.jsonl[/dim]\n")
 
 if __name__ == "__main__":
     main()
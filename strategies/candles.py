@@ -0,0 +1,137 @@
+"""
+Candle Frame Module
+Columnar candle container: one contiguous array per field instead of a list of dicts
+"""
+from datetime import datetime
+from typing import List, Dict, Any, Sequence, Union
+
+import numpy as np
+
+
+class CandleFrame:
+    """
+    Columnar OHLCV candles, oldest first
+
+    Prices and volume live in a single (5, n) float64 block so each column is a
+    contiguous view that the indicators consume without copying; open times are
+    int64 milliseconds. Dict candles (with the formatted "time" string used by the
+    prompt, trade tracker and dashboard) are only built on request.
+    """
+
+    __slots__ = ("open_time", "open", "high", "low", "close", "volume", "_block")
+
+    def __init__(self, open_time: np.ndarray, block: np.ndarray):
+        """
+        Initialize from prebuilt arrays (use the from_* constructors instead)
+
+        Args:
+            open_time: int64 array of kline open times in milliseconds
+            block: float64 array of shape (5, n) with rows open/high/low/close/volume
+        """
+        self.open_time = open_time
+        self._block = block
+        self.open, self.high, self.low, self.close, self.volume = block
+
+    @classmethod
+    def from_klines(cls, klines: Sequence[Sequence[Any]]) -> "CandleFrame":
+        """
+        Build from raw kline rows as returned by /fapi/v1/klines (or the kline store)
+
+        Args:
+            klines: Rows of [open_time, open, high, low, close, volume, ...];
+                    numeric strings are accepted
+
+        Returns:
+            CandleFrame
+        """
+        if len(klines) == 0:
+            return cls.empty()
+
+        rows = np.array([k[:6] for k in klines], dtype=np.float64)
+        return cls(rows[:, 0].astype(np.int64), np.ascontiguousarray(rows[:, 1:6].T))
+
+    @classmethod
+    def from_candles(cls, candles: List[Dict[str, Any]]) -> "CandleFrame":
+        """
+        Build from legacy candle dicts (open/high/low/close/volume, optional open_time)
+
+        Args:
+            candles: List of candle dictionaries
+
+        Returns:
+            CandleFrame
+        """
+        if not candles:
+            return cls.empty()
+
+        block = np.array(
+            [[c["open"], c["high"], c["low"], c["close"], c["volume"]] for c in candles],
+            dtype=np.float64
+        ).T
+        open_time = np.array([c.get("open_time", 0) for c in candles], dtype=np.int64)
+        return cls(open_time, np.ascontiguousarray(block))
+
+    @staticmethod
+    def stack(frames: Sequence["CandleFrame"]) -> np.ndarray:
+        """
+        Stack equal-length frames into one (symbols, 5, time) block for MarketAnalyzer.analyze_many
+
+        Args:
+            frames: Frames with the same number of candles
+
+        Returns:
+            float64 array of shape (len(frames), 5, n)
+        """
+        return np.stack([frame._block for frame in frames])
+
+    @classmethod
+    def empty(cls) -> "CandleFrame":
+        return cls(np.empty(0, dtype=np.int64), np.empty((5, 0), dtype=np.float64))
+
+    @property
+    def block(self) -> np.ndarray:
+        """(5, n) float64 open/high/low/close/volume block backing the columns"""
+        return self._block
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], "CandleFrame"]:
+        """
+        Index a single candle (returned as a dict) or slice a sub-frame (a view, no copy)
+        """
+        if isinstance(index, slice):
+            return CandleFrame(self.open_time[index], self._block[:, index])
+        return self._candle(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._candle(i)
+
+    def tail(self, limit: int) -> "CandleFrame":
+        """Last `limit` candles as a view"""
+        return self[-limit:] if limit < len(self) else self
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Build legacy candle dicts (for the LLM prompt and dashboard)
+
+        Returns:
+            List of candle dictionaries, oldest first
+        """
+        return [self._candle(i) for i in range(len(self))]
+
+    def _candle(self, index: int) -> Dict[str, Any]:
+        open_time = int(self.open_time[index])
+        return {
+            "time": datetime.fromtimestamp(open_time / 1000).strftime('%Y-%m-%d %H:%M'),
+            "open_time": open_time,
+            "open": float(self.open[index]),
+            "high": float(self.high[index]),
+            "low": float(self.low[index]),
+            "close": float(self.close[index]),
+            "volume": float(self.volume[index])
+        }
+
+    def __repr__(self) -> str:
+        return f"CandleFrame(n={len(self)})"
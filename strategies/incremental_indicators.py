@@ -0,0 +1,631 @@
+"""
+Incremental Indicators Module
+Keeps indicator state per (symbol, interval) so a new or updated candle costs O(1)
+instead of recomputing every indicator over the full window
+"""
+import math
+import operator
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Dict, Any, Optional
+
+from strategies.indicators import MarketAnalyzer
+
+
+class _Series:
+    """Fixed-capacity ring buffer addressed by absolute candle index"""
+
+    def __init__(self, capacity: int):
+        self._data = [0.0] * capacity
+        self._capacity = capacity
+        self.last_index = -1
+
+    def append(self, value: float):
+        self.last_index += 1
+        self._data[self.last_index % self._capacity] = value
+
+    def set_last(self, value: float):
+        self._data[self.last_index % self._capacity] = value
+
+    def __getitem__(self, index: int) -> float:
+        return self._data[index % self._capacity]
+
+    def __setitem__(self, index: int, value: float):
+        self._data[index % self._capacity] = value
+
+
+class _RollingMoments:
+    """
+    Rolling sum (and optionally sum of squares) over the last `period` values of a series
+    Values are shifted by a reference level to keep the variance numerically stable
+    """
+
+    def __init__(self, series: _Series, period: int, squares: bool = False):
+        self._series = series
+        self.period = period
+        self._squares = squares
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._pushes = 0
+
+    def push(self):
+        """Account for the value just appended to the series"""
+        series = self._series
+        data, capacity = series._data, series._capacity
+        n = series.last_index
+        entering = data[n % capacity] - self._shift
+        self._sum += entering
+        if self._squares:
+            self._sum_sq += entering * entering
+        if n >= self.period:
+            leaving = data[(n - self.period) % capacity] - self._shift
+            self._sum -= leaving
+            if self._squares:
+                self._sum_sq -= leaving * leaving
+
+        # Periodically rebuild from the raw values to stop floating point drift
+        self._pushes += 1
+        if self._pushes >= self.period * 8:
+            self._resync()
+
+    def replace(self, old: float, new: float):
+        """Account for the last value of the series changing"""
+        self._add(old, sign=-1.0)
+        self._add(new)
+
+    def count(self) -> int:
+        return min(self.period, self._series.last_index + 1)
+
+    def mean(self) -> float:
+        m = self.count()
+        return self._shift + self._sum / m if m else 0.0
+
+    def total(self) -> float:
+        return self._shift * self.count() + self._sum
+
+    def variance(self) -> float:
+        """Population variance (matches np.var / np.std defaults)"""
+        m = self.count()
+        if not m:
+            return 0.0
+        mean_shifted = self._sum / m
+        return max(0.0, self._sum_sq / m - mean_shifted * mean_shifted)
+
+    def _add(self, value: float, sign: float = 1.0):
+        shifted = value - self._shift
+        self._sum += sign * shifted
+        if self._squares:
+            self._sum_sq += sign * shifted * shifted
+
+    def _resync(self):
+        n = self._series.last_index
+        values = [self._series[i] for i in range(max(0, n - self.period + 1), n + 1)]
+        self._shift = math.fsum(values) / len(values) if self._squares else 0.0
+        self._sum = math.fsum(v - self._shift for v in values)
+        self._sum_sq = math.fsum((v - self._shift) ** 2 for v in values) if self._squares else 0.0
+        self._pushes = 0
+
+
+class _SlidingExtreme:
+    """Monotonic deque giving the max (or min) of a series over an index range [lo, hi]"""
+
+    def __init__(self, series: _Series, is_max: bool):
+        self._series = series
+        self._dominates = operator.ge if is_max else operator.le
+        self._indices: deque = deque()
+        self._hi = -1
+
+    def advance(self, lo: int, hi: int):
+        """Move the range forward; both bounds must be non-decreasing"""
+        data, capacity = self._series._data, self._series._capacity
+        indices, dominates = self._indices, self._dominates
+        for i in range(max(self._hi + 1, lo), hi + 1):
+            value = data[i % capacity]
+            while indices and dominates(value, data[indices[-1] % capacity]):
+                indices.pop()
+            indices.append(i)
+        if hi > self._hi:
+            self._hi = hi
+        while indices and indices[0] < lo:
+            indices.popleft()
+
+    def value(self) -> Optional[float]:
+        return self._series[self._indices[0]] if self._indices else None
+
+
+class IncrementalIndicators:
+    """
+    Stateful indicator engine for one (symbol, interval) candle stream
+
+    Produces the same analysis dictionary as MarketAnalyzer.analyze_full_market
+    over the last `window` candles, but each append or in-progress candle update
+    only touches running EMA sums, rolling sums and monotonic min/max deques.
+    Closed candles are committed when the next candle arrives; the last candle
+    can be replaced any number of times while it is still open.
+    """
+
+    # Periods used by the batch TechnicalIndicators defaults
+    RSI_PERIOD = 14
+    MACD_FAST = 12
+    MACD_SLOW = 26
+    MACD_SIGNAL = 9
+    BB_PERIOD = 20
+    BB_STD_DEV = 2.0
+    ATR_PERIOD = 14
+    VOLUME_PERIOD = 20
+    VOLUME_RECENT = 5
+    MOMENTUM_PERIOD = 10
+    TREND_SHORT = 20
+    TREND_LONG = 50
+    VOLATILITY_PERIOD = 20
+    STRUCTURE_PERIOD = 20
+
+    def __init__(self, window: int = 360):
+        """
+        Initialize the engine
+
+        Args:
+            window: Number of most recent candles the analysis covers
+                    (same as the candle count passed to analyze_full_market)
+        """
+        if window < self.TREND_LONG:
+            raise ValueError(f"window must be at least {self.TREND_LONG} candles, got {window}")
+
+        self.window = window
+        capacity = window + 1
+        self._open_time: Optional[int] = None
+        self._analyzer = MarketAnalyzer()
+
+        # Raw candle series
+        self._closes = _Series(capacity)
+        self._highs = _Series(capacity)
+        self._lows = _Series(capacity)
+        self._volumes = _Series(capacity)
+
+        # Derived per-candle series
+        self._gains = _Series(capacity)
+        self._losses = _Series(capacity)
+        self._true_ranges = _Series(capacity)
+        self._ranges = _Series(capacity)  # high - low
+        self._returns = _Series(capacity)
+        self._vols = _Series(capacity)  # return std of the volatility window ending at each candle
+
+        # Unseeded EMA sums: S_n = a*x_n + (1-a)*S_(n-1), S_(-1) = 0
+        # The batch EMA seeded at the window start s is S_n + (1-a)^(n-s) * (x_s - S_s)
+        self._fast_alpha = 2 / (self.MACD_FAST + 1)
+        self._slow_alpha = 2 / (self.MACD_SLOW + 1)
+        self._signal_alpha = 2 / (self.MACD_SIGNAL + 1)
+        self._fast_sums = _Series(capacity)
+        self._slow_sums = _Series(capacity)
+        self._signal_sums = _Series(capacity)  # unseeded EMA of (fast_sum - slow_sum)
+
+        # Rolling sums
+        self._gain_sum = _RollingMoments(self._gains, self.RSI_PERIOD)
+        self._loss_sum = _RollingMoments(self._losses, self.RSI_PERIOD)
+        self._bb = _RollingMoments(self._closes, self.BB_PERIOD, squares=True)
+        self._short_ma = _RollingMoments(self._closes, self.TREND_SHORT)
+        self._long_ma = _RollingMoments(self._closes, self.TREND_LONG)
+        self._tr_sum = _RollingMoments(self._true_ranges, self.ATR_PERIOD)
+        self._range_sum = _RollingMoments(self._ranges, self.ATR_PERIOD)
+        self._volume_sum = _RollingMoments(self._volumes, self.VOLUME_PERIOD)
+        self._volume_recent = _RollingMoments(self._volumes, self.VOLUME_RECENT)
+        self._return_moments = _RollingMoments(self._returns, self.VOLATILITY_PERIOD - 1, squares=True)
+
+        # Rolling min/max over closed candles (the open candle is folded in on read)
+        self._recent_high = _SlidingExtreme(self._highs, is_max=True)
+        self._recent_low = _SlidingExtreme(self._lows, is_max=False)
+        self._first_half_high = _SlidingExtreme(self._highs, is_max=True)
+        self._first_half_low = _SlidingExtreme(self._lows, is_max=False)
+        self._second_half_high = _SlidingExtreme(self._highs, is_max=True)
+        self._second_half_low = _SlidingExtreme(self._lows, is_max=False)
+
+        # Sorted historical volatilities for the percentile rank, covering candles [lo, hi]
+        self._vol_sorted: list = []
+        self._vol_lo = 0
+        self._vol_hi = -1
+
+    def __len__(self) -> int:
+        return min(self._closes.last_index + 1, self.window)
+
+    def update(
+        self,
+        open_time: int,
+        open_price: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float
+    ):
+        """
+        Apply a candle: replaces the last candle if open_time matches, appends if newer
+
+        Args:
+            open_time: Kline open time in milliseconds
+            open_price: Open price (unused by the indicators, kept for row symmetry)
+            high: High price
+            low: Low price
+            close: Close price
+            volume: Base asset volume
+        """
+        if self._open_time is not None and open_time == self._open_time:
+            self.replace_last(high, low, close, volume)
+        elif self._open_time is None or open_time > self._open_time:
+            self.append(high, low, close, volume)
+            self._open_time = open_time
+
+    def append(self, high: float, low: float, close: float, volume: float):
+        """Commit the current candle and start a new one"""
+        n = self._closes.last_index
+        if n >= 0:
+            self._commit(n)
+
+        prev_close = self._closes[n] if n >= 0 else close
+        self._closes.append(close)
+        self._highs.append(high)
+        self._lows.append(low)
+        self._volumes.append(volume)
+
+        delta = close - prev_close if n >= 0 else 0.0
+        self._gains.append(delta if delta > 0 else 0.0)
+        self._losses.append(-delta if delta < 0 else 0.0)
+        self._true_ranges.append(self._true_range(high, low, prev_close) if n >= 0 else high - low)
+        self._ranges.append(high - low)
+        self._returns.append((close - prev_close) / prev_close if n >= 0 else 0.0)
+        self._vols.append(0.0)
+
+        fast = self._fast_alpha * close + (1 - self._fast_alpha) * (self._fast_sums[n] if n >= 0 else 0.0)
+        slow = self._slow_alpha * close + (1 - self._slow_alpha) * (self._slow_sums[n] if n >= 0 else 0.0)
+        signal = self._signal_alpha * (fast - slow) + (1 - self._signal_alpha) * (self._signal_sums[n] if n >= 0 else 0.0)
+        self._fast_sums.append(fast)
+        self._slow_sums.append(slow)
+        self._signal_sums.append(signal)
+
+        for rolling in (
+            self._gain_sum, self._loss_sum, self._bb, self._short_ma, self._long_ma,
+            self._tr_sum, self._range_sum, self._volume_sum, self._volume_recent, self._return_moments
+        ):
+            rolling.push()
+
+        self._advance_windows()
+
+    def replace_last(self, high: float, low: float, close: float, volume: float):
+        """Update the in-progress (last) candle"""
+        n = self._closes.last_index
+        if n < 0:
+            self.append(high, low, close, volume)
+            return
+
+        old_gain, old_loss = self._gains[n], self._losses[n]
+        old_tr, old_range, old_return = self._true_ranges[n], self._ranges[n], self._returns[n]
+        old_close, old_volume = self._closes[n], self._volumes[n]
+
+        prev_close = self._closes[n - 1] if n >= 1 else close
+        delta = close - prev_close if n >= 1 else 0.0
+        new_gain = delta if delta > 0 else 0.0
+        new_loss = -delta if delta < 0 else 0.0
+        new_tr = self._true_range(high, low, prev_close) if n >= 1 else high - low
+        new_return = (close - prev_close) / prev_close if n >= 1 else 0.0
+
+        self._closes.set_last(close)
+        self._highs.set_last(high)
+        self._lows.set_last(low)
+        self._volumes.set_last(volume)
+        self._gains.set_last(new_gain)
+        self._losses.set_last(new_loss)
+        self._true_ranges.set_last(new_tr)
+        self._ranges.set_last(high - low)
+        self._returns.set_last(new_return)
+
+        fast = self._fast_alpha * close + (1 - self._fast_alpha) * (self._fast_sums[n - 1] if n >= 1 else 0.0)
+        slow = self._slow_alpha * close + (1 - self._slow_alpha) * (self._slow_sums[n - 1] if n >= 1 else 0.0)
+        signal = self._signal_alpha * (fast - slow) + (1 - self._signal_alpha) * (self._signal_sums[n - 1] if n >= 1 else 0.0)
+        self._fast_sums.set_last(fast)
+        self._slow_sums.set_last(slow)
+        self._signal_sums.set_last(signal)
+
+        self._gain_sum.replace(old_gain, new_gain)
+        self._loss_sum.replace(old_loss, new_loss)
+        for rolling in (self._bb, self._short_ma, self._long_ma):
+            rolling.replace(old_close, close)
+        self._tr_sum.replace(old_tr, new_tr)
+        self._range_sum.replace(old_range, high - low)
+        self._volume_sum.replace(old_volume, volume)
+        self._volume_recent.replace(old_volume, volume)
+        self._return_moments.replace(old_return, new_return)
+
+    def analysis(self) -> Dict[str, Any]:
+        """
+        Build the analysis dictionary for the current window
+
+        Returns:
+            Same structure as MarketAnalyzer.analyze_full_market
+        """
+        count = len(self)
+        if count < 2:
+            return {}
+
+        n = self._closes.last_index
+        current_price = self._closes[n]
+
+        rsi = self._rsi(count)
+        macd = self._macd(count)
+        bb = self._bollinger(count, current_price)
+        atr = self._atr(count)
+        volume_profile = self._volume_profile(count)
+        momentum = self._momentum(count, current_price)
+        trend = self._trend(count, current_price)
+        volatility = self._volatility(count)
+        structure = self._market_structure(count, current_price)
+
+        trade_quality = self._analyzer._calculate_trade_quality(
+            rsi, macd, bb, volume_profile, trend, structure
+        )
+
+        return {
+            "rsi": rsi,
+            "macd": macd,
+            "bollinger_bands": bb,
+            "atr": atr,
+            "atr_percent": (atr / current_price * 100) if current_price > 0 else 0,
+            "volume_profile": volume_profile,
+            "momentum": momentum,
+            "trend": trend,
+            "volatility": volatility,
+            "market_structure": structure,
+            "trade_quality_score": trade_quality,
+            "current_price": current_price
+        }
+
+    # ========== State maintenance ==========
+
+    @staticmethod
+    def _true_range(high: float, low: float, prev_close: float) -> float:
+        return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+    def _window_start(self) -> int:
+        return max(0, self._closes.last_index - self.window + 1)
+
+    def _commit(self, index: int):
+        """Freeze derived values of a candle that just closed"""
+        if index >= self.VOLATILITY_PERIOD - 1:
+            # Return std of the volatility window ending at this candle
+            self._vols[index] = math.sqrt(self._return_moments.variance())
+
+    def _advance_windows(self):
+        """Slide every min/max deque and the volatility rank set after an append"""
+        n = self._closes.last_index
+        s = self._window_start()
+        count = n - s + 1
+        mid = count // 2
+
+        recent_lo = max(s, n - self.STRUCTURE_PERIOD + 1)
+        self._recent_high.advance(recent_lo, n - 1)
+        self._recent_low.advance(recent_lo, n - 1)
+        self._first_half_high.advance(s, s + mid - 1)
+        self._first_half_low.advance(s, s + mid - 1)
+        self._second_half_high.advance(s + mid, n - 1)
+        self._second_half_low.advance(s + mid, n - 1)
+
+        # Historical volatilities cover windows ending at candles [s + period - 1, n - 1]
+        lo = s + self.VOLATILITY_PERIOD - 1
+        hi = n - 1
+        for i in range(self._vol_lo, min(lo, self._vol_hi + 1)):
+            self._vol_sorted.pop(bisect_left(self._vol_sorted, self._vols[i]))
+        for i in range(max(self._vol_hi + 1, lo), hi + 1):
+            insort(self._vol_sorted, self._vols[i])
+        self._vol_lo = max(self._vol_lo, lo)
+        self._vol_hi = max(self._vol_hi, hi)
+
+    def _window_ema(self, sums: _Series, alpha: float, start: int, end: int) -> float:
+        """EMA seeded at x_start (batch behaviour) from the unseeded running sums"""
+        decay = (1 - alpha) ** (end - start)
+        return sums[end] + decay * (self._closes[start] - sums[start])
+
+    # ========== Indicators (mirror TechnicalIndicators defaults) ==========
+
+    def _rsi(self, count: int) -> float:
+        if count < self.RSI_PERIOD + 1:
+            return 50.0
+        avg_gain = self._gain_sum.total() / self.RSI_PERIOD
+        avg_loss = self._loss_sum.total() / self.RSI_PERIOD
+        if avg_loss == 0:
+            return 100.0
+        rs = avg_gain / avg_loss
+        return float(100 - (100 / (1 + rs)))
+
+    def _macd(self, count: int) -> Dict[str, float]:
+        if count < self.MACD_SLOW + self.MACD_SIGNAL:
+            return {"macd": 0.0, "signal": 0.0, "histogram": 0.0}
+
+        n = self._closes.last_index
+        s = self._window_start()
+        m = n - s
+        q_fast = 1 - self._fast_alpha
+        q_slow = 1 - self._slow_alpha
+        q_signal = 1 - self._signal_alpha
+
+        # Seed corrections of the fast/slow EMAs at the window start
+        fast_offset = self._closes[s] - self._fast_sums[s]
+        slow_offset = self._closes[s] - self._slow_sums[s]
+
+        macd_line = (self._fast_sums[n] - self._slow_sums[n]) + fast_offset * q_fast ** m - slow_offset * q_slow ** m
+
+        # Signal EMA seeded at macd_s = 0: unseeded part plus the geometric sums of the seed corrections
+        signal_decay = q_signal ** m
+        signal_line = (
+            self._signal_sums[n] - signal_decay * self._signal_sums[s]
+            + self._signal_alpha * fast_offset * q_fast * (signal_decay - q_fast ** m) / (q_signal - q_fast)
+            - self._signal_alpha * slow_offset * q_slow * (signal_decay - q_slow ** m) / (q_signal - q_slow)
+        )
+
+        # Flat markets cancel to exactly zero in the batch EMA; drop the algebraic round-off
+        noise = abs(self._closes[n]) * 1e-12
+        if abs(macd_line) <= noise:
+            macd_line = 0.0
+        if abs(signal_line) <= noise:
+            signal_line = 0.0
+
+        return {
+            "macd": float(macd_line),
+            "signal": float(signal_line),
+            "histogram": float(macd_line - signal_line)
+        }
+
+    def _bollinger(self, count: int, current_price: float) -> Dict[str, float]:
+        if count < self.BB_PERIOD:
+            return {
+                "upper": current_price,
+                "middle": current_price,
+                "lower": current_price,
+                "width": 0.0,
+                "position": 0.5
+            }
+
+        sma = self._bb.mean()
+        std = math.sqrt(self._bb.variance())
+        upper = sma + (self.BB_STD_DEV * std)
+        lower = sma - (self.BB_STD_DEV * std)
+        width = (upper - lower) / sma if sma > 0 else 0
+        position = (current_price - lower) / (upper - lower) if upper > lower else 0.5
+
+        return {
+            "upper": float(upper),
+            "middle": float(sma),
+            "lower": float(lower),
+            "width": float(width),
+            "position": float(position)
+        }
+
+    def _atr(self, count: int) -> float:
+        if count < self.ATR_PERIOD + 1:
+            # Fallback to simple range
+            return float(self._range_sum.mean())
+        return float(self._tr_sum.total() / self.ATR_PERIOD)
+
+    def _volume_profile(self, count: int) -> Dict[str, float]:
+        if count < self.VOLUME_PERIOD:
+            return {
+                "avg_volume": 0.0,
+                "volume_ratio": 1.0,
+                "volume_trend": 0.0
+            }
+
+        avg_volume = self._volume_sum.mean()
+        current_volume = self._volumes[self._volumes.last_index]
+        volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
+
+        recent_avg = self._volume_recent.mean()
+        older_avg = (self._volume_sum.total() - self._volume_recent.total()) / (self.VOLUME_PERIOD - self.VOLUME_RECENT)
+        volume_trend = (recent_avg - older_avg) / older_avg if older_avg > 0 else 0.0
+
+        return {
+            "avg_volume": float(avg_volume),
+            "volume_ratio": float(volume_ratio),
+            "volume_trend": float(volume_trend)
+        }
+
+    def _momentum(self, count: int, current_price: float) -> float:
+        if count < self.MOMENTUM_PERIOD + 1:
+            return 0.0
+        past = self._closes[self._closes.last_index - self.MOMENTUM_PERIOD]
+        return float(((current_price - past) / past) * 100 if past > 0 else 0.0)
+
+    def _trend(self, count: int, current_price: float) -> Dict[str, Any]:
+        if count < self.TREND_LONG:
+            return {
+                "trend": "neutral",
+                "strength": 0.0,
+                "short_ma": current_price,
+                "long_ma": current_price
+            }
+
+        short_ma = self._short_ma.mean()
+        long_ma = self._long_ma.mean()
+
+        if short_ma > long_ma * 1.01:  # 1% threshold
+            trend = "bullish"
+        elif short_ma < long_ma * 0.99:
+            trend = "bearish"
+        else:
+            trend = "neutral"
+
+        strength = abs(short_ma - long_ma) / long_ma if long_ma > 0 else 0.0
+
+        return {
+            "trend": trend,
+            "strength": float(strength),
+            "short_ma": float(short_ma),
+            "long_ma": float(long_ma)
+        }
+
+    def _volatility(self, count: int) -> Dict[str, float]:
+        if count < self.VOLATILITY_PERIOD:
+            return {
+                "std_dev": 0.0,
+                "coefficient_variation": 0.0,
+                "volatility_percentile": 50.0
+            }
+
+        std_dev = math.sqrt(self._return_moments.variance()) * 100  # As percentage
+        mean_return = self._return_moments.mean()
+        cv = std_dev / abs(mean_return) if mean_return != 0 else 0.0
+
+        if count > self.VOLATILITY_PERIOD * 2 and self._vol_sorted:
+            current_vol = std_dev / 100
+            volatility_percentile = bisect_left(self._vol_sorted, current_vol) / len(self._vol_sorted) * 100
+        else:
+            volatility_percentile = 50.0
+
+        return {
+            "std_dev": float(std_dev),
+            "coefficient_variation": float(cv),
+            "volatility_percentile": float(volatility_percentile)
+        }
+
+    def _market_structure(self, count: int, current_price: float) -> Dict[str, Any]:
+        if count < self.STRUCTURE_PERIOD:
+            return {
+                "structure": "ranging",
+                "support": current_price,
+                "resistance": current_price,
+                "breakout_probability": 0.5
+            }
+
+        n = self._closes.last_index
+        high, low = self._highs[n], self._lows[n]
+        recent_high = self._with_open(self._recent_high.value(), high, max)
+        recent_low = self._with_open(self._recent_low.value(), low, min)
+
+        range_size = recent_high - recent_low
+        distance_to_high = (recent_high - current_price) / range_size if range_size > 0 else 0.5
+        distance_to_low = (current_price - recent_low) / range_size if range_size > 0 else 0.5
+
+        first_half_high = self._first_half_high.value()
+        first_half_low = self._first_half_low.value()
+        second_half_high = self._with_open(self._second_half_high.value(), high, max)
+        second_half_low = self._with_open(self._second_half_low.value(), low, min)
+
+        if second_half_high > first_half_high and second_half_low > first_half_low:
+            structure = "uptrend"
+            breakout_prob = 0.7 if distance_to_high < 0.1 else 0.5
+        elif second_half_high < first_half_high and second_half_low < first_half_low:
+            structure = "downtrend"
+            breakout_prob = 0.7 if distance_to_low < 0.1 else 0.5
+        else:
+            structure = "ranging"
+            breakout_prob = 0.6 if (distance_to_high < 0.1 or distance_to_low < 0.1) else 0.3
+
+        return {
+            "structure": structure,
+            "support": float(recent_low),
+            "resistance": float(recent_high),
+            "breakout_probability": float(breakout_prob),
+            "distance_to_resistance": float(distance_to_high),
+            "distance_to_support": float(distance_to_low)
+        }
+
+    @staticmethod
+    def _with_open(closed_value: Optional[float], open_value: float, pick) -> float:
+        """Fold the in-progress candle into an extreme computed over closed candles"""
+        return open_value if closed_value is None else pick(closed_value, open_value)
@@ -3,9 +3,20 @@ Technical Indicators Module
 Provides advanced market analysis indicators for aggressive trading
 """
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Dict, Any, Optional, Tuple, Union
 from loguru import logger
 
+from strategies.candles import CandleFrame
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # scipy is optional; _calculate_ema falls back to the scalar recursion
+    lfilter = None
+
+# Indicators accept plain lists or numpy arrays (e.g. CandleFrame columns, used without copying)
+PriceSeries = Union[List[float], np.ndarray]
+
 
 class TechnicalIndicators:
     """
@@ -13,7 +24,7 @@ class TechnicalIndicators:
     """
     
     @staticmethod
-    def calculate_rsi(prices: List[float], period: int = 14) -> float:
+    def calculate_rsi(prices: PriceSeries, period: int = 14) -> float:
         """
         Calculate Relative Strength Index
         
@@ -44,7 +55,7 @@ class TechnicalIndicators:
     
     @staticmethod
     def calculate_macd(
-        prices: List[float],
+        prices: PriceSeries,
         fast_period: int = 12,
         slow_period: int = 26,
         signal_period: int = 9
@@ -64,7 +75,7 @@ class TechnicalIndicators:
         if len(prices) < slow_period + signal_period:
             return {"macd": 0.0, "signal": 0.0, "histogram": 0.0}
         
-        prices_array = np.array(prices)
+        prices_array = np.asarray(prices, dtype=float)
         
         # Calculate EMAs
         fast_ema = TechnicalIndicators._calculate_ema(prices_array, fast_period)
@@ -87,7 +98,7 @@ class TechnicalIndicators:
     
     @staticmethod
     def calculate_bollinger_bands(
-        prices: List[float],
+        prices: PriceSeries,
         period: int = 20,
         std_dev: float = 2.0
     ) -> Dict[str, float]:
@@ -112,7 +123,7 @@ class TechnicalIndicators:
                 "position": 0.5
             }
         
-        prices_array = np.array(prices[-period:])
+        prices_array = np.asarray(prices[-period:], dtype=float)
         sma = np.mean(prices_array)
         std = np.std(prices_array)
         
@@ -136,9 +147,9 @@ class TechnicalIndicators:
     
     @staticmethod
     def calculate_atr(
-        highs: List[float],
-        lows: List[float],
-        closes: List[float],
+        highs: PriceSeries,
+        lows: PriceSeries,
+        closes: PriceSeries,
         period: int = 14
     ) -> float:
         """
@@ -157,20 +168,23 @@ class TechnicalIndicators:
             # Fallback to simple range
             return float(np.mean([h - l for h, l in zip(highs[-period:], lows[-period:])]))
         
-        true_ranges = []
-        for i in range(1, len(closes)):
-            high_low = highs[i] - lows[i]
-            high_close = abs(highs[i] - closes[i-1])
-            low_close = abs(lows[i] - closes[i-1])
-            true_range = max(high_low, high_close, low_close)
-            true_ranges.append(true_range)
+        # Only the last `period` true ranges are averaged, so only those are computed
+        highs_arr = np.asarray(highs[-period:], dtype=float)
+        lows_arr = np.asarray(lows[-period:], dtype=float)
+        prev_closes = np.asarray(closes[-period - 1:-1], dtype=float)
+        
+        true_ranges = np.maximum.reduce([
+            highs_arr - lows_arr,
+            np.abs(highs_arr - prev_closes),
+            np.abs(lows_arr - prev_closes)
+        ])
         
-        atr = np.mean(true_ranges[-period:])
+        atr = np.mean(true_ranges)
         return float(atr)
     
     @staticmethod
     def calculate_volume_profile(
-        volumes: List[float],
+        volumes: PriceSeries,
         period: int = 20
     ) -> Dict[str, float]:
         """
@@ -190,7 +204,7 @@ class TechnicalIndicators:
                 "volume_trend": 0.0
             }
         
-        recent_volumes = np.array(volumes[-period:])
+        recent_volumes = np.asarray(volumes[-period:], dtype=float)
         avg_volume = np.mean(recent_volumes)
         current_volume = volumes[-1]
         
@@ -209,7 +223,7 @@ class TechnicalIndicators:
         }
     
     @staticmethod
-    def calculate_momentum(prices: List[float], period: int = 10) -> float:
+    def calculate_momentum(prices: PriceSeries, period: int = 10) -> float:
         """
         Calculate momentum (rate of change)
         
@@ -230,7 +244,7 @@ class TechnicalIndicators:
         return float(momentum)
     
     @staticmethod
-    def detect_trend(prices: List[float], short_period: int = 20, long_period: int = 50) -> Dict[str, Any]:
+    def detect_trend(prices: PriceSeries, short_period: int = 20, long_period: int = 50) -> Dict[str, Any]:
         """
         Detect trend using moving averages
         
@@ -246,8 +260,8 @@ class TechnicalIndicators:
             return {
                 "trend": "neutral",
                 "strength": 0.0,
-                "short_ma": prices[-1] if prices else 0,
-                "long_ma": prices[-1] if prices else 0
+                "short_ma": prices[-1] if len(prices) else 0,
+                "long_ma": prices[-1] if len(prices) else 0
             }
         
         short_ma = np.mean(prices[-short_period:])
@@ -272,7 +286,7 @@ class TechnicalIndicators:
         }
     
     @staticmethod
-    def calculate_volatility(prices: List[float], period: int = 20) -> Dict[str, float]:
+    def calculate_volatility(prices: PriceSeries, period: int = 20) -> Dict[str, float]:
         """
         Calculate volatility metrics
         
@@ -290,7 +304,7 @@ class TechnicalIndicators:
                 "volatility_percentile": 50.0
             }
         
-        recent_prices = np.array(prices[-period:])
+        recent_prices = np.asarray(prices[-period:], dtype=float)
         returns = np.diff(recent_prices) / recent_prices[:-1]
         
         std_dev = np.std(returns) * 100  # As percentage
@@ -298,17 +312,14 @@ class TechnicalIndicators:
         cv = std_dev / abs(mean_return) if mean_return != 0 else 0.0
         
         # Calculate volatility percentile (current vs historical)
-        all_prices = np.array(prices)
+        all_prices = np.asarray(prices, dtype=float)
         if len(all_prices) > period * 2:
-            historical_vols = []
-            for i in range(period, len(all_prices)):
-                window = all_prices[i-period:i]
-                window_returns = np.diff(window) / window[:-1]
-                historical_vols.append(np.std(window_returns))
+            # Std of returns for every earlier `period`-price window, excluding the current one
+            all_returns = np.diff(all_prices) / all_prices[:-1]
+            historical_vols = sliding_window_view(all_returns, period - 1)[:-1].std(axis=1)
             
             current_vol = std_dev / 100
-            percentile = np.percentile(historical_vols, 50)
-            volatility_percentile = sum(1 for v in historical_vols if v < current_vol) / len(historical_vols) * 100
+            volatility_percentile = np.count_nonzero(historical_vols < current_vol) / len(historical_vols) * 100
         else:
             volatility_percentile = 50.0
         
@@ -322,6 +333,13 @@ class TechnicalIndicators:
     def _calculate_ema(data: np.ndarray, period: int) -> np.ndarray:
         """Calculate Exponential Moving Average"""
         alpha = 2 / (period + 1)
+        data = np.asarray(data, dtype=float)
+        
+        if lfilter is not None and len(data) > 0:
+            # y[i] = alpha*x[i] + (1-alpha)*y[i-1], seeded so that y[0] = x[0]
+            ema, _ = lfilter([alpha], [1.0, alpha - 1.0], data, zi=[(1 - alpha) * data[0]])
+            return ema
+        
         ema = np.zeros_like(data)
         ema[0] = data[0]
         
@@ -332,9 +350,9 @@ class TechnicalIndicators:
     
     @staticmethod
     def analyze_market_structure(
-        prices: List[float],
-        highs: List[float],
-        lows: List[float]
+        prices: PriceSeries,
+        highs: PriceSeries,
+        lows: PriceSeries
     ) -> Dict[str, Any]:
         """
         Analyze market structure for higher quality setups
@@ -350,13 +368,13 @@ class TechnicalIndicators:
         if len(prices) < 20:
             return {
                 "structure": "ranging",
-                "support": prices[-1] if prices else 0,
-                "resistance": prices[-1] if prices else 0,
+                "support": prices[-1] if len(prices) else 0,
+                "resistance": prices[-1] if len(prices) else 0,
                 "breakout_probability": 0.5
             }
         
-        recent_high = max(highs[-20:])
-        recent_low = min(lows[-20:])
+        recent_high = np.max(highs[-20:])
+        recent_low = np.min(lows[-20:])
         current_price = prices[-1]
         
         # Determine if we're near support/resistance
@@ -366,10 +384,10 @@ class TechnicalIndicators:
         
         # Detect higher highs / lower lows
         mid_point = len(prices) // 2
-        first_half_high = max(highs[:mid_point])
-        second_half_high = max(highs[mid_point:])
-        first_half_low = min(lows[:mid_point])
-        second_half_low = min(lows[mid_point:])
+        first_half_high = np.max(highs[:mid_point])
+        second_half_high = np.max(highs[mid_point:])
+        first_half_low = np.min(lows[:mid_point])
+        second_half_low = np.min(lows[mid_point:])
         
         if second_half_high > first_half_high and second_half_low > first_half_low:
             structure = "uptrend"
@@ -391,6 +409,240 @@ class TechnicalIndicators:
         }
 
 
+class VectorizedIndicators:
+    """
+    Indicators over a 2-D (symbols x time) block, computed along the time axis
+    Mirrors the TechnicalIndicators defaults and returns one value (or array) per symbol
+    """
+    
+    @staticmethod
+    def _safe_divide(numerator: np.ndarray, denominator: np.ndarray, valid: np.ndarray, default: float) -> np.ndarray:
+        """Element-wise numerator/denominator where `valid`, `default` elsewhere"""
+        out = np.full(np.broadcast(numerator, denominator).shape, default, dtype=float)
+        np.divide(numerator, denominator, out=out, where=valid)
+        return out
+    
+    @staticmethod
+    def calculate_rsi(closes: np.ndarray, period: int = 14) -> np.ndarray:
+        """RSI per symbol (see TechnicalIndicators.calculate_rsi)"""
+        if closes.shape[1] < period + 1:
+            return np.full(closes.shape[0], 50.0)
+        
+        deltas = np.diff(closes[:, -period - 1:], axis=1)
+        avg_gain = np.where(deltas > 0, deltas, 0).mean(axis=1)
+        avg_loss = np.where(deltas < 0, -deltas, 0).mean(axis=1)
+        
+        rs = VectorizedIndicators._safe_divide(avg_gain, avg_loss, avg_loss != 0, 0.0)
+        return np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + rs)))
+    
+    @staticmethod
+    def calculate_macd(
+        closes: np.ndarray,
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9
+    ) -> Dict[str, np.ndarray]:
+        """MACD line, signal and histogram per symbol (see TechnicalIndicators.calculate_macd)"""
+        if closes.shape[1] < slow_period + signal_period:
+            zeros = np.zeros(closes.shape[0])
+            return {"macd": zeros, "signal": zeros, "histogram": zeros}
+        
+        macd_line = VectorizedIndicators._calculate_ema(closes, fast_period) - VectorizedIndicators._calculate_ema(closes, slow_period)
+        signal_line = VectorizedIndicators._calculate_ema(macd_line, signal_period)
+        
+        return {
+            "macd": macd_line[:, -1],
+            "signal": signal_line[:, -1],
+            "histogram": macd_line[:, -1] - signal_line[:, -1]
+        }
+    
+    @staticmethod
+    def calculate_bollinger_bands(closes: np.ndarray, period: int = 20, std_dev: float = 2.0) -> Dict[str, np.ndarray]:
+        """Bollinger Bands per symbol (see TechnicalIndicators.calculate_bollinger_bands)"""
+        current_price = closes[:, -1]
+        if closes.shape[1] < period:
+            return {
+                "upper": current_price,
+                "middle": current_price,
+                "lower": current_price,
+                "width": np.zeros(closes.shape[0]),
+                "position": np.full(closes.shape[0], 0.5)
+            }
+        
+        window = closes[:, -period:]
+        sma = window.mean(axis=1)
+        std = window.std(axis=1)
+        upper = sma + (std_dev * std)
+        lower = sma - (std_dev * std)
+        
+        return {
+            "upper": upper,
+            "middle": sma,
+            "lower": lower,
+            "width": VectorizedIndicators._safe_divide(upper - lower, sma, sma > 0, 0.0),
+            "position": VectorizedIndicators._safe_divide(current_price - lower, upper - lower, upper > lower, 0.5)
+        }
+    
+    @staticmethod
+    def calculate_atr(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
+        """ATR per symbol (see TechnicalIndicators.calculate_atr)"""
+        if closes.shape[1] < period + 1:
+            # Fallback to simple range
+            return (highs[:, -period:] - lows[:, -period:]).mean(axis=1)
+        
+        recent_highs = highs[:, -period:]
+        recent_lows = lows[:, -period:]
+        prev_closes = closes[:, -period - 1:-1]
+        true_ranges = np.maximum.reduce([
+            recent_highs - recent_lows,
+            np.abs(recent_highs - prev_closes),
+            np.abs(recent_lows - prev_closes)
+        ])
+        return true_ranges.mean(axis=1)
+    
+    @staticmethod
+    def calculate_volume_profile(volumes: np.ndarray, period: int = 20) -> Dict[str, np.ndarray]:
+        """Volume metrics per symbol (see TechnicalIndicators.calculate_volume_profile)"""
+        if volumes.shape[1] < period:
+            return {
+                "avg_volume": np.zeros(volumes.shape[0]),
+                "volume_ratio": np.ones(volumes.shape[0]),
+                "volume_trend": np.zeros(volumes.shape[0])
+            }
+        
+        avg_volume = volumes[:, -period:].mean(axis=1)
+        recent_avg = volumes[:, -5:].mean(axis=1)
+        older_avg = volumes[:, -period:-5].mean(axis=1)
+        
+        return {
+            "avg_volume": avg_volume,
+            "volume_ratio": VectorizedIndicators._safe_divide(volumes[:, -1], avg_volume, avg_volume > 0, 1.0),
+            "volume_trend": VectorizedIndicators._safe_divide(recent_avg - older_avg, older_avg, older_avg > 0, 0.0)
+        }
+    
+    @staticmethod
+    def calculate_momentum(closes: np.ndarray, period: int = 10) -> np.ndarray:
+        """Momentum percentage per symbol (see TechnicalIndicators.calculate_momentum)"""
+        if closes.shape[1] < period + 1:
+            return np.zeros(closes.shape[0])
+        
+        past = closes[:, -period - 1]
+        return VectorizedIndicators._safe_divide(closes[:, -1] - past, past, past > 0, 0.0) * 100
+    
+    @staticmethod
+    def detect_trend(closes: np.ndarray, short_period: int = 20, long_period: int = 50) -> Dict[str, np.ndarray]:
+        """Moving-average trend per symbol (see TechnicalIndicators.detect_trend)"""
+        if closes.shape[1] < long_period:
+            return {
+                "trend": np.full(closes.shape[0], "neutral", dtype=object),
+                "strength": np.zeros(closes.shape[0]),
+                "short_ma": closes[:, -1],
+                "long_ma": closes[:, -1]
+            }
+        
+        short_ma = closes[:, -short_period:].mean(axis=1)
+        long_ma = closes[:, -long_period:].mean(axis=1)
+        trend = np.select(
+            [short_ma > long_ma * 1.01, short_ma < long_ma * 0.99],  # 1% threshold
+            ["bullish", "bearish"],
+            default="neutral"
+        ).astype(object)
+        
+        return {
+            "trend": trend,
+            "strength": VectorizedIndicators._safe_divide(np.abs(short_ma - long_ma), long_ma, long_ma > 0, 0.0),
+            "short_ma": short_ma,
+            "long_ma": long_ma
+        }
+    
+    @staticmethod
+    def calculate_volatility(closes: np.ndarray, period: int = 20) -> Dict[str, np.ndarray]:
+        """Volatility metrics per symbol (see TechnicalIndicators.calculate_volatility)"""
+        if closes.shape[1] < period:
+            return {
+                "std_dev": np.zeros(closes.shape[0]),
+                "coefficient_variation": np.zeros(closes.shape[0]),
+                "volatility_percentile": np.full(closes.shape[0], 50.0)
+            }
+        
+        all_returns = np.diff(closes, axis=1) / closes[:, :-1]
+        returns = all_returns[:, -(period - 1):]
+        std_dev = returns.std(axis=1) * 100  # As percentage
+        mean_return = returns.mean(axis=1)
+        cv = VectorizedIndicators._safe_divide(std_dev, np.abs(mean_return), mean_return != 0, 0.0)
+        
+        if closes.shape[1] > period * 2:
+            historical_vols = sliding_window_view(all_returns, period - 1, axis=1)[:, :-1].std(axis=2)
+            current_vol = std_dev / 100
+            volatility_percentile = np.count_nonzero(historical_vols < current_vol[:, None], axis=1) / historical_vols.shape[1] * 100
+        else:
+            volatility_percentile = np.full(closes.shape[0], 50.0)
+        
+        return {
+            "std_dev": std_dev,
+            "coefficient_variation": cv,
+            "volatility_percentile": volatility_percentile
+        }
+    
+    @staticmethod
+    def analyze_market_structure(closes: np.ndarray, highs: np.ndarray, lows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Market structure per symbol (see TechnicalIndicators.analyze_market_structure)"""
+        current_price = closes[:, -1]
+        if closes.shape[1] < 20:
+            return {
+                "structure": np.full(closes.shape[0], "ranging", dtype=object),
+                "support": current_price,
+                "resistance": current_price,
+                "breakout_probability": np.full(closes.shape[0], 0.5)
+            }
+        
+        recent_high = highs[:, -20:].max(axis=1)
+        recent_low = lows[:, -20:].min(axis=1)
+        range_size = recent_high - recent_low
+        distance_to_high = VectorizedIndicators._safe_divide(recent_high - current_price, range_size, range_size > 0, 0.5)
+        distance_to_low = VectorizedIndicators._safe_divide(current_price - recent_low, range_size, range_size > 0, 0.5)
+        
+        # Higher highs / lower lows between the two halves of the window
+        mid_point = closes.shape[1] // 2
+        first_half_high = highs[:, :mid_point].max(axis=1)
+        second_half_high = highs[:, mid_point:].max(axis=1)
+        first_half_low = lows[:, :mid_point].min(axis=1)
+        second_half_low = lows[:, mid_point:].min(axis=1)
+        
+        uptrend = (second_half_high > first_half_high) & (second_half_low > first_half_low)
+        downtrend = ~uptrend & (second_half_high < first_half_high) & (second_half_low < first_half_low)
+        structure = np.select([uptrend, downtrend], ["uptrend", "downtrend"], default="ranging").astype(object)
+        breakout_prob = np.select(
+            [uptrend, downtrend],
+            [np.where(distance_to_high < 0.1, 0.7, 0.5), np.where(distance_to_low < 0.1, 0.7, 0.5)],
+            default=np.where((distance_to_high < 0.1) | (distance_to_low < 0.1), 0.6, 0.3)
+        )
+        
+        return {
+            "structure": structure,
+            "support": recent_low,
+            "resistance": recent_high,
+            "breakout_probability": breakout_prob,
+            "distance_to_resistance": distance_to_high,
+            "distance_to_support": distance_to_low
+        }
+    
+    @staticmethod
+    def _calculate_ema(data: np.ndarray, period: int) -> np.ndarray:
+        """EMA along the time axis, seeded at the first value of each row"""
+        alpha = 2 / (period + 1)
+        
+        if lfilter is not None:
+            ema, _ = lfilter([alpha], [1.0, alpha - 1.0], data, axis=1, zi=(1 - alpha) * data[:, :1])
+            return ema
+        
+        ema = np.empty_like(data)
+        ema[:, 0] = data[:, 0]
+        for i in range(1, data.shape[1]):
+            ema[:, i] = alpha * data[:, i] + (1 - alpha) * ema[:, i-1]
+        return ema
+
+
 class MarketAnalyzer:
     """
     High-level market analysis combining multiple indicators
@@ -399,24 +651,26 @@ class MarketAnalyzer:
     def __init__(self):
         self.indicators = TechnicalIndicators()
     
-    def analyze_full_market(self, candles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_full_market(self, candles: Union[CandleFrame, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """
         Perform comprehensive market analysis
         
         Args:
-            candles: List of candlestick data
+            candles: CandleFrame (columns used as-is) or list of candlestick dicts
             
         Returns:
             Dictionary with complete market analysis
         """
-        if not candles or len(candles) < 2:
+        if candles is None or len(candles) < 2:
             return {}
         
         # Extract price data
-        closes = [c['close'] for c in candles]
-        highs = [c['high'] for c in candles]
-        lows = [c['low'] for c in candles]
-        volumes = [c['volume'] for c in candles]
+        if not isinstance(candles, CandleFrame):
+            candles = CandleFrame.from_candles(candles)
+        closes = candles.close
+        highs = candles.high
+        lows = candles.low
+        volumes = candles.volume
         
         # Calculate all indicators
         rsi = self.indicators.calculate_rsi(closes)
@@ -446,7 +700,101 @@ class MarketAnalyzer:
             "volatility": volatility,
             "market_structure": structure,
             "trade_quality_score": trade_quality,
-            "current_price": closes[-1]
+            "current_price": float(closes[-1])
+        }
+    
+    def analyze_many(self, block: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Analyze many symbols at once with every indicator broadcast over the symbol axis
+        
+        Args:
+            block: Array of shape (symbols, 5, time) with rows open/high/low/close/volume
+                   per symbol (see CandleFrame.stack)
+            
+        Returns:
+            One analyze_full_market dictionary per symbol, in block order
+        """
+        if block.ndim != 3 or block.shape[2] < 2:
+            return [{} for _ in range(block.shape[0] if block.ndim == 3 else 0)]
+        
+        highs = block[:, 1]
+        lows = block[:, 2]
+        closes = block[:, 3]
+        volumes = block[:, 4]
+        vec = VectorizedIndicators
+        
+        # Calculate all indicators (one array entry per symbol)
+        rsi = vec.calculate_rsi(closes)
+        macd = vec.calculate_macd(closes)
+        bb = vec.calculate_bollinger_bands(closes)
+        atr = vec.calculate_atr(highs, lows, closes)
+        volume_profile = vec.calculate_volume_profile(volumes)
+        momentum = vec.calculate_momentum(closes)
+        trend = vec.detect_trend(closes)
+        volatility = vec.calculate_volatility(closes)
+        structure = vec.analyze_market_structure(closes, highs, lows)
+        current_price = closes[:, -1]
+        atr_percent = vec._safe_divide(atr, current_price, current_price > 0, 0.0) * 100
+        
+        # Hand each symbol its slice in the analyze_full_market layout
+        results = []
+        for i in range(block.shape[0]):
+            symbol_macd = self._row(macd, i)
+            symbol_bb = self._row(bb, i)
+            symbol_volume = self._row(volume_profile, i)
+            symbol_trend = self._row(trend, i)
+            symbol_structure = self._row(structure, i)
+            trade_quality = self._calculate_trade_quality(
+                float(rsi[i]), symbol_macd, symbol_bb, symbol_volume, symbol_trend, symbol_structure
+            )
+            results.append({
+                "rsi": float(rsi[i]),
+                "macd": symbol_macd,
+                "bollinger_bands": symbol_bb,
+                "atr": float(atr[i]),
+                "atr_percent": float(atr_percent[i]),
+                "volume_profile": symbol_volume,
+                "momentum": float(momentum[i]),
+                "trend": symbol_trend,
+                "volatility": self._row(volatility, i),
+                "market_structure": symbol_structure,
+                "trade_quality_score": trade_quality,
+                "current_price": float(current_price[i])
+            })
+        return results
+    
+    @staticmethod
+    def with_order_flow(analysis: Dict[str, Any], flow: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add streamed order-flow features to a candle analysis
+        
+        Args:
+            analysis: analyze_full_market dictionary (not modified; it may be shared)
+            flow: TradeTape.features() output, or None if no tape is streaming
+            
+        Returns:
+            Copy of the analysis with "order_flow" (the windows as given) and
+            "order_flow_bias" ("buying", "selling" or "balanced" on the middle window's
+            aggressor delta), or the analysis unchanged without flow data
+        """
+        if not flow:
+            return analysis
+        windows = [value for value in flow.values() if isinstance(value, dict) and "delta_ratio" in value]
+        bias = "balanced"
+        if windows:
+            delta_ratio = windows[len(windows) // 2]["delta_ratio"]
+            if delta_ratio > 0.2:
+                bias = "buying"
+            elif delta_ratio < -0.2:
+                bias = "selling"
+        return {**analysis, "order_flow": flow, "order_flow_bias": bias}
+    
+    @staticmethod
+    def _row(columns: Dict[str, np.ndarray], index: int) -> Dict[str, Any]:
+        """Pick one symbol out of a dict of per-symbol arrays"""
+        return {
+            key: value[index] if value.dtype == object else float(value[index])
+            for key, value in columns.items()
         }
     
     def _calculate_trade_quality(
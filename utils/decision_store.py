@@ -1,53 +1,118 @@
 """
 Persistent storage for AI trading decisions
+Append-only JSONL journal with an in-memory index by id, time and symbol
 """
 import json
 import os
+import threading
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 from loguru import logger
 
+from utils.journal import JsonlJournal
+
 
 class DecisionStore:
-    """Store AI decisions persistently in a JSON file"""
-    
-    def __init__(self, filepath: str = "logs/decisions.json"):
+    """
+    Store AI decisions persistently in an append-only JSONL journal
+
+    Each decision is one line queued for the end of the file, so the write cost does
+    not depend on history length, and the PersistenceWorker writes it off the event
+    loop. A crash can only tear the last line, and the next load drops it. Once the
+    journal holds twice max_entries lines, it is rewritten with the newest
+    max_entries via a temp file and an atomic rename (also on the worker).
+
+    Every entry gets an increasing "id", so readers can poll with
+    get_decisions(since=last_id) instead of re-reading the whole log.
+    """
+
+    def __init__(
+        self,
+        filepath: Optional[str] = "logs/decisions.jsonl",
+        clock: Optional[Callable[[], datetime]] = None,
+        max_entries: int = 1000
+    ):
+        """
+        Args:
+            filepath: JSONL journal to persist decisions to (None keeps them in memory only, e.g. for backtests)
+            clock: Callable returning the current time (defaults to datetime.now)
+            max_entries: Decisions kept in memory and after compaction
+        """
         self.filepath = filepath
-        self.decisions: List[Dict[str, Any]] = []
-        self._ensure_directory()
+        self._now = clock or datetime.now
+        self.max_entries = max_entries
+
+        self.decisions: List[Dict[str, Any]] = []  # Oldest first, ids contiguous
+        self._times: List[float] = []  # Epoch seconds parallel to self.decisions
+        self._by_symbol: Dict[str, List[int]] = {}  # Symbol -> ids, ascending
+        self._next_id = 1
+        self._lock = threading.Lock()  # The dashboard reads from its own thread
+
+        self._journal = JsonlJournal(filepath) if filepath else None
+
         self._load()
-    
-    def _ensure_directory(self):
-        """Ensure the directory exists"""
-        directory = os.path.dirname(self.filepath)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
-    
+
+    # ========== Loading ==========
+
+    @staticmethod
+    def read_file(path: str) -> List[Dict[str, Any]]:
+        """
+        Read decisions from a journal or a legacy JSON array file
+
+        Args:
+            path: .jsonl journal or .json file written by older versions
+
+        Returns:
+            Decision entries, oldest first (a torn trailing line is skipped)
+        """
+        with open(path, "r") as f:
+            if path.endswith(".json"):
+                return json.load(f)
+            entries = []
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # Torn last line from an interrupted write
+            return entries
+
     def _load(self):
-        """Load decisions from file"""
-        if os.path.exists(self.filepath):
-            try:
-                with open(self.filepath, 'r') as f:
-                    self.decisions = json.load(f)
-                logger.info(f"Loaded {len(self.decisions)} decisions from {self.filepath}")
-            except Exception as e:
-                logger.error(f"Error loading decisions: {e}")
-                self.decisions = []
-        else:
-            self.decisions = []
-    
-    def _save(self):
-        """Save decisions to file"""
+        """Load the newest decisions from the journal (importing a legacy JSON file once)"""
+        if self._journal is None:
+            return
         try:
-            with open(self.filepath, 'w') as f:
-                json.dump(self.decisions, f, indent=2)
+            if not self._journal.exists():
+                self._migrate_legacy()
+            entries = self._journal.read()
         except Exception as e:
-            logger.error(f"Error saving decisions: {e}")
-    
-    def add_decision(self, decision: Dict[str, Any], market_data: Dict[str, Any], portfolio_state: Dict[str, Any]):
-        """Add a new decision"""
+            logger.error(f"Error loading decisions: {e}")
+            entries = []
+
+        for position, entry in enumerate(entries, start=1):
+            entry.setdefault("id", position)
+        for entry in entries[-self.max_entries:]:
+            self._index(entry)
+        if entries:
+            self._next_id = max(self._next_id, int(entries[-1]["id"]) + 1)
+            logger.info(f"Loaded {len(self.decisions)} decisions from {self.filepath}")
+
+    def _migrate_legacy(self):
+        """Import the JSON array file older versions rewrote on every decision"""
+        legacy_path = os.path.splitext(self.filepath)[0] + ".json"
+        if legacy_path == self.filepath or not os.path.exists(legacy_path):
+            return
+        entries = self.read_file(legacy_path)
+        self._journal.rewrite(dict(entry, id=index) for index, entry in enumerate(entries, start=1))
+        os.replace(legacy_path, legacy_path + ".migrated")
+        logger.info(f"📦 Migrated {len(entries)} decisions from {legacy_path} to {self.filepath}")
+
+    # ========== Writing ==========
+
+    def add_decision(self, decision: Dict[str, Any], market_data: Dict[str, Any], portfolio_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a new decision (one journal line; returns the stored entry)"""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._now().isoformat(),
             "decision": decision,
             "market_snapshot": {
                 "price": market_data.get('ticker', {}).get('lastPrice'),
@@ -57,20 +122,117 @@ class DecisionStore:
                 "positions": portfolio_state.get('positions', [])
             }
         }
-        
+
+        with self._lock:
+            entry["id"] = self._next_id
+            self._next_id += 1
+            self._index(entry)
+            if self._journal is not None:
+                try:
+                    self._journal.append(entry)
+                    if self._journal.lines >= 2 * self.max_entries:
+                        self._compact()
+                except Exception as e:
+                    logger.error(f"Error saving decision: {e}")
+        return entry
+
+    def _compact(self):
+        """Queue a rewrite of the journal with only the newest max_entries decisions"""
+        self._journal.replace(self.decisions[-self.max_entries:])
+        logger.debug(f"🗜️ Compacting {self.filepath} to {self._journal.lines} decisions")
+
+    def close(self):
+        """Wait for queued writes and close the journal (call on shutdown)"""
+        if self._journal is None:
+            return
+        try:
+            self._journal.close()
+        except Exception as e:
+            logger.error(f"Error closing decision journal: {e}")
+
+    # ========== Index ==========
+
+    def _index(self, entry: Dict[str, Any]):
+        """Add an entry to the in-memory index, trimming it in chunks to max_entries"""
         self.decisions.append(entry)
-        
-        # Keep only last 1000 decisions
-        if len(self.decisions) > 1000:
-            self.decisions = self.decisions[-1000:]
-        
-        self._save()
-    
-    def get_decisions(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get recent decisions"""
-        return self.decisions[-limit:]
-    
-    def get_all_decisions(self) -> List[Dict[str, Any]]:
-        """Get all decisions"""
-        return self.decisions
+        try:
+            self._times.append(datetime.fromisoformat(entry["timestamp"]).timestamp())
+        except (KeyError, TypeError, ValueError):
+            self._times.append(self._times[-1] if self._times else 0.0)
+        symbol = self._symbol_of(entry)
+        if symbol:
+            self._by_symbol.setdefault(symbol, []).append(entry["id"])
+
+        if len(self.decisions) > 2 * self.max_entries:
+            # Trim in one step every max_entries adds: amortized O(1) per decision
+            del self.decisions[:-self.max_entries]
+            del self._times[:-self.max_entries]
+            first_id = self.decisions[0]["id"]
+            for symbol, ids in list(self._by_symbol.items()):
+                del ids[:bisect_left(ids, first_id)]
+                if not ids:
+                    del self._by_symbol[symbol]
+
+    @staticmethod
+    def _symbol_of(entry: Dict[str, Any]) -> Optional[str]:
+        decision = entry.get("decision") or {}
+        return decision.get("symbol") if isinstance(decision, dict) else None
 
+    # ========== Reads ==========
+
+    @property
+    def last_id(self) -> int:
+        """Id of the newest decision (0 if none) - a cursor for get_decisions(since=...)"""
+        return self._next_id - 1
+
+    def get_decisions(
+        self,
+        limit: Optional[int] = 50,
+        since: Optional[int] = None,
+        symbol: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get decisions, oldest first
+
+        Args:
+            limit: Maximum entries returned (None for no limit)
+            since: Cursor - only decisions with an id greater than this, starting
+                from the oldest (without it the newest entries are returned)
+            symbol: Only decisions for this symbol
+            start: Only decisions at or after this time
+            end: Only decisions at or before this time
+
+        Returns:
+            Decision entries (only the newest max_entries are held in memory)
+        """
+        with self._lock:
+            entries = self.decisions[-self.max_entries:]
+            if not entries:
+                return []
+            base = len(self.decisions) - len(entries)
+            first_id = entries[0]["id"]
+            lo = 0 if since is None else max(since + 1 - first_id, 0)
+            hi = len(entries)
+            times = self._times
+            if start is not None:
+                lo = max(lo, bisect_left(times, start.timestamp(), base) - base)
+            if end is not None:
+                hi = min(hi, bisect_right(times, end.timestamp(), base) - base)
+
+            if symbol:
+                ids = self._by_symbol.get(symbol, [])
+                window = ids[bisect_left(ids, first_id + lo):bisect_left(ids, first_id + hi)]
+                selected = [entries[entry_id - first_id] for entry_id in window]
+            else:
+                selected = entries[lo:hi] if lo < hi else []
+
+        if limit is None:
+            return selected
+        return selected[:limit] if since is not None else selected[-limit:]
+
+    def get_all_decisions(self) -> List[Dict[str, Any]]:
+        """Get all decisions held in memory (the newest max_entries)"""
+        with self._lock:
+            return self.decisions[-self.max_entries:]
@@ -0,0 +1,292 @@
+"""
+Exchange Filter Cache
+Per-symbol trading rules (PRICE_FILTER, LOT_SIZE, MARKET_LOT_SIZE, MIN_NOTIONAL and
+leverage brackets) loaded from exchangeInfo, refreshed in the background and kept
+on disk so a restart can format orders before the first REST call returns
+"""
+import asyncio
+import json
+import os
+import time
+from decimal import Decimal, ROUND_CEILING, ROUND_DOWN, ROUND_HALF_EVEN
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from config.config import config
+
+
+# Lot steps used only until exchangeInfo has been loaded once
+FALLBACK_STEP_SIZES = {
+    "ASTERUSDT": "1",
+    "BTCUSDT": "0.001",
+    "ETHUSDT": "0.001",
+    "SOLUSDT": "0.01",
+    "BNBUSDT": "0.01",
+}
+DEFAULT_STEP_SIZE = "0.001"
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    """Filter value -> Decimal, None when absent or 0 (a disabled rule)"""
+    if value in (None, ""):
+        return None
+    number = Decimal(str(value))
+    return number if number > 0 else None
+
+
+def _exponent(step: Decimal) -> Decimal:
+    """Quantizer with the step's number of decimals (0.010 -> 0.01, 5 -> 1)"""
+    exponent = step.normalize().as_tuple().exponent
+    return Decimal(1).scaleb(min(exponent, 0))
+
+
+def _fallback_tick(price: float) -> Decimal:
+    """Tick guess by price magnitude (only without exchangeInfo)"""
+    if price >= 1000:
+        return Decimal("0.1")
+    if price >= 100:
+        return Decimal("0.01")
+    if price >= 10:
+        return Decimal("0.001")
+    return Decimal("0.0001")
+
+
+def _to_string(value: Decimal) -> str:
+    text = format(value, "f")
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+class SymbolFilters:
+    """
+    Trading rules for one symbol with precomputed Decimal quantizers
+
+    Quantities snap to the LOT_SIZE (or MARKET_LOT_SIZE) step and prices to the
+    PRICE_FILTER tick, so orders pass the exchange's filters the first time.
+    """
+
+    def __init__(self, symbol: str, info: Optional[Dict[str, Any]] = None, brackets: Optional[List[Dict]] = None):
+        """
+        Args:
+            symbol: Trading symbol
+            info: The symbol's entry from exchangeInfo["symbols"] (None = fallback rules)
+            brackets: Leverage brackets from leverageBracket
+        """
+        self.symbol = symbol
+        self.info = info or {}
+        self.brackets = sorted(brackets or [], key=lambda b: float(b.get("notionalFloor", 0)))
+        self.from_exchange = info is not None
+        filters = {f.get("filterType"): f for f in self.info.get("filters", [])}
+
+        price = filters.get("PRICE_FILTER", {})
+        self.tick_size = _decimal(price.get("tickSize"))
+        self.min_price = _decimal(price.get("minPrice"))
+        self.max_price = _decimal(price.get("maxPrice"))
+
+        lot = filters.get("LOT_SIZE", {})
+        self.step_size = _decimal(lot.get("stepSize")) or Decimal(FALLBACK_STEP_SIZES.get(symbol, DEFAULT_STEP_SIZE))
+        self.min_qty = _decimal(lot.get("minQty")) or self.step_size
+        self.max_qty = _decimal(lot.get("maxQty"))
+
+        market = filters.get("MARKET_LOT_SIZE", {})
+        self.market_step_size = _decimal(market.get("stepSize")) or self.step_size
+        self.market_min_qty = _decimal(market.get("minQty")) or self.min_qty
+        self.market_max_qty = _decimal(market.get("maxQty")) or self.max_qty
+
+        self.min_notional = _decimal(filters.get("MIN_NOTIONAL", {}).get("notional")) or Decimal(0)
+
+        self._step_exp = _exponent(self.step_size)
+        self._market_step_exp = _exponent(self.market_step_size)
+        self._tick_exp = _exponent(self.tick_size) if self.tick_size else None
+
+    @staticmethod
+    def _snap(value: float, step: Decimal, exponent: Decimal, rounding: str) -> Decimal:
+        units = (Decimal(repr(float(value))) / step).to_integral_value(rounding)
+        return (units * step).quantize(exponent)
+
+    def quantize_quantity(self, quantity: float, market: bool = False, rounding: str = ROUND_HALF_EVEN) -> Decimal:
+        """Quantity on the lot step, capped at the max quantity"""
+        step, exponent = (self.market_step_size, self._market_step_exp) if market else (self.step_size, self._step_exp)
+        value = self._snap(quantity, step, exponent, rounding)
+        max_qty = self.market_max_qty if market else self.max_qty
+        if max_qty is not None and value > max_qty:
+            value = self._snap(float(max_qty), step, exponent, ROUND_DOWN)
+        return value
+
+    def format_quantity(self, quantity: float, market: bool = False) -> str:
+        """Quantity string the exchange accepts (nearest step)"""
+        return _to_string(self.quantize_quantity(quantity, market))
+
+    def round_quantity(self, quantity: float, market: bool = False) -> float:
+        """Quantity snapped to the nearest step, as a float"""
+        return float(self.quantize_quantity(quantity, market))
+
+    def min_quantity(self, price: float, market: bool = True) -> float:
+        """
+        Smallest order quantity at a price: minQty, raised to meet MIN_NOTIONAL
+
+        Args:
+            price: Order (or mark) price
+            market: Use MARKET_LOT_SIZE rules
+        """
+        step, exponent = (self.market_step_size, self._market_step_exp) if market else (self.step_size, self._step_exp)
+        min_qty = self.market_min_qty if market else self.min_qty
+        if self.min_notional and price > 0:
+            by_notional = self._snap(float(self.min_notional) / price, step, exponent, ROUND_CEILING)
+            min_qty = max(min_qty, by_notional)
+        return float(min_qty)
+
+    def format_price(self, price: float) -> str:
+        """Price string on the tick size (nearest tick)"""
+        if self._tick_exp is None:
+            tick = _fallback_tick(price)
+            return _to_string(self._snap(price, tick, tick, ROUND_HALF_EVEN))
+        value = self._snap(price, self.tick_size, self._tick_exp, ROUND_HALF_EVEN)
+        if self.min_price is not None and value < self.min_price:
+            value = self.min_price.quantize(self._tick_exp)
+        if self.max_price is not None and value > self.max_price:
+            value = self.max_price.quantize(self._tick_exp)
+        return _to_string(value)
+
+    def max_leverage(self, notional: float = 0.0) -> Optional[int]:
+        """Highest initial leverage allowed for a position notional (None if unknown)"""
+        allowed = None
+        for bracket in self.brackets:
+            if notional >= float(bracket.get("notionalFloor", 0)):
+                allowed = int(bracket.get("initialLeverage", 0)) or allowed
+        return allowed
+
+
+class ExchangeFilterCache:
+    """
+    Singleton symbol-rule cache shared by all clients and bots
+
+    Loaded from disk at startup (if present), then from exchangeInfo and
+    leverageBracket; start() keeps it fresh in the background. Lookups never
+    hit the network: unknown symbols get fallback rules until the next refresh.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._symbols: Dict[str, SymbolFilters] = {}
+        self._fallbacks: Dict[str, SymbolFilters] = {}
+        self._loaded_at: float = 0
+        self._aster_client = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.path = config.data.exchange_info_path
+        self._load_from_disk()
+        self._initialized = True
+        logger.info(f"✅ ExchangeFilterCache initialized ({len(self._symbols)} symbols from disk)")
+
+    def set_client(self, client):
+        """Set the Aster client used to refresh exchangeInfo"""
+        self._aster_client = client
+
+    def get(self, symbol: str) -> SymbolFilters:
+        """
+        Rules for a symbol
+
+        Returns:
+            Exchange rules when known, otherwise fallback rules (legacy step sizes,
+            tick guessed from price)
+        """
+        symbol = symbol.upper()
+        filters = self._symbols.get(symbol)
+        if filters is None:
+            filters = self._fallbacks.get(symbol)
+            if filters is None:
+                filters = self._fallbacks[symbol] = SymbolFilters(symbol)
+        return filters
+
+    @property
+    def age(self) -> float:
+        """Seconds since the rules were fetched (inf if never)"""
+        return time.time() - self._loaded_at if self._loaded_at else float("inf")
+
+    def _apply(self, exchange_info: Dict[str, Any], brackets: Dict[str, List[Dict]], loaded_at: float):
+        self._symbols = {
+            item["symbol"]: SymbolFilters(item["symbol"], item, brackets.get(item["symbol"]))
+            for item in exchange_info.get("symbols", []) if item.get("symbol")
+        }
+        self._loaded_at = loaded_at
+
+    def _load_from_disk(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self._apply(saved.get("exchange_info", {}), saved.get("brackets", {}), saved.get("loaded_at", 0))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read cached exchange filters from {self.path}: {e}")
+
+    def _save_to_disk(self, exchange_info: Dict[str, Any], brackets: Dict[str, List[Dict]]):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"loaded_at": self._loaded_at, "exchange_info": exchange_info, "brackets": brackets}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save exchange filters to {self.path}: {e}")
+
+    async def refresh(self) -> bool:
+        """
+        Reload the rules from the exchange and persist them
+
+        Returns:
+            True if exchangeInfo was loaded (leverage brackets are best effort)
+        """
+        if not self._aster_client:
+            logger.error("❌ No Aster client set for ExchangeFilterCache")
+            return False
+        try:
+            exchange_info = await self._aster_client.get_markets()
+        except Exception as e:
+            logger.error(f"❌ Failed to load exchangeInfo: {e}")
+            return False
+
+        brackets: Dict[str, List[Dict]] = {}
+        try:
+            for item in await self._aster_client.get_leverage_brackets():
+                brackets[item.get("symbol")] = item.get("brackets", [])
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load leverage brackets: {e}")
+
+        self._apply(exchange_info, brackets, time.time())
+        self._save_to_disk(exchange_info, brackets)
+        logger.info(f"📏 Exchange filters loaded for {len(self._symbols)} symbols")
+        return True
+
+    async def start(self):
+        """Refresh now if the cache is stale, then keep refreshing in the background"""
+        if self.age >= config.data.exchange_info_refresh:
+            await self.refresh()
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Stop background refreshing"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(max(config.data.exchange_info_refresh - self.age, 60))
+            await self.refresh()
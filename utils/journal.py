@@ -0,0 +1,117 @@
+"""
+JSONL Journal
+Append-only file of JSON records, written behind by the PersistenceWorker, with
+torn-write recovery
+"""
+import json
+import os
+import threading
+from typing import List, Dict, Any, Iterable
+from loguru import logger
+
+from utils.persistence import PersistenceWorker
+
+
+class JsonlJournal:
+    """
+    One JSON record per line, appended at the end of the file
+
+    append() serializes the record and hands the line to the shared
+    PersistenceWorker; the file is written and fsynced on the worker's thread,
+    one write per flush however many records are pending. A crash can only tear
+    the last line; read() drops and truncates it so the next append starts on a
+    clean line.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Journal file (its directory is created if missing)
+        """
+        self.path = path
+        self.lines = 0  # Records in the file once queued writes land
+        self._file = None
+        self._io_lock = threading.Lock()  # File handle is used by the worker thread
+        self._worker = PersistenceWorker()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Parse every record, truncating a torn trailing line (call before appending)
+
+        Returns:
+            Records, oldest first
+        """
+        records = []
+        good_bytes = 0
+        if not os.path.exists(self.path):
+            self.lines = 0
+            return records
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                good_bytes += len(line)
+        if good_bytes < os.path.getsize(self.path):
+            logger.warning(f"⚠️ Dropping a torn record at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_bytes)
+        self.lines = len(records)
+        return records
+
+    def append(self, record: Dict[str, Any]):
+        """Queue one record (serialized now, so later changes to it aren't written)"""
+        self._worker.append(self, json.dumps(record, default=str) + "\n")
+        self.lines += 1
+
+    def replace(self, records: List[Dict[str, Any]]):
+        """Queue a rewrite of the whole file (records must not be mutated afterwards)"""
+        self._worker.replace(self, records)
+        self.lines = len(records)
+
+    def rewrite(self, records: Iterable[Dict[str, Any]]):
+        """Replace the file now, on the calling thread (for loading and migrations)"""
+        records = list(records)
+        self._replace_now(records)
+        self.lines = len(records)
+
+    def close(self):
+        """Wait for queued writes to land, then close the file"""
+        self._worker.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ========== Worker thread ==========
+
+    def _write_now(self, lines: List[str]):
+        """Append serialized lines in one write and fsync"""
+        with self._io_lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("".join(lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _replace_now(self, records: List[Dict[str, Any]]):
+        """Write records to a temp file, fsync and rename it over the journal"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record, default=str) + "\n" for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(temp_path, self.path)
@@ -0,0 +1,160 @@
+"""
+LLM Usage Tracker
+Input, cached and output tokens plus latency for every LLM call, aggregated per bot
+and per model so the savings from provider prompt caching are visible
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+from loguru import logger
+
+
+LATENCY_SAMPLES = 200  # Recent call latencies kept per bot/model for percentiles
+
+# Approximate price of a cache-read input token relative to a regular one (list prices)
+CACHED_TOKEN_PRICE = {
+    "anthropic": 0.1,
+    "openai": 0.5,
+    "deepseek": 0.1,
+    "qwen": 0.4,
+}
+CACHE_WRITE_PREMIUM = {
+    "anthropic": 0.25,  # Writing a 5-minute cache entry costs 1.25x
+}
+
+
+class _Usage:
+    """Running totals for one bot/model pair"""
+    __slots__ = ("provider", "calls", "errors", "input_tokens", "cached_tokens", "cache_write_tokens",
+                 "output_tokens", "latency_total", "hit_calls", "hit_latency", "latencies", "last_call")
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0  # Whole prompt, cached part included
+        self.cached_tokens = 0  # Read from the provider's prompt cache
+        self.cache_write_tokens = 0  # Written to the cache (Anthropic bills these separately)
+        self.output_tokens = 0
+        self.latency_total = 0.0
+        self.hit_calls = 0  # Calls that read anything from the cache
+        self.hit_latency = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.last_call: Optional[float] = None
+
+
+class LLMUsageTracker:
+    """
+    Singleton token and latency accounting shared across all bots
+
+    LLMClient records every call here; reads are for logging and the dashboard.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._usage: Dict[Tuple[str, str], _Usage] = {}  # (bot, model) -> totals
+        self._lock = threading.Lock()  # The dashboard reads from its own thread
+        self._initialized = True
+        logger.info("✅ LLMUsageTracker initialized")
+
+    def record(
+        self,
+        bot: str,
+        provider: str,
+        model: str,
+        latency: float,
+        input_tokens: int = 0,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        output_tokens: int = 0,
+        error: bool = False
+    ):
+        """
+        Record one LLM call
+
+        Args:
+            bot: Bot the call was made for
+            provider: LLM provider name
+            model: Model name
+            latency: Seconds from request to response
+            input_tokens: Prompt tokens including cached ones
+            cached_tokens: Prompt tokens served from the provider cache
+            cache_write_tokens: Prompt tokens written to the provider cache
+            output_tokens: Completion tokens
+            error: True if the call failed (latency only)
+        """
+        with self._lock:
+            usage = self._usage.get((bot, model))
+            if usage is None:
+                usage = self._usage[(bot, model)] = _Usage(provider)
+            usage.last_call = time.time()
+            if error:
+                usage.errors += 1
+                return
+            usage.calls += 1
+            usage.input_tokens += input_tokens
+            usage.cached_tokens += cached_tokens
+            usage.cache_write_tokens += cache_write_tokens
+            usage.output_tokens += output_tokens
+            usage.latency_total += latency
+            usage.latencies.append(latency)
+            if cached_tokens:
+                usage.hit_calls += 1
+                usage.hit_latency += latency
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Per bot/model usage plus totals
+
+        Returns:
+            Dictionary with "bots" ({bot: {model: stats}}) and "totals". Stats include
+            token counts, cache_hit_ratio (cached share of input tokens),
+            input_tokens_saved (input-token equivalents saved at approximate cached
+            pricing, after cache-write premiums) and average latency of calls with and
+            without a cache hit.
+        """
+        with self._lock:
+            bots: Dict[str, Dict[str, Any]] = {}
+            totals = {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "input_tokens_saved": 0.0}
+            for (bot, model), usage in self._usage.items():
+                stats = self._summarize(usage)
+                bots.setdefault(bot, {})[model] = stats
+                for key in totals:
+                    totals[key] += stats[key]
+            totals["input_tokens_saved"] = round(totals["input_tokens_saved"])
+            totals["cache_hit_ratio"] = round(totals["cached_tokens"] / totals["input_tokens"], 3) if totals["input_tokens"] else 0.0
+            return {"bots": bots, "totals": totals}
+
+    @staticmethod
+    def _summarize(usage: _Usage) -> Dict[str, Any]:
+        latencies = sorted(usage.latencies)
+        miss_calls = usage.calls - usage.hit_calls
+        saved = (usage.cached_tokens * (1 - CACHED_TOKEN_PRICE.get(usage.provider, 1.0))
+                 - usage.cache_write_tokens * CACHE_WRITE_PREMIUM.get(usage.provider, 0.0))
+        return {
+            "provider": usage.provider,
+            "calls": usage.calls,
+            "errors": usage.errors,
+            "input_tokens": usage.input_tokens,
+            "cached_tokens": usage.cached_tokens,
+            "cache_write_tokens": usage.cache_write_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_hit_ratio": round(usage.cached_tokens / usage.input_tokens, 3) if usage.input_tokens else 0.0,
+            "input_tokens_saved": round(saved),
+            "avg_latency_ms": round(usage.latency_total / usage.calls * 1000) if usage.calls else 0,
+            "p50_latency_ms": round(latencies[len(latencies) // 2] * 1000) if latencies else 0,
+            "p95_latency_ms": round(latencies[int(len(latencies) * 0.95)] * 1000) if latencies else 0,
+            "cache_hit_latency_ms": round(usage.hit_latency / usage.hit_calls * 1000) if usage.hit_calls else None,
+            "cache_miss_latency_ms": round((usage.latency_total - usage.hit_latency) / miss_calls * 1000) if miss_calls else None,
+            "last_call": usage.last_call,
+        }
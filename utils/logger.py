@@ -23,13 +23,17 @@ def setup_logger():
         level="INFO"
     )
     
+    # File sinks write from loguru's queue thread (enqueue=True) so logging never
+    # blocks the event loop on disk; PersistenceWorker.stop() drains them
+    
     # File handler for all logs
     logger.add(
         log_dir / "vibe_trader.log",
         rotation="500 MB",
         retention="10 days",
         level="DEBUG",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}"
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function} - {message}",
+        enqueue=True
     )
     
     # Separate file for errors
@@ -38,7 +42,8 @@ def setup_logger():
         rotation="100 MB",
         retention="30 days",
         level="ERROR",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+        enqueue=True
     )
     
     # Separate file for trades
@@ -48,6 +53,7 @@ def setup_logger():
         retention="90 days",
         level="INFO",
         filter=lambda record: "trade" in record["message"].lower() or "position" in record["message"].lower(),
-        format="{time:YYYY-MM-DD HH:mm:ss} | {message}"
+        format="{time:YYYY-MM-DD HH:mm:ss} | {message}",
+        enqueue=True
     )
 
@@ -0,0 +1,209 @@
+"""
+Mark Price Cache
+Mark price, index price and funding per symbol, kept current from <symbol>@markPrice@1s
+streams on the shared MarketStreamHub, with settled funding history in the local archive
+"""
+import asyncio
+import time
+from typing import Dict, Any, Optional
+from loguru import logger
+
+from config.config import config
+from utils.market_stream import CONNECTED, MarketStreamHub
+
+
+DEFAULT_FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000  # Until two settlements show the real interval
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class MarkPriceCache:
+    """
+    Singleton mark-price and funding view shared across all bots
+
+    Replaces per-call premiumIndex polling: reads are dictionary lookups. Settled
+    funding is backfilled from /fapi/v1/fundingRate on start and then recorded from
+    the stream itself whenever a symbol's next funding time rolls over.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._symbols: set = set()
+        self._marks: Dict[str, Dict[str, Any]] = {}  # Latest parsed markPriceUpdate per symbol
+        self._history: Dict[str, Dict[str, Any]] = {}  # Settled funding summary per symbol
+        self._aster_client = None
+        self._archive = None
+        self._hub = MarketStreamHub()
+        self._stream_task: Optional[asyncio.Task] = None
+        self._backfill_task: Optional[asyncio.Task] = None
+        self._running = False
+        self._stale_after: float = 10  # Seconds without an update before a mark is not served
+        self._initialized = True
+        logger.info("✅ MarkPriceCache initialized")
+
+    def set_client(self, client):
+        """Set the Aster client used for the funding history backfill"""
+        self._aster_client = client
+
+    def subscribe(self, symbol: str):
+        """Register a symbol to stream (before start())"""
+        self._symbols.add(symbol.upper())
+
+    async def start(self):
+        """Start the mark price stream and backfill funding history in the background"""
+        if self._running or not self._symbols:
+            return
+        from data.funding_archive import FundingArchive
+        self._archive = FundingArchive()
+        for symbol in self._symbols:
+            self._summarize(symbol)
+
+        self._running = True
+        self._stream_task = asyncio.create_task(self._stream_loop())
+        if self._aster_client is not None and config.data.funding_history_days > 0:
+            self._backfill_task = asyncio.create_task(self._backfill())
+        logger.success(f"📍 Mark price stream started for {len(self._symbols)} symbols")
+
+    async def stop(self):
+        """Stop the stream and any running backfill"""
+        self._running = False
+        for task in (self._stream_task, self._backfill_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._stream_task = self._backfill_task = None
+
+    # ========== Reads ==========
+
+    def mark_price(self, symbol: str) -> Optional[float]:
+        """
+        Latest mark price (no HTTP calls)
+
+        Returns:
+            Mark price, or None if the symbol isn't streaming or the value is stale
+        """
+        mark = self._marks.get(symbol.upper())
+        if mark is None or not self._hub.connected or time.time() - mark["received"] > self._stale_after:
+            return None
+        return mark["mark_price"]
+
+    def funding(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Funding features for a symbol (no HTTP calls)
+
+        Returns:
+            Dictionary with rate (current period estimate), next_funding_time,
+            minutes_to_funding, interval_hours, annualized_rate, last_settled_rate,
+            avg_rate_24h and avg_rate_7d (None where no history is archived yet),
+            or None if the symbol isn't streaming
+        """
+        symbol = symbol.upper()
+        mark = self._marks.get(symbol)
+        if mark is None or not self._hub.connected:
+            return None
+        history = self._history.get(symbol, {})
+        interval_ms = history.get("interval_ms", DEFAULT_FUNDING_INTERVAL_MS)
+        return {
+            "rate": mark["funding_rate"],
+            "next_funding_time": mark["next_funding_time"],
+            "minutes_to_funding": max(0.0, (mark["next_funding_time"] - time.time() * 1000) / 60_000),
+            "interval_hours": interval_ms / 3_600_000,
+            "annualized_rate": mark["funding_rate"] * DAY_MS / interval_ms * 365,
+            "last_settled_rate": history.get("last_rate"),
+            "avg_rate_24h": history.get("avg_24h"),
+            "avg_rate_7d": history.get("avg_7d"),
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-symbol marks and funding for logging and the dashboard"""
+        return {
+            "running": self._running,
+            "symbols": {
+                symbol: {
+                    "mark_price": mark["mark_price"],
+                    "funding_rate": mark["funding_rate"],
+                    "age": round(time.time() - mark["received"], 1),
+                    "settlements": self._history.get(symbol, {}).get("count", 0),
+                }
+                for symbol, mark in self._marks.items()
+            },
+        }
+
+    # ========== Stream ==========
+
+    async def _stream_loop(self):
+        """Consume markPriceUpdate events from the shared market stream hub"""
+        streams = [f"{symbol.lower()}@markPrice@1s" for symbol in sorted(self._symbols)]
+        subscription = self._hub.subscribe(streams)
+        try:
+            async for stream, event in subscription:
+                if stream == CONNECTED or event.get("e") != "markPriceUpdate":
+                    continue
+                self._on_mark(event)
+        finally:
+            subscription.close()
+
+    def _on_mark(self, event: Dict[str, Any]):
+        symbol = event["s"]
+        previous = self._marks.get(symbol)
+        next_funding_time = int(event["T"])
+        if previous is not None and next_funding_time > previous["next_funding_time"] > 0:
+            # The period just settled at the last rate streamed before the rollover
+            self._record_settlement(symbol, previous["next_funding_time"], previous["funding_rate"])
+        self._marks[symbol] = {
+            "mark_price": float(event["p"]),
+            "index_price": float(event.get("i") or 0),
+            "funding_rate": float(event.get("r") or 0),
+            "next_funding_time": next_funding_time,
+            "event_time": int(event["E"]),
+            "received": time.time(),
+        }
+
+    # ========== Funding history ==========
+
+    def _record_settlement(self, symbol: str, funding_time: int, rate: float):
+        try:
+            if self._archive.append(symbol, [(funding_time, rate)]):
+                self._summarize(symbol)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to archive {symbol} funding: {e}")
+
+    def _summarize(self, symbol: str):
+        """Refresh the cached history summary from the archive (a few KB per symbol)"""
+        times, rates = self._archive.read(symbol)
+        if not len(times):
+            self._history.pop(symbol, None)
+            return
+        last_time = int(times[-1])
+        recent_24h = rates[times > last_time - DAY_MS]
+        recent_7d = rates[times > last_time - 7 * DAY_MS]
+        self._history[symbol] = {
+            "count": len(times),
+            "last_rate": float(rates[-1]),
+            "avg_24h": float(recent_24h.mean()),
+            "avg_7d": float(recent_7d.mean()),
+            "interval_ms": int(times[-1] - times[-2]) if len(times) > 1 else DEFAULT_FUNDING_INTERVAL_MS,
+        }
+
+    async def _backfill(self):
+        """Bring each symbol's funding history up to date"""
+        from data.backfill import FundingBackfiller
+        backfiller = FundingBackfiller(self._aster_client, self._archive)
+        start_time = int(time.time() * 1000) - config.data.funding_history_days * DAY_MS
+        for symbol in sorted(self._symbols):
+            try:
+                await backfiller.backfill(symbol, start_time)
+                self._summarize(symbol)
+            except Exception as e:
+                logger.warning(f"⚠️ Funding backfill failed for {symbol}: {e}")
@@ -0,0 +1,330 @@
+"""
+Market Stream Hub
+One upstream combined-stream connection for the whole process: streams are subscribed
+once (reference counted) and every frame is decoded once, then fanned out to any
+number of subscribers through bounded drop-oldest queues
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import websockets
+from loguru import logger
+
+from api.http_pool import loads
+from config.config import config
+
+
+# Pseudo stream pushed to every subscriber after each (re)connect; payload {"reconnect": bool}.
+# Consumers that keep derived state (candles, books) resync on reconnect=True.
+CONNECTED = "@connected"
+
+MAX_STREAMS_PER_CONNECTION = 200  # Exchange limit
+CONTROL_MESSAGE_INTERVAL = 0.25  # Seconds between SUBSCRIBE/UNSUBSCRIBE frames (limit: 10 messages/s)
+
+
+class StreamClosed(Exception):
+    """Raised by StreamSubscription.get() once the subscription is closed"""
+
+
+class StreamSubscription:
+    """
+    One consumer's view of the hub: a bounded queue of (stream, payload) pairs
+
+    Lives on the event loop that created it (the dashboard's loop or the bots'); the
+    hub hands events over thread-safely. When the queue is full the oldest event is
+    dropped, so a slow consumer sees the newest data and never stalls the others.
+    Payloads are shared between subscribers and must be treated as read-only.
+    """
+
+    def __init__(self, hub: "MarketStreamHub", streams: Set[str], maxsize: int):
+        self.streams = frozenset(streams)
+        self.dropped = 0
+        self.closed = False
+        self._hub = hub
+        self._loop = asyncio.get_running_loop()
+        self._queue: deque = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+
+    def _push(self, stream: str, payload: Dict[str, Any]):
+        """Runs on the subscriber's loop"""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append((stream, payload))
+        self._ready.set()
+
+    async def get(self) -> Tuple[str, Dict[str, Any]]:
+        """Next (stream, payload), waiting if none is queued"""
+        while not self._queue:
+            if self.closed:
+                raise StreamClosed("Market stream subscription closed")
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+    def drain(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """All queued events without waiting"""
+        items = list(self._queue)
+        self._queue.clear()
+        return items
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[str, Dict[str, Any]]:
+        try:
+            return await self.get()
+        except StreamClosed:
+            raise StopAsyncIteration
+
+    def close(self):
+        """Stop receiving; streams nobody else uses are unsubscribed upstream"""
+        if not self.closed:
+            self.closed = True
+            self._hub.unsubscribe(self)
+            self._ready.set()
+
+
+class MarketStreamHub:
+    """
+    Singleton upstream market-data connection shared by bots and dashboard viewers
+
+    Upstream load is one connection and one subscription per stream name, however
+    many subscribers there are. The connection runs on the loop of the first
+    subscriber (or of start()); streams are added and removed with live
+    SUBSCRIBE / UNSUBSCRIBE frames, and it reconnects with backoff (the exchange
+    also drops every connection after 24 hours).
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()  # Subscribers come from the bots' loop and the dashboard thread
+        self._refcounts: Dict[str, int] = {}
+        self._by_stream: Dict[str, List[StreamSubscription]] = {}
+        self._subscribers: List[StreamSubscription] = []
+        self._latest: Dict[str, Dict[str, Any]] = {}  # Last payload per stream
+        self._active: Set[str] = set()  # Streams subscribed on the current connection
+        self._changed: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self._connections = 0
+        self._last_message: float = 0
+        self.frames = 0
+        self._initialized = True
+        logger.info("✅ MarketStreamHub initialized")
+
+    # ========== Subscriptions ==========
+
+    def subscribe(self, streams: Iterable[str], maxsize: Optional[int] = None) -> StreamSubscription:
+        """
+        Receive events for some streams (call from a running event loop)
+
+        Args:
+            streams: Stream names, e.g. "btcusdt@bookTicker", "btcusdt@kline_5m"
+            maxsize: Queue bound (default config.aster.stream_queue_size)
+
+        Returns:
+            StreamSubscription; iterate it or await get(), and close() when done
+        """
+        streams = {self._normalize(s) for s in streams}
+        subscription = StreamSubscription(self, streams, maxsize or config.aster.stream_queue_size)
+        with self._lock:
+            new = [s for s in streams if s not in self._refcounts]
+            if len(self._refcounts) + len(new) > MAX_STREAMS_PER_CONNECTION:
+                raise ValueError(f"Market stream limit reached ({MAX_STREAMS_PER_CONNECTION} streams per connection)")
+            for stream in streams:
+                self._refcounts[stream] = self._refcounts.get(stream, 0) + 1
+                self._by_stream.setdefault(stream, []).append(subscription)
+            self._subscribers.append(subscription)
+        self._ensure_running()
+        if new:
+            self._notify()
+        if self._connected:
+            subscription._push(CONNECTED, {"reconnect": False})
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription):
+        """Remove a subscriber (StreamSubscription.close() calls this)"""
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers.remove(subscription)
+            for stream in subscription.streams:
+                self._by_stream[stream].remove(subscription)
+                self._refcounts[stream] -= 1
+                if self._refcounts[stream] <= 0:
+                    del self._refcounts[stream]
+                    del self._by_stream[stream]
+                    self._latest.pop(stream, None)
+        self._notify()
+
+    def latest(self, stream: str) -> Optional[Dict[str, Any]]:
+        """Last payload received on a subscribed stream (no waiting)"""
+        return self._latest.get(self._normalize(stream))
+
+    @staticmethod
+    def _normalize(stream: str) -> str:
+        # Symbols are lower case in stream names; the rest (e.g. @bookTicker) is case sensitive
+        if stream.startswith("!"):
+            return stream
+        symbol, sep, rest = stream.partition("@")
+        return f"{symbol.lower()}{sep}{rest}"
+
+    # ========== Lifecycle ==========
+
+    async def start(self):
+        """Run the upstream connection on the current loop (otherwise the first subscriber's)"""
+        self._ensure_running()
+
+    async def stop(self):
+        """Close the upstream connection and end every subscription"""
+        task, self._task = self._task, None
+        if task:
+            if self._loop is asyncio.get_running_loop():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            else:
+                self._loop.call_soon_threadsafe(task.cancel)
+        for subscription in list(self._subscribers):
+            try:
+                subscription._loop.call_soon_threadsafe(subscription.close)
+            except RuntimeError:  # Subscriber's loop has closed
+                self.unsubscribe(subscription)
+        self._connected = False
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._task is not None and not self._task.done() and not self._loop.is_closed():
+                return
+            self._loop = asyncio.get_running_loop()
+            self._changed = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+
+    def _notify(self):
+        """Wake the connection task to sync subscriptions (thread-safe)"""
+        loop, changed = self._loop, self._changed
+        if loop is None or changed is None or loop.is_closed():
+            return
+        if loop is asyncio.get_running_loop():
+            changed.set()
+        else:
+            loop.call_soon_threadsafe(changed.set)
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def get_status(self) -> Dict[str, Any]:
+        """Upstream and fan-out metrics for logging and the dashboard"""
+        with self._lock:
+            return {
+                "connected": self._connected,
+                "connections": self._connections,
+                "streams": len(self._refcounts),
+                "subscribers": len(self._subscribers),
+                "frames": self.frames,
+                "last_message_age": round(time.time() - self._last_message, 1) if self._last_message else None,
+                "dropped": sum(s.dropped for s in self._subscribers),
+            }
+
+    # ========== Upstream ==========
+
+    async def _run(self):
+        """Connect while anything is subscribed, reconnecting with backoff"""
+        backoff = 1
+        while True:
+            if not self._refcounts:
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+            with self._lock:
+                initial = sorted(self._refcounts)
+            url = f"{config.aster.stream_url}/stream?streams={'/'.join(initial)}"
+            try:
+                async with websockets.connect(url, ping_interval=300, ping_timeout=60, max_queue=None) as ws:
+                    self._active = set(initial)
+                    self._connected = True
+                    self._connections += 1
+                    backoff = 1
+                    logger.info(f"✅ Market stream connected ({len(initial)} streams)")
+                    self._broadcast(CONNECTED, {"reconnect": self._connections > 1})
+
+                    sync = asyncio.create_task(self._sync_loop(ws))
+                    try:
+                        async for message in ws:
+                            self._dispatch(message)
+                    finally:
+                        sync.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Market stream disconnected: {e}. Reconnecting in {backoff}s...")
+            finally:
+                self._connected = False
+                self._active = set()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    async def _sync_loop(self, ws):
+        """Send SUBSCRIBE / UNSUBSCRIBE frames when the wanted set changes"""
+        request_id = 0
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            with self._lock:
+                wanted = set(self._refcounts)
+            for method, params in (("SUBSCRIBE", wanted - self._active), ("UNSUBSCRIBE", self._active - wanted)):
+                if params:
+                    request_id += 1
+                    await ws.send(json.dumps({"method": method, "params": sorted(params), "id": request_id}))
+                    logger.debug(f"Market stream {method.lower()}: {sorted(params)}")
+                    await asyncio.sleep(CONTROL_MESSAGE_INTERVAL)
+            self._active = wanted
+
+    def _dispatch(self, message):
+        """Decode one frame and hand it to every subscriber of its stream"""
+        self._last_message = time.time()
+        frame = loads(message)
+        stream = frame.get("stream") if isinstance(frame, dict) else None
+        if stream is None:
+            return  # SUBSCRIBE acknowledgement ({"result": null, "id": n})
+        payload = frame.get("data")
+        self.frames += 1
+        self._latest[stream] = payload
+        with self._lock:
+            subscribers = list(self._by_stream.get(stream, ()))
+        for subscription in subscribers:
+            self._deliver(subscription, stream, payload)
+
+    def _broadcast(self, stream: str, payload: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            self._deliver(subscription, stream, payload)
+
+    def _deliver(self, subscription: StreamSubscription, stream: str, payload: Dict[str, Any]):
+        if subscription._loop is self._loop:
+            subscription._push(stream, payload)
+            return
+        try:
+            subscription._loop.call_soon_threadsafe(subscription._push, stream, payload)
+        except RuntimeError:  # Subscriber's loop has closed
+            self.unsubscribe(subscription)
+
@@ -0,0 +1,400 @@
+"""
+Order Book
+Local L2 books kept in sync from a /fapi/v1/depth snapshot plus <symbol>@depth@100ms
+diff events on the shared MarketStreamHub, so bots can read depth without REST calls
+"""
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+from loguru import logger
+
+from config.config import config
+from utils.market_stream import CONNECTED, MarketStreamHub
+
+
+DEPTH_QUEUE_SIZE = 10_000  # Diff events buffered per book before the oldest are dropped (forces a resync)
+
+
+class BookSide:
+    """
+    One side of a book: price levels in a sorted array plus a price -> quantity map
+
+    Prices are stored as sort keys (negated for bids) so index 0 is always the best
+    level. Finding a level is O(log n); inserting or removing one shifts the array,
+    which is a memmove over at most a few thousand floats.
+    """
+
+    def __init__(self, descending: bool):
+        self._sign = -1.0 if descending else 1.0
+        self._keys: List[float] = []
+        self._quantities: Dict[float, float] = {}
+
+    def clear(self):
+        self._keys.clear()
+        self._quantities.clear()
+
+    def set(self, price: float, quantity: float):
+        """Set a level's quantity (0 removes it)"""
+        key = price * self._sign
+        if quantity == 0:
+            if self._quantities.pop(key, None) is not None:
+                del self._keys[bisect_left(self._keys, key)]
+        else:
+            if key not in self._quantities:
+                self._keys.insert(bisect_left(self._keys, key), key)
+            self._quantities[key] = quantity
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        """(price, quantity) of the best level, or None if empty"""
+        if not self._keys:
+            return None
+        key = self._keys[0]
+        return key * self._sign, self._quantities[key]
+
+    def levels(self, limit: Optional[int] = None) -> List[Tuple[float, float]]:
+        """(price, quantity) pairs, best first"""
+        keys = self._keys if limit is None else self._keys[:limit]
+        return [(key * self._sign, self._quantities[key]) for key in keys]
+
+    def notional_within(self, bound: float) -> float:
+        """Quote notional of the levels at or better than a price bound"""
+        end = bisect_right(self._keys, bound * self._sign)
+        return sum(key * self._sign * self._quantities[key] for key in self._keys[:end])
+
+    def walk(self, notional: float) -> Tuple[float, float]:
+        """
+        Take liquidity from the best level outward
+
+        Returns:
+            (base quantity filled, quote notional filled), capped at the book's depth
+        """
+        filled_qty = filled_notional = 0.0
+        for key in self._keys:
+            price, quantity = key * self._sign, self._quantities[key]
+            take = min(quantity, (notional - filled_notional) / price)
+            filled_qty += take
+            filled_notional += take * price
+            if filled_notional >= notional - 1e-9:
+                break
+        return filled_qty, filled_notional
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class OrderBook:
+    """
+    L2 book for one symbol, synced with the exchange's diff-depth rules
+
+    load_snapshot() seeds it from REST; apply() then takes depthUpdate events and
+    returns False on any sequence gap, after which the caller must resync.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id: Optional[int] = None  # u of the last applied event (lastUpdateId after a snapshot)
+        self.synced = False
+        self.updated_at: float = 0
+        self._primed = False  # First event after the snapshot has been applied
+
+    def reset(self):
+        """Forget all levels (until the next snapshot)"""
+        self.bids.clear()
+        self.asks.clear()
+        self.last_update_id = None
+        self.synced = False
+        self._primed = False
+
+    def load_snapshot(self, snapshot: Dict[str, Any]):
+        """Seed the book from a GET /fapi/v1/depth response"""
+        self.reset()
+        for price, quantity in snapshot.get("bids", []):
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in snapshot.get("asks", []):
+            self.asks.set(float(price), float(quantity))
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        self.synced = True
+        self.updated_at = time.time()
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """
+        Apply one depthUpdate event
+
+        Returns:
+            False if the event doesn't follow on from the book (resync needed)
+        """
+        if not self.synced:
+            return False
+        first, final = int(event["U"]), int(event["u"])
+        if not self._primed:
+            if final < self.last_update_id:
+                return True  # Already contained in the snapshot
+            if first > self.last_update_id:
+                return False  # Events between the snapshot and this one were missed
+            self._primed = True
+        elif int(event["pu"]) != self.last_update_id:
+            return False
+
+        for price, quantity in event.get("b", []):
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in event.get("a", []):
+            self.asks.set(float(price), float(quantity))
+        self.last_update_id = final
+        self.updated_at = time.time()
+        return True
+
+    # ========== Queries ==========
+
+    def best_bid(self) -> Optional[float]:
+        best = self.bids.best()
+        return best[0] if best else None
+
+    def best_ask(self) -> Optional[float]:
+        best = self.asks.best()
+        return best[0] if best else None
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def spread_bps(self) -> Optional[float]:
+        mid = self.mid()
+        return self.spread() / mid * 10_000 if mid else None
+
+    def depth(self, side: str, bps: float) -> float:
+        """
+        Quote notional resting within some basis points of mid
+
+        Args:
+            side: "BUY" (asks a buy would take) or "SELL" (bids a sell would take)
+            bps: Distance from mid in basis points
+
+        Returns:
+            Notional in quote currency (0 if the book is empty)
+        """
+        mid = self.mid()
+        if mid is None:
+            return 0.0
+        if side.upper() == "BUY":
+            return self.asks.notional_within(mid * (1 + bps / 10_000))
+        return self.bids.notional_within(mid * (1 - bps / 10_000))
+
+    def imbalance(self, bps: float = 10.0) -> Optional[float]:
+        """
+        Bid/ask notional imbalance within some basis points of mid
+
+        Returns:
+            (bids - asks) / (bids + asks) in [-1, 1]; positive means more bids, or None if empty
+        """
+        bids, asks = self.depth("SELL", bps), self.depth("BUY", bps)
+        total = bids + asks
+        return (bids - asks) / total if total else None
+
+    def estimate_fill(self, side: str, notional: float) -> Optional[Dict[str, float]]:
+        """
+        Estimate a market order's fill by walking the book
+
+        Args:
+            side: "BUY" or "SELL"
+            notional: Order size in quote currency
+
+        Returns:
+            Dictionary with avg_price, slippage_bps (average price vs mid, so it includes
+            half the spread) and filled_notional (less than requested if the book is too
+            thin), or None if the book is empty
+        """
+        mid = self.mid()
+        if mid is None or notional <= 0:
+            return None
+        buying = side.upper() == "BUY"
+        quantity, filled = (self.asks if buying else self.bids).walk(notional)
+        if quantity == 0:
+            return None
+        avg_price = filled / quantity
+        slippage = (avg_price - mid) / mid if buying else (mid - avg_price) / mid
+        return {
+            "avg_price": avg_price,
+            "slippage_bps": slippage * 10_000,
+            "filled_notional": filled,
+        }
+
+    def snapshot(self, levels: int = 10) -> Dict[str, Any]:
+        """Top of book for logging and the dashboard"""
+        return {
+            "symbol": self.symbol,
+            "bids": self.bids.levels(levels),
+            "asks": self.asks.levels(levels),
+            "spread_bps": self.spread_bps(),
+            "imbalance": self.imbalance(),
+            "last_update_id": self.last_update_id,
+            "age": round(time.time() - self.updated_at, 1) if self.updated_at else None,
+        }
+
+
+class OrderBookManager:
+    """
+    Singleton set of order books shared across all bots
+
+    One depth diff stream per symbol via the MarketStreamHub; a REST snapshot is only
+    fetched at start, after a reconnect, or when a sequence gap is detected.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._books: Dict[str, OrderBook] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._aster_client = None
+        self._hub = MarketStreamHub()
+        self._running = False
+        self._stale_after: float = 30  # Seconds without depth updates before a book is not served
+        self.resyncs = 0
+        self._initialized = True
+        logger.info("✅ OrderBookManager initialized")
+
+    def set_client(self, client):
+        """Set the Aster client used for depth snapshots"""
+        self._aster_client = client
+
+    def subscribe(self, symbol: str):
+        """Register a symbol to keep a book for (streams once start() runs)"""
+        symbol = symbol.upper()
+        if symbol not in self._books:
+            self._books[symbol] = OrderBook(symbol)
+            if self._running:
+                self._tasks[symbol] = asyncio.create_task(self._sync_loop(self._books[symbol]))
+
+    async def start(self):
+        """Start syncing every subscribed book in the background"""
+        if self._running or not config.aster.order_book_enabled:
+            return
+        if not self._aster_client:
+            logger.error("❌ No Aster client set for OrderBookManager")
+            return
+
+        self._running = True
+        for symbol, book in self._books.items():
+            self._tasks[symbol] = asyncio.create_task(self._sync_loop(book))
+        logger.success(f"📚 Order books started for {len(self._books)} symbols")
+
+    async def stop(self):
+        """Stop every sync task"""
+        self._running = False
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for book in self._books.values():
+            book.reset()
+
+    def get(self, symbol: str) -> Optional[OrderBook]:
+        """
+        Book for a symbol if it is synced and live (no HTTP calls)
+
+        Returns:
+            OrderBook, or None if the symbol isn't tracked or the book may be stale
+        """
+        book = self._books.get(symbol.upper())
+        if book is None or not book.synced or not self._hub.connected:
+            return None
+        if time.time() - book.updated_at > self._stale_after:
+            return None
+        return book
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-book sync state for logging and the dashboard"""
+        return {
+            "running": self._running,
+            "resyncs": self.resyncs,
+            "books": {
+                symbol: {
+                    "synced": book.synced,
+                    "levels": [len(book.bids), len(book.asks)],
+                    "spread_bps": book.spread_bps(),
+                    "age": round(time.time() - book.updated_at, 1) if book.updated_at else None,
+                }
+                for symbol, book in self._books.items()
+            },
+        }
+
+    async def _sync_loop(self, book: OrderBook):
+        """
+        Keep one book in sync (Aster's "how to manage a local order book" procedure)
+
+        Diff events are buffered while a snapshot is in flight, then replayed on top of
+        it; a dropped or out-of-order event starts the procedure again.
+        """
+        subscription = self._hub.subscribe([f"{book.symbol.lower()}@depth@100ms"], maxsize=DEPTH_QUEUE_SIZE)
+        buffered: List[Dict[str, Any]] = []
+        fetch: Optional[asyncio.Task] = None
+        try:
+            async for stream, event in subscription:
+                if stream == CONNECTED:
+                    # Events were missed while disconnected
+                    book.reset()
+                    buffered.clear()
+                    continue
+                if event.get("e") != "depthUpdate":
+                    continue
+
+                if book.synced:
+                    if book.apply(event):
+                        continue
+                    logger.warning(f"⚠️ Gap in {book.symbol} depth stream, resyncing")
+                    book.reset()
+                    self.resyncs += 1
+
+                buffered.append(event)
+                if fetch is None:
+                    fetch = asyncio.create_task(self._fetch_snapshot(book.symbol))
+                if not fetch.done():
+                    continue
+                snapshot, fetch = fetch.result(), None
+                if snapshot is None:
+                    buffered.clear()
+                    continue
+                book.load_snapshot(snapshot)
+                if not all(book.apply(e) for e in buffered):
+                    # Snapshot older than the buffered events - fetch another
+                    book.reset()
+                    buffered = buffered[-1:]
+                else:
+                    buffered.clear()
+                    logger.debug(f"📚 {book.symbol} book synced at update {book.last_update_id}")
+        finally:
+            if fetch is not None:
+                fetch.cancel()
+            subscription.close()
+            book.reset()
+
+    async def _fetch_snapshot(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Depth snapshot, or None after a failure (logged, retried with the next events)"""
+        try:
+            return await self._aster_client.get_orderbook(symbol, limit=config.aster.order_book_snapshot_limit)
+        except Exception as e:
+            logger.error(f"❌ Failed to fetch {symbol} depth snapshot: {e}")
+            await asyncio.sleep(1)
+            return None
@@ -0,0 +1,241 @@
+"""
+Write-Behind Persistence
+One background thread that performs journal writes for every bot, so trading
+cycles only enqueue records and never wait on the filesystem
+"""
+import atexit
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from loguru import logger
+
+from config.config import config
+
+
+class _Pending:
+    """Coalesced writes waiting for one journal"""
+    __slots__ = ("replace", "lines", "ops", "since")
+
+    def __init__(self):
+        self.replace: Optional[List[Dict[str, Any]]] = None  # Full rewrite, applied before lines
+        self.lines: List[str] = []  # Serialized records to append
+        self.ops = 0  # Submissions folded into this entry
+        self.since = time.monotonic()
+
+
+class PersistenceWorker:
+    """
+    Singleton write-behind queue shared across all bots
+
+    Journals submit serialized lines or full rewrites; the worker thread writes
+    them on size (config.data.persistence_flush_size records) or time
+    (config.data.persistence_flush_interval seconds). Updates to the same file
+    are coalesced: all pending lines go out in one write and one fsync, and a
+    rewrite supersedes whatever was queued for that file before it. stop()
+    (also registered with atexit) drains the queue before returning.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._cond = threading.Condition()
+        self._pending: Dict[Any, _Pending] = {}  # Journal -> coalesced writes, in submission order
+        self._pending_records = 0
+        self._submitted = 0
+        self._completed = 0
+        self._flush_requested = False
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._atexit_registered = False
+
+        # Metrics
+        self._flushes = 0
+        self._records_written = 0
+        self._errors = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._max_depth = 0
+        self._journals: Dict[str, Dict[str, Any]] = {}  # Path -> per-file counters
+
+        self._initialized = True
+        logger.info("✅ PersistenceWorker initialized")
+
+    # ========== Submitting ==========
+
+    def append(self, journal, line: str):
+        """
+        Queue one serialized record to be appended to a journal
+
+        Args:
+            journal: JsonlJournal the line belongs to
+            line: JSON text including the trailing newline
+        """
+        with self._cond:
+            pending = self._entry(journal)
+            pending.lines.append(line)
+            self._enqueued(pending)
+
+    def replace(self, journal, records: List[Dict[str, Any]]):
+        """
+        Queue a full rewrite of a journal (drops writes still queued for it)
+
+        Args:
+            journal: JsonlJournal to rewrite
+            records: Records the file should hold (serialized on the worker thread,
+                so they must not be mutated afterwards)
+        """
+        with self._cond:
+            pending = self._entry(journal)
+            self._pending_records -= len(pending.lines)
+            pending.replace = records
+            pending.lines = []
+            self._enqueued(pending)
+
+    def _entry(self, journal) -> _Pending:
+        if not self._running:
+            self._start()
+        pending = self._pending.get(journal)
+        if pending is None:
+            pending = self._pending[journal] = _Pending()
+        return pending
+
+    def _enqueued(self, pending: _Pending):
+        pending.ops += 1
+        self._submitted += 1
+        self._pending_records += 1
+        self._max_depth = max(self._max_depth, self._pending_records)
+        if self._pending_records >= config.data.persistence_flush_size:
+            self._cond.notify_all()
+
+    # ========== Lifecycle ==========
+
+    def _start(self):
+        """Start the writer thread (called with the lock held on first use)"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="persistence-worker", daemon=True)
+        self._thread.start()
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Block until everything submitted so far is on disk
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue drained in time
+        """
+        with self._cond:
+            if not self._running:
+                return not self._pending
+            target = self._submitted
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._completed >= target, timeout)
+
+    def stop(self, timeout: float = 10.0):
+        """Drain the queue and stop the writer thread (and flush loguru's queued sinks)"""
+        with self._cond:
+            thread = self._thread
+            self._running = False
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"⚠️ Persistence worker still writing after {timeout}s ({self._pending_records} records queued)")
+        self._thread = None
+        logger.complete()
+
+    # ========== Writer thread ==========
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._flush_requested and not self._due():
+                    self._cond.wait(self._wait_time())
+                batch, self._pending = self._pending, {}
+                self._pending_records = 0
+                self._flush_requested = False
+                if not batch:
+                    self._cond.notify_all()
+                    if not self._running:
+                        return
+                    continue
+
+            started = time.perf_counter()
+            results = [(journal.path, self._write(journal, pending)) for journal, pending in batch.items()]
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            with self._cond:
+                records = 0
+                for path, written in results:
+                    stats = self._journals.setdefault(path, {"records": 0, "flushes": 0, "errors": 0})
+                    if written is None:
+                        self._errors += 1
+                        stats["errors"] += 1
+                        continue
+                    records += written
+                    stats["records"] += written
+                    stats["flushes"] += 1
+                self._completed += sum(pending.ops for pending in batch.values())
+                self._flushes += 1
+                self._records_written += records
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+                self._cond.notify_all()
+
+    def _due(self) -> bool:
+        if self._pending_records >= config.data.persistence_flush_size:
+            return True
+        oldest = min((pending.since for pending in self._pending.values()), default=None)
+        return oldest is not None and time.monotonic() - oldest >= config.data.persistence_flush_interval
+
+    def _wait_time(self) -> Optional[float]:
+        oldest = min((pending.since for pending in self._pending.values()), default=None)
+        if oldest is None:
+            return None
+        return max(oldest + config.data.persistence_flush_interval - time.monotonic(), 0.0)
+
+    def _write(self, journal, pending: _Pending) -> Optional[int]:
+        """Apply one journal's coalesced writes; returns records written (None on error)"""
+        try:
+            if pending.replace is not None:
+                journal._replace_now(pending.replace)
+            if pending.lines:
+                journal._write_now(pending.lines)
+        except Exception as e:
+            logger.error(f"Error writing {journal.path}: {e}")
+            return None
+        return len(pending.lines) + (len(pending.replace) if pending.replace is not None else 0)
+
+    # ========== Metrics ==========
+
+    def get_status(self) -> Dict[str, Any]:
+        """Queue depth, flush latency and per-file counters for logging and the dashboard"""
+        with self._cond:
+            return {
+                "running": self._running,
+                "queue_depth": self._pending_records,
+                "max_queue_depth": self._max_depth,
+                "files_pending": len(self._pending),
+                "flushes": self._flushes,
+                "records_written": self._records_written,
+                "errors": self._errors,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "avg_flush_ms": round(self._total_flush_ms / self._flushes, 3) if self._flushes else 0.0,
+                "max_flush_ms": round(self._max_flush_ms, 3),
+                "journals": {path: dict(stats) for path, stats in self._journals.items()},
+            }
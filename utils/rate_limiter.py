@@ -0,0 +1,431 @@
+"""
+Exchange Rate Limiter
+Process-wide token buckets for Aster's REQUEST_WEIGHT and ORDERS limits, shared by
+every AsterClient so that bots, the kline store and the dashboard draw on one budget
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import re
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from config.config import config
+
+
+class Priority(IntEnum):
+    """Scheduling class of a request - lower values are served first"""
+    ORDER = 0        # Entries, exits and cancels
+    PROTECTIVE = 1   # Stop loss / take profit placement
+    ACCOUNT = 2      # Balance, positions, open orders, leverage, listenKey
+    MARKET_DATA = 3  # Klines, tickers, depth for trading decisions
+    DASHBOARD = 4    # Anything a browser asked for
+
+
+# Request weight per endpoint (path after /fapi/vN/), from the Aster API docs.
+# Endpoints priced by `limit` or by the presence of `symbol` are handled in request_weight()
+ENDPOINT_WEIGHTS = {
+    ("GET", "exchangeInfo"): 1,
+    ("GET", "trades"): 1,
+    ("GET", "historicalTrades"): 20,
+    ("GET", "aggTrades"): 20,
+    ("GET", "premiumIndex"): 1,
+    ("GET", "fundingRate"): 1,
+    ("GET", "order"): 1,
+    ("GET", "allOrders"): 5,
+    ("GET", "balance"): 5,
+    ("GET", "account"): 5,
+    ("GET", "positionRisk"): 5,
+    ("GET", "userTrades"): 5,
+    ("GET", "income"): 30,
+    ("POST", "order"): 1,
+    ("POST", "batchOrders"): 5,
+    ("POST", "leverage"): 1,
+    ("GET", "leverageBracket"): 1,
+    ("DELETE", "order"): 1,
+    ("DELETE", "batchOrders"): 1,
+    ("DELETE", "allOpenOrders"): 1,
+}
+
+# (weight with symbol, weight without symbol)
+SYMBOL_OPTIONAL_WEIGHTS = {
+    "ticker/24hr": (1, 40),
+    "ticker/price": (1, 2),
+    "ticker/bookTicker": (1, 2),
+    "openOrders": (1, 40),
+}
+
+ORDER_ENDPOINTS = {"order", "batchOrders", "allOpenOrders"}
+
+INTERVAL_SECONDS = {"S": 1, "M": 60, "H": 3600, "D": 86400}
+
+# X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-1M
+_USAGE_HEADER = re.compile(r"^x-mbx-(used-weight|order-count)-(\d+)([smhd])$", re.IGNORECASE)
+
+
+def route_of(endpoint: str) -> str:
+    """Route name of an endpoint path ("/fapi/v3/openOrders" -> "openOrders")"""
+    parts = endpoint.strip("/").split("/", 2)
+    return parts[2] if len(parts) == 3 else endpoint.strip("/")
+
+
+def _kline_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def _depth_weight(limit: int) -> int:
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def request_weight(method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """
+    REQUEST_WEIGHT cost of one call
+
+    Args:
+        method: HTTP method
+        endpoint: API path, e.g. "/fapi/v1/klines"
+        params: Request parameters (limit and symbol change some weights)
+
+    Returns:
+        Weight the exchange will charge (1 for endpoints not in the table)
+    """
+    params = params or {}
+    route = route_of(endpoint)
+    if route in ("klines", "indexPriceKlines", "markPriceKlines"):
+        return _kline_weight(int(params.get("limit") or 500))
+    if route == "depth":
+        return _depth_weight(int(params.get("limit") or 500))
+    if route in SYMBOL_OPTIONAL_WEIGHTS and method == "GET":
+        with_symbol, without_symbol = SYMBOL_OPTIONAL_WEIGHTS[route]
+        return with_symbol if params.get("symbol") else without_symbol
+    return ENDPOINT_WEIGHTS.get((method, route), 1)
+
+
+def order_count(method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """Number of orders a call adds to the ORDERS limit (new orders only)"""
+    if method != "POST":
+        return 0
+    route = route_of(endpoint)
+    if route == "order":
+        return 1
+    if route == "batchOrders":
+        batch = (params or {}).get("batchOrders") or []
+        if isinstance(batch, str):  # Pre-serialized JSON array
+            batch = json.loads(batch)
+        return len(batch) or 1
+    return 0
+
+
+def default_priority(method: str, endpoint: str, signed: bool) -> Priority:
+    """Scheduling class for a call when the caller didn't pick one"""
+    if method in ("POST", "DELETE") and route_of(endpoint) in ORDER_ENDPOINTS:
+        return Priority.ORDER
+    return Priority.ACCOUNT if signed else Priority.MARKET_DATA
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "weight", "orders", "loop", "future")
+
+    def __init__(self, priority: int, seq: int, weight: float, orders: int, loop: asyncio.AbstractEventLoop):
+        self.priority = priority
+        self.seq = seq
+        self.weight = weight
+        self.orders = orders
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RateLimiter:
+    """
+    Singleton pair of token buckets (request weight, order count) with priority queueing
+
+    Each bucket holds `budget` x the exchange's per-minute limit and refills at
+    limit/60 per second. Requests wait in one queue ordered by Priority (FIFO within
+    a class), so a queued order is never stuck behind market data. Market data and
+    dashboard requests also leave a reserve untouched so orders can go out at once.
+
+    The exchange's own view comes back on every response (X-MBX-USED-WEIGHT-1M,
+    X-MBX-ORDER-COUNT-1M); the buckets are clamped to it, which accounts for traffic
+    from other processes on the same IP. A 429/418 stops all requests until the
+    back-off has passed.
+
+    Thread-safe: the dashboard API runs its own event loop in a separate thread and
+    shares the buckets with the bots.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.enabled = config.aster.rate_limit_enabled
+        self._lock = threading.Lock()
+        self._weight_limit = 0
+        self._order_limit = 0
+        self._weight_tokens: Optional[float] = None
+        self._order_tokens: Optional[float] = None
+        self.configure(config.aster.weight_limit_per_minute, config.aster.order_limit_per_minute)
+        self._weight_tokens = self._weight_capacity
+        self._order_tokens = self._order_capacity
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+
+        # Last values the exchange reported, for status/logging
+        self.used_weight: Optional[int] = None
+        self.order_count: Optional[int] = None
+        self.waits = 0
+        self.wait_time = 0.0
+        self._initialized = True
+        logger.info(f"✅ RateLimiter initialized ({self._weight_capacity:.0f} weight / "
+                    f"{self._order_capacity:.0f} orders per minute)")
+
+    def configure(self, weight_limit: int, order_limit: int):
+        """
+        Set the exchange limits (per minute) the buckets are sized from
+
+        Args:
+            weight_limit: REQUEST_WEIGHT limit per minute
+            order_limit: ORDERS limit per minute
+        """
+        with self._lock:
+            budget = config.aster.rate_limit_budget
+            self._weight_limit = weight_limit
+            self._order_limit = order_limit
+            self._weight_capacity = weight_limit * budget
+            self._order_capacity = order_limit * budget
+            self._weight_rate = self._weight_capacity / 60
+            self._order_rate = self._order_capacity / 60
+            self._reserve = self._weight_capacity * config.aster.rate_limit_reserve
+            if self._weight_tokens is not None:
+                self._weight_tokens = min(self._weight_tokens, self._weight_capacity)
+                self._order_tokens = min(self._order_tokens, self._order_capacity)
+
+    def configure_from_exchange_info(self, exchange_info: Dict[str, Any]):
+        """Pick up the per-minute limits from an /exchangeInfo response"""
+        limits = {
+            item.get("rateLimitType"): item.get("limit", 0) * 60 / (
+                INTERVAL_SECONDS.get(str(item.get("interval", "MINUTE"))[0], 60) * item.get("intervalNum", 1)
+            )
+            for item in exchange_info.get("rateLimits", [])
+        }
+        weight = int(limits.get("REQUEST_WEIGHT") or self._weight_limit)
+        orders = int(limits.get("ORDERS") or self._order_limit)
+        if (weight, orders) != (self._weight_limit, self._order_limit):
+            logger.info(f"⚖️ Exchange rate limits: {weight} weight / {orders} orders per minute")
+            self.configure(weight, orders)
+
+    # ----- internals (call with self._lock held) -----
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        if elapsed > 0:
+            self._weight_tokens = min(self._weight_capacity, self._weight_tokens + elapsed * self._weight_rate)
+            self._order_tokens = min(self._order_capacity, self._order_tokens + elapsed * self._order_rate)
+            self._refilled_at = now
+
+    def _delay(self, priority: int, weight: float, orders: int, now: float) -> float:
+        """Seconds until a request can go out (0 = now)"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        # Each class below ACCOUNT keeps one more reserve's worth of weight untouched
+        floor = self._reserve * max(0, priority - Priority.ACCOUNT)
+        weight = min(weight, self._weight_capacity - floor)
+        return max(
+            0.0,
+            (weight + floor - self._weight_tokens) / self._weight_rate,
+            (orders - self._order_tokens) / self._order_rate if orders else 0.0
+        )
+
+    def _take(self, weight: float, orders: int):
+        self._weight_tokens -= weight
+        self._order_tokens -= orders
+
+    def _head(self) -> Optional[_Waiter]:
+        while self._queue and self._queue[0].future.cancelled():
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def _dispatch(self, now: float) -> Optional[float]:
+        """
+        Grant queued requests in priority order until the head has to wait
+
+        Returns:
+            Seconds until the head can go, or None if the queue is empty
+        """
+        self._refill(now)
+        while (head := self._head()) is not None:
+            delay = self._delay(head.priority, head.weight, head.orders, now)
+            if delay > 0:
+                return delay
+            heapq.heappop(self._queue)
+            self._take(head.weight, head.orders)
+            try:
+                head.loop.call_soon_threadsafe(self._resolve, head)
+            except RuntimeError:  # Waiter's event loop already closed
+                self._take(-head.weight, -head.orders)
+        return None
+
+    def _resolve(self, waiter: _Waiter):
+        """Wake a granted waiter on its own event loop"""
+        if waiter.future.done():
+            # Caller gave up before the grant arrived: hand the tokens back
+            with self._lock:
+                self._take(-waiter.weight, -waiter.orders)
+        else:
+            waiter.future.set_result(None)
+
+    # ----- public API -----
+
+    async def acquire(self, weight: int = 1, priority: Priority = Priority.MARKET_DATA, orders: int = 0) -> float:
+        """
+        Wait until a request may be sent and charge it to the buckets
+
+        Args:
+            weight: REQUEST_WEIGHT of the request
+            priority: Scheduling class
+            orders: New orders the request places
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+        start = time.monotonic()
+        with self._lock:
+            self._refill(start)
+            if self._head() is None and self._delay(priority, weight, orders, start) == 0:
+                self._take(weight, orders)
+                return 0.0
+            waiter = _Waiter(int(priority), next(self._seq), weight, orders, asyncio.get_running_loop())
+            heapq.heappush(self._queue, waiter)
+            delay = self._dispatch(start)
+
+        try:
+            while not waiter.future.done():
+                try:
+                    # Every waiter wakes when the head is due and re-runs the queue; a grant
+                    # made from another thread wakes us through the future
+                    await asyncio.wait_for(asyncio.shield(waiter.future), delay)
+                except asyncio.TimeoutError:
+                    with self._lock:
+                        delay = self._dispatch(time.monotonic())
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the caller gave up: hand the tokens back
+                with self._lock:
+                    self._take(-weight, -orders)
+            waiter.future.cancel()
+            with self._lock:
+                self._dispatch(time.monotonic())
+            raise
+
+        waited = time.monotonic() - start
+        self.waits += 1
+        self.wait_time += waited
+        if waited > 1:
+            logger.debug(f"⏳ {Priority(priority).name} request held {waited:.1f}s by rate limiter")
+        return waited
+
+    def update_from_headers(self, headers):
+        """
+        Clamp the buckets to the usage the exchange reports
+
+        Args:
+            headers: Response headers (X-MBX-USED-WEIGHT-<n><unit>, X-MBX-ORDER-COUNT-<n><unit>)
+        """
+        for name, value in headers.items():
+            match = _USAGE_HEADER.match(name)
+            if not match:
+                continue
+            kind, num, unit = match.groups()
+            # Buckets model the per-minute limits; other windows aren't tracked
+            if int(num) * INTERVAL_SECONDS[unit.upper()] != 60:
+                continue
+            try:
+                used = int(value)
+            except (TypeError, ValueError):
+                continue
+            with self._lock:
+                self._refill(time.monotonic())
+                if kind.lower() == "used-weight":
+                    self.used_weight = used
+                    self._weight_tokens = min(self._weight_tokens, self._weight_capacity - used)
+                else:
+                    self.order_count = used
+                    self._order_tokens = min(self._order_tokens, self._order_capacity - used)
+
+    def back_off(self, status: int, retry_after: Optional[float] = None):
+        """
+        Stop sending after a 429 (rate limited) or 418 (IP banned)
+
+        Args:
+            status: HTTP status code
+            retry_after: Seconds from the Retry-After header, if present
+        """
+        if retry_after is None:
+            # 429: wait for the exchange's minute window to roll over; 418: shortest ban
+            retry_after = 120.0 if status == 418 else 61 - time.time() % 60
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._weight_tokens = min(self._weight_tokens, 0.0)
+            self._refilled_at = self._blocked_until
+        level = "IP banned" if status == 418 else "rate limited"
+        logger.warning(f"🛑 Exchange {level} ({status}) - pausing all requests for {retry_after:.0f}s")
+
+    def is_constrained(self, priority: Priority = Priority.DASHBOARD, weight: int = 1) -> bool:
+        """True if a request of this class would have to queue right now"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return self._head() is not None or self._delay(priority, weight, 0, now) > 0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot of the buckets for logging and the dashboard"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "weight_available": round(self._weight_tokens, 1),
+                "weight_capacity": self._weight_capacity,
+                "orders_available": round(self._order_tokens, 1),
+                "orders_capacity": self._order_capacity,
+                "exchange_used_weight": self.used_weight,
+                "exchange_order_count": self.order_count,
+                "queued": sum(1 for w in self._queue if not w.future.done()),
+                "blocked_for": round(max(0.0, self._blocked_until - now), 1),
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 2),
+            }
@@ -1,12 +1,15 @@
 """
 Shared Account Data Cache
-Centralizes account data fetching to reduce API calls when running multiple bots
+Centralizes account data fetching to reduce API calls when running multiple bots;
+served from the user data stream's in-memory book while that stream is live
 """
 import asyncio
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from loguru import logger
 
+from utils.user_data_stream import UserDataStream
+
 
 class SharedAccountCache:
     """
@@ -30,6 +33,7 @@ class SharedAccountCache:
         self._last_update: float = 0
         self._cache_duration: int = 30  # Cache for 30 seconds
         self._aster_client = None
+        self._stream = UserDataStream()
         self._initialized = True
         logger.info("✅ SharedAccountCache initialized")
     
@@ -37,16 +41,23 @@ class SharedAccountCache:
         """Set the Aster client to use for fetching"""
         self._aster_client = client
     
-    async def get_account_data(self, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+    async def get_account_data(self, force_refresh: bool = False, client=None) -> Optional[Dict[str, Any]]:
         """
-        Get account data - uses cache if fresh, otherwise fetches from API
+        Get account data - from the user data stream when live, else the cache if
+        fresh, otherwise fetches from API
         
         Args:
             force_refresh: Force a fresh API call even if cache is valid
+            client: Caller's Aster client, used if none was set with set_client()
             
         Returns:
             Account data dictionary or None if fetch fails
         """
+        if not force_refresh and self._stream.is_live():
+            account = self._stream.get_account()
+            if account is not None:
+                return account
+        
         async with self._lock:
             current_time = time.time()
             cache_age = current_time - self._last_update
@@ -57,13 +68,14 @@ class SharedAccountCache:
                 return self._account_data
             
             # Fetch fresh data
-            if not self._aster_client:
+            client = self._aster_client or client
+            if not client:
                 logger.error("❌ No Aster client set for SharedAccountCache")
                 return self._account_data  # Return stale data if available
             
             try:
                 logger.debug("🔄 Fetching fresh account data (shared across all bots)")
-                account = await self._aster_client.get_account()
+                account = await client.get_account()
                 self._account_data = account
                 self._last_update = current_time
                 return account
@@ -72,6 +84,24 @@ class SharedAccountCache:
                 # Return stale data if available, otherwise None
                 return self._account_data
     
+    async def get_open_orders(self, symbol: Optional[str] = None, client=None) -> List[Dict[str, Any]]:
+        """
+        Get open orders - from the user data stream when live, otherwise from API
+        
+        Args:
+            symbol: Only this symbol's orders (all if None)
+            client: Caller's Aster client, used if none was set with set_client()
+        
+        Raises:
+            ValueError: If the stream is not live and there is no client to ask
+        """
+        if self._stream.is_live():
+            return self._stream.get_open_orders(symbol)
+        client = self._aster_client or client
+        if not client:
+            raise ValueError("No Aster client set for SharedAccountCache")
+        return await client.get_open_orders(symbol)
+    
     def clear_cache(self):
         """Clear cached data"""
         self._account_data = None
@@ -80,6 +110,8 @@ class SharedAccountCache:
     
     def get_cache_age(self) -> float:
         """Get age of cached data in seconds"""
+        if self._stream.is_live():
+            return self._stream.get_age()
         if self._last_update == 0:
             return float('inf')
         return time.time() - self._last_update
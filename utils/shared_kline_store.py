@@ -0,0 +1,340 @@
+"""
+Shared Kline Store
+Keeps candles for all bots in memory: bootstrapped once over REST, then kept
+current from <symbol>@kline_<interval> streams on the shared MarketStreamHub
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from loguru import logger
+
+from config.config import config
+from strategies.candles import CandleFrame
+from strategies.incremental_indicators import IncrementalIndicators
+from utils.market_stream import CONNECTED, MarketStreamHub
+
+
+# Interval length in milliseconds (used to detect gaps in the stream)
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+}
+
+KLINE_QUEUE_SIZE = 10_000  # Kline events buffered for the store before the oldest are dropped
+
+
+class SharedKlineStore:
+    """
+    Singleton candle store shared across all bots
+    Reduces kline REST calls from (bots x timeframes) per cycle to zero once streaming
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        # Ring buffers of raw rows [open_time, open, high, low, close, volume] per (symbol, interval)
+        self._buffers: Dict[Tuple[str, str], deque] = {}
+        # Incremental indicator engines covering the same candles as each buffer
+        self._engines: Dict[Tuple[str, str], IncrementalIndicators] = {}
+        self._bootstrapped: set = set()
+        self._aster_client = None
+        self._backfiller = None  # Reads history from the local kline archive (config.data)
+        self._stream_task: Optional[asyncio.Task] = None
+        self._subscription = None  # Hub subscription the stream task consumes
+        self._retry_task: Optional[asyncio.Task] = None  # Re-bootstraps pairs whose REST load failed
+        self._bootstrap_tasks: Dict[Tuple[str, str], asyncio.Task] = {}  # Per-pair refills after gaps/resizes
+        self._hub = MarketStreamHub()
+        self._running = False
+        self._connected = False
+        self._last_message: float = 0
+        self._stale_after: int = 90  # Seconds without stream traffic before bots fall back to REST
+        self._initialized = True
+        logger.info("✅ SharedKlineStore initialized")
+
+    def set_client(self, client):
+        """Set the Aster client used for REST bootstrap"""
+        self._aster_client = client
+        self._backfiller = None
+        if config.data.archive_enabled:
+            from data.backfill import KlineBackfiller
+            self._backfiller = KlineBackfiller(client)
+
+    def subscribe(self, symbol: str, interval: str, limit: int):
+        """
+        Register a (symbol, interval) pair to keep in memory
+
+        Once the store is running (call from its event loop), a new pair is added to
+        the stream and new or enlarged pairs are bootstrapped in the background.
+
+        Args:
+            symbol: Trading symbol (e.g., "BTCUSDT")
+            interval: Kline interval (e.g., "1m")
+            limit: Number of candles to retain
+        """
+        key = (symbol.upper(), interval)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            self._buffers[key] = deque(maxlen=limit)
+            if self._running:
+                self._start_stream()
+                self._schedule_bootstrap(key)
+        elif buffer.maxlen < limit:
+            # Grow the ring buffer, keeping what we have; bootstrap again to fill history
+            self._buffers[key] = deque(buffer, maxlen=limit)
+            self._engines.pop(key, None)
+            self._bootstrapped.discard(key)
+            if self._running:
+                self._schedule_bootstrap(key)
+
+    async def start(self):
+        """Bootstrap every subscribed pair over REST, then start the stream in the background"""
+        if self._running:
+            return
+        if not self._buffers:
+            logger.warning("SharedKlineStore started with no subscriptions")
+            return
+
+        self._running = True
+        await self._bootstrap_all()
+        self._start_stream()
+        logger.success(f"📡 Kline stream started for {len(self._buffers)} symbol/interval pairs")
+
+    async def stop(self):
+        """Stop the stream and bootstrap tasks"""
+        self._running = False
+        for task in (self._stream_task, self._retry_task, *self._bootstrap_tasks.values()):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._stream_task = None
+        self._retry_task = None
+        self._bootstrap_tasks.clear()
+        self._connected = False
+
+    def is_ready(self, symbol: str, interval: str) -> bool:
+        """
+        Check whether candles for a pair can be served from memory
+
+        Returns:
+            True if the pair is bootstrapped and the stream is live
+        """
+        key = (symbol.upper(), interval)
+        if key not in self._bootstrapped or not self._connected or not self._hub.connected:
+            return False
+        return (time.time() - self._last_message) < self._stale_after
+
+    def get_candles(self, symbol: str, interval: str, limit: Optional[int] = None) -> CandleFrame:
+        """
+        Get the most recent candles for a pair (no HTTP calls)
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval
+            limit: Number of candles to return (default: all retained)
+
+        Returns:
+            CandleFrame, oldest first (empty if the pair is unknown)
+        """
+        buffer = self._buffers.get((symbol.upper(), interval))
+        if not buffer:
+            return CandleFrame.empty()
+        rows = list(buffer)
+        if limit is not None:
+            rows = rows[-limit:]
+        return CandleFrame.from_klines(rows)
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        """
+        Latest streamed close for a symbol (no HTTP calls)
+
+        Returns:
+            Close of the in-progress candle of the shortest live interval, or None
+            if the symbol isn't streaming
+        """
+        symbol = symbol.upper()
+        ready = [interval for s, interval in list(self._bootstrapped) if s == symbol and self.is_ready(s, interval)]
+        if not ready:
+            return None
+        interval = min(ready, key=lambda i: INTERVAL_MS.get(i, float("inf")))
+        buffer = self._buffers.get((symbol, interval))
+        return float(buffer[-1][4]) if buffer else None
+
+    def get_analysis(self, symbol: str, interval: str, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the incrementally maintained indicator analysis for a pair
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval
+            limit: Candle count the analysis must cover (default: all retained)
+
+        Returns:
+            Same dictionary as MarketAnalyzer.analyze_full_market over the retained
+            candles, or None if no engine covers exactly that window
+        """
+        engine = self._engines.get((symbol.upper(), interval))
+        if engine is None or not len(engine):
+            return None
+        if limit is not None and engine.window != limit:
+            return None
+        return engine.analysis()
+
+    async def _bootstrap_all(self):
+        """Load history over REST for every pair that is not bootstrapped (or being refilled) yet"""
+        for key in list(self._buffers.keys()):
+            task = self._bootstrap_tasks.get(key)
+            if key not in self._bootstrapped and (task is None or task.done()):
+                await self._bootstrap(*key)
+
+    def _schedule_bootstrap(self, key: Tuple[str, str]):
+        """Refill one pair in the background; it is not ready until the refill lands"""
+        task = self._bootstrap_tasks.get(key)
+        if task is not None and not task.done():
+            return
+        self._bootstrapped.discard(key)
+        task = asyncio.create_task(self._bootstrap(*key))
+        self._bootstrap_tasks[key] = task
+        task.add_done_callback(lambda done: self._bootstrap_tasks.pop(key, None) if self._bootstrap_tasks.get(key) is done else None)
+
+    async def _bootstrap(self, symbol: str, interval: str):
+        """Load history for one pair from /fapi/v1/klines"""
+        if not self._aster_client:
+            logger.error("❌ No Aster client set for SharedKlineStore")
+            return
+
+        key = (symbol, interval)
+        buffer = self._buffers[key]
+        try:
+            if self._backfiller is not None and interval in INTERVAL_MS:
+                # Archived history plus only the candles it is missing
+                klines = await self._backfiller.recent(symbol, interval, buffer.maxlen)
+            else:
+                klines = await self._aster_client.get_klines(symbol, interval=interval, limit=buffer.maxlen)
+            buffer.clear()
+            for k in klines:
+                buffer.append([int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])])
+
+            # Rebuild the indicator state from the fresh history
+            engine = self._new_engine(buffer.maxlen)
+            if engine is not None:
+                for row in buffer:
+                    engine.update(*row)
+                self._engines[key] = engine
+            self._bootstrapped.add(key)
+            logger.debug(f"📦 Bootstrapped {len(buffer)} {interval} candles for {symbol}")
+        except Exception as e:
+            self._bootstrapped.discard(key)
+            logger.error(f"❌ Failed to bootstrap {symbol} {interval} klines: {e}")
+            self._schedule_retry()
+
+    def _schedule_retry(self):
+        """Start the bootstrap retry task unless it is already running"""
+        if self._running and (self._retry_task is None or self._retry_task.done()):
+            self._retry_task = asyncio.create_task(self._retry_loop())
+
+    async def _retry_loop(self):
+        """Retry failed bootstraps with backoff until every pair is live again"""
+        backoff = 1
+        while self._running and any(key not in self._bootstrapped for key in self._buffers):
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+            await self._bootstrap_all()
+
+    @staticmethod
+    def _new_engine(window: int) -> Optional[IncrementalIndicators]:
+        """Create an indicator engine, or None if the window is too short for one"""
+        try:
+            return IncrementalIndicators(window=window)
+        except ValueError:
+            return None
+
+    def _stream_names(self) -> List[str]:
+        """Kline stream names for all subscribed pairs"""
+        return [f"{symbol.lower()}@kline_{interval}" for symbol, interval in self._buffers]
+
+    def _start_stream(self):
+        """(Re)start the stream task on a hub subscription covering every pair"""
+        # Subscribe before dropping the old subscription so shared streams stay up upstream.
+        # Every update matters to the candles, so keep a deep queue
+        previous = self._stream_task
+        self._subscription = self._hub.subscribe(self._stream_names(), maxsize=KLINE_QUEUE_SIZE)
+        self._stream_task = asyncio.create_task(self._stream_loop(self._subscription))
+        if previous is not None:
+            previous.cancel()
+
+    async def _stream_loop(self, subscription):
+        """Consume kline updates from the shared market stream hub"""
+        try:
+            async for stream, payload in subscription:
+                self._last_message = time.time()
+                if stream == CONNECTED:
+                    self._connected = True
+                    if payload.get("reconnect"):
+                        # Candles may have closed while we were disconnected - force a REST resync
+                        self._bootstrapped.clear()
+                    await self._bootstrap_all()
+                elif payload.get("e") == "kline":
+                    self._handle_kline(payload["k"])
+        finally:
+            subscription.close()
+            if self._subscription is subscription:
+                self._connected = False
+
+    def _handle_kline(self, k: Dict[str, Any]):
+        """Apply one kline update to its ring buffer"""
+        key = (k["s"].upper(), k["i"])
+        buffer = self._buffers.get(key)
+        if buffer is None or key not in self._bootstrapped:
+            return
+
+        row = [int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"])]
+        last_open = buffer[-1][0] if buffer else None
+
+        engine = self._engines.get(key)
+        if engine is not None:
+            engine.update(*row)
+
+        if last_open is None or row[0] == last_open:
+            # Update to the in-progress candle
+            if buffer:
+                buffer[-1] = row
+            else:
+                buffer.append(row)
+            if k.get("x") and self._backfiller is not None:
+                self._archive_closed(key, row)
+        elif row[0] > last_open:
+            gap = row[0] - last_open
+            buffer.append(row)
+            if gap > INTERVAL_MS.get(key[1], gap):
+                # Missed at least one candle - refill from REST without holding up other pairs
+                logger.warning(f"⚠️ Gap in {key[0]} {key[1]} kline stream, resyncing")
+                self._schedule_bootstrap(key)
+
+    def _archive_closed(self, key: Tuple[str, str], row: List):
+        """Write a candle the stream reported as closed to the local archive"""
+        try:
+            self._backfiller.archive.append(key[0], key[1], [row])
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to archive {key[0]} {key[1]} candle: {e}")
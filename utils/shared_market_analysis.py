@@ -0,0 +1,100 @@
+"""
+Shared Market Analysis
+Coalesces indicator requests from all bots into one vectorized MarketAnalyzer.analyze_many
+pass per (interval, candle count) and hands each bot its own slice
+"""
+import asyncio
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+from loguru import logger
+
+from strategies.candles import CandleFrame
+from strategies.indicators import MarketAnalyzer
+
+
+class SharedMarketAnalysis:
+    """
+    Singleton analysis scheduler shared across all bots
+    Requests that arrive within one batch window are analyzed together, so indicator
+    cost grows with numpy work instead of per-symbol Python overhead
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._analyzer = MarketAnalyzer()
+        # Pending requests: (symbol, interval, frame, future)
+        self._pending: List[Tuple[str, str, CandleFrame, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_window: float = 0.05  # Seconds to wait for other bots before analyzing
+        self._batches = 0
+        self._symbols_analyzed = 0
+        self._initialized = True
+        logger.info("✅ SharedMarketAnalysis initialized")
+
+    def set_batch_window(self, seconds: float):
+        """Set how long a request waits for others to join its batch"""
+        self._batch_window = max(0.0, seconds)
+
+    async def analyze(self, symbol: str, interval: str, candles: CandleFrame) -> Dict[str, Any]:
+        """
+        Analyze one symbol's candles as part of the next batch
+
+        Args:
+            symbol: Trading symbol
+            interval: Kline interval (batches are grouped per interval and candle count)
+            candles: Candles to analyze
+
+        Returns:
+            Same dictionary as MarketAnalyzer.analyze_full_market
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((symbol, interval, candles, future))
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._flush)
+
+        return await future
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching statistics (symbols per vectorized pass)"""
+        return {
+            "batches": self._batches,
+            "symbols_analyzed": self._symbols_analyzed,
+            "avg_batch_size": self._symbols_analyzed / self._batches if self._batches else 0.0
+        }
+
+    def _flush(self):
+        """Run one analyze_many pass per (interval, candle count) group and resolve the waiters"""
+        pending, self._pending = self._pending, []
+        self._flush_handle = None
+
+        groups: Dict[Tuple[str, int], list] = defaultdict(list)
+        for request in pending:
+            groups[(request[1], len(request[2]))].append(request)
+
+        for (interval, length), requests in groups.items():
+            try:
+                results = self._analyzer.analyze_many(CandleFrame.stack([request[2] for request in requests]))
+                self._batches += 1
+                self._symbols_analyzed += len(requests)
+            except Exception as e:
+                logger.error(f"❌ Batch analysis failed for {interval} x{len(requests)}: {e}")
+                results = [e] * len(requests)
+
+            for (symbol, _, _, future), result in zip(requests, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -0,0 +1,281 @@
+"""
+Trade Tape
+Aggregated trades from <symbol>@aggTrade streams on the shared MarketStreamHub, kept in
+fixed-size ring buffers with incrementally maintained rolling-window order-flow features
+"""
+import asyncio
+import math
+import time
+from typing import Dict, Any, Optional, Sequence
+import numpy as np
+from loguru import logger
+
+from config.config import config
+from utils.market_stream import CONNECTED, MarketStreamHub
+
+
+TRADE_QUEUE_SIZE = 20_000  # aggTrade events buffered per tape before the oldest are dropped
+LARGE_PRINT_MIN_SAMPLES = 30  # Trades in the longest window before large prints are flagged
+
+
+class _Window:
+    """Running sums over the trades of one rolling time window"""
+    __slots__ = ("seconds", "start", "count", "volume", "notional", "buy_volume", "sell_volume", "large")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.start = 0  # Sequence number of the oldest trade still in the window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.volume = 0.0
+        self.notional = 0.0
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self.large = 0
+
+
+class TradeTape:
+    """
+    Ring buffer of one symbol's aggregated trades plus rolling order-flow features
+
+    Trades are written into preallocated numpy columns (no object per trade). Each
+    window adds a trade when it arrives and subtracts it when it ages out, so both
+    add() and features() are O(1) amortized however long the windows are.
+    """
+
+    def __init__(self, symbol: str, capacity: int, windows: Sequence[float], large_print_sigma: float):
+        self.symbol = symbol.upper()
+        self.capacity = capacity
+        self.large_print_sigma = large_print_sigma
+        self._time = np.zeros(capacity, dtype=np.float64)  # Trade time (seconds)
+        self._price = np.zeros(capacity, dtype=np.float64)
+        self._qty = np.zeros(capacity, dtype=np.float64)
+        self._buy = np.zeros(capacity, dtype=np.bool_)  # Buyer was the aggressor
+        self._large = np.zeros(capacity, dtype=np.bool_)
+        self._windows = [_Window(seconds) for seconds in sorted(windows)]
+        self._seq = 0  # Sequence number of the next trade
+        # Notional mean/variance over the longest window, for large-print detection
+        self._sum_notional = 0.0
+        self._sum_notional_sq = 0.0
+        self.last_trade_id: Optional[int] = None
+        self.last_large_print: Optional[Dict[str, Any]] = None
+
+    def __len__(self):
+        return min(self._seq, self.capacity)
+
+    def add(self, trade_time: float, price: float, qty: float, buyer_aggressor: bool):
+        """
+        Record one trade
+
+        Args:
+            trade_time: Trade time in seconds
+            price: Trade price
+            qty: Base quantity
+            buyer_aggressor: True if the buyer took liquidity (aggTrade "m" is False)
+        """
+        notional = price * qty
+        longest = self._windows[-1]
+        self._evict(trade_time)
+
+        # Large print: notional well above the longest window's typical trade
+        large = False
+        if longest.count >= LARGE_PRINT_MIN_SAMPLES:
+            mean = self._sum_notional / longest.count
+            variance = max(self._sum_notional_sq / longest.count - mean * mean, 0.0)
+            large = notional > mean + self.large_print_sigma * math.sqrt(variance)
+            if large:
+                self.last_large_print = {
+                    "time": trade_time, "price": price, "notional": notional,
+                    "side": "buy" if buyer_aggressor else "sell",
+                }
+
+        seq = self._seq
+        slot = seq % self.capacity
+        if seq >= self.capacity:
+            # Overwriting the oldest slot - make sure no window still counts it
+            self._evict_through(seq - self.capacity)
+        self._time[slot] = trade_time
+        self._price[slot] = price
+        self._qty[slot] = qty
+        self._buy[slot] = buyer_aggressor
+        self._large[slot] = large
+        self._seq = seq + 1
+
+        for window in self._windows:
+            window.count += 1
+            window.volume += qty
+            window.notional += notional
+            if buyer_aggressor:
+                window.buy_volume += qty
+            else:
+                window.sell_volume += qty
+            window.large += large
+        self._sum_notional += notional
+        self._sum_notional_sq += notional * notional
+
+    def features(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Order-flow features over every window
+
+        Args:
+            now: Evaluation time in seconds (default: wall clock)
+
+        Returns:
+            Dictionary keyed by window ("10s", "60s", ...) with vwap, volume, buy/sell
+            volume, delta, delta_ratio, trades, trade_rate and large_prints, plus
+            burst (shortest-window trade rate over the longest's) and last_large_print
+            (None once it is older than the longest window)
+        """
+        now = time.time() if now is None else now
+        self._evict(now)
+        result: Dict[str, Any] = {}
+        for window in self._windows:
+            delta = window.buy_volume - window.sell_volume
+            result[f"{window.seconds:g}s"] = {
+                "vwap": window.notional / window.volume if window.volume else None,
+                "volume": window.volume,
+                "buy_volume": window.buy_volume,
+                "sell_volume": window.sell_volume,
+                "delta": delta,
+                "delta_ratio": delta / window.volume if window.volume else 0.0,
+                "trades": window.count,
+                "trade_rate": window.count / window.seconds,
+                "large_prints": window.large,
+            }
+        shortest, longest = self._windows[0], self._windows[-1]
+        long_rate = longest.count / longest.seconds
+        result["burst"] = (shortest.count / shortest.seconds) / long_rate if long_rate else 0.0
+        large = self.last_large_print
+        result["last_large_print"] = large if large and large["time"] >= now - longest.seconds else None
+        return result
+
+    def _evict(self, now: float):
+        """Age trades out of every window"""
+        for index, window in enumerate(self._windows):
+            cutoff = now - window.seconds
+            while window.start < self._seq and self._time[window.start % self.capacity] < cutoff:
+                self._remove(window, window.start, index == len(self._windows) - 1)
+
+    def _evict_through(self, seq: int):
+        """Remove trades up to and including a sequence number from every window"""
+        for index, window in enumerate(self._windows):
+            while window.start <= seq:
+                self._remove(window, window.start, index == len(self._windows) - 1)
+
+    def _remove(self, window: _Window, seq: int, longest: bool):
+        slot = seq % self.capacity
+        qty = float(self._qty[slot])
+        notional = float(self._price[slot]) * qty
+        window.start = seq + 1
+        window.count -= 1
+        if window.count == 0:
+            # Empty window: restart the sums from exactly zero so float error can't build up
+            window.reset()
+            if longest:
+                self._sum_notional = self._sum_notional_sq = 0.0
+            return
+        window.volume -= qty
+        window.notional -= notional
+        if self._buy[slot]:
+            window.buy_volume -= qty
+        else:
+            window.sell_volume -= qty
+        window.large -= bool(self._large[slot])
+        if longest:
+            self._sum_notional -= notional
+            self._sum_notional_sq -= notional * notional
+
+
+class TradeTapeManager:
+    """
+    Singleton set of trade tapes shared across all bots
+
+    One aggTrade stream per symbol via the MarketStreamHub; no REST calls.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._tapes: Dict[str, TradeTape] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._hub = MarketStreamHub()
+        self._running = False
+        self._initialized = True
+        logger.info("✅ TradeTapeManager initialized")
+
+    def subscribe(self, symbol: str):
+        """Register a symbol to keep a tape for (streams once start() runs)"""
+        symbol = symbol.upper()
+        if symbol not in self._tapes:
+            self._tapes[symbol] = TradeTape(
+                symbol,
+                capacity=config.aster.trade_tape_capacity,
+                windows=config.aster.trade_tape_windows,
+                large_print_sigma=config.aster.large_print_sigma
+            )
+            if self._running:
+                self._tasks[symbol] = asyncio.create_task(self._consume(self._tapes[symbol]))
+
+    async def start(self):
+        """Start consuming every subscribed symbol's trades in the background"""
+        if self._running or not config.aster.trade_tape_enabled:
+            return
+        self._running = True
+        for symbol, tape in self._tapes.items():
+            self._tasks[symbol] = asyncio.create_task(self._consume(tape))
+        logger.success(f"🧾 Trade tapes started for {len(self._tapes)} symbols")
+
+    async def stop(self):
+        """Stop every consumer task"""
+        self._running = False
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def features(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Rolling order-flow features for a symbol (no HTTP calls)
+
+        Returns:
+            TradeTape.features(), or None if the symbol isn't streaming
+        """
+        tape = self._tapes.get(symbol.upper())
+        if tape is None or not self._running or not self._hub.connected or not len(tape):
+            return None
+        return tape.features()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-tape trade counts for logging and the dashboard"""
+        return {
+            "running": self._running,
+            "tapes": {symbol: {"trades": len(tape), "last_trade_id": tape.last_trade_id}
+                      for symbol, tape in self._tapes.items()},
+        }
+
+    async def _consume(self, tape: TradeTape):
+        """Feed one symbol's aggTrade events into its tape"""
+        subscription = self._hub.subscribe([f"{tape.symbol.lower()}@aggTrade"], maxsize=TRADE_QUEUE_SIZE)
+        add = tape.add
+        try:
+            async for stream, event in subscription:
+                if stream == CONNECTED or event.get("e") != "aggTrade":
+                    continue
+                add(event["T"] / 1000, float(event["p"]), float(event["q"]), not event["m"])
+                tape.last_trade_id = event["a"]
+        finally:
+            subscription.close()
@@ -3,44 +3,120 @@ Trade Outcome Tracker - Label AI decisions with actual results
 This builds a dataset for future model improvements
 """
 import json
+import os
+from bisect import bisect_left, insort
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
-from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
 from loguru import logger
 
+from utils.journal import JsonlJournal
+
 
 class TradeTracker:
     """
     Tracks trades from decision → execution → outcome
     Labels each AI decision with actual P&L and correctness
+
+    Closed trades are kept in a ledger ordered by close time with prefix sums of
+    P&L and wins, and the overall stats are running aggregates updated on close.
+    get_stats() is O(1) and get_recent_performance() is O(log n), however long
+    the history grows. Opens and closes are appended to a JSONL journal written
+    behind by the PersistenceWorker.
     """
     
-    def __init__(self, filepath: str = "logs/trade_outcomes.json"):
-        self.filepath = Path(filepath)
-        self.filepath.parent.mkdir(parents=True, exist_ok=True)
-        self.trades = self._load()
-        
-    def _load(self) -> Dict[str, Any]:
-        """Load existing trade outcomes"""
-        if self.filepath.exists():
-            try:
-                with open(self.filepath, 'r') as f:
-                    data = json.load(f)
-                    logger.info(f"Loaded {len(data.get('trades', []))} tracked trades from {self.filepath}")
-                    return data
-            except Exception as e:
-                logger.error(f"Error loading trade tracker: {e}")
-                return {"trades": [], "stats": {}}
-        return {"trades": [], "stats": {}}
+    def __init__(
+        self,
+        filepath: Optional[str] = "logs/trade_outcomes.jsonl",
+        clock: Optional[Callable[[], datetime]] = None
+    ):
+        """
+        Args:
+            filepath: JSONL journal to persist outcomes to (None keeps them in memory only, e.g. for backtests)
+            clock: Callable returning the current time (defaults to datetime.now)
+        """
+        self.filepath = filepath
+        self._now = clock or datetime.now
+        self._journal = JsonlJournal(filepath) if filepath else None
+        
+        self.trades: List[Dict[str, Any]] = []  # Every trade, in open order
+        self._open: Dict[str, List[Dict[str, Any]]] = {}  # Symbol -> open trades, oldest first
+        
+        # Ledger of closed trades ordered by close time, with prefix sums for window queries
+        self._closed: List[Dict[str, Any]] = []
+        self._close_times: List[float] = []
+        self._cum_pnl: List[float] = [0.0]
+        self._cum_wins: List[int] = [0]
+        
+        # Running aggregates over every closed trade
+        self._correct = 0
+        self._total_pnl = 0.0
+        self._quality_counts: Dict[str, int] = {}
+        self._stats: Dict[str, Any] = {}
+        
+        self._load()
+        
+    def _load(self):
+        """Replay the journal (importing a legacy JSON file once) and build the ledger"""
+        if self._journal is None:
+            return
+        try:
+            if not self._journal.exists():
+                self._migrate_legacy()
+            records = self._journal.read()
+        except Exception as e:
+            logger.error(f"Error loading trade tracker: {e}")
+            records = []
+        
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            if record.get("event") == "open":
+                trade = record["trade"]
+                by_id[trade["trade_id"]] = trade
+                self.trades.append(trade)
+            elif record.get("event") == "close" and record.get("trade_id") in by_id:
+                trade = by_id[record["trade_id"]]
+                trade["timestamp_close"] = record["timestamp_close"]
+                trade["outcome"] = record["outcome"]
+                trade["label"] = record["label"]
+        
+        for trade in self.trades:
+            if trade["outcome"]["exit_price"] is None:
+                self._open.setdefault(trade["symbol"], []).append(trade)
+            else:
+                self._add_closed(trade)
+        self._refresh_stats()
+        if self.trades:
+            logger.info(f"Loaded {len(self.trades)} tracked trades from {self.filepath}")
+    
+    def _migrate_legacy(self):
+        """Import the JSON file older versions rewrote on every update"""
+        legacy_path = os.path.splitext(self.filepath)[0] + ".json"
+        if legacy_path == self.filepath or not os.path.exists(legacy_path):
+            return
+        with open(legacy_path, "r") as f:
+            trades = json.load(f).get("trades", [])
+        self._journal.rewrite({"event": "open", "trade": trade} for trade in trades)
+        os.replace(legacy_path, legacy_path + ".migrated")
+        logger.info(f"📦 Migrated {len(trades)} tracked trades from {legacy_path} to {self.filepath}")
     
-    def _save(self):
-        """Save trade outcomes to disk"""
+    def _save(self, record: Dict[str, Any]):
+        """Append one open/close record to the journal"""
+        if self._journal is None:
+            return
         try:
-            with open(self.filepath, 'w') as f:
-                json.dump(self.trades, f, indent=2)
+            self._journal.append(record)
         except Exception as e:
             logger.error(f"Error saving trade tracker: {e}")
     
+    def close(self):
+        """Wait for queued writes and close the journal (call on shutdown)"""
+        if self._journal is None:
+            return
+        try:
+            self._journal.close()
+        except Exception as e:
+            logger.error(f"Error closing trade tracker: {e}")
+    
     def start_trade(
         self,
         symbol: str,
@@ -53,12 +129,12 @@ class TradeTracker:
         Record when a trade is opened
         Returns trade_id for later reference
         """
-        trade_id = f"{symbol}_{datetime.now().timestamp()}"
+        trade_id = f"{symbol}_{self._now().timestamp()}"
         
         trade = {
             "trade_id": trade_id,
             "symbol": symbol,
-            "timestamp_open": datetime.now().isoformat(),
+            "timestamp_open": self._now().isoformat(),
             "timestamp_close": None,
             
             # AI Decision
@@ -104,8 +180,9 @@ class TradeTracker:
             }
         }
         
-        self.trades["trades"].append(trade)
-        self._save()
+        self.trades.append(trade)
+        self._open.setdefault(symbol, []).append(trade)
+        self._save({"event": "open", "trade": trade})
         
         logger.info(f"Started tracking trade {trade_id}: {decision.get('action')} @ ${entry_price}")
         return trade_id
@@ -121,14 +198,13 @@ class TradeTracker:
         Calculate outcome and label quality
         """
         # Find most recent open trade for this symbol
-        open_trades = [t for t in self.trades["trades"] 
-                      if t["symbol"] == symbol and t["outcome"]["exit_price"] is None]
+        open_trades = self._open.get(symbol)
         
         if not open_trades:
             logger.warning(f"No open trade found for {symbol} to close")
             return
         
-        trade = open_trades[-1]  # Most recent
+        trade = open_trades.pop()  # Most recent
         
         # Calculate outcome
         entry_price = trade["position"]["entry_price"]
@@ -149,7 +225,7 @@ class TradeTracker:
         
         # Duration
         time_open = datetime.fromisoformat(trade["timestamp_open"])
-        time_close = datetime.now()
+        time_close = self._now()
         duration_minutes = (time_close - time_open).total_seconds() / 60
         
         # Update outcome
@@ -167,8 +243,15 @@ class TradeTracker:
         # Label quality for ML
         trade["label"] = self._label_quality(trade)
         
-        self._save()
-        self._update_stats()
+        self._save({
+            "event": "close",
+            "trade_id": trade["trade_id"],
+            "timestamp_close": trade["timestamp_close"],
+            "outcome": trade["outcome"],
+            "label": trade["label"]
+        })
+        self._add_closed(trade)
+        self._refresh_stats()
         
         logger.info(f"Closed trade {trade['trade_id']}: "
                    f"{'✓' if was_correct else '✗'} "
@@ -222,98 +305,79 @@ class TradeTracker:
             "lessons": lessons
         }
     
-    def _update_stats(self):
-        """Calculate overall performance statistics"""
-        closed_trades = [t for t in self.trades["trades"] 
-                        if t["outcome"]["exit_price"] is not None]
-        
-        if not closed_trades:
-            return
-        
-        total_trades = len(closed_trades)
-        correct_trades = sum(1 for t in closed_trades if t["outcome"]["was_correct"])
-        total_pnl = sum(t["outcome"]["pnl_usd"] for t in closed_trades)
+    def _add_closed(self, trade: Dict[str, Any]):
+        """Add a closed trade to the ledger and the running aggregates (O(1) when closes arrive in order)"""
+        try:
+            close_time = datetime.fromisoformat(trade["timestamp_close"]).timestamp()
+        except Exception:
+            close_time = self._close_times[-1] if self._close_times else 0.0
+        outcome = trade["outcome"]
+        pnl_usd = outcome.get("pnl_usd") or 0
         
-        # Win rate
-        win_rate = (correct_trades / total_trades * 100) if total_trades > 0 else 0
+        if not self._close_times or close_time >= self._close_times[-1]:
+            self._closed.append(trade)
+            self._close_times.append(close_time)
+            self._cum_pnl.append(self._cum_pnl[-1] + pnl_usd)
+            self._cum_wins.append(self._cum_wins[-1] + (pnl_usd > 0))
+        else:
+            # Out of order (e.g. a legacy file): insert and rebuild the prefix sums
+            index = bisect_left(self._close_times, close_time)
+            insort(self._close_times, close_time)
+            self._closed.insert(index, trade)
+            self._cum_pnl, self._cum_wins = [0.0], [0]
+            for closed in self._closed:
+                pnl = closed["outcome"].get("pnl_usd") or 0
+                self._cum_pnl.append(self._cum_pnl[-1] + pnl)
+                self._cum_wins.append(self._cum_wins[-1] + (pnl > 0))
         
-        # Quality distribution
-        quality_counts = {}
-        for t in closed_trades:
-            q = t["label"]["quality"]
-            quality_counts[q] = quality_counts.get(q, 0) + 1
+        self._correct += bool(outcome.get("was_correct"))
+        self._total_pnl += pnl_usd
+        quality = trade["label"]["quality"]
+        self._quality_counts[quality] = self._quality_counts.get(quality, 0) + 1
+    
+    def _refresh_stats(self):
+        """Rebuild the stats dictionary from the running aggregates"""
+        total_trades = len(self._closed)
+        if not total_trades:
+            return
         
-        self.trades["stats"] = {
+        self._stats = {
             "total_trades": total_trades,
-            "correct_predictions": correct_trades,
-            "win_rate": round(win_rate, 2),
-            "total_pnl_usd": round(total_pnl, 2),
-            "avg_pnl_per_trade": round(total_pnl / total_trades, 2) if total_trades > 0 else 0,
-            "quality_distribution": quality_counts,
-            "last_updated": datetime.now().isoformat()
+            "correct_predictions": self._correct,
+            "win_rate": round(self._correct / total_trades * 100, 2),
+            "total_pnl_usd": round(self._total_pnl, 2),
+            "avg_pnl_per_trade": round(self._total_pnl / total_trades, 2),
+            "quality_distribution": dict(self._quality_counts),
+            "last_updated": self._now().isoformat()
         }
-        
-        self._save()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
-        return self.trades.get("stats", {})
+        return self._stats
     
     def get_recent_performance(self, hours: int = 24) -> Dict[str, Any]:
         """
         Calculate P&L and win rate for trades closed within the last `hours`
         """
-        try:
-            closed_trades = [
-                t for t in self.trades.get("trades", [])
-                if t["outcome"]["exit_price"] is not None and t.get("timestamp_close")
-            ]
-            
-            if not closed_trades:
-                return {
-                    "trades": 0,
-                    "pnl_usd": 0.0,
-                    "win_rate": 0.0,
-                    "hours": hours
-                }
-            
-            cutoff = datetime.now() - timedelta(hours=hours)
-            recent_trades = []
-            for trade in closed_trades:
-                try:
-                    close_time = datetime.fromisoformat(trade["timestamp_close"])
-                except Exception:
-                    continue
-                
-                if close_time >= cutoff:
-                    recent_trades.append(trade)
-            
-            if not recent_trades:
-                return {
-                    "trades": 0,
-                    "pnl_usd": 0.0,
-                    "win_rate": 0.0,
-                    "hours": hours
-                }
-            
-            total_pnl = sum(t["outcome"].get("pnl_usd", 0) for t in recent_trades)
-            wins = sum(1 for t in recent_trades if t["outcome"].get("pnl_usd", 0) > 0)
-            win_rate = (wins / len(recent_trades)) * 100 if recent_trades else 0.0
-            
-            return {
-                "trades": len(recent_trades),
-                "pnl_usd": round(total_pnl, 2),
-                "win_rate": round(win_rate, 2),
-                "hours": hours
-            }
-        except Exception as e:
-            logger.error(f"Error computing recent performance: {e}")
+        cutoff = (self._now() - timedelta(hours=hours)).timestamp()
+        start = bisect_left(self._close_times, cutoff)
+        count = len(self._close_times) - start
+        if not count:
             return {
                 "trades": 0,
                 "pnl_usd": 0.0,
                 "win_rate": 0.0,
                 "hours": hours
             }
+        
+        total_pnl = self._cum_pnl[-1] - self._cum_pnl[start]
+        wins = self._cum_wins[-1] - self._cum_wins[start]
+        return {
+            "trades": count,
+            "pnl_usd": round(total_pnl, 2),
+            "win_rate": round(wins / count * 100, 2),
+            "hours": hours
+        }
     
     def get_training_data(self, quality_filter: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
@@ -323,14 +387,10 @@ class TradeTracker:
             quality_filter: Only return trades with these quality labels
                            e.g., ["excellent", "good"] for positive examples
         """
-        closed_trades = [t for t in self.trades["trades"] 
-                        if t["outcome"]["exit_price"] is not None]
+        closed_trades = list(self._closed)
         
         if quality_filter:
             closed_trades = [t for t in closed_trades 
                            if t["label"]["quality"] in quality_filter]
         
         return closed_trades
-
-
-
@@ -0,0 +1,440 @@
+"""
+User Data Stream Service
+One long-lived listenKey stream per process that keeps balances, positions and open
+orders in memory from ACCOUNT_UPDATE / ORDER_TRADE_UPDATE events, so bots and the
+dashboard read account state without REST polling
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import websockets
+from loguru import logger
+
+from config.config import config
+
+
+# Order statuses that leave the open-order book
+CLOSED_ORDER_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "REJECTED", "NEW_INSURANCE", "NEW_ADL"}
+
+
+def _order_from_event(o: Dict[str, Any]) -> Dict[str, Any]:
+    """ORDER_TRADE_UPDATE "o" payload -> the shape GET /openOrders returns"""
+    return {
+        "orderId": o.get("i"),
+        "symbol": o.get("s"),
+        "status": o.get("X"),
+        "clientOrderId": o.get("c"),
+        "price": o.get("p"),
+        "avgPrice": o.get("ap"),
+        "origQty": o.get("q"),
+        "executedQty": o.get("z"),
+        "timeInForce": o.get("f"),
+        "type": o.get("o"),
+        "origType": o.get("ot", o.get("o")),
+        "reduceOnly": o.get("R", False),
+        "closePosition": o.get("cp", False),
+        "side": o.get("S"),
+        "positionSide": o.get("ps"),
+        "stopPrice": o.get("sp"),
+        "workingType": o.get("wt"),
+        "updateTime": o.get("T"),
+    }
+
+
+class UserDataStream:
+    """
+    Singleton in-memory account book fed by the user data stream
+
+    Every (re)connect takes a REST snapshot (account + open orders); events that
+    arrive while it is in flight are buffered and replayed on top of it. The
+    listenKey is kept alive in the background and renewed when the exchange
+    reports it expired. Unrealized PnL is re-marked from the kline stream's
+    latest price.
+
+    Reads (get_account, get_open_orders, get_position) never touch the network.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._account: Optional[Dict[str, Any]] = None  # Last REST account snapshot (top-level fields)
+        self._balances: Dict[str, Dict[str, Any]] = {}
+        self._positions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._orders: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._view: Optional[Dict[str, Any]] = None  # Copy of the book get_account() serves from, rebuilt after changes
+        self._book_lock = threading.Lock()  # The dashboard reads the book from its own thread
+
+        self._aster_client = None
+        self._listen_key: Optional[str] = None
+        self._stream_task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._subscribers_lock = threading.Lock()  # The dashboard subscribes from its own thread
+        self._running = False
+        self._connected = False
+        self._synced = False
+        self._synced_at: float = 0
+        self._first_sync = asyncio.Event()
+        self._resyncing = False
+        self._pending: List[Dict[str, Any]] = []  # Events received during a resync
+        self._keepalive_at: float = 0
+        self._last_event: float = 0  # Local time of the last applied event
+        self._last_event_time: int = 0  # Exchange event time (E) of the last applied event
+        self._mark_price: Optional[Callable[[str], Optional[float]]] = None
+        self._initialized = True
+        logger.info("✅ UserDataStream initialized")
+
+    def set_client(self, client):
+        """Set the Aster client used for the listenKey and REST resyncs"""
+        self._aster_client = client
+
+    def set_mark_price_source(self, source: Callable[[str], Optional[float]]):
+        """Set a callable symbol -> latest price used to re-mark unrealized PnL"""
+        self._mark_price = source
+
+    @staticmethod
+    def _streamed_price(symbol: str) -> Optional[float]:
+        """Streamed mark price, else the latest streamed kline close"""
+        from utils.mark_price_cache import MarkPriceCache
+        from utils.shared_kline_store import SharedKlineStore
+        return MarkPriceCache().mark_price(symbol) or SharedKlineStore().last_price(symbol)
+
+    async def start(self):
+        """Start the stream in the background and wait (briefly) for the first snapshot"""
+        if self._running:
+            return
+        if not self._aster_client:
+            logger.error("❌ No Aster client set for UserDataStream")
+            return
+
+        if self._mark_price is None:
+            self._mark_price = self._streamed_price
+        self._running = True
+        self._stream_task = asyncio.create_task(self._stream_loop())
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+        try:
+            await asyncio.wait_for(self._first_sync.wait(), timeout=config.aster.user_stream_start_timeout)
+            logger.success("📡 User data stream started")
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ User data stream not synced yet - account reads use REST until it is")
+
+    async def stop(self):
+        """Stop the stream and release the listenKey"""
+        self._running = False
+        for task in (self._maintenance_task, self._stream_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._maintenance_task = self._stream_task = None
+        if self._listen_key and self._aster_client:
+            try:
+                await self._aster_client.close_user_data_stream()
+            except Exception as e:
+                logger.debug(f"Could not close listenKey: {e}")
+        self._listen_key = None
+        self._connected = False
+        self._synced = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def is_live(self) -> bool:
+        """True if the book is synced and the stream is connected (reads are authoritative)"""
+        return self._running and self._connected and self._synced
+
+    def get_age(self) -> float:
+        """Seconds since the book last changed (event or resync)"""
+        latest = max(self._last_event, self._synced_at)
+        return time.time() - latest if latest else float("inf")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Stream health for logging and the dashboard"""
+        with self._book_lock:
+            open_positions = sum(1 for p in self._positions.values() if float(p.get("positionAmt", 0)) != 0)
+            open_orders = sum(len(orders) for orders in self._orders.values())
+        return {
+            "running": self._running,
+            "connected": self._connected,
+            "synced": self._synced,
+            "last_event_time": self._last_event_time,
+            "last_event_age": round(time.time() - self._last_event, 1) if self._last_event else None,
+            "last_resync_age": round(time.time() - self._synced_at, 1) if self._synced_at else None,
+            "open_positions": open_positions,
+            "open_orders": open_orders,
+            "subscribers": len(self._subscribers),
+        }
+
+    # ========== Reads ==========
+
+    def get_account(self) -> Optional[Dict[str, Any]]:
+        """
+        Account in the shape GET /account returns (assets, positions, totals)
+
+        Positions and totalUnrealizedProfit are re-marked to the latest price;
+        other totals (availableBalance, margins) are as of the last REST resync.
+
+        Returns:
+            Account dict, or None before the first snapshot or if an open position
+            can't be marked (callers should fall back to REST)
+        """
+        with self._book_lock:
+            if self._view is None:
+                if self._account is None:
+                    return None
+                view = dict(self._account)
+                view["assets"] = [dict(asset) for asset in self._balances.values()]
+                view["positions"] = [dict(position) for position in self._positions.values()]
+                self._view = view
+            view = self._view
+        # The view is never modified once built; each caller gets its own re-marked copy
+        positions = self._marked_positions(view["positions"])
+        if positions is None:
+            return None
+        account = dict(view)
+        account["assets"] = list(view["assets"])
+        account["positions"] = positions
+        account["totalUnrealizedProfit"] = str(sum(float(p.get("unrealizedProfit", 0)) for p in positions))
+        return account
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Open orders (one symbol or all), in the shape GET /openOrders returns"""
+        with self._book_lock:
+            if symbol:
+                return list(self._orders.get(symbol.upper(), {}).values())
+            return [order for orders in self._orders.values() for order in orders.values()]
+
+    def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Open position for a symbol (None if flat), like AsterClient.get_position"""
+        symbol = symbol.upper()
+        with self._book_lock:
+            for (s, _), position in self._positions.items():
+                if s == symbol and float(position.get("positionAmt", 0)) != 0:
+                    return dict(position)
+        return None
+
+    def _marked_positions(self, positions: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Copy of positions with open ones re-marked (PnL, notional); None if a price is missing"""
+        marked = []
+        for position in positions:
+            amount = float(position.get("positionAmt", 0))
+            if amount != 0:
+                price = self._mark_price(position["symbol"]) if self._mark_price else None
+                if price is None:
+                    return None
+                entry = float(position.get("entryPrice", 0))
+                position = dict(position)
+                position["unrealizedProfit"] = str(amount * (price - entry))
+                position["notional"] = str(amount * price)
+            marked.append(position)
+        return marked
+
+    # ========== Subscriptions ==========
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Receive every raw stream event on the caller's event loop
+
+        Returns:
+            Queue of event dicts; pass it to unsubscribe() when done
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        with self._subscribers_lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._subscribers_lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+
+    def _publish(self, event: Dict[str, Any]):
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:  # Subscriber's loop is closed
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: Dict[str, Any]):
+        if not queue.full():  # A stalled subscriber drops events rather than blocking the stream
+            queue.put_nowait(event)
+
+    # ========== Stream ==========
+
+    async def _resync(self) -> bool:
+        """
+        Replace the book with a REST snapshot (account + all open orders)
+
+        Returns:
+            True if the snapshot was taken
+        """
+        self._resyncing = True
+        self._pending = []
+        try:
+            account, orders = await asyncio.gather(
+                self._aster_client.get_account(),
+                self._aster_client.get_open_orders()
+            )
+            by_symbol: Dict[str, Dict[int, Dict[str, Any]]] = {}
+            for order in orders:
+                by_symbol.setdefault(order["symbol"], {})[order["orderId"]] = order
+            with self._book_lock:
+                self._account = {key: value for key, value in account.items() if key not in ("assets", "positions")}
+                self._balances = {asset["asset"]: dict(asset) for asset in account.get("assets", [])}
+                self._positions = {
+                    (p["symbol"], p.get("positionSide", "BOTH")): dict(p) for p in account.get("positions", [])
+                }
+                self._orders = by_symbol
+                self._view = None
+            self._synced = True
+            self._synced_at = time.time()
+            self._first_sync.set()
+            logger.info(f"🔄 User data resynced ({len(orders)} open orders)")
+            return True
+        except Exception as e:
+            logger.error(f"❌ User data resync failed: {e}")
+            return False
+        finally:
+            # Replay in stream order: events the snapshot already reflects are skipped per
+            # entity by updateTime, and any stale one is followed by its newer event
+            self._resyncing = False
+            pending, self._pending = self._pending, []
+            for event in pending:
+                self._apply(event)
+
+    async def _maintenance_loop(self):
+        """Keep the listenKey alive, retry failed syncs and resync periodically"""
+        while self._running:
+            await asyncio.sleep(30)
+            now = time.time()
+            if self._listen_key and now - self._keepalive_at >= config.aster.user_stream_keepalive:
+                try:
+                    await self._aster_client.keepalive_user_data_stream()
+                    self._keepalive_at = now
+                    logger.debug("✅ Extended listenKey validity")
+                except Exception as e:
+                    logger.warning(f"⚠️ listenKey keepalive failed: {e}")
+            if self._connected and not self._resyncing and (
+                not self._synced or now - self._synced_at >= config.aster.user_stream_resync
+            ):
+                await self._resync()
+
+    async def _stream_loop(self):
+        """Consume the user data stream, renewing the listenKey and resyncing on reconnect"""
+        backoff = 1
+        while self._running:
+            try:
+                self._listen_key = await self._aster_client.start_user_data_stream()
+                self._keepalive_at = time.time()  # POST extends an active key too
+
+                url = f"{config.aster.stream_url}/ws/{self._listen_key}"
+                async with websockets.connect(url, ping_interval=300, ping_timeout=60) as ws:
+                    self._connected = True
+                    backoff = 1
+                    logger.info("✅ Connected to Aster user data stream")
+
+                    # Anything may have changed while we were disconnected (events queue up meanwhile)
+                    await self._resync()
+
+                    async for message in ws:
+                        try:
+                            event = json.loads(message)
+                        except json.JSONDecodeError:
+                            continue
+                        if event.get("e") == "listenKeyExpired":
+                            logger.warning("⚠️ listenKey expired, renewing...")
+                            break
+                        if self._resyncing:
+                            self._pending.append(event)
+                        else:
+                            self._apply(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ User data stream disconnected: {e}. Reconnecting in {backoff}s...")
+            finally:
+                self._connected = False
+                self._synced = False
+
+            if self._running:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _apply(self, event: Dict[str, Any]):
+        """Apply one stream event to the book and forward it to subscribers"""
+        event_type = event.get("e")
+        event_time = int(event.get("E", 0))
+
+        with self._book_lock:
+            if event_type == "ACCOUNT_UPDATE":
+                self._apply_account_update(event)
+            elif event_type == "ORDER_TRADE_UPDATE":
+                self._apply_order_update(event)
+            elif event_type == "ACCOUNT_CONFIG_UPDATE":
+                leverage = event.get("ac", {})
+                for (symbol, _), position in self._positions.items():
+                    if symbol == leverage.get("s") and leverage.get("l") is not None:
+                        position["leverage"] = str(leverage["l"])
+                self._view = None
+            else:
+                logger.debug(f"User data event: {event_type}")
+
+        self._last_event = time.time()
+        self._last_event_time = max(self._last_event_time, event_time)
+        self._publish(event)
+
+    def _apply_account_update(self, event: Dict[str, Any]):
+        update = event.get("a", {})
+        update_time = event.get("T", event.get("E"))
+        for balance in update.get("B", []):
+            entry = self._balances.setdefault(balance["a"], {"asset": balance["a"]})
+            if int(entry.get("updateTime") or 0) > int(update_time or 0):
+                continue
+            entry["walletBalance"] = balance.get("wb", entry.get("walletBalance"))
+            entry["crossWalletBalance"] = balance.get("cw", entry.get("crossWalletBalance"))
+            entry["updateTime"] = update_time
+        for p in update.get("P", []):
+            key = (p["s"], p.get("ps", "BOTH"))
+            position = self._positions.setdefault(key, {"symbol": p["s"], "positionSide": key[1]})
+            if int(position.get("updateTime") or 0) > int(update_time or 0):
+                continue
+            amount = float(p.get("pa", 0))
+            entry_price = float(p.get("ep", 0))
+            unrealized = float(p.get("up", 0))
+            position.update({
+                "positionAmt": p.get("pa", "0"),
+                "entryPrice": p.get("ep", "0"),
+                "unrealizedProfit": p.get("up", "0"),
+                "notional": str(amount * entry_price + unrealized),
+                "isolated": p.get("mt") == "isolated",
+                "isolatedWallet": p.get("iw", "0"),
+                "updateTime": update_time,
+            })
+        self._view = None
+
+    def _apply_order_update(self, event: Dict[str, Any]):
+        order = _order_from_event(event.get("o", {}))
+        orders = self._orders.setdefault(order["symbol"], {})
+        current = orders.get(order["orderId"])
+        if current is not None and int(current.get("updateTime") or 0) > int(order["updateTime"] or 0):
+            return
+        if order["status"] in CLOSED_ORDER_STATUSES:
+            orders.pop(order["orderId"], None)
+        else:
+            orders[order["orderId"]] = order